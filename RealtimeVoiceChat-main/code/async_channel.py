@@ -0,0 +1,318 @@
+import asyncio
+import threading
+from collections import deque
+from queue import Queue
+from typing import Any, Callable, List, Optional
+
+LINKED_WAIT_TIMEOUT = 1.0 # Safety net for `wait_for_stream` when every event it waits for is a LinkedEvent
+
+
+class ThreadSafeAsyncEvent:
+    """
+    An asyncio.Event that worker threads can set without touching the event loop directly.
+
+    `set()` may be called from any thread; it schedules the actual event set on
+    the owning loop via `call_soon_threadsafe`. Bursts of `set()` calls made
+    before the loop got around to processing the first one are coalesced into a
+    single wakeup.
+    """
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Initializes the ThreadSafeAsyncEvent.
+
+        Args:
+            loop: The event loop that awaits this event. Defaults to the running loop.
+        """
+        self.loop = loop or asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        self._set_pending = False
+        self.wakeups = 0 # Number of times `wait` returned because the event was set
+
+    def _set_in_loop(self) -> None:
+        """Sets the event, always runs on the owning loop."""
+        self._set_pending = False
+        self._event.set()
+
+    def set(self) -> None:
+        """Wakes up the waiter. Safe to call from any thread."""
+        if self._set_pending:
+            return
+        self._set_pending = True
+        try:
+            self.loop.call_soon_threadsafe(self._set_in_loop)
+        except RuntimeError:
+            # Loop already closed (e.g. during shutdown), nobody is waiting anymore
+            self._set_pending = False
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the event is set or the timeout expires, then clears it.
+
+        Args:
+            timeout: Maximum time to wait in seconds, None waits forever.
+
+        Returns:
+            True if the event was set, False on timeout.
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._event.clear()
+        self.wakeups += 1
+        return True
+
+
+class NotifyingQueue(Queue):
+    """
+    A thread-safe `queue.Queue` that invokes a callback after every put.
+
+    Lets producer threads (e.g. TTS workers) wake an asyncio consumer through a
+    `ThreadSafeAsyncEvent` instead of the consumer polling with `get_nowait`.
+    """
+    def __init__(self, maxsize: int = 0, on_put: Optional[Callable[[], None]] = None, record: bool = False) -> None:
+        """
+        Initializes the NotifyingQueue.
+
+        Args:
+            maxsize: Maximum queue size as in `queue.Queue` (0 means unbounded).
+            on_put: Callback invoked (in the producer's thread) after an item was queued.
+            record: If True, every item put is also appended to `recorded`, so the
+                    full sequence stays available after consumers took items out.
+        """
+        super().__init__(maxsize)
+        self.on_put = on_put
+        self.recorded: Optional[List[Any]] = [] if record else None
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        """Puts an item into the queue and then fires `on_put` (`put_nowait` uses this too)."""
+        super().put(item, block, timeout)
+        if self.recorded is not None:
+            self.recorded.append(item)
+        if self.on_put:
+            self.on_put()
+
+
+class CoalescingAudioQueue:
+    """
+    Byte-budgeted asyncio queue for inbound audio packets.
+
+    Items are `AudioPacket` records (anything with a writable `pcm`). While less than
+    `coalesce_bytes` of audio is waiting, every packet is queued on its own.
+    Once the consumer falls behind, new PCM is appended to the newest waiting
+    packet instead, which keeps that packet's (earliest) metadata, so the
+    consumer catches up with fewer, larger chunks. Audio is only dropped when
+    the backlog would exceed `max_bytes`. `None` is queued as is (termination signal).
+    """
+    QUEUED = "queued"
+    COALESCED = "coalesced"
+    DROPPED = "dropped"
+
+    def __init__(self, coalesce_bytes: int, max_bytes: int) -> None:
+        """
+        Initializes the CoalescingAudioQueue.
+
+        Args:
+            coalesce_bytes: Backlog in bytes from which new packets are merged into the newest waiting one.
+            max_bytes: Hard cap on the backlog in bytes, packets that do not fit are dropped.
+        """
+        self.coalesce_bytes = coalesce_bytes
+        self.max_bytes = max_bytes
+        self._items: deque = deque()
+        self._not_empty = asyncio.Event()
+        self.bytes = 0 # PCM bytes currently waiting
+        self.coalesced_bytes = 0
+        self.dropped_bytes = 0
+
+    def qsize(self) -> int:
+        """Returns the number of waiting items (coalesced packets count once)."""
+        return len(self._items)
+
+    def put_nowait(self, item: Any) -> str:
+        """
+        Queues, coalesces or drops an audio packet.
+
+        Args:
+            item: An AudioPacket, or None.
+
+        Returns:
+            `QUEUED`, `COALESCED` or `DROPPED`.
+        """
+        if item is None:
+            self._items.append(None)
+            self._not_empty.set()
+            return self.QUEUED
+        size = len(item.pcm)
+        if self.bytes + size > self.max_bytes:
+            self.dropped_bytes += size
+            return self.DROPPED
+        self.bytes += size
+        tail = self._items[-1] if self._items else None
+        if tail is not None and self.bytes - size >= self.coalesce_bytes:
+            if not isinstance(tail.pcm, bytearray):
+                tail.pcm = bytearray(tail.pcm) # Grows in place from now on
+            tail.pcm += item.pcm
+            self.coalesced_bytes += size
+            return self.COALESCED
+        self._items.append(item)
+        self._not_empty.set()
+        return self.QUEUED
+
+    async def get(self) -> Any:
+        """Waits for and returns the oldest item."""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        item = self._items.popleft()
+        if item is not None:
+            self.bytes -= len(item.pcm)
+        return item
+
+
+class LinkedEvent(threading.Event):
+    """
+    A `threading.Event` that also sets the listener events registered with it.
+
+    Python cannot wait on several events at once; a waiter registers one
+    private event as listener on each LinkedEvent it cares about and blocks on
+    that instead (see `wait_for_stream`), so it wakes up on whichever is set first.
+    """
+    def __init__(self) -> None:
+        """Initializes the LinkedEvent without listeners."""
+        super().__init__()
+        self._listeners: List[Any] = []
+        self._listeners_lock = threading.Lock()
+
+    def set(self) -> None:
+        """Sets the event and all registered listeners."""
+        super().set()
+        with self._listeners_lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener.set()
+
+    def add_listener(self, listener: Any) -> None:
+        """Registers an event (or any object with a `set()` method) that is set whenever this event is set."""
+        with self._listeners_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Any) -> None:
+        """Unregisters a listener added with `add_listener`."""
+        with self._listeners_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+
+def wait_for_stream(
+        is_playing: Callable[[], bool],
+        finished_event: threading.Event,
+        stop_event: threading.Event,
+        poll_interval: float = 0.01,
+    ) -> bool:
+    """
+    Blocks until a stream has finished or a stop was requested.
+
+    The stream counts as finished once `finished_event` is set and `is_playing()`
+    returns False. LinkedEvents wake the waiter the moment they are set; plain
+    events are polled every `poll_interval`, as is `is_playing()` in the short
+    window after `finished_event` was set.
+
+    Args:
+        is_playing: Returns whether the stream is still running.
+        finished_event: Set by the stream when it stopped.
+        stop_event: Set by whoever wants the stream stopped.
+        poll_interval: Polling interval in seconds for events that cannot signal.
+
+    Returns:
+        True if the stream finished, False if `stop_event` was set first.
+    """
+    wakeup = threading.Event()
+    linked = [event for event in (finished_event, stop_event) if isinstance(event, LinkedEvent)]
+    for event in linked:
+        event.add_listener(wakeup)
+    try:
+        while True:
+            wakeup.clear()
+            if stop_event.is_set():
+                return False
+            if finished_event.is_set():
+                if not is_playing():
+                    return True
+                wakeup.wait(poll_interval)
+            elif len(linked) == 2:
+                wakeup.wait(LINKED_WAIT_TIMEOUT)
+            else:
+                wakeup.wait(poll_interval)
+    finally:
+        for event in linked:
+            event.remove_listener(wakeup)
+
+
+class ResourcePool:
+    """
+    A fixed set of interchangeable resources that threads check out one at a time.
+
+    `acquire` blocks until a resource is free, woken by `release` or, if the
+    stop event is a LinkedEvent, the moment a stop is requested; plain stop
+    events are polled. Used to share a few TTS engines between sessions, which
+    check one out per text they synthesize.
+    """
+    def __init__(self, items: List[Any], poll_interval: float = 0.05) -> None:
+        """
+        Initializes the ResourcePool.
+
+        Args:
+            items: The resources, all free initially.
+            poll_interval: Polling interval in seconds for stop events that cannot signal.
+        """
+        self.size = len(items)
+        self.poll_interval = poll_interval
+        self._free = deque(items)
+        self._condition = threading.Condition()
+
+    @property
+    def available(self) -> int:
+        """Number of resources currently free."""
+        return len(self._free)
+
+    def try_acquire(self) -> Optional[Any]:
+        """Returns a free resource without waiting, or None if all are checked out."""
+        with self._condition:
+            return self._free.popleft() if self._free else None
+
+    def acquire(self, stop_event: threading.Event) -> Optional[Any]:
+        """
+        Checks out a resource, waiting until one is free.
+
+        Args:
+            stop_event: Cancels the wait when set.
+
+        Returns:
+            The resource, or None if `stop_event` was set first.
+        """
+        linked = isinstance(stop_event, LinkedEvent)
+        if linked:
+            stop_event.add_listener(self)
+        try:
+            with self._condition:
+                while not self._free:
+                    if stop_event.is_set():
+                        return None
+                    self._condition.wait(LINKED_WAIT_TIMEOUT if linked else self.poll_interval)
+                if stop_event.is_set():
+                    return None
+                return self._free.popleft()
+        finally:
+            if linked:
+                stop_event.remove_listener(self)
+
+    def release(self, item: Any) -> None:
+        """Returns a resource checked out with `acquire` and wakes the waiters."""
+        with self._condition:
+            self._free.append(item)
+            self._condition.notify_all()
+
+    def set(self) -> None:
+        """LinkedEvent listener hook: wakes the waiters so they see their stop event."""
+        with self._condition:
+            self._condition.notify_all()
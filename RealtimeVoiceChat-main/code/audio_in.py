@@ -2,7 +2,8 @@ import asyncio
 import logging
 from typing import Optional, Callable
 import numpy as np
-from scipy.signal import resample_poly
+from async_channel import CoalescingAudioQueue
+from streaming_resampler import StreamingDecimator
 from transcribe import TranscriptionProcessor
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ class AudioInputProcessor:
             is_orpheus: bool = False,
             silence_active_callback: Optional[Callable[[bool], None]] = None,
             pipeline_latency: float = 0.5,
+            session_id: Optional[int] = None,
         ) -> None:
         """
         Initializes the AudioInputProcessor.
@@ -36,14 +38,17 @@ class AudioInputProcessor:
             silence_active_callback: Optional callback function invoked when silence state changes.
                                      It receives a boolean argument (True if silence is active).
             pipeline_latency: Estimated latency of the processing pipeline in seconds.
+            session_id: The voice session this processor belongs to, tags trace events.
         """
         self.last_partial_text: Optional[str] = None
+        self.decimator = StreamingDecimator(self._RESAMPLE_RATIO)
         self.transcriber = TranscriptionProcessor(
             language,
             on_recording_start_callback=self._on_recording_start,
             silence_active_callback=self._silence_active_callback,
             is_orpheus=is_orpheus,
             pipeline_latency=pipeline_latency,
+            session_id=session_id,
         )
         # Flag to indicate if the transcription loop has failed fatally
         self._transcription_failed = False
@@ -121,46 +126,33 @@ class AudioInputProcessor:
         """
         Converts raw audio bytes (int16) to a 16kHz 16-bit PCM numpy array.
 
-        The audio is converted to float32 for accurate resampling and then
-        converted back to int16, clipping values outside the valid range.
+        Uses the connection's `StreamingDecimator`, which keeps the FIR filter
+        history between chunks so consecutive chunks are resampled as one
+        continuous signal. Values outside the int16 range are clipped.
 
         Args:
             raw_bytes: Raw audio data assumed to be in int16 format.
 
         Returns:
-            A numpy array containing the resampled audio in int16 format at 16kHz.
-            Returns an array of zeros if the input is silent.
+            A numpy array containing the resampled audio in int16 format at 16kHz
+            (`ceil(samples / 3)` samples). Returns an array of zeros if the input
+            is silent. The array is reused by the next call, copy it if needed.
         """
         raw_audio = np.frombuffer(raw_bytes, dtype=np.int16)
+        return self.decimator.process(raw_audio)
 
-        if np.max(np.abs(raw_audio)) == 0:
-            # Calculate expected length after resampling for silence
-            expected_len = int(np.ceil(len(raw_audio) / self._RESAMPLE_RATIO))
-            return np.zeros(expected_len, dtype=np.int16)
 
-        # Convert to float32 for resampling precision
-        audio_float32 = raw_audio.astype(np.float32)
-
-        # Resample using float32 data
-        resampled_float = resample_poly(audio_float32, 1, self._RESAMPLE_RATIO)
-
-        # Convert back to int16, clipping to ensure validity
-        resampled_int16 = np.clip(resampled_float, -32768, 32767).astype(np.int16)
-
-        return resampled_int16
-
-
-    async def process_chunk_queue(self, audio_queue: asyncio.Queue) -> None:
+    async def process_chunk_queue(self, audio_queue: CoalescingAudioQueue) -> None:
         """
-        Continuously processes audio chunks received from an asyncio Queue.
+        Continuously processes audio chunks received from the inbound audio queue.
 
         Retrieves audio data, processes it using `process_audio_chunk`, and
         feeds the result to the transcriber unless interrupted or the transcription
         task has failed. Stops when `None` is received from the queue or upon error.
 
         Args:
-            audio_queue: An asyncio queue expected to yield dictionaries containing
-                         'pcm' (raw audio bytes) or None to terminate.
+            audio_queue: The session's inbound queue, yielding `AudioPacket` records
+                         (raw audio in `pcm`, several packets if coalesced) or None to terminate.
         """
         logger.info("👂▶️ Starting audio chunk processing loop.")
         while True:
@@ -190,7 +182,7 @@ class AudioInputProcessor:
                     logger.info("👂🔌 Received termination signal for audio processing.")
                     break  # Termination signal
 
-                pcm_data = audio_data.pop("pcm")
+                pcm_data = audio_data.pcm
 
                 # Process audio chunk (resampling happens consistently via float32)
                 processed = self.process_audio_chunk(pcm_data)
@@ -216,6 +208,30 @@ class AudioInputProcessor:
         logger.info("👂⏹️ Audio chunk processing loop finished.")
 
 
+    def reset(self) -> None:
+        """
+        Resets per-connection state so the processor can serve a new client.
+
+        Detaches all externally set callbacks, clears the interruption flag and
+        the last partial text, and resets the underlying transcriber state.
+        """
+        logger.info("👂🔄 Resetting AudioInputProcessor state.")
+        self.realtime_callback = None
+        self.recording_start_callback = None
+        self.silence_active_callback = None
+        self.interrupted = False
+        self.last_partial_text = None
+        self.decimator.reset()
+
+        transcriber = self.transcriber
+        transcriber.potential_sentence_end = None
+        transcriber.potential_full_transcription_callback = None
+        transcriber.potential_full_transcription_abort_callback = None
+        transcriber.full_transcription_callback = None
+        transcriber.before_final_sentence = None
+        transcriber.on_tts_allowed_to_synthesize = None
+        transcriber.reset()
+
     def shutdown(self) -> None:
         """
         Initiates shutdown procedures for the audio processor and transcriber.
@@ -1,4 +1,5 @@
 import asyncio
+import importlib.metadata
 import logging
 import os
 import struct
@@ -6,13 +7,19 @@ import threading
 import time
 from collections import namedtuple
 from queue import Queue
-from typing import Callable, Generator, Optional
+from typing import Callable, Dict, Generator, List, Optional
 
 import numpy as np
 from huggingface_hub import hf_hub_download
 # Assuming RealtimeTTS is installed and available
 from RealtimeTTS import (CoquiEngine, KokoroEngine, OrpheusEngine,
                          OrpheusVoice, TextToAudioStream)
+from stream2sentence import generate_sentences
+
+from async_channel import LinkedEvent, ResourcePool, wait_for_stream
+from tts_cache import ChunkRecorder, TTSCache, fingerprint_files
+from turn_trace import tracer
+from metrics import TTS_TTFA, TTS_REAL_TIME_FACTOR
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +35,38 @@ ENGINE_SILENCES = {
 QUICK_ANSWER_STREAM_CHUNK_SIZE = 8
 FINAL_ANSWER_STREAM_CHUNK_SIZE = 30
 
+# Cache of synthesized audio for short, often repeated quick answers ("Sure!", "Okay.")
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE", "1").lower() not in ("0", "false", "no")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache") # Empty keeps the cache in memory only
+try:
+    TTS_CACHE_MEMORY_MB = int(os.getenv("TTS_CACHE_MEMORY_MB", 64))
+except ValueError:
+    logger.warning("👄⚠️ Invalid TTS_CACHE_MEMORY_MB env var. Using default: 64")
+    TTS_CACHE_MEMORY_MB = 64
+try:
+    TTS_CACHE_DISK_MB = int(os.getenv("TTS_CACHE_DISK_MB", 512))
+except ValueError:
+    logger.warning("👄⚠️ Invalid TTS_CACHE_DISK_MB env var. Using default: 512")
+    TTS_CACHE_DISK_MB = 512
+try:
+    TTS_CACHE_MAX_CHARS = int(os.getenv("TTS_CACHE_MAX_CHARS", 80))
+except ValueError:
+    logger.warning("👄⚠️ Invalid TTS_CACHE_MAX_CHARS env var. Using default: 80")
+    TTS_CACHE_MAX_CHARS = 80
+
+try:
+    # Engine instances shared by all sessions; quick answers and final answer sentences check one out each
+    TTS_FINAL_ENGINES = int(os.getenv("TTS_FINAL_ENGINES", 1))
+except ValueError:
+    logger.warning("👄⚠️ Invalid TTS_FINAL_ENGINES env var. Using default: 1")
+    TTS_FINAL_ENGINES = 1
+try:
+    # Sentences synthesized ahead of the one currently being emitted
+    TTS_SENTENCE_LOOKAHEAD = int(os.getenv("TTS_SENTENCE_LOOKAHEAD", 3))
+except ValueError:
+    logger.warning("👄⚠️ Invalid TTS_SENTENCE_LOOKAHEAD env var. Using default: 3")
+    TTS_SENTENCE_LOOKAHEAD = 3
+
 # Coqui model download helper functions
 def create_directory(path: str) -> None:
     """
@@ -65,6 +104,96 @@ def ensure_lasinya_models(models_root: str = "models", model_name: str = "Lasiny
                 local_dir=base
             )
 
+def _package_version(name: str) -> str:
+    """Returns the installed version of a package, or "unknown"."""
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+class SynthesisLane:
+    """
+    One TTS engine with its own RealtimeTTS stream, synthesizing one text at a time.
+
+    `AudioProcessor` keeps its lanes in a pool shared by all sessions. A lane is
+    checked out per quick answer or final answer sentence, so several lanes
+    synthesize different sessions' texts, or the sentences of one final answer,
+    in parallel.
+    """
+    def __init__(self, name: str, engine, stream: Optional[TextToAudioStream] = None, finished_event: Optional[threading.Event] = None, chunk_size: Optional[int] = None) -> None:
+        """
+        Initializes a SynthesisLane.
+
+        Args:
+            name: Lane name for logging.
+            engine: The RealtimeTTS engine of this lane.
+            stream: An existing stream for `engine`; a new muted one is created if None.
+            finished_event: Event set by `stream` when it stops (required if `stream` is given).
+            chunk_size: The engine's current stream chunk size (Coqui), if known.
+        """
+        self.name = name
+        self.engine = engine
+        self.chunk_size = chunk_size
+        if stream is None:
+            finished_event = LinkedEvent()
+            stream = TextToAudioStream(
+                engine,
+                muted=True,
+                playout_chunk_size=4096,
+                on_audio_stream_stop=finished_event.set,
+            )
+        self.stream = stream
+        self.finished_event = finished_event
+
+    def set_chunk_size(self, chunk_size: int) -> None:
+        """Sets the engine's stream chunk size if it supports one and it differs."""
+        if self.chunk_size != chunk_size and hasattr(self.engine, 'set_stream_chunk_size'):
+            self.engine.set_stream_chunk_size(chunk_size)
+            self.chunk_size = chunk_size
+
+    def synthesize(self, text: str, on_audio_chunk: Callable[[bytes], None], stop_event: threading.Event, silence: Silence) -> bool:
+        """
+        Synthesizes a text, passing every audio chunk to `on_audio_chunk`.
+
+        Args:
+            text: The text to synthesize.
+            on_audio_chunk: Called with each PCM chunk from the stream's thread.
+            stop_event: Stops the synthesis when set.
+            silence: Pause durations for the engine.
+
+        Returns:
+            True if synthesis completed fully, False if interrupted by stop_event.
+        """
+        self.stream.feed(text)
+        self.finished_event.clear()
+        self.stream.play_async(
+            log_synthesized_text=False,
+            on_audio_chunk=on_audio_chunk,
+            muted=True,
+            fast_sentence_fragment=False,
+            comma_silence_duration=silence.comma,
+            sentence_silence_duration=silence.sentence,
+            default_silence_duration=silence.default,
+            force_first_fragment_after_words=999999,
+        )
+        if not wait_for_stream(self.stream.is_playing, self.finished_event, stop_event):
+            self.stream.stop()
+            self.finished_event.wait(timeout=1.0)
+            return False
+        return True
+
+
+class SentenceAudio:
+    """Audio of one final answer sentence, filled by a lane and emitted in order."""
+    __slots__ = ("text", "chunks", "done", "audio_bytes")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.audio_bytes = 0 # Total synthesized, `chunks` is emptied once emitted
+
+
 class AudioProcessor:
     """
     Manages Text-to-Speech (TTS) synthesis using various engines via RealtimeTTS.
@@ -94,7 +223,7 @@ class AudioProcessor:
         """
         self.engine_name = engine
         self.stop_event = threading.Event()
-        self.finished_event = threading.Event()
+        self.finished_event = LinkedEvent() # Set by on_audio_stream_stop, wakes synthesis waits immediately
         self.audio_chunks = asyncio.Queue() # Queue for synthesized audio output
         self.orpheus_model = orpheus_model
 
@@ -102,46 +231,7 @@ class AudioProcessor:
         self.current_stream_chunk_size = QUICK_ANSWER_STREAM_CHUNK_SIZE # Initial chunk size
 
         # Dynamically load and configure the selected TTS engine
-        if engine == "coqui":
-            ensure_lasinya_models(models_root="models", model_name="Lasinya")
-            self.engine = CoquiEngine(
-                specific_model="Lasinya",
-                local_models_path="./models",
-                voice="reference_audio.wav",
-                speed=1.1,
-                use_deepspeed=True,
-                thread_count=6,
-                stream_chunk_size=self.current_stream_chunk_size,
-                overlap_wav_len=1024,
-                load_balancing=True,
-                load_balancing_buffer_length=0.5,
-                load_balancing_cut_off=0.1,
-                add_sentence_filter=True,
-            )
-        elif engine == "kokoro":
-            self.engine = KokoroEngine(
-                voice="af_heart",
-                default_speed=1.26,
-                trim_silence=True,
-                silence_threshold=0.01,
-                extra_start_ms=25,
-                extra_end_ms=15,
-                fade_in_ms=15,
-                fade_out_ms=10,
-            )
-        elif engine == "orpheus":
-            self.engine = OrpheusEngine(
-                model=self.orpheus_model,
-                temperature=0.8,
-                top_p=0.95,
-                repetition_penalty=1.1,
-                max_tokens=1200,
-            )
-            voice = OrpheusVoice("tara")
-            self.engine.set_voice(voice)
-        else:
-            raise ValueError(f"Unsupported engine: {engine}")
-
+        self.engine = self._create_engine()
 
         # Initialize the RealtimeTTS stream
         self.stream = TextToAudioStream(
@@ -170,19 +260,19 @@ class AudioProcessor:
         )
         self.stream.play(**play_kwargs) # Synchronous play for prewarm
         # Wait for prewarm to finish (indicated by on_audio_stream_stop)
-        while self.stream.is_playing():
-            time.sleep(0.01)
         self.finished_event.wait() # Wait for stop callback
         self.finished_event.clear()
 
         # Measure Time To First Audio (TTFA)
         start_time = time.time()
         ttfa = None
+        first_chunk_event = LinkedEvent()
         def on_audio_chunk_ttfa(chunk: bytes):
             nonlocal ttfa
             if ttfa is None:
                 ttfa = time.time() - start_time
-                logger.debug(f"👄⏱️ TTFA measurement first chunk arrived, TTFA: {ttfa:.2f}s.")
+                first_chunk_event.set()
+                logger.debug("👄⏱️ TTFA measurement first chunk arrived, TTFA: %.2fs.", ttfa)
 
         self.stream.feed("This is a test sentence to measure the time to first audio chunk.")
         play_kwargs_ttfa = dict(
@@ -198,8 +288,7 @@ class AudioProcessor:
         self.stream.play_async(**play_kwargs_ttfa)
 
         # Wait until the first chunk arrives or stream finishes
-        while ttfa is None and (self.stream.is_playing() or not self.finished_event.is_set()):
-            time.sleep(0.01)
+        wait_for_stream(self.stream.is_playing, self.finished_event, first_chunk_event)
         self.stream.stop() # Ensure stream stops cleanly
 
         # Wait for stop callback if it hasn't fired yet
@@ -208,7 +297,7 @@ class AudioProcessor:
         self.finished_event.clear()
 
         if ttfa is not None:
-            logger.debug(f"👄⏱️ TTFA measurement complete. TTFA: {ttfa:.2f}s.")
+            logger.debug("👄⏱️ TTFA measurement complete. TTFA: %.2fs.", ttfa)
             self.tts_inference_time = ttfa * 1000  # Store as ms
         else:
             logger.warning("👄⚠️ TTFA measurement failed (no audio chunk received).")
@@ -217,6 +306,90 @@ class AudioProcessor:
         # Callbacks to be set externally if needed
         self.on_first_audio_chunk_synthesize: Optional[Callable[[], None]] = None
 
+        self.tts_cache: Optional[TTSCache] = None
+        if TTS_CACHE_ENABLED:
+            self.tts_cache = TTSCache(
+                directory=TTS_CACHE_DIR or None,
+                max_memory_bytes=TTS_CACHE_MEMORY_MB * 1024 * 1024,
+                max_disk_bytes=TTS_CACHE_DISK_MB * 1024 * 1024,
+                max_text_chars=TTS_CACHE_MAX_CHARS,
+            )
+
+        # Engine instances shared by all sessions, checked out per text (see `_acquire_lane`)
+        self.synthesis_lanes: List[SynthesisLane] = [SynthesisLane("lane 0", self.engine, self.stream, self.finished_event, self.current_stream_chunk_size)]
+        for lane_index in range(1, max(1, TTS_FINAL_ENGINES)):
+            lane = SynthesisLane(f"lane {lane_index}", self._create_engine(), chunk_size=self.current_stream_chunk_size)
+            lane.synthesize("prewarm", lambda chunk: None, threading.Event(), self.silence)
+            self.synthesis_lanes.append(lane)
+        self.lane_pool = ResourcePool(list(self.synthesis_lanes))
+        if len(self.synthesis_lanes) > 1:
+            logger.info(f"👄🛤️ {len(self.synthesis_lanes)} TTS engines; final answers are synthesized sentence by sentence ({TTS_SENTENCE_LOOKAHEAD} sentences lookahead).")
+
+    def _create_engine(self):
+        """
+        Creates and configures a TTS engine instance for `engine_name`.
+
+        Also sets `model_id`, `voice` and `speed`, which identify the engine's output
+        in the TTS cache. Model and voice files are fingerprinted, so a replaced
+        reference clip or model invalidates the cached phrases.
+
+        Returns:
+            The RealtimeTTS engine instance.
+
+        Raises:
+            ValueError: If `engine_name` is not a supported engine.
+        """
+        if self.engine_name == "coqui":
+            ensure_lasinya_models(models_root="models", model_name="Lasinya")
+            model_dir = os.path.join("models", "Lasinya")
+            model_files = [os.path.join(model_dir, fn) for fn in ("config.json", "vocab.json", "speakers_xtts.pth", "model.pth")]
+            self.model_id = f"Lasinya@{fingerprint_files(model_files)}"
+            reference_audio = "reference_audio.wav" # Resolved against the working directory by CoquiEngine
+            self.voice = f"{reference_audio}@{fingerprint_files([reference_audio])}"
+            self.speed = 1.1
+            engine = CoquiEngine(
+                specific_model="Lasinya",
+                local_models_path="./models",
+                voice=reference_audio,
+                speed=self.speed,
+                use_deepspeed=True,
+                thread_count=6,
+                stream_chunk_size=self.current_stream_chunk_size,
+                overlap_wav_len=1024,
+                load_balancing=True,
+                load_balancing_buffer_length=0.5,
+                load_balancing_cut_off=0.1,
+                add_sentence_filter=True,
+            )
+        elif self.engine_name == "kokoro":
+            self.model_id = f"kokoro@{_package_version('kokoro')}"
+            self.voice, self.speed = "af_heart", 1.26
+            engine = KokoroEngine(
+                voice=self.voice,
+                default_speed=self.speed,
+                trim_silence=True,
+                silence_threshold=0.01,
+                extra_start_ms=25,
+                extra_end_ms=15,
+                fade_in_ms=15,
+                fade_out_ms=10,
+            )
+        elif self.engine_name == "orpheus":
+            engine = OrpheusEngine(
+                model=self.orpheus_model,
+                temperature=0.8,
+                top_p=0.95,
+                repetition_penalty=1.1,
+                max_tokens=1200,
+            )
+            self.model_id = self.orpheus_model
+            self.voice, self.speed = "tara", 1.0
+            voice = OrpheusVoice("tara")
+            engine.set_voice(voice)
+        else:
+            raise ValueError(f"Unsupported engine: {self.engine_name}")
+        return engine
+
     def on_audio_stream_stop(self) -> None:
         """
         Callback executed when the RealtimeTTS audio stream stops processing.
@@ -226,12 +399,43 @@ class AudioProcessor:
         logger.info("👄🛑 Audio stream stopped.")
         self.finished_event.set()
 
+    def _acquire_lane(self, stop_event: threading.Event, generation_string: str = "", session_id: Optional[int] = None) -> Optional[SynthesisLane]:
+        """
+        Checks out a free synthesis lane, waiting while all are busy.
+
+        The AudioProcessor is shared by all sessions, but each lane's stream can
+        only synthesize one text at a time. Lanes are held for one text (a quick
+        answer or one final answer sentence), never while waiting for LLM
+        tokens, so other sessions get a lane within one sentence. The wait wakes
+        immediately on a LinkedEvent stop_event. Release with `lane_pool.release`.
+
+        Args:
+            stop_event: A threading.Event that cancels the wait when set.
+            generation_string: An optional identifier string for logging purposes.
+            session_id: The requesting voice session, tags the trace event of the wait.
+
+        Returns:
+            The lane, or None if the wait was cancelled by stop_event.
+        """
+        lane = self.lane_pool.try_acquire()
+        if lane is not None:
+            return lane
+        logger.info("👄⏳ %s All TTS engines busy, waiting for a synthesis lane...", generation_string)
+        wait_start = time.time()
+        lane = self.lane_pool.acquire(stop_event)
+        tracer.complete("tts_lane_wait", "tts", wait_start, session=session_id)
+        if lane is None:
+            logger.info("👄🛑 %s Stopped while waiting for a synthesis lane.", generation_string)
+        return lane
+
     def synthesize(
             self,
             text: str,
             audio_chunks: Queue, 
             stop_event: threading.Event,
             generation_string: str = "",
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+            session_id: Optional[int] = None,
         ) -> bool:
         """
         Synthesizes audio from a complete text string and puts chunks into a queue.
@@ -240,7 +444,11 @@ class AudioProcessor:
         they are potentially buffered initially for smoother streaming and then put
         into the provided queue. Synthesis can be interrupted via the stop_event.
         Skips initial silent chunks if using the Orpheus engine. Triggers the
-        `on_first_audio_chunk_synthesize` callback when the first valid audio chunk is queued.
+        first-chunk callback when the first valid audio chunk is queued.
+
+        Short texts are looked up in the TTS cache first; a hit replays the stored
+        chunks without touching the engine. Completed syntheses of short texts
+        are added to the cache.
 
         Args:
             text: The text string to synthesize.
@@ -249,17 +457,105 @@ class AudioProcessor:
             stop_event: A threading.Event to signal interruption of the synthesis.
                         This should typically be the instance's `self.stop_event`.
             generation_string: An optional identifier string for logging purposes.
+            on_first_audio_chunk: Callback fired for this call when the first chunk is
+                                  queued. Defaults to `on_first_audio_chunk_synthesize`.
+            session_id: The requesting voice session, tags the trace events.
 
         Returns:
             True if synthesis completed fully, False if interrupted by stop_event.
         """
-        if self.engine_name == "coqui" and hasattr(self.engine, 'set_stream_chunk_size') and self.current_stream_chunk_size != QUICK_ANSWER_STREAM_CHUNK_SIZE:
-            logger.info(f"👄⚙️ {generation_string} Setting Coqui stream chunk size to {QUICK_ANSWER_STREAM_CHUNK_SIZE} for quick synthesis.")
-            self.engine.set_stream_chunk_size(QUICK_ANSWER_STREAM_CHUNK_SIZE)
-            self.current_stream_chunk_size = QUICK_ANSWER_STREAM_CHUNK_SIZE
+        with tracer.span("tts_synthesize", "tts", session=session_id, engine=self.engine_name, chars=len(text)) as span:
+            cache_key = self.tts_cache.make_key(self.engine_name, self.model_id, self.voice, self.speed, text) if self.tts_cache else None
+            if cache_key:
+                cached_chunks = self.tts_cache.get(cache_key)
+                if cached_chunks is not None:
+                    span.set(cached=True)
+                    return self._replay_cached(text, cached_chunks, audio_chunks, stop_event, generation_string, on_first_audio_chunk)
+
+            lane = self._acquire_lane(stop_event, generation_string, session_id)
+            if lane is None:
+                return False
+            try:
+                if not cache_key:
+                    return self._synthesize(lane, text, audio_chunks, stop_event, generation_string, on_first_audio_chunk)
+                recorder = ChunkRecorder(audio_chunks)
+                completed = self._synthesize(lane, text, recorder, stop_event, generation_string, on_first_audio_chunk)
+                if completed and not stop_event.is_set():
+                    self.tts_cache.put(cache_key, recorder.chunks)
+                return completed
+            finally:
+                self.lane_pool.release(lane)
+
+    def _replay_cached(
+            self,
+            text: str,
+            chunks: list,
+            audio_chunks: Queue,
+            stop_event: threading.Event,
+            generation_string: str = "",
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+        ) -> bool:
+        """
+        Puts cached audio chunks into the queue instead of running the engine.
 
-        self.stream.feed(text)
-        self.finished_event.clear() # Reset finished event before starting
+        Args:
+            text: The text the chunks were synthesized from (for logging).
+            chunks: The cached PCM chunks.
+            audio_chunks: The queue to put the audio chunks into.
+            stop_event: A threading.Event to signal interruption.
+            generation_string: An optional identifier string for logging purposes.
+            on_first_audio_chunk: Optional per-call first-chunk callback.
+
+        Returns:
+            True if all chunks were queued, False if interrupted by stop_event.
+        """
+        first_chunk_callback = on_first_audio_chunk or self.on_first_audio_chunk_synthesize
+        logger.info("👄💾 %s Quick answer served from TTS cache (%s chunks). Text: %.50s...", generation_string, len(chunks), text)
+        for i, chunk in enumerate(chunks):
+            if stop_event.is_set():
+                logger.info(f"👄🛑 {generation_string} Cached audio replay aborted by stop_event. Text: {text[:50]}...")
+                return False
+            try:
+                audio_chunks.put_nowait(chunk)
+            except asyncio.QueueFull:
+                logger.warning(f"👄⚠️ {generation_string} Quick audio queue full, dropping cached chunk.")
+            if i == 0 and first_chunk_callback:
+                try:
+                    first_chunk_callback()
+                except Exception as e:
+                    logger.error(f"👄💥 {generation_string} Error in on_first_audio_chunk_synthesize callback (cached audio): {e}", exc_info=True)
+        return True
+
+    def _synthesize(
+            self,
+            lane: SynthesisLane,
+            text: str,
+            audio_chunks: Queue, 
+            stop_event: threading.Event,
+            generation_string: str = "",
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+        ) -> bool:
+        """
+        Performs the actual text synthesis for `synthesize`. Caller must have checked out `lane`.
+
+        Args:
+            lane: The synthesis lane to run the text on.
+            text: The text string to synthesize.
+            audio_chunks: The queue to put the resulting audio chunks (bytes) into.
+            stop_event: A threading.Event to signal interruption of the synthesis.
+            generation_string: An optional identifier string for logging purposes.
+            on_first_audio_chunk: Optional per-call first-chunk callback.
+
+        Returns:
+            True if synthesis completed fully, False if interrupted by stop_event.
+        """
+        first_chunk_callback = on_first_audio_chunk or self.on_first_audio_chunk_synthesize
+        if self.engine_name == "coqui" and lane.chunk_size != QUICK_ANSWER_STREAM_CHUNK_SIZE:
+            logger.info(f"👄⚙️ {generation_string} Setting Coqui stream chunk size to {QUICK_ANSWER_STREAM_CHUNK_SIZE} on {lane.name} for quick synthesis.")
+            lane.set_chunk_size(QUICK_ANSWER_STREAM_CHUNK_SIZE)
+
+        lane.stream.feed(text)
+        lane.finished_event.clear() # Reset finished event before starting
 
         # Buffering state variables
         buffer: list[bytes] = []
@@ -268,10 +564,11 @@ class AudioProcessor:
         buf_dur: float = 0.0
         SR, BPS = 24000, 2 # Assumed Sample Rate and Bytes Per Sample (16-bit)
         start = time.time()
+        audio_duration = 0.0 # Seconds of audio the engine produced, for the real-time factor
         self._quick_prev_chunk_time: float = 0.0 # Track time of previous chunk
 
         def on_audio_chunk(chunk: bytes):
-            nonlocal buffer, good_streak, buffering, buf_dur, start
+            nonlocal buffer, good_streak, buffering, buf_dur, start, audio_duration
             # Check for interruption signal
             if stop_event.is_set():
                 logger.info(f"👄🛑 {generation_string} Quick audio stream interrupted by stop_event. Text: {text[:50]}...")
@@ -281,6 +578,7 @@ class AudioProcessor:
             now = time.time()
             samples = len(chunk) // BPS
             play_duration = samples / SR # Duration of the current chunk
+            audio_duration += play_duration
 
             # --- Orpheus specific: Skip initial silence ---
             if on_audio_chunk.first_call and self.engine_name == "orpheus":
@@ -299,14 +597,14 @@ class AudioProcessor:
                     if avg_amplitude < on_audio_chunk.silence_threshold:
                         on_audio_chunk.silent_chunks_count += 1
                         on_audio_chunk.silent_chunks_time += play_duration
-                        logger.debug(f"👄⏭️ {generation_string} Quick Skipping silent chunk {on_audio_chunk.silent_chunks_count} (avg_amp: {avg_amplitude:.2f})")
+                        logger.debug("👄⏭️ %s Quick Skipping silent chunk %s (avg_amp: %.2f)", generation_string, on_audio_chunk.silent_chunks_count, avg_amplitude)
                         return # Skip this chunk
                     elif on_audio_chunk.silent_chunks_count > 0:
                         # First non-silent chunk after silence
-                        logger.info(f"👄⏭️ {generation_string} Quick Skipped {on_audio_chunk.silent_chunks_count} silent chunks, saved {on_audio_chunk.silent_chunks_time*1000:.2f}ms")
+                        logger.info("👄⏭️ %s Quick Skipped %s silent chunks, saved %.2fms", generation_string, on_audio_chunk.silent_chunks_count, on_audio_chunk.silent_chunks_time*1000)
                         # Proceed to process this non-silent chunk
                 except Exception as e:
-                    logger.warning(f"👄⚠️ {generation_string} Quick Error analyzing audio chunk for silence: {e}")
+                    logger.warning("👄⚠️ %s Quick Error analyzing audio chunk for silence: %s", generation_string, e)
                     # Proceed assuming not silent on error
 
             # --- Timing and Logging ---
@@ -314,7 +612,8 @@ class AudioProcessor:
                 on_audio_chunk.first_call = False
                 self._quick_prev_chunk_time = now
                 ttfa_actual = now - start
-                logger.info(f"👄🚀 {generation_string} Quick audio start. TTFA: {ttfa_actual:.2f}s. Text: {text[:50]}...")
+                logger.info("👄🚀 %s Quick audio start. TTFA: %.2fs. Text: %.50s...", generation_string, ttfa_actual, text)
+                TTS_TTFA.labels("quick").observe(ttfa_actual)
             else:
                 gap = now - self._quick_prev_chunk_time
                 self._quick_prev_chunk_time = now
@@ -322,7 +621,7 @@ class AudioProcessor:
                     # logger.debug(f"👄✅ {generation_string} Quick chunk ok (gap={gap:.3f}s ≤ {play_duration:.3f}s). Text: {text[:50]}...")
                     good_streak += 1
                 else:
-                    logger.warning(f"👄❌ {generation_string} Quick chunk slow (gap={gap:.3f}s > {play_duration:.3f}s). Text: {text[:50]}...")
+                    logger.warning("👄❌ %s Quick chunk slow (gap=%.3fs > %.3fs). Text: %.50s...", generation_string, gap, play_duration, text)
                     good_streak = 0 # Reset streak on slow chunk
 
             put_occurred_this_call = False # Track if put happened in this specific call
@@ -334,13 +633,13 @@ class AudioProcessor:
             if buffering:
                 # Check conditions to flush buffer and stop buffering
                 if good_streak >= 2 or buf_dur >= 0.5: # Flush if stable or buffer > 0.5s
-                    logger.info(f"👄➡️ {generation_string} Quick Flushing buffer (streak={good_streak}, dur={buf_dur:.2f}s).")
+                    logger.info("👄➡️ %s Quick Flushing buffer (streak=%s, dur=%.2fs).", generation_string, good_streak, buf_dur)
                     for c in buffer:
                         try:
                             audio_chunks.put_nowait(c)
                             put_occurred_this_call = True
                         except asyncio.QueueFull:
-                            logger.warning(f"👄⚠️ {generation_string} Quick audio queue full, dropping chunk.")
+                            logger.warning("👄⚠️ %s Quick audio queue full, dropping chunk.", generation_string)
                     buffer.clear()
                     buf_dur = 0.0 # Reset buffer duration
                     buffering = False # Stop buffering mode
@@ -349,15 +648,15 @@ class AudioProcessor:
                     audio_chunks.put_nowait(chunk)
                     put_occurred_this_call = True
                 except asyncio.QueueFull:
-                    logger.warning(f"👄⚠️ {generation_string} Quick audio queue full, dropping chunk.")
+                    logger.warning("👄⚠️ %s Quick audio queue full, dropping chunk.", generation_string)
 
 
             # --- First Chunk Callback ---
             if put_occurred_this_call and not on_audio_chunk.callback_fired:
-                if self.on_first_audio_chunk_synthesize:
+                if first_chunk_callback:
                     try:
-                        logger.info(f"👄🚀 {generation_string} Quick Firing on_first_audio_chunk_synthesize.")
-                        self.on_first_audio_chunk_synthesize()
+                        logger.info("👄🚀 %s Quick Firing on_first_audio_chunk_synthesize.", generation_string)
+                        first_chunk_callback()
                     except Exception as e:
                         logger.error(f"👄💥 {generation_string} Quick Error in on_first_audio_chunk_synthesize callback: {e}", exc_info=True)
                 # Ensure callback fires only once per synthesize call
@@ -378,20 +677,18 @@ class AudioProcessor:
             force_first_fragment_after_words=999999, # Don't force early fragments
         )
 
-        logger.info(f"👄▶️ {generation_string} Quick Starting synthesis. Text: {text[:50]}...")
-        self.stream.play_async(**play_kwargs)
+        logger.info(f"👄▶️ {generation_string} Quick Starting synthesis on {lane.name}. Text: {text[:50]}...")
+        lane.stream.play_async(**play_kwargs)
 
-        # Wait loop for completion or interruption
-        while self.stream.is_playing() or not self.finished_event.is_set():
-            if stop_event.is_set():
-                self.stream.stop()
-                logger.info(f"👄🛑 {generation_string} Quick answer synthesis aborted by stop_event. Text: {text[:50]}...")
-                # Drain remaining buffer if any? Decided against it to stop faster.
-                buffer.clear()
-                # Wait briefly for stop confirmation? The finished_event handles this.
-                self.finished_event.wait(timeout=1.0) # Wait for stream stop confirmation
-                return False # Indicate interruption
-            time.sleep(0.01)
+        # Wait for completion or interruption (woken directly by the stream's stop callback / a LinkedEvent stop_event)
+        if not wait_for_stream(lane.stream.is_playing, lane.finished_event, stop_event):
+            lane.stream.stop()
+            logger.info(f"👄🛑 {generation_string} Quick answer synthesis aborted by stop_event. Text: {text[:50]}...")
+            # Drain remaining buffer if any? Decided against it to stop faster.
+            buffer.clear()
+            # Wait briefly for stop confirmation? The finished_event handles this.
+            lane.finished_event.wait(timeout=1.0) # Wait for stream stop confirmation
+            return False # Indicate interruption
 
         # # If loop exited normally, check if buffer still has content (stream finished before flush)
         if buffering and buffer and not stop_event.is_set():
@@ -403,6 +700,8 @@ class AudioProcessor:
                     logger.warning(f"👄⚠️ {generation_string} Quick audio queue full on final flush, dropping chunk.")
             buffer.clear()
 
+        if audio_duration > 0:
+            TTS_REAL_TIME_FACTOR.labels("quick").observe((time.time() - start) / audio_duration)
         logger.info(f"👄✅ {generation_string} Quick answer synthesis complete. Text: {text[:50]}...")
         return True # Indicate successful completion
 
@@ -412,16 +711,19 @@ class AudioProcessor:
             audio_chunks: Queue, # Should match self.audio_chunks type
             stop_event: threading.Event,
             generation_string: str = "",
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+            session_id: Optional[int] = None,
         ) -> bool:
         """
         Synthesizes audio from a generator yielding text chunks and puts audio into a queue.
 
-        Feeds text chunks yielded by the generator to the TTS engine. As audio chunks
+        Splits the text stream into sentences and synthesizes each on a lane
+        checked out from the shared pool just for that sentence. As audio chunks
         are generated, they are potentially buffered initially and then put into the
         provided queue. Synthesis can be interrupted via the stop_event.
         Skips initial silent chunks if using the Orpheus engine. Sets specific playback
-        parameters when using the Orpheus engine. Triggers the
-       `on_first_audio_chunk_synthesize` callback when the first valid audio chunk is queued.
+        parameters when using the Orpheus engine. Triggers the first-chunk callback
+        when the first valid audio chunk is queued.
 
 
         Args:
@@ -431,18 +733,211 @@ class AudioProcessor:
             stop_event: A threading.Event to signal interruption of the synthesis.
                         This should typically be the instance's `self.stop_event`.
             generation_string: An optional identifier string for logging purposes.
+            on_first_audio_chunk: Callback fired for this call when the first chunk is
+                                  queued. Defaults to `on_first_audio_chunk_synthesize`.
+            session_id: The requesting voice session, tags the trace events.
+
+        Returns:
+            True if synthesis completed fully, False if interrupted by stop_event.
+        """
+        if len(self.synthesis_lanes) > 1:
+            return self._synthesize_sentences(generator, audio_chunks, stop_event, generation_string, on_first_audio_chunk, session_id)
+        return self._synthesize_generator(generator, audio_chunks, stop_event, generation_string, on_first_audio_chunk, session_id)
+
+    def _synthesize_sentences(
+            self,
+            generator: Generator[str, None, None],
+            audio_chunks: Queue,
+            stop_event: threading.Event,
+            generation_string: str = "",
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+            session_id: Optional[int] = None,
+        ) -> bool:
+        """
+        Sentence-pipelined variant of `_synthesize_generator` for several synthesis lanes.
+
+        A splitter thread cuts the text stream into sentences as they complete.
+        One worker per lane takes the next unsynthesized sentence, at most
+        `TTS_SENTENCE_LOOKAHEAD` sentences ahead of the one being emitted, and
+        checks out any free lane for it, so later sentences are ready before
+        earlier audio has finished playing while other sessions still get lanes
+        between sentences. This thread emits the audio strictly in sentence
+        order, streaming the current sentence's chunks as they arrive.
+
+        Args:
+            generator: A generator yielding text chunks (strings) to synthesize.
+            audio_chunks: The queue to put the resulting audio chunks (bytes) into.
+            stop_event: A threading.Event to signal interruption of the synthesis.
+            generation_string: An optional identifier string for logging purposes.
+            on_first_audio_chunk: Optional per-call first-chunk callback.
+            session_id: The requesting voice session, tags the trace events.
 
         Returns:
             True if synthesis completed fully, False if interrupted by stop_event.
         """
-        if self.engine_name == "coqui" and hasattr(self.engine, 'set_stream_chunk_size') and self.current_stream_chunk_size != FINAL_ANSWER_STREAM_CHUNK_SIZE:
-            logger.info(f"👄⚙️ {generation_string} Setting Coqui stream chunk size to {FINAL_ANSWER_STREAM_CHUNK_SIZE} for generator synthesis.")
-            self.engine.set_stream_chunk_size(FINAL_ANSWER_STREAM_CHUNK_SIZE)
-            self.current_stream_chunk_size = FINAL_ANSWER_STREAM_CHUNK_SIZE
+        first_chunk_callback = on_first_audio_chunk or self.on_first_audio_chunk_synthesize
+        min_sentence_length = 200 if self.engine_name == "orpheus" else 10 # Orpheus prefers long fragments
+        condition = threading.Condition()
+        sentences: List[SentenceAudio] = []
+        state: Dict[str, object] = {"splitting": True, "next": 0, "emitting": 0}
+        finished = threading.Event() # Tells lanes to stop picking up sentences
+
+        def split_sentences():
+            try:
+                for text in generate_sentences(generator, minimum_sentence_length=min_sentence_length, minimum_first_fragment_length=min_sentence_length):
+                    if stop_event.is_set() or finished.is_set():
+                        break
+                    if text.strip():
+                        with condition:
+                            sentences.append(SentenceAudio(text.strip()))
+                            condition.notify_all()
+            except Exception as e:
+                logger.error(f"👄💥 {generation_string} Final Error splitting text stream into sentences: {e}", exc_info=True)
+            finally:
+                with condition:
+                    state["splitting"] = False
+                    condition.notify_all()
+
+        def run_worker():
+            while True:
+                with condition:
+                    while True:
+                        if stop_event.is_set() or finished.is_set():
+                            return
+                        if state["next"] < len(sentences) and state["next"] <= state["emitting"] + TTS_SENTENCE_LOOKAHEAD:
+                            break
+                        if not state["splitting"] and state["next"] >= len(sentences):
+                            return
+                        condition.wait(timeout=0.1)
+                    sentence = sentences[state["next"]]
+                    state["next"] += 1
+
+                def on_audio_chunk(chunk: bytes, sentence: SentenceAudio = sentence):
+                    with condition:
+                        sentence.chunks.append(chunk)
+                        condition.notify_all()
+                    sentence.audio_bytes += len(chunk)
+
+                lane = self._acquire_lane(stop_event, generation_string, session_id)
+                if lane is None:
+                    with condition:
+                        sentence.done = True
+                        condition.notify_all()
+                    return
+                start = time.time()
+                try:
+                    if self.engine_name == "coqui":
+                        lane.set_chunk_size(FINAL_ANSWER_STREAM_CHUNK_SIZE)
+                    if lane.synthesize(sentence.text, on_audio_chunk, stop_event, self.silence) and sentence.audio_bytes:
+                        TTS_REAL_TIME_FACTOR.labels("final").observe((time.time() - start) / (sentence.audio_bytes / (24000 * 2)))
+                    logger.debug("👄🛤️ %s Final %s synthesized in %.2fs: %.40s...", generation_string, lane.name, time.time() - start, sentence.text)
+                except Exception as e:
+                    logger.error(f"👄💥 {generation_string} Final {lane.name} failed on sentence '{sentence.text[:40]}': {e}", exc_info=True)
+                finally:
+                    self.lane_pool.release(lane)
+                    tracer.complete("tts_sentence", "tts", start, session=session_id, lane=lane.name, text=sentence.text)
+                    with condition:
+                        sentence.done = True
+                        condition.notify_all()
+
+        class StopNotifier:
+            """LinkedEvent listener that wakes everyone waiting on `condition`."""
+            def set(self):
+                with condition:
+                    condition.notify_all()
+        stop_notifier = StopNotifier()
+        if isinstance(stop_event, LinkedEvent):
+            stop_event.add_listener(stop_notifier)
+
+        logger.info(f"👄▶️ {generation_string} Final Starting sentence-pipelined synthesis on {len(self.synthesis_lanes)} engines.")
+        start = time.time()
+        # Threads per call: concurrent sessions must not queue behind each other's workers
+        # (a stopped splitter may still be waiting for the aborted LLM stream, it is not joined)
+        threading.Thread(target=split_sentences, name="TTSSentenceSplitter", daemon=True).start()
+        workers = [threading.Thread(target=run_worker, name=f"TTSSentence-{i}", daemon=True) for i in range(len(self.synthesis_lanes))]
+        for worker in workers:
+            worker.start()
+
+        index, emitted, first_chunk = 0, 0, True
+        try:
+            while True:
+                with condition:
+                    while not stop_event.is_set():
+                        if index < len(sentences):
+                            sentence = sentences[index]
+                            if len(sentence.chunks) > emitted or sentence.done:
+                                break
+                        elif not state["splitting"]:
+                            break
+                        condition.wait(timeout=0.05)
+                    if stop_event.is_set():
+                        logger.info(f"👄🛑 {generation_string} Final answer synthesis aborted by stop_event.")
+                        return False
+                    if index >= len(sentences):
+                        break # Splitter finished and every sentence was emitted
+                    new_chunks = sentence.chunks[emitted:]
+                    emitted = len(sentence.chunks)
+                    if sentence.done and emitted == len(sentence.chunks):
+                        sentence.chunks = [] # Already emitted, free the memory
+                        index, emitted = index + 1, 0
+                        state["emitting"] = index
+                        condition.notify_all()
+
+                for chunk in new_chunks:
+                    try:
+                        audio_chunks.put_nowait(chunk)
+                    except asyncio.QueueFull:
+                        logger.warning("👄⚠️ %s Final audio queue full, dropping chunk.", generation_string)
+                    if first_chunk:
+                        first_chunk = False
+                        TTS_TTFA.labels("final").observe(time.time() - start)
+                        if first_chunk_callback:
+                            try:
+                                logger.info("👄🚀 %s Final Firing on_first_audio_chunk_synthesize.", generation_string)
+                                first_chunk_callback()
+                            except Exception as e:
+                                logger.error(f"👄💥 {generation_string} Final Error in on_first_audio_chunk_synthesize callback: {e}", exc_info=True)
+        finally:
+            finished.set()
+            if isinstance(stop_event, LinkedEvent):
+                stop_event.remove_listener(stop_notifier)
+            with condition:
+                condition.notify_all()
+            for worker in workers:
+                worker.join() # Workers stop within one sentence (immediately on stop_event)
+
+        logger.info(f"👄✅ {generation_string} Final answer synthesis complete ({len(sentences)} sentences).")
+        return True
+
+    def _synthesize_generator(
+            self,
+            generator: Generator[str, None, None],
+            audio_chunks: Queue,
+            stop_event: threading.Event,
+            generation_string: str = "",
+            on_first_audio_chunk: Optional[Callable[[], None]] = None,
+            session_id: Optional[int] = None,
+        ) -> bool:
+        """
+        Performs the actual generator synthesis for `synthesize_generator` on a single lane.
 
-        # Feed the generator to the stream
-        self.stream.feed(generator)
-        self.finished_event.clear() # Reset finished event
+        The text stream is split into sentences here; a lane is checked out for
+        each sentence and returned before the next one is read from `generator`,
+        so no engine is held while waiting for LLM tokens. Buffering, silence
+        skipping and the first-chunk callback span the whole answer.
+
+        Args:
+            generator: A generator yielding text chunks (strings) to synthesize.
+            audio_chunks: The queue to put the resulting audio chunks (bytes) into.
+            stop_event: A threading.Event to signal interruption of the synthesis.
+            generation_string: An optional identifier string for logging purposes.
+            on_first_audio_chunk: Optional per-call first-chunk callback.
+            session_id: The requesting voice session, tags the trace events.
+
+        Returns:
+            True if synthesis completed fully, False if interrupted by stop_event.
+        """
+        first_chunk_callback = on_first_audio_chunk or self.on_first_audio_chunk_synthesize
 
         # Buffering state variables
         buffer: list[bytes] = []
@@ -479,19 +974,20 @@ class AudioProcessor:
                     if avg_amplitude < on_audio_chunk.silence_threshold:
                         on_audio_chunk.silent_chunks_count += 1
                         on_audio_chunk.silent_chunks_time += play_duration
-                        logger.debug(f"👄⏭️ {generation_string} Final Skipping silent chunk {on_audio_chunk.silent_chunks_count} (avg_amp: {avg_amplitude:.2f})")
+                        logger.debug("👄⏭️ %s Final Skipping silent chunk %s (avg_amp: %.2f)", generation_string, on_audio_chunk.silent_chunks_count, avg_amplitude)
                         return # Skip
                     elif on_audio_chunk.silent_chunks_count > 0:
-                        logger.info(f"👄⏭️ {generation_string} Final Skipped {on_audio_chunk.silent_chunks_count} silent chunks, saved {on_audio_chunk.silent_chunks_time*1000:.2f}ms")
+                        logger.info("👄⏭️ %s Final Skipped %s silent chunks, saved %.2fms", generation_string, on_audio_chunk.silent_chunks_count, on_audio_chunk.silent_chunks_time*1000)
                 except Exception as e:
-                    logger.warning(f"👄⚠️ {generation_string} Final Error analyzing audio chunk for silence: {e}")
+                    logger.warning("👄⚠️ %s Final Error analyzing audio chunk for silence: %s", generation_string, e)
 
             # --- Timing and Logging ---
             if on_audio_chunk.first_call:
                 on_audio_chunk.first_call = False
                 self._final_prev_chunk_time = now
                 ttfa_actual = now-start
-                logger.info(f"👄🚀 {generation_string} Final audio start. TTFA: {ttfa_actual:.2f}s.")
+                logger.info("👄🚀 %s Final audio start. TTFA: %.2fs.", generation_string, ttfa_actual)
+                TTS_TTFA.labels("final").observe(ttfa_actual)
             else:
                 gap = now - self._final_prev_chunk_time
                 self._final_prev_chunk_time = now
@@ -499,7 +995,7 @@ class AudioProcessor:
                     # logger.debug(f"👄✅ {generation_string} Final chunk ok (gap={gap:.3f}s ≤ {play_duration:.3f}s).")
                     good_streak += 1
                 else:
-                    logger.warning(f"👄❌ {generation_string} Final chunk slow (gap={gap:.3f}s > {play_duration:.3f}s).")
+                    logger.warning("👄❌ %s Final chunk slow (gap=%.3fs > %.3fs).", generation_string, gap, play_duration)
                     good_streak = 0
 
             put_occurred_this_call = False
@@ -509,13 +1005,13 @@ class AudioProcessor:
             buf_dur += play_duration
             if buffering:
                 if good_streak >= 2 or buf_dur >= 0.5: # Same flush logic as synthesize
-                    logger.info(f"👄➡️ {generation_string} Final Flushing buffer (streak={good_streak}, dur={buf_dur:.2f}s).")
+                    logger.info("👄➡️ %s Final Flushing buffer (streak=%s, dur=%.2fs).", generation_string, good_streak, buf_dur)
                     for c in buffer:
                         try:
                            audio_chunks.put_nowait(c)
                            put_occurred_this_call = True
                         except asyncio.QueueFull:
-                            logger.warning(f"👄⚠️ {generation_string} Final audio queue full, dropping chunk.")
+                            logger.warning("👄⚠️ %s Final audio queue full, dropping chunk.", generation_string)
                     buffer.clear()
                     buf_dur = 0.0
                     buffering = False
@@ -524,15 +1020,15 @@ class AudioProcessor:
                     audio_chunks.put_nowait(chunk)
                     put_occurred_this_call = True
                 except asyncio.QueueFull:
-                    logger.warning(f"👄⚠️ {generation_string} Final audio queue full, dropping chunk.")
+                    logger.warning("👄⚠️ %s Final audio queue full, dropping chunk.", generation_string)
 
 
             # --- First Chunk Callback --- (Using the same callback as synthesize)
             if put_occurred_this_call and not on_audio_chunk.callback_fired:
-                if self.on_first_audio_chunk_synthesize:
+                if first_chunk_callback:
                     try:
-                        logger.info(f"👄🚀 {generation_string} Final Firing on_first_audio_chunk_synthesize.")
-                        self.on_first_audio_chunk_synthesize()
+                        logger.info("👄🚀 %s Final Firing on_first_audio_chunk_synthesize.", generation_string)
+                        first_chunk_callback()
                     except Exception as e:
                         logger.error(f"👄💥 {generation_string} Final Error in on_first_audio_chunk_synthesize callback: {e}", exc_info=True)
                 on_audio_chunk.callback_fired = True
@@ -552,24 +1048,36 @@ class AudioProcessor:
             force_first_fragment_after_words=999999,
         )
 
-        # Add Orpheus specific parameters for generator streaming
-        if self.engine_name == "orpheus":
-            # These encourage waiting for more text before synthesizing, potentially better for generators
-            play_kwargs["minimum_sentence_length"] = 200
-            play_kwargs["minimum_first_fragment_length"] = 200
+        # Orpheus prefers long fragments: wait for more text before synthesizing
+        min_sentence_length = 200 if self.engine_name == "orpheus" else 10
 
         logger.info(f"👄▶️ {generation_string} Final Starting synthesis from generator.")
-        self.stream.play_async(**play_kwargs)
-
-        # Wait loop for completion or interruption
-        while self.stream.is_playing() or not self.finished_event.is_set():
+        for sentence in generate_sentences(generator, minimum_sentence_length=min_sentence_length, minimum_first_fragment_length=min_sentence_length):
             if stop_event.is_set():
-                self.stream.stop()
-                logger.info(f"👄🛑 {generation_string} Final answer synthesis aborted by stop_event.")
-                buffer.clear()
-                self.finished_event.wait(timeout=1.0) # Wait for stream stop confirmation
-                return False # Indicate interruption
-            time.sleep(0.01)
+                break
+            if not sentence.strip():
+                continue
+            lane = self._acquire_lane(stop_event, generation_string, session_id)
+            if lane is None:
+                break
+            try:
+                if self.engine_name == "coqui":
+                    lane.set_chunk_size(FINAL_ANSWER_STREAM_CHUNK_SIZE)
+                lane.stream.feed(sentence.strip())
+                lane.finished_event.clear()
+                lane.stream.play_async(**play_kwargs)
+
+                # Wait for completion or interruption (woken directly by the stream's stop callback / a LinkedEvent stop_event)
+                if not wait_for_stream(lane.stream.is_playing, lane.finished_event, stop_event):
+                    lane.stream.stop()
+                    lane.finished_event.wait(timeout=1.0) # Wait for stream stop confirmation
+            finally:
+                self.lane_pool.release(lane)
+
+        if stop_event.is_set():
+            logger.info(f"👄🛑 {generation_string} Final answer synthesis aborted by stop_event.")
+            buffer.clear()
+            return False # Indicate interruption
 
         # Flush remaining buffer if stream finished before flush condition met
         if buffering and buffer and not stop_event.is_set():
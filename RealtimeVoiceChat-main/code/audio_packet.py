@@ -0,0 +1,104 @@
+import struct
+from datetime import datetime
+from typing import Union
+
+# Browser audio packets: big-endian uint32 timestamp (ms, `Date.now() & 0xFFFFFFFF`), uint32 flags, then PCM16
+PACKET_HEADER = struct.Struct("!II")
+FLAG_TTS_PLAYING = 1
+
+
+def format_timestamp_ns(timestamp_ns: int) -> str:
+    """
+    Formats a nanosecond timestamp into a human-readable HH:MM:SS.fff string.
+
+    Args:
+        timestamp_ns: The timestamp in nanoseconds since the epoch.
+
+    Returns:
+        A string formatted as hours:minutes:seconds.milliseconds.
+    """
+    # Split into whole seconds and the nanosecond remainder
+    seconds = timestamp_ns // 1_000_000_000
+    remainder_ns = timestamp_ns % 1_000_000_000
+
+    # Convert seconds part into a datetime object (local time)
+    dt = datetime.fromtimestamp(seconds)
+
+    # Format the main time as HH:MM:SS
+    time_str = dt.strftime("%H:%M:%S")
+
+    # For instance, if you want milliseconds, divide the remainder by 1e6 and format as 3-digit
+    milliseconds = remainder_ns // 1_000_000
+    formatted_timestamp = f"{time_str}.{milliseconds:03d}"
+
+    return formatted_timestamp
+
+
+class AudioPacket:
+    """
+    Metadata and PCM payload of one client audio packet.
+
+    A fixed-layout record built once per packet (50+ per second and client):
+    only the raw header fields are stored, derived values and the human-readable
+    timestamps are computed when accessed, e.g. when a debug log line renders.
+    `pcm` is a zero-copy view into the WebSocket message; the inbound queue may
+    replace it with a bytearray when it coalesces packets.
+    """
+    __slots__ = ("client_sent_ms", "flags", "server_received", "pcm")
+
+    def __init__(self, client_sent_ms: int, flags: int, server_received: int, pcm: Union[bytes, bytearray, memoryview]) -> None:
+        """
+        Initializes the AudioPacket.
+
+        Args:
+            client_sent_ms: The client's send time from the header (uint32 milliseconds).
+            flags: The header flags (bit 0: client is playing TTS audio).
+            server_received: The server receive time in nanoseconds since the epoch.
+            pcm: The raw PCM16 audio.
+        """
+        self.client_sent_ms = client_sent_ms
+        self.flags = flags
+        self.server_received = server_received
+        self.pcm = pcm
+
+    @classmethod
+    def from_message(cls, raw: bytes, server_received: int) -> "AudioPacket":
+        """
+        Parses a binary WebSocket message.
+
+        Args:
+            raw: The message, at least `PACKET_HEADER.size` bytes long.
+            server_received: The receive time in nanoseconds since the epoch.
+
+        Returns:
+            The AudioPacket, its `pcm` referencing `raw` without a copy.
+
+        Raises:
+            struct.error: If the message is shorter than the header.
+        """
+        client_sent_ms, flags = PACKET_HEADER.unpack_from(raw)
+        return cls(client_sent_ms, flags, server_received, memoryview(raw)[PACKET_HEADER.size:])
+
+    @property
+    def client_sent(self) -> int:
+        """The header timestamp in nanoseconds (still truncated to 32 bits of milliseconds)."""
+        return self.client_sent_ms * 1_000_000
+
+    @property
+    def is_tts_playing(self) -> bool:
+        """Whether the client was playing TTS audio when it sent the packet."""
+        return bool(self.flags & FLAG_TTS_PLAYING)
+
+    @property
+    def client_sent_formatted(self) -> str:
+        return format_timestamp_ns(self.client_sent)
+
+    @property
+    def server_received_formatted(self) -> str:
+        return format_timestamp_ns(self.server_received)
+
+    def __repr__(self) -> str:
+        return (
+            f"AudioPacket(client_sent={self.client_sent_formatted}, server_received={self.server_received_formatted}, "
+            f"tts_playing={self.is_tts_playing}, bytes={len(self.pcm)})"
+        )
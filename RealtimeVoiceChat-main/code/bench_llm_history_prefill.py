@@ -0,0 +1,86 @@
+"""
+Benchmark for LLM time to first token with and without history prefill.
+
+Builds synthetic conversations of 5, 20 and 50 turns and measures the time to
+first token of the next user request against a running backend, once cold and
+once after `LLM.prefill_history` sent the same history ahead of time (as the
+pipeline does while the user is still speaking). Every measurement starts its
+conversation with a unique marker so no earlier run can be served from cache.
+
+Usage:
+    python bench_llm_history_prefill.py [--backend ollama] [--model MODEL] [--turns 5 20 50] [--repeat 3]
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from llm_module import LLM
+
+QUESTIONS = [
+    "What's a good way to start learning the piano as an adult?",
+    "How long should I practice every day?",
+    "Can you recommend some easy pieces for beginners?",
+    "What about learning to read sheet music?",
+    "Is it worth buying a digital piano or should I get an acoustic one?",
+]
+ANSWER = (
+    "That's a great question. It depends a bit on your goals, but a steady routine, short focused sessions "
+    "and picking music you actually enjoy will keep you motivated. Start slowly, use a metronome and "
+    "don't be afraid to repeat the tricky parts until they feel natural."
+)
+NEXT_REQUEST = "Thanks! One last thing, how do I avoid getting bored?"
+
+
+def make_history(turns: int) -> list:
+    """Builds a conversation with `turns` user/assistant exchanges and a unique system marker."""
+    history = [{"role": "system", "content": f"You are a concise, friendly assistant. (conversation {uuid.uuid4()})"}]
+    for i in range(turns):
+        history.append({"role": "user", "content": QUESTIONS[i % len(QUESTIONS)]})
+        history.append({"role": "assistant", "content": ANSWER})
+    return history
+
+
+def time_to_first_token(llm: LLM, history: list) -> float:
+    """Sends the next user request on top of `history`, returns the TTFT in milliseconds."""
+    messages = history + [{"role": "user", "content": NEXT_REQUEST}]
+    start = time.perf_counter()
+    generator = llm.generate(text="", history=messages, use_system_prompt=False, temperature=0.1)
+    try:
+        next(generator)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        generator.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default="ollama", help="LLM backend (ollama or lmstudio).")
+    parser.add_argument("--model", default="hf.co/bartowski/huihui-ai_Mistral-Small-24B-Instruct-2501-abliterated-GGUF:Q4_K_M", help="Model name.")
+    parser.add_argument("--turns", type=int, nargs="+", default=[5, 20, 50], help="History lengths in turns.")
+    parser.add_argument("--repeat", type=int, default=3, help="Measurements per history length and mode (median is reported).")
+    args = parser.parse_args()
+
+    llm = LLM(backend=args.backend, model=args.model)
+    if not llm.prewarm():
+        raise SystemExit("Backend not reachable, start it first.")
+
+    print(f"{'turns':>6} {'cold TTFT ms':>13} {'prefilled TTFT ms':>18} {'prefill ms':>11} {'speedup':>8}")
+    for turns in args.turns:
+        cold, warm, prefill = [], [], []
+        for _ in range(args.repeat):
+            cold.append(time_to_first_token(llm, make_history(turns)))
+
+            history = make_history(turns)
+            start = time.perf_counter()
+            if not llm.prefill_history(history, use_system_prompt=False):
+                raise SystemExit(f"Prefill not supported or failed for backend '{args.backend}'.")
+            prefill.append((time.perf_counter() - start) * 1000)
+            warm.append(time_to_first_token(llm, history))
+        cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+        print(f"{turns:>6} {cold_ms:>13.0f} {warm_ms:>18.0f} {statistics.median(prefill):>11.0f} {cold_ms / warm_ms:>7.1f}x")
+    print("prefill ms: time of the zero-token request, spent while the user is still speaking.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Micro-benchmark for LLM stream parsing and the pooled async transport.
+
+Part 1 splits a synthetic Ollama NDJSON stream, delivered in network chunks of
+a given size, with the former `buffer += chunk.decode()` / `split('\\n', 1)`
+loop and with the byte-level `LineSplitter`, and checks that both produce the
+same tokens. Long lines (e.g. a final message carrying a large context array)
+make the former loop quadratic.
+
+Part 2 starts a local fake Ollama (NDJSON) and OpenAI (SSE) server and streams
+several turns through `AsyncLLMTransport`, reporting time to first token,
+connections the server accepted (keep-alive reuse) and how fast a cancelled
+stream stops.
+
+Usage:
+    python bench_llm_stream.py [--tokens 2000] [--chunk-size 64] [--turns 10]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+from llm_transport import (
+    FAST_JSON_AVAILABLE,
+    AsyncLLMTransport,
+    LineSplitter,
+    StreamHandle,
+    json_loads,
+    parse_ollama_line,
+)
+
+TOKEN_DELAY = 0.002 # Seconds between tokens sent by the fake server
+accepted_connections = 0 # Connections accepted by the fake server
+
+
+def make_ollama_stream(num_tokens: int, context_size: int) -> bytes:
+    """Builds an Ollama /api/chat NDJSON body, the final line carries a `context` array."""
+    lines = []
+    for i in range(num_tokens):
+        lines.append(json.dumps({"model": "m", "message": {"role": "assistant", "content": f"tök{i} "}, "done": False}))
+    lines.append(json.dumps({"model": "m", "message": {"role": "assistant", "content": ""}, "done": True, "context": list(range(context_size))}))
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def legacy_parse(body: bytes, chunk_size: int) -> list:
+    """The former `_yield_ollama_chunks` loop, kept here as the baseline."""
+    tokens = []
+    buffer = ""
+    for i in range(0, len(body), chunk_size):
+        buffer += body[i:i + chunk_size].decode("utf-8", "replace")
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            content = chunk.get("message", {}).get("content")
+            if content:
+                tokens.append(content)
+    return tokens
+
+
+def splitter_parse(body: bytes, chunk_size: int) -> list:
+    """Current parsing: LineSplitter plus `parse_ollama_line`."""
+    tokens = []
+    splitter = LineSplitter()
+    for i in range(0, len(body), chunk_size):
+        for line in splitter.feed(body[i:i + chunk_size]):
+            content, _done = parse_ollama_line(line)
+            if content:
+                tokens.append(content)
+    return tokens
+
+
+def best_time(fn, *args, repeat: int = 5) -> float:
+    """Returns the best-of-`repeat` run time in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, num_tokens: int) -> None:
+    """Fake backend: answers POST /api/chat with NDJSON and POST /v1/chat/completions with SSE, keep-alive."""
+    global accepted_connections
+    accepted_connections += 1
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            length = 0
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            sse = b"/chat/completions" in request_line
+            content_type = b"text/event-stream" if sse else b"application/x-ndjson"
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: " + content_type + b"\r\nTransfer-Encoding: chunked\r\n\r\n")
+            for i in range(num_tokens):
+                if sse:
+                    line = b"data: " + json.dumps({"choices": [{"delta": {"content": f"t{i} "}}]}).encode() + b"\n\n"
+                else:
+                    line = json.dumps({"message": {"content": f"t{i} "}, "done": False}).encode() + b"\n"
+                writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+                await writer.drain()
+                await asyncio.sleep(TOKEN_DELAY)
+            final = b"data: [DONE]\n\n" if sse else b'{"message": {"content": ""}, "done": true}\n'
+            writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(final), final))
+            await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def start_fake_server(num_tokens: int) -> int:
+    """Runs the fake backend in a daemon thread and returns its port."""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        asyncio.start_server(lambda r, w: handle_client(r, w, num_tokens), "127.0.0.1", 0)
+    )
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def stream_turns(transport: AsyncLLMTransport, path: str, protocol: str, turns: int, num_tokens: int) -> tuple:
+    """Streams `turns` requests, returns (ttft ms per turn, all complete)."""
+    ttfts = []
+    complete = True
+    for _ in range(turns):
+        start = time.perf_counter()
+        received = 0
+        for _token in transport.stream_chat(path, {"stream": True}, protocol, StreamHandle()):
+            if received == 0:
+                ttfts.append((time.perf_counter() - start) * 1000)
+            received += 1
+        complete &= received == num_tokens
+    return ttfts, complete
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=2000, help="Tokens per synthetic answer.")
+    parser.add_argument("--context", type=int, default=20000, help="Length of the context array in the final Ollama line.")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Network chunk size in bytes for the parsing comparison.")
+    parser.add_argument("--turns", type=int, default=10, help="Streamed turns per backend for the transport check.")
+    args = parser.parse_args()
+
+    body = make_ollama_stream(args.tokens, args.context)
+    legacy_tokens = legacy_parse(body, args.chunk_size)
+    splitter_tokens = splitter_parse(body, args.chunk_size)
+    legacy_ms = best_time(legacy_parse, body, args.chunk_size)
+    splitter_ms = best_time(splitter_parse, body, args.chunk_size)
+    print(f"Parsing {len(body) / 1024:.0f} KiB in {args.chunk_size} B chunks (fast JSON: {FAST_JSON_AVAILABLE}, loads={json_loads.__module__}):")
+    print(f"  legacy str split: {legacy_ms:8.1f} ms")
+    print(f"  LineSplitter:     {splitter_ms:8.1f} ms ({legacy_ms / splitter_ms:.1f}x)")
+    parse_ok = legacy_tokens == splitter_tokens
+    print(f"  Tokens identical: {parse_ok}")
+
+    num_tokens = 50
+    port = start_fake_server(num_tokens)
+    transport_ok = True
+    for name, base_url, path, protocol in (
+        ("ollama", f"http://127.0.0.1:{port}", "/api/chat", "ndjson"),
+        ("openai", f"http://127.0.0.1:{port}/v1", "/chat/completions", "sse"),
+    ):
+        connections_before = accepted_connections
+        transport = AsyncLLMTransport(base_url)
+        ttfts, complete = stream_turns(transport, path, protocol, args.turns, num_tokens)
+        connections = accepted_connections - connections_before
+
+        handle = StreamHandle()
+        generator = transport.stream_chat(path, {"stream": True}, protocol, handle)
+        next(generator)
+        start = time.perf_counter()
+        handle.close()
+        leftover = sum(1 for _ in generator)
+        stop_ms = (time.perf_counter() - start) * 1000
+
+        print(
+            f"{name:>7}: {args.turns} turns, TTFT first {ttfts[0]:.2f} ms / later {sum(ttfts[1:]) / max(1, len(ttfts) - 1):.2f} ms, "
+            f"connections opened {connections}, complete {complete}, "
+            f"cancel stop {stop_ms:.2f} ms ({leftover} tokens after cancel)"
+        )
+        transport_ok &= complete and connections <= 2
+        transport.close()
+
+    sys.exit(0 if parse_ok and transport_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
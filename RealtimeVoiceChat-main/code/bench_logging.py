@@ -0,0 +1,145 @@
+"""
+Micro-benchmark for the cost of a log call on the TTS and STT worker threads.
+
+Compares three logging setups:
+  legacy  eager f-strings with `Colors.apply`, formatted and written by a
+          `StreamHandler` in the calling thread (the former call sites and setup)
+  sync    lazy `%s` templates with colour markup, `ConsoleFormatter`,
+          still writing in the calling thread (`LOG_QUEUE=0`)
+  queued  lazy templates through `DeferredQueueHandler`; a `QueueListener`
+          thread formats and writes (the default)
+
+A TTS and an STT thread log concurrently, using message templates taken from
+`audio_module` and `transcribe`, once at an enabled level (INFO) and once at a
+disabled one (DEBUG calls with the level at INFO). Reported per thread: mean
+and p99 time per call. Output goes to a temporary file; `--write-latency-us`
+adds a delay to every write to emulate a slow or blocked terminal.
+
+Usage:
+    python bench_logging.py [--calls 20000] [--write-latency-us 0]
+"""
+import argparse
+import logging
+import tempfile
+import threading
+import time
+from logging.handlers import QueueListener
+from queue import SimpleQueue
+
+from colors import Colors, render_markup
+from logsetup import ConsoleFormatter, CustomTimeFormatter, DeferredQueueHandler
+
+LEGACY_FORMAT = "{blue}%(asctime)s{reset} {gray}%(name)-10.10s{reset} {green}{bold}%(levelname)-4.4s{reset} %(message)s"
+GENERATION = "🗣️ Gen 3 Quick"
+PARTIAL_TEXT = "so what I was wondering is whether the"
+
+
+class SlowStream:
+    """A file wrapper whose writes take at least `latency` seconds, like a congested terminal."""
+    def __init__(self, stream, latency: float) -> None:
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def legacy_tts_call(logger: logging.Logger, level: int, i: int) -> None:
+    logger.log(level, f"👄➡️ {GENERATION} Quick Flushing buffer (streak={i}, dur={i * 0.021:.2f}s).")
+    logger.log(level, f"👄⏭️ {GENERATION} Quick Skipping silent chunk {i} (avg_amp: {i * 0.5:.2f})")
+
+
+def legacy_stt_call(logger: logging.Logger, level: int, i: int) -> None:
+    logger.log(level, f"👂📝 Partial transcription: {Colors.CYAN}{PARTIAL_TEXT} {i}{Colors.RESET}")
+    logger.log(level, f"👂✅ {Colors.apply('Final user text: ').green} {Colors.apply(PARTIAL_TEXT).yellow}")
+
+
+def template_tts_call(logger: logging.Logger, level: int, i: int) -> None:
+    logger.log(level, "👄➡️ %s Quick Flushing buffer (streak=%s, dur=%.2fs).", GENERATION, i, i * 0.021)
+    logger.log(level, "👄⏭️ %s Quick Skipping silent chunk %s (avg_amp: %.2f)", GENERATION, i, i * 0.5)
+
+
+def template_stt_call(logger: logging.Logger, level: int, i: int) -> None:
+    logger.log(level, "👂📝 Partial transcription: {cyan}%s %s", PARTIAL_TEXT, i)
+    logger.log(level, "👂✅ {green}Final user text: {reset} {yellow}%s", PARTIAL_TEXT)
+
+
+def worker(logger: logging.Logger, call, level: int, calls: int, samples: list, start: threading.Barrier) -> None:
+    """Runs `call` `calls` times, appending each duration in microseconds to `samples`."""
+    clock = time.perf_counter_ns
+    start.wait()
+    for i in range(calls):
+        t0 = clock()
+        call(logger, level, i)
+        samples.append((clock() - t0) / 1000 / 2) # Two log calls per iteration
+
+
+def run(setup: str, call_level: int, calls: int, stream) -> dict:
+    """Configures one setup on fresh loggers, runs both threads and returns per-thread samples."""
+    handler = logging.StreamHandler(stream)
+    if setup == "legacy":
+        handler.setFormatter(CustomTimeFormatter(render_markup(LEGACY_FORMAT)))
+    else:
+        handler.setFormatter(ConsoleFormatter())
+    handler.setLevel(logging.INFO)
+
+    listener = None
+    if setup == "queued":
+        log_queue = SimpleQueue()
+        listener = QueueListener(log_queue, handler, respect_handler_level=True)
+        listener.start()
+        entry_handler = DeferredQueueHandler(log_queue)
+    else:
+        entry_handler = handler
+
+    tts_call, stt_call = (legacy_tts_call, legacy_stt_call) if setup == "legacy" else (template_tts_call, template_stt_call)
+    results = {}
+    threads = []
+    barrier = threading.Barrier(2)
+    for name, call in (("TTS", tts_call), ("STT", stt_call)):
+        logger = logging.getLogger(f"bench.{setup}.{name}.{call_level}")
+        logger.handlers[:] = [entry_handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        results[name] = []
+        threads.append(threading.Thread(target=worker, name=f"{name}Worker", args=(logger, call, call_level, calls, results[name], barrier)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if listener:
+        listener.stop() # Drains the queue, outside the measured calls
+    handler.flush()
+    return results
+
+
+def summarize(samples: list) -> str:
+    ordered = sorted(samples)
+    mean = sum(ordered) / len(ordered)
+    p99 = ordered[int(len(ordered) * 0.99)]
+    return f"{mean:7.2f} us mean {p99:8.2f} us p99"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000, help="Iterations per thread (two log calls each).")
+    parser.add_argument("--write-latency-us", type=float, default=0.0, help="Extra delay per write, emulating a slow console.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryFile("w", encoding="utf-8") as output:
+        stream = SlowStream(output, args.write_latency_us / 1e6)
+        print(f"{args.calls} iterations per thread, write latency {args.write_latency_us:g} us")
+        for label, call_level in (("enabled (INFO)", logging.INFO), ("disabled (DEBUG)", logging.DEBUG)):
+            print(f"{label}, per log call")
+            for setup in ("legacy", "sync", "queued"):
+                results = run(setup, call_level, args.calls, stream)
+                print(f"  {setup:<7} TTS {summarize(results['TTS'])}   STT {summarize(results['STT'])}")
+
+
+if __name__ == "__main__":
+    main()
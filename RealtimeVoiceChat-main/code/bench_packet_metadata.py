@@ -0,0 +1,124 @@
+"""
+Micro-benchmark for parsing and enqueueing client audio packets on the WebSocket receive path.
+
+Compares the former per-packet metadata dict of `process_incoming_data` (header
+unpacked from a slice, two `format_timestamp_ns` calls, PCM copied out of the
+message, `asyncio.Queue.put_nowait`) with `AudioPacket.from_message` (header
+unpacked in place, PCM as a zero-copy view, timestamps formatted only when
+read) and `CoalescingAudioQueue.put_nowait`.
+
+Reported per packet: parse time, enqueue time, and the bytes allocated for the
+record while packets are kept alive (tracemalloc), for the browser's 2048-sample
+packets.
+
+Usage:
+    python bench_packet_metadata.py [--packets 200000] [--batch 50]
+"""
+import argparse
+import asyncio
+import struct
+import time
+import tracemalloc
+
+import numpy as np
+
+from async_channel import CoalescingAudioQueue
+from audio_packet import AudioPacket, format_timestamp_ns
+
+BATCH_SAMPLES = 2048 # Samples per packet, as in static/app.js
+
+
+def legacy_parse(raw: bytes, server_ns: int) -> dict:
+    """The former metadata construction of `process_incoming_data`."""
+    timestamp_ms, flags = struct.unpack("!II", raw[:8])
+    client_sent_ns = timestamp_ms * 1_000_000
+    metadata = {
+        "client_sent_ms":           timestamp_ms,
+        "client_sent":              client_sent_ns,
+        "client_sent_formatted":    format_timestamp_ns(client_sent_ns),
+        "isTTSPlaying":             bool(flags & 1),
+    }
+    metadata["server_received"] = server_ns
+    metadata["server_received_formatted"] = format_timestamp_ns(server_ns)
+    metadata["pcm"] = raw[8:]
+    return metadata
+
+
+def make_messages(count: int) -> list:
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-3000, 3000, BATCH_SAMPLES, dtype=np.int16).tobytes()
+    now_ms = int(time.time() * 1000)
+    return [struct.pack("!II", (now_ms + i * 43) & 0xFFFFFFFF, i & 1) + pcm for i in range(count)]
+
+
+def time_parse(parse, messages: list) -> float:
+    """Returns the mean parse time in microseconds."""
+    server_ns = time.time_ns()
+    start = time.perf_counter()
+    for raw in messages:
+        parse(raw, server_ns)
+    return (time.perf_counter() - start) / len(messages) * 1e6
+
+
+def allocated_per_packet(parse, messages: list) -> float:
+    """Returns the bytes allocated per packet while all parsed packets stay referenced."""
+    server_ns = time.time_ns()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [parse(raw, server_ns) for raw in messages]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before - 8 * len(kept)) / len(kept) # Minus the list's own pointer slots
+
+
+async def time_enqueue(make_queue, items: list, batch: int) -> float:
+    """Returns the mean enqueue time in microseconds, draining the queue between batches (untimed)."""
+    total = 0.0
+    for offset in range(0, len(items), batch):
+        queue = make_queue()
+        put = queue.put_nowait
+        chunk = items[offset:offset + batch]
+        start = time.perf_counter()
+        for item in chunk:
+            put(item)
+        total += time.perf_counter() - start
+        for _ in range(queue.qsize()):
+            await queue.get()
+    return total / len(items) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--packets", type=int, default=200000, help="Packets per measurement.")
+    parser.add_argument("--batch", type=int, default=50, help="Packets queued before the consumer drains the queue.")
+    args = parser.parse_args()
+
+    messages = make_messages(args.packets)
+    alloc_messages = messages[:min(len(messages), 20000)]
+    server_ns = time.time_ns()
+    packet_bytes = len(messages[0])
+
+    print(f"{args.packets} packets of {packet_bytes} bytes")
+    print("parse (per packet)")
+    for name, parse in (("dict + format_timestamp_ns", legacy_parse), ("AudioPacket.from_message", AudioPacket.from_message)):
+        print(f"  {name:<28} {time_parse(parse, messages):6.2f} us  {allocated_per_packet(parse, alloc_messages):7.0f} bytes allocated")
+
+    legacy_items = [legacy_parse(raw, server_ns) for raw in messages]
+    packets = [AudioPacket.from_message(raw, server_ns) for raw in messages]
+    no_coalescing = 1 << 62
+
+    async def enqueue() -> None:
+        print(f"enqueue (per packet, batches of {args.batch})")
+        legacy = await time_enqueue(asyncio.Queue, legacy_items, args.batch)
+        print(f"  {'asyncio.Queue':<28} {legacy:6.2f} us")
+        plain = await time_enqueue(lambda: CoalescingAudioQueue(no_coalescing, no_coalescing), packets, args.batch)
+        print(f"  {'CoalescingAudioQueue':<28} {plain:6.2f} us")
+        # Coalescing path: every packet after the first is merged into the waiting one
+        merged = await time_enqueue(lambda: CoalescingAudioQueue(0, no_coalescing), [AudioPacket.from_message(raw, server_ns) for raw in messages], args.batch)
+        print(f"  {'  ... while coalescing':<28} {merged:6.2f} us")
+
+    asyncio.run(enqueue())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for the inbound 48kHz -> 16kHz resampling path.
+
+Compares the former per-chunk `resample_poly` conversion with the stateful
+`StreamingDecimator` used by `AudioInputProcessor.process_audio_chunk` for
+10, 20 and 40 ms chunks and reports the per-chunk cost.
+
+Usage:
+    python bench_resample_in.py [--seconds 20] [--repeat 5]
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from streaming_resampler import StreamingDecimator
+
+SAMPLE_RATE = 48000
+FACTOR = 3
+CHUNK_MS = (10, 20, 40)
+
+
+def legacy_process_audio_chunk(raw_audio: np.ndarray) -> np.ndarray:
+    """The previous stateless implementation, kept here as the baseline."""
+    if np.max(np.abs(raw_audio)) == 0:
+        expected_len = int(np.ceil(len(raw_audio) / FACTOR))
+        return np.zeros(expected_len, dtype=np.int16)
+    audio_float32 = raw_audio.astype(np.float32)
+    resampled_float = resample_poly(audio_float32, 1, FACTOR)
+    return np.clip(resampled_float, -32768, 32767).astype(np.int16)
+
+
+def make_test_signal(seconds: float) -> np.ndarray:
+    """Speech-like test signal: a few harmonics plus noise at realistic levels."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    signal = sum(3000 / k * np.sin(2 * np.pi * 180 * k * t) for k in range(1, 6))
+    signal += 300 * rng.standard_normal(t.size)
+    return signal.astype(np.int16)
+
+
+def time_per_chunk(fn, chunks: list, repeat: int) -> float:
+    """Returns the best-of-`repeat` mean time per chunk in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for chunk in chunks:
+            fn(chunk)
+        best = min(best, (time.perf_counter() - start) / len(chunks))
+    return best * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0, help="Length of the test signal in seconds.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    signal = make_test_signal(args.seconds)
+    print(f"{'chunk':>8} {'samples':>8} {'legacy µs':>10} {'stream µs':>10} {'speedup':>8} {'len ok':>7}")
+    for chunk_ms in CHUNK_MS:
+        size = SAMPLE_RATE * chunk_ms // 1000
+        chunks = [signal[i:i + size] for i in range(0, len(signal) - size + 1, size)]
+
+        decimator = StreamingDecimator(FACTOR)
+        lengths_match = all(
+            len(decimator.process(c)) == len(legacy_process_audio_chunk(c)) for c in chunks
+        )
+
+        legacy_us = time_per_chunk(legacy_process_audio_chunk, chunks, args.repeat)
+        decimator = StreamingDecimator(FACTOR)
+        stream_us = time_per_chunk(decimator.process, chunks, args.repeat)
+        print(
+            f"{chunk_ms:>6}ms {size:>8} {legacy_us:>10.1f} {stream_us:>10.1f} "
+            f"{legacy_us / stream_us:>7.2f}x {str(lengths_match):>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Micro-benchmark for `TranscriptionProcessor.detect_potential_sentence_end` caching.
+
+Replays a long simulated monologue as realtime transcript updates (the text grows
+word by word and every finished sentence is repeated a few times, as Whisper does
+while it stabilizes) through the former list-based caches and through the
+`SentenceTailCache` based ones. Checks that both yield the same sentences and
+reports the per-update cost at the start and at the end of the monologue.
+
+Usage:
+    python bench_sentence_end_cache.py [--sentences 100] [--step 0.05]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+from text_similarity import SentenceTailCache, TextSimilarity
+
+MAX_AGE = 0.2 # TranscriptionProcessor._SENTENCE_CACHE_MAX_AGE_MS (seconds)
+TRIGGER_COUNT = 3 # TranscriptionProcessor._SENTENCE_CACHE_TRIGGER_COUNT
+THRESHOLD = 0.96
+WORDS = (
+    "i think we should go to the park tomorrow because the weather will be nice and "
+    "maybe we can bring some food for a picnic with friends who live nearby then later "
+    "we could watch a movie or read books about history science music and travel"
+).split()
+
+
+def normalize(text: str) -> str:
+    """TranscriptionProcessor._normalize_text."""
+    text = text.lower()
+    text = re.sub(r'[^a-z0-9\s]', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+class LegacyDetector:
+    """The former linear-scan implementation, kept here as the baseline."""
+    def __init__(self):
+        self.text_similarity = TextSimilarity(focus='end', n_words=5)
+        self.sentence_end_cache = []
+        self.potential_sentences_yielded = []
+
+    def detect(self, text: str, now: float):
+        stripped = text.strip()
+        if stripped.endswith("...") or not any(stripped.endswith(p) for p in ".!?"):
+            return None
+        normalized_text = normalize(stripped)
+        entry_found = None
+        for entry in self.sentence_end_cache:
+            if self.text_similarity.calculate_similarity(entry['text'], normalized_text) > THRESHOLD:
+                entry_found = entry
+                break
+        if entry_found:
+            entry_found['timestamps'].append(now)
+            entry_found['timestamps'] = [t for t in entry_found['timestamps'] if now - t <= MAX_AGE]
+        else:
+            entry_found = {'text': normalized_text, 'timestamps': [now]}
+            self.sentence_end_cache.append(entry_found)
+        if len(entry_found['timestamps']) >= TRIGGER_COUNT:
+            for yielded_entry in self.potential_sentences_yielded:
+                if self.text_similarity.calculate_similarity(yielded_entry['text'], normalized_text) > THRESHOLD:
+                    return None
+            self.potential_sentences_yielded.append({'text': normalized_text, 'timestamp': now})
+            return stripped
+        return None
+
+
+class IndexedDetector:
+    """The current implementation based on SentenceTailCache."""
+    def __init__(self):
+        self.sentence_end_cache = SentenceTailCache(n_words=5, similarity_threshold=THRESHOLD)
+        self.potential_sentences_yielded = SentenceTailCache(n_words=5, similarity_threshold=THRESHOLD, max_entries=64)
+
+    def detect(self, text: str, now: float):
+        stripped = text.strip()
+        if stripped.endswith("...") or not any(stripped.endswith(p) for p in ".!?"):
+            return None
+        tail = self.sentence_end_cache.tail_from_text(stripped, normalize)
+        if not tail:
+            return None
+        self.sentence_end_cache.evict_older_than(now - MAX_AGE, lambda stamps: stamps[-1])
+        cached_tail = self.sentence_end_cache.find(tail)
+        if cached_tail is not None:
+            timestamps = self.sentence_end_cache.entries[cached_tail]
+            timestamps.append(now)
+            timestamps = [t for t in timestamps if now - t <= MAX_AGE]
+            self.sentence_end_cache.add(cached_tail, timestamps)
+        else:
+            timestamps = [now]
+            self.sentence_end_cache.add(tail, timestamps)
+        if len(timestamps) >= TRIGGER_COUNT:
+            if self.potential_sentences_yielded.find(tail) is not None:
+                return None
+            self.potential_sentences_yielded.add(tail, now)
+            return stripped
+        return None
+
+
+def make_updates(num_sentences: int, step: float) -> list:
+    """Builds (timestamp, realtime text) updates for a monologue of `num_sentences` sentences."""
+    rng = random.Random(0)
+    updates = []
+    now = 0.0
+    spoken = ""
+    for _ in range(num_sentences):
+        sentence = rng.sample(WORDS, rng.randint(4, 12))
+        for i in range(1, len(sentence) + 1):
+            now += step
+            updates.append((now, (spoken + " ".join(sentence[:i])).strip()))
+        finished = " ".join(sentence).capitalize() + rng.choice(".!?")
+        for _ in range(rng.randint(1, 4)): # Whisper repeats a stable text a few times
+            now += step
+            updates.append((now, spoken + finished))
+        spoken += finished + " "
+    return updates
+
+
+def run(detector_cls, updates: list, window: int) -> tuple:
+    """Returns (yielded sentences, µs/update over the first window, µs/update over the last window)."""
+    detector = detector_cls()
+    yielded = []
+    timings = []
+    for now, text in updates:
+        start = time.perf_counter()
+        result = detector.detect(text, now)
+        timings.append(time.perf_counter() - start)
+        if result:
+            yielded.append(result)
+    first = sum(timings[:window]) / window * 1e6
+    last = sum(timings[-window:]) / window * 1e6
+    return yielded, first, last
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=100, help="Sentences in the simulated monologue.")
+    parser.add_argument("--step", type=float, default=0.05, help="Seconds between realtime transcript updates.")
+    args = parser.parse_args()
+
+    updates = make_updates(args.sentences, args.step)
+    window = max(1, len(updates) // 10)
+    legacy_yields, legacy_first, legacy_last = run(LegacyDetector, updates, window)
+    indexed_yields, indexed_first, indexed_last = run(IndexedDetector, updates, window)
+
+    print(f"{len(updates)} updates ({updates[-1][0] / 60:.1f} min of speech), {len(legacy_yields)} legacy / {len(indexed_yields)} indexed yields")
+    print(f"{'':>8} {'first 10% µs':>13} {'last 10% µs':>12}")
+    print(f"{'legacy':>8} {legacy_first:>13.1f} {legacy_last:>12.1f}")
+    print(f"{'indexed':>8} {indexed_first:>13.1f} {indexed_last:>12.1f}")
+    same = legacy_yields == indexed_yields
+    print(f"Yielded sentences identical: {same}")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Simulation of the speculation cache hit rate for two parking policies.
+
+Replays turns in which a speculative generation starts on a stable partial
+transcript and is aborted when the user's text changes. In a share of the
+turns (`--return-prob`) the user's final text turns out to be the earlier one
+again (a trailing word that Whisper drops, a false restart), so a parked
+branch for it can be promoted. The abort time is drawn from an exponential
+distribution around `--change-after`; generation progress follows a simple
+timing model (LLM time to first token and token rate, TTS real time factor).
+
+Branches are parked and looked up through the real `SpeculationCache` and
+`TextSimilarity`, once with the former policy (park only fully synthesized
+answers) and once with the current one (park as soon as the quick answer audio
+is complete). Reported per policy: hit rate, hits on quick answer only
+branches and mean first-audio time saved per hit.
+
+Usage:
+    python bench_speculation_cache.py [--turns 2000] [--change-after 1.5] [--return-prob 0.3]
+"""
+import argparse
+import random
+
+from speculation_cache import SpeculationCache, SpeculativeBranch
+from text_similarity import TextSimilarity
+
+WORDS = (
+    "could you tell me how long it takes to cook rice and whether i should rinse it first "
+    "what is the weather like in berlin tomorrow morning and do i need an umbrella "
+    "remind me to call my sister after the meeting about the budget"
+).split()
+SECONDS_PER_WORD = 0.35 # Speaking rate of the synthesized answer
+
+
+def timings(args, rng: random.Random) -> tuple:
+    """Returns (first audio, quick audio complete, whole answer complete) in seconds after the start."""
+    ttft = rng.uniform(0.5, 1.5) * args.llm_ttft
+    quick_words = rng.randint(4, 12)
+    final_words = rng.randint(15, 60)
+    quick_llm = ttft + quick_words * 1.3 / args.tokens_per_second
+    first_audio = quick_llm + args.tts_ttfa
+    quick_done = quick_llm + quick_words * SECONDS_PER_WORD * args.tts_rtf
+    llm_done = quick_llm + final_words * 1.3 / args.tokens_per_second
+    answer_done = max(llm_done, quick_done + final_words * SECONDS_PER_WORD * args.tts_rtf)
+    return first_audio, quick_done, answer_done
+
+
+def run(args, park_quick_answers: bool) -> dict:
+    rng = random.Random(args.seed) # Same turns for both policies
+    cache = SpeculationCache(TextSimilarity(focus='end', n_words=5), max_branches=args.branches)
+    saved_ms = 0.0
+    for turn in range(args.turns):
+        context_key = ("history", turn) # Every turn answers on a new history
+        cache.drop_other_contexts(context_key)
+        start = rng.randrange(len(WORDS) - 12)
+        spoken = " ".join(WORDS[start:start + rng.randint(4, 9)])
+        first_audio, quick_done, answer_done = timings(args, rng)
+        aborted_at = rng.expovariate(1 / args.change_after)
+
+        if aborted_at >= answer_done:
+            complete = True
+        elif park_quick_answers and aborted_at >= quick_done:
+            complete = False
+        else:
+            complete = None # Nothing worth parking yet
+        if complete is not None:
+            cache.add(SpeculativeBranch(spoken, context_key, "quick", "final" if complete else "", [b"\0"],
+                                        first_audio * 1000, (answer_done if complete else quick_done) * 1000, complete=complete))
+
+        final_text = spoken if rng.random() < args.return_prob else f"{spoken} {rng.choice(WORDS)} {rng.choice(WORDS)}"
+        branch = cache.take(final_text, context_key)
+        if branch:
+            saved_ms += branch.first_audio_ms
+    stats = cache.stats()
+    stats["saved_per_hit_ms"] = saved_ms / stats["hits"] if stats["hits"] else 0.0
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=2000, help="Simulated user turns.")
+    parser.add_argument("--change-after", type=float, default=1.5, help="Mean seconds until the user's text changes.")
+    parser.add_argument("--return-prob", type=float, default=0.3, help="Share of turns whose final text is the speculated one.")
+    parser.add_argument("--llm-ttft", type=float, default=0.35, help="Mean LLM time to first token in seconds.")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="LLM decoding rate.")
+    parser.add_argument("--tts-ttfa", type=float, default=0.15, help="TTS time to first audio in seconds.")
+    parser.add_argument("--tts-rtf", type=float, default=0.3, help="TTS real time factor (synthesis seconds per audio second).")
+    parser.add_argument("--branches", type=int, default=3, help="SPECULATION_CACHE_BRANCHES.")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{args.turns} turns, text changes after {args.change_after:g}s on average, {args.return_prob:.0%} of final texts match the speculation")
+    for label, park_quick_answers in (("complete answers only", False), ("after quick answer audio", True)):
+        stats = run(args, park_quick_answers)
+        print(f"  {label:<25} hit rate {stats['hit_rate']:6.1%} ({stats['hits']} hits, {stats['partial_hits']} quick answer only), "
+              f"{stats['saved_per_hit_ms']:.0f}ms first audio saved per hit")
+
+
+if __name__ == "__main__":
+    main()
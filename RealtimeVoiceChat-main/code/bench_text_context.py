@@ -0,0 +1,144 @@
+"""
+Regression check and micro-benchmark for quick-answer boundary detection.
+
+Replays a corpus of LLM answers token by token through the former worker logic
+(clean the whole answer and call `TextContext.get_context` on it after every
+token) and through the incremental `StreamingTextContext` logic now used by
+`SpeechPipelineManager._llm_inference_worker`, with and without `no_think`
+cleaning. Every answer is split at several random token boundaries. Reports
+mismatching boundaries (exits with status 1 if there are any) and the mean
+detection cost per answer.
+
+Usage:
+    python bench_text_context.py [--splits 20] [--repeat 5]
+"""
+import argparse
+import random
+import sys
+import time
+
+from text_context import TextContext, is_leading_settled
+
+# Mirrors QUICK_ANSWER_LEADING_PATTERNS in speech_pipeline_manager.py
+LEADING_PATTERNS = ["<think>", "</think>", "\n", " "]
+
+CORPUS = [
+    "Sure! The capital of France is Paris, a city known for art and food.",
+    "Hi.",
+    "Yes",
+    "Well, that depends on a lot of factors, for example how much time you have.",
+    "<think>\n\n</think>\n\nHello there! How can I help you today?",
+    "<think></think> Okay, let me think about that for a second: the answer is forty-two.",
+    "   \n  Leading whitespace before the actual answer starts, then a comma, and more.",
+    "This is a rather long first sentence without any punctuation whatsoever that keeps going and going and going on and on beyond the maximum length",
+    "Short, but not enough alnum. Then a real sentence follows here.",
+    "a-b-c-d-e-f-g-h-i-j-k-l-m-n-o-p",
+    "Numbers like 3.14159 and 2.71828 are famous constants in mathematics.",
+    "日本語の文章です。次の文もあります、そして続きます。",
+    "Hmm; interesting question - let me explain: first, second, third.",
+    "<thi",
+    "<think>",
+    "\n\n\n",
+    "Okay!!! Wow!!! That is amazing news, congratulations to you!",
+    "Line one\nLine two\nLine three and then some more words here.",
+]
+
+
+def split_tokens(text: str, rng: random.Random) -> list:
+    """Splits a text into LLM-like tokens of 1 to 6 characters."""
+    tokens = []
+    i = 0
+    while i < len(text):
+        size = rng.randint(1, 6)
+        tokens.append(text[i:i + size])
+        i += size
+    return tokens
+
+
+def legacy_clean_quick_answer(text: str) -> str:
+    """The former SpeechPipelineManager.clean_quick_answer, kept here as the baseline."""
+    previous_text = None
+    current_text = text
+    while previous_text != current_text:
+        previous_text = current_text
+        for pattern in LEADING_PATTERNS:
+            while current_text.startswith(pattern):
+                current_text = current_text[len(pattern):]
+    return current_text
+
+
+def legacy_detect(tokens: list, text_context: TextContext, no_think: bool) -> tuple:
+    """Former worker loop: rescan the whole accumulated answer after every token."""
+    quick_answer = ""
+    for index, token in enumerate(tokens):
+        quick_answer += token
+        if no_think:
+            quick_answer = legacy_clean_quick_answer(quick_answer)
+        context, overhang = text_context.get_context(quick_answer)
+        if context:
+            return index, context, overhang
+    return None, quick_answer, None
+
+
+def streaming_detect(tokens: list, text_context: TextContext, no_think: bool) -> tuple:
+    """Current worker loop: clean the start until it is settled, scan each token once."""
+    quick_answer = ""
+    detector = text_context.stream()
+    leading_settled = not no_think
+    for index, token in enumerate(tokens):
+        quick_answer += token
+        new_text = token
+        if not leading_settled:
+            quick_answer = legacy_clean_quick_answer(quick_answer)
+            leading_settled = is_leading_settled(quick_answer, LEADING_PATTERNS)
+            detector.reset()
+            new_text = quick_answer
+        context, overhang = detector.feed(new_text)
+        if context:
+            return index, context, overhang
+    return None, quick_answer, None
+
+
+def time_corpus(fn, cases: list, text_context: TextContext, repeat: int) -> float:
+    """Returns the best-of-`repeat` mean time per answer in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for tokens, no_think in cases:
+            fn(tokens, text_context, no_think)
+        best = min(best, (time.perf_counter() - start) / len(cases))
+    return best * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--splits", type=int, default=20, help="Random tokenizations per corpus answer.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    text_context = TextContext()
+    cases = []
+    for answer in CORPUS:
+        tokenizations = [list(answer), answer.split(" ")] + [split_tokens(answer, rng) for _ in range(args.splits)]
+        for tokens in tokenizations:
+            for no_think in (False, True):
+                cases.append((tokens, no_think))
+
+    mismatches = 0
+    for tokens, no_think in cases:
+        expected = legacy_detect(tokens, text_context, no_think)
+        actual = streaming_detect(tokens, text_context, no_think)
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH no_think={no_think} tokens={tokens!r}\n  legacy:    {expected!r}\n  streaming: {actual!r}")
+
+    legacy_us = time_corpus(legacy_detect, cases, text_context, args.repeat)
+    stream_us = time_corpus(streaming_detect, cases, text_context, args.repeat)
+    print(f"{len(cases)} tokenized answers, {mismatches} boundary mismatch(es).")
+    print(f"legacy: {legacy_us:.1f} µs/answer, streaming: {stream_us:.1f} µs/answer ({legacy_us / stream_us:.2f}x)")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark for abort-to-return and finish-to-return latency of TTS synthesis waits.
+
+Compares the former wait loop of `AudioProcessor` (`while stream.is_playing() or
+not finished_event.is_set(): ... time.sleep(0.01)`) with `wait_for_stream`,
+which is woken directly by the LinkedEvents set from `on_audio_stream_stop`
+and by the pipeline's stop request. A synthetic stream thread plays the
+engine: it emits chunks for a while and then calls its stop callback. For each
+strategy the benchmark measures the time from `stop_event.set()` (abort) or
+from the stop callback (natural finish) until the waiting thread returns,
+plus how often the waiting thread woke up.
+
+With `--engine`, it additionally aborts real `AudioProcessor.synthesize` calls
+and reports the time from `stop_event.set()` until `synthesize` returned.
+
+Usage:
+    python bench_tts_abort_latency.py [--runs 200] [--engine kokoro]
+"""
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from async_channel import LinkedEvent, wait_for_stream
+
+
+class SyntheticStream:
+    """Stands in for a TextToAudioStream: plays for `duration` seconds, then fires the stop callback."""
+    def __init__(self, finished_event: threading.Event, duration: float):
+        self.finished_event = finished_event
+        self.duration = duration
+        self.playing = False
+        self.stop_requested = threading.Event()
+        self.stopped_at = None
+
+    def play_async(self) -> None:
+        self.playing = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        self.stop_requested.wait(self.duration) # Emulates chunk production until done or stopped
+        self.playing = False
+        self.stopped_at = time.perf_counter()
+        self.finished_event.set()
+
+    def is_playing(self) -> bool:
+        return self.playing
+
+    def stop(self) -> None:
+        self.stop_requested.set()
+
+
+def legacy_wait(stream: SyntheticStream, finished_event: threading.Event, stop_event: threading.Event, counter: list) -> bool:
+    """The former AudioProcessor wait loop."""
+    while stream.is_playing() or not finished_event.is_set():
+        counter[0] += 1
+        if stop_event.is_set():
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def event_wait(stream: SyntheticStream, finished_event: threading.Event, stop_event: threading.Event, counter: list) -> bool:
+    """The current wait: `wait_for_stream` on LinkedEvents."""
+    def is_playing():
+        counter[0] += 1
+        return stream.is_playing()
+    return wait_for_stream(is_playing, finished_event, stop_event)
+
+
+def measure(wait, runs: int, abort: bool) -> tuple:
+    """Returns (latencies in ms, wakeups per run) for `runs` synthetic syntheses."""
+    latencies, wakeups = [], []
+    for _ in range(runs):
+        finished_event, stop_event = LinkedEvent(), LinkedEvent()
+        playing_for = random.uniform(0.05, 0.08)
+        stream = SyntheticStream(finished_event, duration=playing_for if not abort else 10.0)
+        counter = [0]
+        result = {}
+        waiter = threading.Thread(target=lambda: result.update(value=wait(stream, finished_event, stop_event, counter), at=time.perf_counter()))
+        stream.play_async()
+        waiter.start()
+        if abort:
+            time.sleep(playing_for)
+            start = time.perf_counter()
+            stop_event.set()
+            waiter.join()
+            stream.stop()
+        else:
+            waiter.join()
+            start = stream.stopped_at
+        latencies.append((result["at"] - start) * 1000)
+        wakeups.append(counter[0])
+    return latencies, wakeups
+
+
+def report(name: str, latencies: list, wakeups: list) -> None:
+    lat = np.array(latencies)
+    print(f"  {name:<22} mean {lat.mean():6.2f} ms  p95 {np.percentile(lat, 95):6.2f} ms  max {lat.max():6.2f} ms  wakeups/run {np.mean(wakeups):5.1f}")
+
+
+def measure_engine(engine: str, runs: int) -> None:
+    """Aborts real syntheses after a random delay and reports stop_event-to-return latency."""
+    from queue import Queue
+    from audio_module import AudioProcessor
+
+    processor = AudioProcessor(engine=engine)
+    text = "This is a fairly long sentence that keeps the engine busy for a while, so that we can interrupt it in the middle."
+    latencies = []
+    for i in range(runs):
+        stop_event = LinkedEvent()
+        returned = {}
+        worker = threading.Thread(target=lambda: returned.update(at=time.perf_counter(), ok=processor.synthesize(f"{text} ({i})", Queue(), stop_event)))
+        worker.start()
+        time.sleep(random.uniform(0.3, 0.6))
+        start = time.perf_counter()
+        stop_event.set()
+        worker.join()
+        if not returned["ok"]:
+            latencies.append((returned["at"] - start) * 1000)
+    if latencies:
+        report(f"{engine} synthesize()", latencies, [0])
+    else:
+        print(f"  {engine}: every synthesis finished before the abort, use a longer text.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200, help="Synthetic syntheses per strategy and scenario.")
+    parser.add_argument("--engine", default=None, help="Also measure real aborts with this TTS engine (coqui, kokoro, orpheus).")
+    parser.add_argument("--engine-runs", type=int, default=10, help="Real syntheses to abort with --engine.")
+    args = parser.parse_args()
+
+    for scenario, abort in (("abort (stop_event.set -> wait returns)", True), ("finish (stream stop callback -> wait returns)", False)):
+        print(scenario)
+        for name, wait in (("sleep(0.01) polling", legacy_wait), ("wait_for_stream", event_wait)):
+            report(name, *measure(wait, args.runs, abort))
+
+    if args.engine:
+        print("real engine abort (stop_event.set -> synthesize returns)")
+        measure_engine(args.engine, args.engine_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Micro-benchmark for the TTS chunk sender's wakeup strategy.
+
+Compares the former `send_tts_chunks` loop, which polled the generation's audio
+queue with `asyncio.sleep(0.001)`, against the event-driven sender that sleeps
+on a `ThreadSafeAsyncEvent` set by the producing TTS thread. A producer thread
+plays the role of the TTS worker: it stays silent for an idle phase, then
+emits chunks at a fixed cadence. For both phases the benchmark reports event
+loop wakeups per second and CPU time, plus the put-to-send latency of chunks.
+
+Usage:
+    python bench_tts_sender_wakeups.py [--idle 2.0] [--active 2.0] [--interval-ms 20]
+"""
+import argparse
+import asyncio
+import threading
+import time
+from queue import Empty
+
+import numpy as np
+
+from async_channel import NotifyingQueue, ThreadSafeAsyncEvent
+
+IDLE_TIMEOUT = 1.0 # Mirrors TTS_SENDER_IDLE_TIMEOUT in server.py
+
+
+class Stats:
+    """Counters collected by a sender, split by phase."""
+    def __init__(self):
+        self.wakeups = {"idle": 0, "active": 0}
+        self.latencies = []
+        self.phase = "idle"
+
+
+def producer(chunks: NotifyingQueue, stats: Stats, idle: float, active: float, interval: float, done: threading.Event) -> None:
+    """Emulates a TTS worker: silent for `idle` seconds, then one chunk every `interval` seconds."""
+    time.sleep(idle)
+    stats.phase = "active"
+    end = time.perf_counter() + active
+    next_put = time.perf_counter()
+    while next_put < end:
+        delay = next_put - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        chunks.put_nowait(time.perf_counter())
+        next_put += interval
+    done.set()
+    chunks.put_nowait(None) # Wakes the sender so it notices the end
+
+
+async def polling_sender(chunks: NotifyingQueue, stats: Stats, done: threading.Event) -> None:
+    """The previous strategy: poll the thread queue every millisecond."""
+    while not done.is_set():
+        await asyncio.sleep(0.001)
+        stats.wakeups[stats.phase] += 1
+        try:
+            put_time = chunks.get_nowait()
+        except Empty:
+            await asyncio.sleep(0.001)
+            continue
+        if put_time is not None:
+            stats.latencies.append(time.perf_counter() - put_time)
+
+
+async def event_sender(chunks: NotifyingQueue, stats: Stats, done: threading.Event) -> None:
+    """The current strategy: sleep until the producer signals, then drain the queue."""
+    wakeup = ThreadSafeAsyncEvent()
+    chunks.on_put = wakeup.set
+    while not done.is_set():
+        await asyncio.sleep(0)
+        try:
+            put_time = chunks.get_nowait()
+        except Empty:
+            await wakeup.wait(timeout=IDLE_TIMEOUT)
+            stats.wakeups[stats.phase] += 1
+            continue
+        if put_time is not None:
+            stats.latencies.append(time.perf_counter() - put_time)
+
+
+async def run(sender, idle: float, active: float, interval: float) -> tuple:
+    """Runs one sender against the producer, returns (stats, cpu seconds per phase)."""
+    chunks = NotifyingQueue()
+    stats = Stats()
+    done = threading.Event()
+    cpu = {}
+
+    async def measure_phases():
+        start = time.process_time()
+        while stats.phase == "idle":
+            await asyncio.sleep(0.05)
+        cpu["idle"] = time.process_time() - start
+        start = time.process_time()
+        while not done.is_set():
+            await asyncio.sleep(0.05)
+        cpu["active"] = time.process_time() - start
+
+    thread = threading.Thread(target=producer, args=(chunks, stats, idle, active, interval, done), daemon=True)
+    thread.start()
+    await asyncio.gather(sender(chunks, stats, done), measure_phases())
+    thread.join()
+    return stats, cpu
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--idle", type=float, default=2.0, help="Seconds without TTS audio.")
+    parser.add_argument("--active", type=float, default=2.0, help="Seconds of TTS audio streaming.")
+    parser.add_argument("--interval-ms", type=float, default=20.0, help="Time between TTS chunks while active.")
+    args = parser.parse_args()
+    interval = args.interval_ms / 1000.0
+
+    print(f"{'sender':>8} {'idle wk/s':>10} {'idle cpu%':>10} {'active wk/s':>12} {'active cpu%':>12} {'lat p50 µs':>11} {'lat p99 µs':>11}")
+    for name, sender in (("polling", polling_sender), ("event", event_sender)):
+        stats, cpu = asyncio.run(run(sender, args.idle, args.active, interval))
+        latencies = np.array(stats.latencies) * 1e6
+        print(
+            f"{name:>8} {stats.wakeups['idle'] / args.idle:>10.0f} {100 * cpu['idle'] / args.idle:>9.1f}% "
+            f"{stats.wakeups['active'] / args.active:>12.0f} {100 * cpu['active'] / args.active:>11.1f}% "
+            f"{np.percentile(latencies, 50):>11.0f} {np.percentile(latencies, 99):>11.0f}"
+        )
+    print("wk/s: event loop wakeups of the sender per second; cpu%: process CPU time per wall time.")
+    print("lat: time from the TTS thread queueing a chunk to the sender picking it up.")
+
+
+if __name__ == "__main__":
+    main()
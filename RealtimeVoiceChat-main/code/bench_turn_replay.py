@@ -0,0 +1,503 @@
+"""
+Deterministic replay benchmark for end-to-end turn latency of the voice pipeline.
+
+Replays recorded WAV files through the real server code path: a fake WebSocket
+feeds `server.websocket_endpoint` audio packets with the browser's 8-byte
+`!II` header (timestamp, flags) and 2048-sample 48 kHz batches, at real time or
+accelerated by `--speed`. Between utterances the fake client keeps streaming
+silence, like an open microphone. Transcription and turn detection are the
+real ones. The LLM is a local fake Ollama server that streams a scripted answer
+at `--token-rate` after `--llm-ttft`, and TTS is a stub that emits silent PCM
+at `--tts-rtf` times real time. That keeps runs comparable across commits.
+
+The fake client reacts like the browser: it reports `tts_start` on the first
+TTS chunk and `tts_stop` when the answer finished or was interrupted. With
+`--barge-in-every N`, every Nth utterance is spoken `--barge-in-delay` seconds
+after the previous answer started playing.
+
+Reported (p50/p95/p99 in ms):
+    speech_end_to_final      last voiced packet sent -> `final_user_request`
+    final_to_first_tts       `final_user_request` -> first TTS chunk
+    barge_in_to_silence      first voiced packet of a barge-in -> `tts_interruption`
+
+`--save` writes the results as a JSON baseline, `--compare` checks a run
+against one and exits with status 1 if a percentile regressed by more than
+`--tolerance`.
+
+Usage:
+    python bench_turn_replay.py hello.wav question.wav [--repeat 3] [--speed 1.0]
+        [--token-rate 40] [--llm-ttft 0.15] [--tts-rtf 0.3] [--barge-in-every 3]
+        [--save baseline.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import struct
+import subprocess
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from math import gcd
+from queue import Queue
+
+import numpy as np
+
+from async_channel import ResourcePool
+
+CLIENT_SAMPLE_RATE = 48000 # What the browser client sends
+BATCH_SAMPLES = 2048 # Samples per packet, as in static/app.js
+TTS_SAMPLE_RATE = 24000 # What the TTS engines produce
+TTS_CHUNK_SECONDS = 0.08
+STUB_SECONDS_PER_CHAR = 0.06 # Speaking rate of the stub TTS voice
+METRICS = ("speech_end_to_final", "final_to_first_tts", "barge_in_to_silence")
+DEFAULT_ANSWER = (
+    "Sure, happy to help with that. Here is a short answer that keeps going for a couple of sentences, "
+    "so the final part of the reply has something to synthesize as well. That should be enough for now."
+)
+
+
+# --------------------------------------------------------------------
+# Fake LLM backend
+# --------------------------------------------------------------------
+def start_fake_ollama(answer: str, token_rate: float, ttft: float) -> ThreadingHTTPServer:
+    """Starts a local Ollama-compatible server streaming `answer` word by word."""
+    tokens = re.findall(r"\S+\s*", answer)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            if not payload.get("stream", True): # History prefill / non-streaming requests
+                self.wfile.write(json.dumps({"message": {"role": "assistant", "content": ""}, "done": True}).encode() + b"\n")
+                return
+            try:
+                time.sleep(ttft)
+                for token in tokens:
+                    self.wfile.write(json.dumps({"message": {"role": "assistant", "content": token}, "done": False}).encode() + b"\n")
+                    self.wfile.flush()
+                    time.sleep(1.0 / token_rate)
+                self.wfile.write(json.dumps({"message": {"role": "assistant", "content": ""}, "done": True}).encode() + b"\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass # Generation was aborted
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="FakeOllama", daemon=True).start()
+    return server
+
+
+# --------------------------------------------------------------------
+# Stub TTS
+# --------------------------------------------------------------------
+class StubAudioProcessor:
+    """
+    Stands in for `AudioProcessor`: emits silent 24 kHz PCM at a fixed real-time factor.
+
+    Audio length follows the text length (`STUB_SECONDS_PER_CHAR`), and each
+    chunk is released after `TTS_CHUNK_SECONDS * rtf`, so the first chunk
+    arrives after one chunk's synthesis time, like a streaming engine. Like
+    `AudioProcessor`, it shares `engines` stub engines between all sessions and
+    checks one out per quick answer or final answer sentence, so sessions
+    contend for TTS the same way they do in production.
+    """
+    def __init__(self, rtf: float, engines: int = 1) -> None:
+        self.rtf = rtf
+        self.tts_inference_time = TTS_CHUNK_SECONDS * rtf * 1000 # ms, used for the pipeline latency estimate
+        self.tts_cache = None
+        self.on_first_audio_chunk_synthesize = None
+        self.lane_pool = ResourcePool(list(range(max(1, engines))))
+
+    def _speak(self, text: str, audio_chunks: Queue, stop_event: threading.Event, state: dict) -> bool:
+        lane = self.lane_pool.acquire(stop_event)
+        if lane is None:
+            return False
+        try:
+            return self._synthesize(text, audio_chunks, stop_event, state)
+        finally:
+            self.lane_pool.release(lane)
+
+    def _synthesize(self, text: str, audio_chunks: Queue, stop_event: threading.Event, state: dict) -> bool:
+        seconds = len(text.strip()) * STUB_SECONDS_PER_CHAR
+        chunk = bytes(int(TTS_SAMPLE_RATE * TTS_CHUNK_SECONDS) * 2)
+        for _ in range(max(1, round(seconds / TTS_CHUNK_SECONDS))):
+            if stop_event.wait(TTS_CHUNK_SECONDS * self.rtf):
+                return False
+            audio_chunks.put_nowait(chunk)
+            if not state["first_chunk_sent"]:
+                state["first_chunk_sent"] = True
+                if state["callback"]:
+                    state["callback"]()
+        return True
+
+    def synthesize(self, text, audio_chunks, stop_event, generation_string="", on_first_audio_chunk=None, session_id=None) -> bool:
+        state = {"first_chunk_sent": False, "callback": on_first_audio_chunk or self.on_first_audio_chunk_synthesize}
+        return self._speak(text, audio_chunks, stop_event, state)
+
+    def synthesize_generator(self, generator, audio_chunks, stop_event, generation_string="", on_first_audio_chunk=None, session_id=None) -> bool:
+        state = {"first_chunk_sent": False, "callback": on_first_audio_chunk or self.on_first_audio_chunk_synthesize}
+        text = ""
+        for piece in generator: # No engine is held while waiting for tokens
+            text += piece
+            sentences = re.split(r"(?<=[.!?])\s+", text)
+            for sentence in sentences[:-1]: # Speak complete sentences as they arrive
+                if not self._speak(sentence, audio_chunks, stop_event, state):
+                    return False
+            text = sentences[-1]
+        if text.strip() and not self._speak(text, audio_chunks, stop_event, state):
+            return False
+        return not stop_event.is_set()
+
+    def stop_playback(self) -> None:
+        pass
+
+
+# --------------------------------------------------------------------
+# Recorded audio
+# --------------------------------------------------------------------
+class Utterance:
+    """A WAV file converted to client packets, with the packet indices where speech starts and ends."""
+    def __init__(self, path: str, vad_threshold_db: float) -> None:
+        from scipy.signal import resample_poly
+
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise SystemExit(f"{path}: only 16-bit PCM WAV files are supported.")
+            rate, channels = wav.getframerate(), wav.getnchannels()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        samples = samples.astype(np.float32)
+        if rate != CLIENT_SAMPLE_RATE:
+            divisor = gcd(rate, CLIENT_SAMPLE_RATE)
+            samples = resample_poly(samples, CLIENT_SAMPLE_RATE // divisor, rate // divisor)
+        samples = np.clip(samples, -32768, 32767).astype(np.int16)
+        padding = (-len(samples)) % BATCH_SAMPLES
+        samples = np.concatenate([samples, np.zeros(padding, dtype=np.int16)])
+
+        self.path = path
+        self.packets = [samples[i:i + BATCH_SAMPLES].tobytes() for i in range(0, len(samples), BATCH_SAMPLES)]
+        rms_db = [20 * np.log10(np.sqrt(np.mean(samples[i:i + BATCH_SAMPLES].astype(np.float64) ** 2)) / 32768 + 1e-12) for i in range(0, len(samples), BATCH_SAMPLES)]
+        voiced = [i for i, level in enumerate(rms_db) if level > vad_threshold_db]
+        if not voiced:
+            raise SystemExit(f"{path}: no packet above {vad_threshold_db} dBFS, lower --vad-threshold-db.")
+        self.speech_start, self.speech_end = voiced[0], voiced[-1]
+
+
+# --------------------------------------------------------------------
+# Fake browser client
+# --------------------------------------------------------------------
+class TurnRecord:
+    """Timestamps (perf_counter seconds) collected for one utterance."""
+    def __init__(self, utterance: Utterance, barge_in: bool) -> None:
+        self.utterance = utterance
+        self.barge_in = barge_in
+        self.speech_start = None
+        self.speech_end = None
+        self.final = None
+        self.first_tts = None
+        self.interrupted = None
+        self.answer_done = asyncio.Event()
+        self.first_tts_event = asyncio.Event()
+
+
+class FakeWebSocket:
+    """
+    Plays the browser side of `/ws`: streams microphone packets and reacts to server messages.
+
+    Implements the subset of Starlette's WebSocket used by `websocket_endpoint`.
+    """
+    def __init__(self, speed: float, tts_binary: bool) -> None:
+        self.speed = speed
+        self.query_params = {"tts": "binary"} if tts_binary else {}
+        self.inbound: asyncio.Queue = asyncio.Queue()
+        self.turns = []
+        self.current = None # Turn whose answer is expected next
+        self.tts_playing = False
+        self.pending = [] # (utterance, record, packet index) still to send
+        self.closed = False
+
+    # --- Starlette WebSocket interface ---
+    async def accept(self) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+
+    async def receive(self) -> dict:
+        message = await self.inbound.get()
+        if message is None:
+            from fastapi import WebSocketDisconnect
+            raise WebSocketDisconnect(1000)
+        return message
+
+    async def send_bytes(self, data: bytes) -> None:
+        self._on_tts_chunk()
+
+    async def send_json(self, data: dict) -> None:
+        now = time.perf_counter()
+        msg_type = data.get("type")
+        if msg_type == "tts_chunk":
+            self._on_tts_chunk()
+        elif msg_type == "final_user_request" and self.current and self.current.final is None:
+            self.current.final = now
+        elif msg_type == "tts_interruption":
+            for record in reversed(self.turns):
+                if record.barge_in and record.speech_start is not None and record.interrupted is None:
+                    record.interrupted = now
+                    break
+            self._send_text({"type": "tts_stop"})
+        elif msg_type == "final_assistant_answer" and self.current and self.current.final is not None:
+            self.current.answer_done.set()
+            if self.tts_playing:
+                self._send_text({"type": "tts_stop"})
+
+    # --- Client behaviour ---
+    def _send_text(self, data: dict) -> None:
+        if data["type"] == "tts_start":
+            self.tts_playing = True
+        elif data["type"] == "tts_stop":
+            self.tts_playing = False
+        self.inbound.put_nowait({"type": "websocket.receive", "text": json.dumps(data)})
+
+    def _on_tts_chunk(self) -> None:
+        record = self.current
+        if record and record.final is not None and record.first_tts is None:
+            record.first_tts = time.perf_counter()
+            record.first_tts_event.set()
+        if not self.tts_playing:
+            self._send_text({"type": "tts_start"})
+
+    async def pump(self) -> None:
+        """Sends one packet per batch duration: pending utterance audio, otherwise silence."""
+        silence = bytes(BATCH_SAMPLES * 2)
+        interval = BATCH_SAMPLES / CLIENT_SAMPLE_RATE / self.speed
+        next_send = time.perf_counter()
+        while not self.closed:
+            pcm = silence
+            if self.pending:
+                utterance, record, index = self.pending[0]
+                pcm = utterance.packets[index]
+                now = time.perf_counter()
+                if index == utterance.speech_start:
+                    record.speech_start = now
+                if index == utterance.speech_end:
+                    record.speech_end = now
+                if index + 1 < len(utterance.packets):
+                    self.pending[0] = (utterance, record, index + 1)
+                else:
+                    self.pending.pop(0)
+            timestamp_ms = int(time.time() * 1000) & 0xFFFFFFFF
+            header = struct.pack("!II", timestamp_ms, int(self.tts_playing))
+            self.inbound.put_nowait({"type": "websocket.receive", "bytes": header + pcm})
+            next_send += interval
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+
+    def speak(self, utterance: Utterance, barge_in: bool) -> TurnRecord:
+        record = TurnRecord(utterance, barge_in)
+        self.turns.append(record)
+        self.current = record
+        self.pending.append((utterance, record, 0))
+        return record
+
+    def disconnect(self) -> None:
+        self.closed = True
+        self.inbound.put_nowait(None)
+
+
+# --------------------------------------------------------------------
+# Runner
+# --------------------------------------------------------------------
+def create_stub_pool(size: int, tts_rtf: float, llm_ttft: float, tts_engines: int = 1):
+    """
+    Builds a started `SessionPool` whose sessions use the stub TTS and the fake LLM.
+
+    The sessions share one stub TTS with `tts_engines` engines, as they share
+    the `AudioProcessor` in production.
+
+    Must run inside the event loop. Transcription and turn detection are real.
+    """
+    import server
+    from audio_in import AudioInputProcessor
+    from session_pool import SessionPool, VoiceSession
+    from speech_pipeline_manager import SpeechPipelineManager
+
+    stub_tts = StubAudioProcessor(tts_rtf, tts_engines)
+
+    def create_session(session_id: int) -> VoiceSession:
+        pipeline_manager = SpeechPipelineManager(
+            tts_engine="kokoro",
+            llm_provider="ollama",
+            llm_model="replay-mock",
+            audio_processor=stub_tts,
+            llm_inference_time=llm_ttft * 1000,
+            session_id=session_id,
+        )
+        audio_input_processor = AudioInputProcessor(
+            server.LANGUAGE,
+            pipeline_latency=pipeline_manager.full_output_pipeline_latency / 1000,
+            session_id=session_id,
+        )
+        return VoiceSession(session_id, pipeline_manager, audio_input_processor)
+
+    pool = SessionPool(size, create_session)
+    pool.start()
+    return pool
+
+
+async def run_session(args, utterances: list) -> list:
+    import server
+
+    pool = create_stub_pool(1, args.tts_rtf, args.llm_ttft)
+    server.app.state.SessionPool = pool
+
+    ws = FakeWebSocket(args.speed, args.tts_binary)
+    endpoint = asyncio.create_task(server.websocket_endpoint(ws))
+    pump = asyncio.create_task(ws.pump())
+    timeout = args.turn_timeout / args.speed
+    try:
+        await asyncio.sleep(args.warmup / args.speed) # Let the transcriber settle on silence first
+        sequence = utterances * args.repeat
+        i = 0
+        while i < len(sequence):
+            record = ws.speak(sequence[i], barge_in=False)
+            # Utterance j (1-based) is a barge-in if j is a multiple of --barge-in-every
+            next_is_barge_in = args.barge_in_every > 0 and i + 1 < len(sequence) and (i + 2) % args.barge_in_every == 0
+            try:
+                if next_is_barge_in:
+                    await asyncio.wait_for(record.first_tts_event.wait(), timeout)
+                    await asyncio.sleep(args.barge_in_delay / args.speed)
+                    i += 1
+                    record = ws.speak(sequence[i], barge_in=True)
+                await asyncio.wait_for(record.answer_done.wait(), timeout)
+            except asyncio.TimeoutError:
+                print(f"  utterance {i + 1} ({os.path.basename(sequence[i].path)}) timed out")
+            i += 1
+            await asyncio.sleep(args.pause / args.speed)
+    finally:
+        ws.disconnect()
+        pump.cancel()
+        await asyncio.gather(pump, endpoint, return_exceptions=True)
+        pool.shutdown()
+    return ws.turns
+
+
+def percentiles(values: list) -> dict:
+    if not values:
+        return {"n": 0}
+    ms = np.array(values) * 1000
+    return {"n": len(values), "p50": float(np.percentile(ms, 50)), "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99))}
+
+
+def summarize(turns: list) -> dict:
+    samples = {name: [] for name in METRICS}
+    for record in turns:
+        if record.speech_end is not None and record.final is not None:
+            samples["speech_end_to_final"].append(record.final - record.speech_end)
+        if record.final is not None and record.first_tts is not None:
+            samples["final_to_first_tts"].append(record.first_tts - record.final)
+        if record.barge_in and record.speech_start is not None and record.interrupted is not None:
+            samples["barge_in_to_silence"].append(record.interrupted - record.speech_start)
+    return {name: percentiles(values) for name, values in samples.items()}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints the change against a baseline, returns False if a percentile regressed beyond `tolerance`."""
+    ok = True
+    print(f"compared with baseline from commit {baseline.get('commit', '?')}")
+    for name in METRICS:
+        for key in ("p50", "p95", "p99"):
+            old = baseline["results"].get(name, {}).get(key)
+            new = results[name].get(key)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            regressed = change > tolerance
+            ok = ok and not regressed
+            print(f"  {name:<22} {key}  {old:8.1f} -> {new:8.1f} ms  ({change:+.0%}){'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("wavs", nargs="+", help="16-bit PCM WAV files, one utterance each (any sample rate).")
+    parser.add_argument("--repeat", type=int, default=3, help="How often the utterance list is replayed.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback pace, 2.0 streams audio twice as fast as real time.")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds of silence between a finished answer and the next utterance.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of silence streamed before the first utterance.")
+    parser.add_argument("--answer", default=DEFAULT_ANSWER, help="Scripted answer of the fake LLM.")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="Tokens per second of the fake LLM.")
+    parser.add_argument("--llm-ttft", type=float, default=0.15, help="Seconds until the fake LLM sends its first token.")
+    parser.add_argument("--tts-rtf", type=float, default=0.3, help="Real-time factor of the stub TTS engine.")
+    parser.add_argument("--barge-in-every", type=int, default=3, help="Every Nth utterance interrupts the previous answer (0 disables).")
+    parser.add_argument("--barge-in-delay", type=float, default=0.5, help="Seconds after the first TTS chunk a barge-in starts.")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="Seconds to wait for an answer before moving on.")
+    parser.add_argument("--vad-threshold-db", type=float, default=-45.0, help="Packets above this level (dBFS) count as speech.")
+    parser.add_argument("--tts-binary", action="store_true", help="Request binary TTS frames instead of Base64 JSON.")
+    parser.add_argument("--save", help="Write the results to this JSON baseline file.")
+    parser.add_argument("--compare", help="Compare the results with this JSON baseline file.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative increase per percentile for --compare.")
+    parser.add_argument("--verbose", action="store_true", help="Keep the pipeline's INFO logging.")
+    args = parser.parse_args()
+
+    utterances = [Utterance(path, args.vad_threshold_db) for path in args.wavs]
+    fake_llm = start_fake_ollama(args.answer, args.token_rate, args.llm_ttft)
+    os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{fake_llm.server_address[1]}" # Read when llm_module is imported
+    os.environ.setdefault("LLM_HISTORY_SUMMARY", "0")
+
+    import server # noqa: F401 (configures logging)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    turns = asyncio.run(run_session(args, utterances))
+    fake_llm.shutdown()
+
+    results = summarize(turns)
+    print(f"{len(turns)} utterances replayed at {args.speed}x")
+    for name in METRICS:
+        stats = results[name]
+        if stats["n"]:
+            print(f"  {name:<22} n={stats['n']:<3} p50 {stats['p50']:8.1f} ms  p95 {stats['p95']:8.1f} ms  p99 {stats['p99']:8.1f} ms")
+        else:
+            print(f"  {name:<22} no samples")
+
+    config = {key: value for key, value in vars(args).items() if key not in ("save", "compare", "verbose")}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"commit": git_commit(), "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "config": config, "results": results}, f, indent=2)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("warning: baseline was recorded with a different configuration")
+        if not compare(results, baseline, args.tolerance):
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
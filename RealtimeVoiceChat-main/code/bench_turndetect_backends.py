@@ -0,0 +1,126 @@
+"""
+Parity and latency check for the turn detection classifier backends.
+
+Runs the sentence completion classifier through eager PyTorch, onnxruntime fp32
+and onnxruntime int8 (exported on first run) on a fixed set of partial and
+complete sentences. Reports the maximum probability deviation from PyTorch, the
+agreement of the complete/incomplete decision, the resulting pause difference,
+single-sentence latency and batched throughput. Exits with status 1 if an ONNX
+backend deviates more than the given tolerance.
+
+Usage:
+    python bench_turndetect_backends.py [--threads 2] [--repeat 200] [--tolerance 0.05]
+"""
+import argparse
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from turndetect import (
+    CompletionClassifier,
+    OnnxCompletionClassifier,
+    interpolate_detection,
+    model_dir_local,
+)
+
+# Texts as they reach the model: punctuation stripped, mix of finished and unfinished turns
+SENTENCES = [
+    "Hello",
+    "Hello how are you",
+    "I wanted to ask you about",
+    "Can you tell me what the weather",
+    "Can you tell me what the weather is like today",
+    "Thats all I needed to know",
+    "So the thing is",
+    "My favorite color is blue",
+    "I think that we should",
+    "What time is it",
+    "Well I was thinking maybe we could",
+    "Thank you very much",
+    "And then",
+    "Could you explain how neural networks learn",
+    "I am not sure if",
+    "Lets go to the park tomorrow",
+    "The reason I am calling is because",
+    "Yes",
+    "No I dont think so",
+    "Tell me a joke about",
+    "Tell me a joke about cats",
+    "I would like to order a large pizza with",
+    "I would like to order a large pizza with extra cheese",
+    "How do I get to the train station",
+    "Um",
+    "Actually never mind",
+    "What do you think about the new movie that came out last week",
+    "If you could travel anywhere where would you go",
+    "When I was a kid I used to",
+    "Good night",
+]
+
+
+def measure_latency(classifier: CompletionClassifier, repeat: int) -> tuple:
+    """Returns (p50 ms, p99 ms) of single-sentence predictions."""
+    timings = []
+    for i in range(repeat):
+        sentence = SENTENCES[i % len(SENTENCES)]
+        start = time.perf_counter()
+        classifier.predict_batch([sentence])
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def measure_throughput(classifier: CompletionClassifier, batch_size: int, seconds: float = 2.0) -> float:
+    """Returns classified sentences per second for batches of `batch_size`."""
+    batch = (SENTENCES * (batch_size // len(SENTENCES) + 1))[:batch_size]
+    done = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        classifier.predict_batch(batch)
+        done += batch_size
+    return done / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model-dir", default=model_dir_local, help="Classifier path or Hugging Face id.")
+    parser.add_argument("--onnx-dir", default=None, help="Where to export the ONNX models (default: temp dir).")
+    parser.add_argument("--threads", type=int, default=2, help="onnxruntime intra-op threads.")
+    parser.add_argument("--repeat", type=int, default=200, help="Single-sentence predictions for the latency measurement.")
+    parser.add_argument("--batch-size", type=int, default=16, help="Batch size for the throughput measurement.")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Max allowed probability deviation from PyTorch.")
+    args = parser.parse_args()
+    onnx_dir = args.onnx_dir or tempfile.mkdtemp(prefix="turndetection_onnx_")
+
+    backends = {
+        "torch": CompletionClassifier(args.model_dir),
+        "onnx fp32": OnnxCompletionClassifier(args.model_dir, onnx_dir=onnx_dir, quantize=False, num_threads=args.threads),
+        "onnx int8": OnnxCompletionClassifier(args.model_dir, onnx_dir=onnx_dir, quantize=True, num_threads=args.threads),
+    }
+
+    reference = np.array(backends["torch"].predict_batch(SENTENCES))
+    reference_pause = np.array([interpolate_detection(p) for p in reference])
+    parity_ok = True
+
+    print(f"{'backend':>10} {'max |dp|':>9} {'agree':>7} {'max |dpause|':>13} {'p50 ms':>8} {'p99 ms':>8} {'sent/s':>8}")
+    for name, classifier in backends.items():
+        probabilities = np.array(classifier.predict_batch(SENTENCES))
+        max_diff = np.abs(probabilities - reference).max()
+        agreement = np.mean((probabilities > 0.5) == (reference > 0.5))
+        pause_diff = np.abs(np.array([interpolate_detection(p) for p in probabilities]) - reference_pause).max()
+        p50, p99 = measure_latency(classifier, args.repeat)
+        throughput = measure_throughput(classifier, args.batch_size)
+        print(
+            f"{name:>10} {max_diff:>9.4f} {agreement:>6.0%} {pause_diff:>13.4f} "
+            f"{p50:>8.2f} {p99:>8.2f} {throughput:>8.0f}"
+        )
+        if max_diff > args.tolerance:
+            parity_ok = False
+
+    print(f"Parity {'PASSED' if parity_ok else 'FAILED'} (tolerance {args.tolerance}, {len(SENTENCES)} sentences).")
+    sys.exit(0 if parity_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for the outbound 24kHz -> 48kHz TTS upsampling path.
+
+Compares the former overlap-and-resample `UpsampleOverlap` implementation with
+the streaming one for typical TTS chunk sizes. Reports the hot-path cost per
+chunk (including Base64 encoding) and the boundary quality, measured as the
+maximum deviation from resampling the whole signal in one go.
+
+Usage:
+    python bench_upsample_out.py [--seconds 20] [--repeat 5]
+"""
+import argparse
+import base64
+import time
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from upsample_overlap import UpsampleOverlap
+
+SAMPLE_RATE = 24000
+CHUNK_SAMPLES = (512, 1024, 2048, 4096)
+
+
+class LegacyUpsampleOverlap:
+    """The previous implementation, kept here as the baseline."""
+    def __init__(self):
+        self.previous_chunk = None
+        self.resampled_previous_chunk = None
+
+    def get_base64_chunk(self, chunk: bytes) -> str:
+        audio_int16 = np.frombuffer(chunk, dtype=np.int16)
+        if audio_int16.size == 0:
+            return ""
+        audio_float = audio_int16.astype(np.float32) / 32768.0
+        upsampled_current_chunk = resample_poly(audio_float, 48000, 24000)
+        if self.previous_chunk is None:
+            part = upsampled_current_chunk[:len(upsampled_current_chunk) // 2]
+        else:
+            combined = np.concatenate((self.previous_chunk, audio_float))
+            up = resample_poly(combined, 48000, 24000)
+            prev_len = len(self.resampled_previous_chunk)
+            h_prev = prev_len // 2
+            h_cur = (len(up) - prev_len) // 2 + prev_len
+            part = up[h_prev:h_cur]
+        self.previous_chunk = audio_float
+        self.resampled_previous_chunk = upsampled_current_chunk
+        pcm = (part * 32767).astype(np.int16).tobytes()
+        return base64.b64encode(pcm).decode('utf-8')
+
+
+def make_test_signal(seconds: float) -> np.ndarray:
+    """Speech-like test signal: a few harmonics plus noise at realistic levels."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    signal = sum(3000 / k * np.sin(2 * np.pi * 180 * k * t) for k in range(1, 6))
+    signal += 300 * rng.standard_normal(t.size)
+    return signal.astype(np.int16)
+
+
+def decode(chunks: list) -> np.ndarray:
+    """Decodes a list of Base64 PCM16 strings into one float array."""
+    return np.concatenate([np.frombuffer(base64.b64decode(c), dtype=np.int16) for c in chunks]).astype(np.float64)
+
+
+def time_per_chunk(factory, chunks: list, repeat: int) -> float:
+    """Returns the best-of-`repeat` mean time per chunk in microseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        upsampler = factory()
+        start = time.perf_counter()
+        for chunk in chunks:
+            upsampler.get_base64_chunk(chunk)
+        best = min(best, (time.perf_counter() - start) / len(chunks))
+    return best * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=20.0, help="Length of the test signal in seconds.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timing repetitions (best is reported).")
+    args = parser.parse_args()
+
+    signal = make_test_signal(args.seconds)
+    reference = resample_poly(signal.astype(np.float64), 2, 1)
+
+    print(f"{'chunk':>7} {'legacy µs':>10} {'stream µs':>10} {'speedup':>8} {'legacy err':>11} {'stream err':>11} {'held back':>10}")
+    for size in CHUNK_SAMPLES:
+        chunks = [signal[i:i + size].tobytes() for i in range(0, len(signal) - size + 1, size)]
+
+        legacy = LegacyUpsampleOverlap()
+        legacy_out = decode([legacy.get_base64_chunk(c) for c in chunks])
+        streaming = UpsampleOverlap()
+        stream_out = decode([streaming.get_base64_chunk(c) for c in chunks] + [streaming.flush_base64_chunk()])
+        delay = streaming.upsampler.delay
+
+        # Ignore the first/last filter lengths where both approaches see zero padding
+        margin = 4 * delay
+        n = len(chunks) * size * 2
+        legacy_err = np.abs(legacy_out[margin:len(legacy_out) - margin] - reference[margin:len(legacy_out) - margin]).max()
+        stream_err = np.abs(stream_out[delay + margin:delay + n - margin] - reference[margin:n - margin]).max()
+
+        legacy_us = time_per_chunk(LegacyUpsampleOverlap, chunks, args.repeat)
+        stream_us = time_per_chunk(UpsampleOverlap, chunks, args.repeat)
+        print(
+            f"{size:>7} {legacy_us:>10.1f} {stream_us:>10.1f} {legacy_us / stream_us:>7.2f}x "
+            f"{legacy_err:>11.1f} {stream_err:>11.1f} {f'{size} vs {delay}':>10}"
+        )
+    print("err: max abs deviation (PCM16 LSB) from resampling the full signal at once.")
+    print("held back: output samples delayed per chunk (legacy: half a chunk, streaming: filter delay).")
+
+
+if __name__ == "__main__":
+    main()
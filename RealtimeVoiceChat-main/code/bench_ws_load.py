@@ -0,0 +1,405 @@
+"""
+Multi-client WebSocket load generator for sizing how many `/ws` sessions one node sustains.
+
+For every concurrency level in `--clients`, opens that many WebSocket clients
+at once and lets them talk for `--duration` seconds. Each client behaves like
+the browser: it streams microphone packets with the 8-byte `!II` header
+(timestamp, flags) and 2048-sample 48 kHz PCM16 batches at real-time cadence,
+speaks the given WAV utterances in turn with silence in between, plays the
+TTS answer on a simulated playback clock and reports `tts_start`/`tts_stop`.
+
+By default the server runs in-process on a free port, with the fake Ollama
+server and stub TTS engine from `bench_turn_replay.py` and `MAX_SESSIONS`
+set to the highest level, so only the server itself (transcription, turn
+detection, queues, scheduling) is loaded. `--url` targets a separately
+started server instead, e.g. one with real engines.
+
+Reported per level (p50/p95 over all turns or clients):
+    turn latency      last voiced packet sent -> first TTS chunk of the answer
+    send jitter       how late packets left the client against the real-time schedule
+    late tts chunks   TTS chunks that arrived after the simulated playback ran dry,
+                      with the p95 stall they caused
+    dropped           `rtvc_audio_chunks_dropped_total` delta scraped from `/metrics`
+    rejected          clients that received `session_rejected`
+
+`--csv` writes one row per level, the concurrency-vs-latency curve.
+
+Requires the `websockets` package (also used by uvicorn for `/ws`).
+
+Usage:
+    python bench_ws_load.py hello.wav question.wav [--clients 1 2 4 8] [--duration 60]
+        [--tts-rtf 0.3] [--token-rate 40] [--llm-ttft 0.15] [--csv curve.csv]
+    python bench_ws_load.py hello.wav --url ws://gpu-node:8000/ws --clients 1 2 3
+"""
+import argparse
+import asyncio
+import base64
+import csv
+import json
+import logging
+import os
+import random
+import re
+import socket
+import struct
+import time
+import urllib.request
+
+import numpy as np
+
+from bench_turn_replay import (
+    BATCH_SAMPLES,
+    CLIENT_SAMPLE_RATE,
+    DEFAULT_ANSWER,
+    Utterance,
+    create_stub_pool,
+    git_commit,
+    start_fake_ollama,
+)
+
+TTS_FRAME_HEADER = struct.Struct("!III") # As in server.py: generation id, sequence number, sample rate
+TTS_OUTPUT_SAMPLE_RATE = 48000 # Sample rate of Base64 JSON TTS chunks
+
+
+class ClientStats:
+    """Measurements of one load client."""
+    def __init__(self, client_id: int) -> None:
+        self.client_id = client_id
+        self.rejected = False
+        self.queued_at = None
+        self.send_lateness = [] # Seconds each packet left after its scheduled time
+        self.turn_latencies = [] # Seconds from last voiced packet to the first TTS chunk
+        self.turns_started = 0
+        self.turns_answered = 0
+        self.tts_chunks = 0
+        self.tts_late_chunks = 0
+        self.tts_stalls = [] # Seconds the simulated playback ran dry before a late chunk
+        self.error = None
+
+
+class LoadClient:
+    """
+    One simulated browser on `/ws`.
+
+    Packets are sent on a fixed real-time schedule; the receive side feeds TTS
+    chunks into a playback clock that advances by each chunk's duration, so a
+    chunk arriving after the clock ran out is one the listener would hear as a gap.
+    """
+    def __init__(self, client_id: int, url: str, utterances: list, args) -> None:
+        self.url = url
+        self.utterances = utterances
+        self.args = args
+        self.stats = ClientStats(client_id)
+        self.ws = None
+        self.pending = [] # (utterance, packet index) still to send
+        self.tts_playing = False
+        self.playback_end = 0.0 # perf_counter time the simulated playback buffer runs dry
+        self.speech_end = None # Send time of the last voiced packet of the current utterance
+        self.awaiting_first_tts = False
+        self.answer_done = asyncio.Event()
+        self.closed = False
+
+    async def run(self, start_delay: float, duration: float) -> ClientStats:
+        import websockets
+
+        await asyncio.sleep(start_delay)
+        try:
+            async with websockets.connect(self.url, max_size=None) as ws:
+                self.ws = ws
+                receiver = asyncio.create_task(self._receive())
+                sender = asyncio.create_task(self._send_audio())
+                try:
+                    await self._converse(duration)
+                finally:
+                    self.closed = True
+                    sender.cancel()
+                    receiver.cancel()
+                    await asyncio.gather(sender, receiver, return_exceptions=True)
+        except Exception as e:
+            if not self.stats.rejected:
+                self.stats.error = f"{type(e).__name__}: {e}"
+        return self.stats
+
+    async def _converse(self, duration: float) -> None:
+        """Speaks utterances one after another, waiting for each answer to finish playing."""
+        deadline = time.perf_counter() + duration
+        await asyncio.sleep(self.args.warmup)
+        turn = random.randrange(len(self.utterances)) # Clients start at different utterances
+        while time.perf_counter() < deadline and not self.closed:
+            utterance = self.utterances[turn % len(self.utterances)]
+            turn += 1
+            self.answer_done.clear()
+            self.speech_end = None
+            self.awaiting_first_tts = True
+            self.pending.append((utterance, 0))
+            self.stats.turns_started += 1
+            try:
+                await asyncio.wait_for(self.answer_done.wait(), self.args.turn_timeout)
+                self.stats.turns_answered += 1
+            except asyncio.TimeoutError:
+                self.awaiting_first_tts = False
+            await asyncio.sleep(self.args.pause)
+
+    async def _send_audio(self) -> None:
+        """Sends one packet per batch duration: pending utterance audio, otherwise silence."""
+        silence = bytes(BATCH_SAMPLES * 2)
+        interval = BATCH_SAMPLES / CLIENT_SAMPLE_RATE
+        next_send = time.perf_counter()
+        while not self.closed:
+            pcm = silence
+            voiced_end = False
+            if self.pending:
+                utterance, index = self.pending[0]
+                pcm = utterance.packets[index]
+                voiced_end = index == utterance.speech_end
+                if index + 1 < len(utterance.packets):
+                    self.pending[0] = (utterance, index + 1)
+                else:
+                    self.pending.pop(0)
+            timestamp_ms = int(time.time() * 1000) & 0xFFFFFFFF
+            await self.ws.send(struct.pack("!II", timestamp_ms, int(self.tts_playing)) + pcm)
+            now = time.perf_counter()
+            if voiced_end:
+                self.speech_end = now
+            if self.stats.queued_at is None: # Sends while waiting for a session only pile up in the socket
+                self.stats.send_lateness.append(max(0.0, now - next_send))
+            next_send += interval
+            await asyncio.sleep(max(0.0, next_send - now))
+
+    async def _send_json(self, data: dict) -> None:
+        if data["type"] == "tts_start":
+            self.tts_playing = True
+        elif data["type"] == "tts_stop":
+            self.tts_playing = False
+        await self.ws.send(json.dumps(data))
+
+    async def _receive(self) -> None:
+        try:
+            await self._dispatch()
+        finally:
+            self.closed = True # Server closed the connection or the client is shutting down
+            self.answer_done.set()
+
+    async def _dispatch(self) -> None:
+        async for message in self.ws:
+            now = time.perf_counter()
+            if isinstance(message, bytes):
+                _, _, sample_rate = TTS_FRAME_HEADER.unpack_from(message)
+                await self._on_tts_chunk(now, (len(message) - TTS_FRAME_HEADER.size) / 2 / sample_rate)
+                continue
+            data = json.loads(message)
+            msg_type = data.get("type")
+            if msg_type == "tts_chunk":
+                await self._on_tts_chunk(now, len(base64.b64decode(data["content"])) / 2 / TTS_OUTPUT_SAMPLE_RATE)
+            elif msg_type == "session_queued":
+                self.stats.queued_at = now
+            elif msg_type == "session_rejected":
+                self.stats.rejected = True
+                return
+            elif msg_type in ("tts_interruption", "stop_tts"):
+                self.playback_end = now
+                if self.tts_playing:
+                    await self._send_json({"type": "tts_stop"})
+            elif msg_type == "final_assistant_answer":
+                asyncio.create_task(self._finish_playback())
+
+    async def _on_tts_chunk(self, now: float, seconds: float) -> None:
+        if self.stats.queued_at is not None:
+            self.stats.queued_at = None # Audio flows, so the session was assigned
+        if self.awaiting_first_tts:
+            self.awaiting_first_tts = False
+            if self.speech_end is not None:
+                self.stats.turn_latencies.append(now - self.speech_end)
+            self.playback_end = now # A new answer starts playing right away
+        elif now > self.playback_end:
+            self.stats.tts_late_chunks += 1
+            self.stats.tts_stalls.append(now - self.playback_end)
+        self.stats.tts_chunks += 1
+        self.playback_end = max(self.playback_end, now) + seconds
+        if not self.tts_playing:
+            await self._send_json({"type": "tts_start"})
+
+    async def _finish_playback(self) -> None:
+        """Reports `tts_stop` once the simulated playback of the answer ran out, like the browser."""
+        await asyncio.sleep(max(0.0, self.playback_end - time.perf_counter()))
+        if self.tts_playing and not self.closed:
+            await self._send_json({"type": "tts_stop"})
+        self.answer_done.set()
+
+
+# --------------------------------------------------------------------
+# Server side
+# --------------------------------------------------------------------
+def scrape_counter(metrics_url: str, name: str):
+    """Returns the value of an unlabeled counter from a `/metrics` page, or None if unavailable."""
+    try:
+        with urllib.request.urlopen(metrics_url, timeout=5) as response:
+            text = response.read().decode("utf-8")
+    except OSError:
+        return None
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_stub_server(args, sessions: int):
+    """Serves `server.app` in this event loop, with a pool of stub sessions instead of the lifespan's."""
+    import server
+    import uvicorn
+
+    pool = create_stub_pool(sessions, args.tts_rtf, args.llm_ttft, args.tts_engines)
+    server.app.state.SessionPool = pool
+    server.register_pool_metrics(pool)
+
+    port = free_port()
+    uvicorn_server = uvicorn.Server(uvicorn.Config(server.app, host="127.0.0.1", port=port, lifespan="off", log_config=None))
+    task = asyncio.create_task(uvicorn_server.serve())
+    while not uvicorn_server.started:
+        if task.done():
+            task.result() # Raises the startup error
+        await asyncio.sleep(0.05)
+    return uvicorn_server, task, pool, f"ws://127.0.0.1:{port}/ws"
+
+
+# --------------------------------------------------------------------
+# Runner
+# --------------------------------------------------------------------
+def percentile(values: list, q: float):
+    return float(np.percentile(np.array(values) * 1000, q)) if values else None
+
+
+async def run_level(url: str, metrics_url: str, clients: int, utterances: list, args) -> dict:
+    """Runs `clients` concurrent clients for `--duration` seconds and aggregates their stats."""
+    dropped_before = await asyncio.to_thread(scrape_counter, metrics_url, "rtvc_audio_chunks_dropped_total")
+    received_before = await asyncio.to_thread(scrape_counter, metrics_url, "rtvc_audio_chunks_received_total")
+
+    interval = BATCH_SAMPLES / CLIENT_SAMPLE_RATE
+    load_clients = [LoadClient(i + 1, url, utterances, args) for i in range(clients)]
+    # Spread connects over one packet interval so the clients' packets interleave instead of arriving in bursts
+    stats = await asyncio.gather(*(client.run(i * interval / clients, args.duration) for i, client in enumerate(load_clients)))
+
+    dropped_after = await asyncio.to_thread(scrape_counter, metrics_url, "rtvc_audio_chunks_dropped_total")
+    received_after = await asyncio.to_thread(scrape_counter, metrics_url, "rtvc_audio_chunks_received_total")
+
+    turn_latencies = [value for s in stats for value in s.turn_latencies]
+    send_lateness = [value for s in stats for value in s.send_lateness]
+    stalls = [value for s in stats for value in s.tts_stalls]
+    tts_chunks = sum(s.tts_chunks for s in stats)
+    for s in stats:
+        if s.error:
+            print(f"  client {s.client_id}: {s.error}")
+    return {
+        "clients": clients,
+        "rejected": sum(s.rejected for s in stats),
+        "turns": sum(s.turns_started for s in stats),
+        "answered": sum(s.turns_answered for s in stats),
+        "turn_latency_p50_ms": percentile(turn_latencies, 50),
+        "turn_latency_p95_ms": percentile(turn_latencies, 95),
+        "send_jitter_p95_ms": percentile(send_lateness, 95),
+        "send_jitter_max_ms": max(send_lateness) * 1000 if send_lateness else None,
+        "tts_chunks": tts_chunks,
+        "tts_late_pct": 100.0 * sum(s.tts_late_chunks for s in stats) / tts_chunks if tts_chunks else None,
+        "tts_stall_p95_ms": percentile(stalls, 95),
+        "chunks_received": received_after - received_before if received_before is not None and received_after is not None else None,
+        "chunks_dropped": dropped_after - dropped_before if dropped_before is not None and dropped_after is not None else None,
+    }
+
+
+def print_row(row: dict) -> None:
+    def ms(key):
+        return f"{row[key]:8.1f}" if row[key] is not None else "     n/a"
+    late = f"{row['tts_late_pct']:5.1f}%" if row["tts_late_pct"] is not None else "   n/a"
+    dropped = f"{row['chunks_dropped']:.0f}/{row['chunks_received']:.0f}" if row["chunks_dropped"] is not None else "n/a"
+    print(
+        f"  {row['clients']:>7}  {row['answered']:>3}/{row['turns']:<3}  {ms('turn_latency_p50_ms')} {ms('turn_latency_p95_ms')}"
+        f"  {ms('send_jitter_p95_ms')}  {late} {ms('tts_stall_p95_ms')}  {dropped:>11}  {row['rejected']:>8}"
+    )
+
+
+async def run(args, utterances: list) -> list:
+    stub = None
+    url = args.url
+    if url is None:
+        stub = await start_stub_server(args, max(args.clients))
+        url = stub[3]
+    if args.tts_binary:
+        url += ("&" if "?" in url else "?") + "tts=binary"
+    metrics_url = re.sub(r"^ws", "http", url.split("?")[0]).rsplit("/", 1)[0] + "/metrics"
+
+    print(f"target {url}, {args.duration:.0f}s per level")
+    print("  clients  answered  turn p50  turn p95  jitter p95  late  stall p95  dropped/recv  rejected")
+    rows = []
+    try:
+        for clients in args.clients:
+            row = await run_level(url, metrics_url, clients, utterances, args)
+            print_row(row)
+            rows.append(row)
+            await asyncio.sleep(args.settle) # Let released sessions reset before the next level
+    finally:
+        if stub:
+            uvicorn_server, task, pool, _ = stub
+            uvicorn_server.should_exit = True
+            await task
+            pool.shutdown()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("wavs", nargs="+", help="16-bit PCM WAV files, one utterance each (any sample rate).")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8], help="Concurrency levels to run, in order.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Seconds each client keeps talking per level.")
+    parser.add_argument("--url", help="WebSocket URL of a running server (default: start a stub server in-process).")
+    parser.add_argument("--pause", type=float, default=1.0, help="Seconds of silence between a finished answer and the next utterance.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds of silence each client streams before its first utterance.")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds to wait between levels.")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="Seconds to wait for an answer before moving on.")
+    parser.add_argument("--answer", default=DEFAULT_ANSWER, help="Scripted answer of the fake LLM.")
+    parser.add_argument("--token-rate", type=float, default=40.0, help="Tokens per second of the fake LLM.")
+    parser.add_argument("--llm-ttft", type=float, default=0.15, help="Seconds until the fake LLM sends its first token.")
+    parser.add_argument("--tts-rtf", type=float, default=0.3, help="Real-time factor of the stub TTS engine.")
+    parser.add_argument("--tts-engines", type=int, default=1, help="Stub TTS engines shared by all sessions (like TTS_FINAL_ENGINES).")
+    parser.add_argument("--vad-threshold-db", type=float, default=-45.0, help="Packets above this level (dBFS) count as speech.")
+    parser.add_argument("--tts-binary", action="store_true", help="Request binary TTS frames instead of Base64 JSON.")
+    parser.add_argument("--csv", help="Write one row per concurrency level to this CSV file.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the clients' utterance order.")
+    parser.add_argument("--verbose", action="store_true", help="Keep the server's INFO logging.")
+    args = parser.parse_args()
+
+    try:
+        import websockets # noqa: F401
+    except ImportError:
+        raise SystemExit("bench_ws_load.py needs the websockets package: pip install websockets")
+
+    random.seed(args.seed)
+    utterances = [Utterance(path, args.vad_threshold_db) for path in args.wavs]
+    fake_llm = None
+    if args.url is None:
+        fake_llm = start_fake_ollama(args.answer, args.token_rate, args.llm_ttft)
+        os.environ["OLLAMA_BASE_URL"] = f"http://127.0.0.1:{fake_llm.server_address[1]}" # Read when llm_module is imported
+        os.environ.setdefault("LLM_HISTORY_SUMMARY", "0")
+        import server # noqa: F401 (configures logging)
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    rows = asyncio.run(run(args, utterances))
+    if fake_llm:
+        fake_llm.shutdown()
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["commit"] + list(rows[0].keys()))
+            writer.writeheader()
+            commit = git_commit()
+            for row in rows:
+                writer.writerow({"commit": commit, **row})
+        print(f"curve written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
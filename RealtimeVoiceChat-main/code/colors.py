@@ -1,3 +1,7 @@
+import re
+from functools import lru_cache
+
+
 class Colors:
     # Foreground colors (standard)
     BLACK = "\033[30m"
@@ -86,6 +90,35 @@ class Colors:
         return cls.Formatter(text)
 
 
+_MARKUP_TAG = re.compile(r"\{(" + "|".join(name.lower() for name, value in vars(Colors).items() if isinstance(value, str) and value.startswith("\033")) + r")\}")
+
+
+@lru_cache(maxsize=1024)
+def render_markup(template: str, enabled: bool = True) -> str:
+    """
+    Replaces colour tags such as `{green}`, `{bold}` or `{reset}` in a log message template.
+
+    Lets logging call sites name colours in a constant template
+    (`logger.info("{green}Final: {reset}%s", text)`) instead of building ANSI
+    strings on every call; the console formatter renders the tags, and a reset
+    is appended so colours never leak into the next line. Results are cached
+    per template.
+
+    Args:
+        template: The message template.
+        enabled: Whether to insert ANSI codes; if False the tags are removed.
+
+    Returns:
+        The template with the tags replaced.
+    """
+    if "{" not in template:
+        return template
+    rendered = _MARKUP_TAG.sub(lambda match: getattr(Colors, match.group(1).upper()) if enabled else "", template)
+    if enabled and rendered != template:
+        rendered += Colors.RESET
+    return rendered
+
+
 # Usage examples:
 if __name__ == "__main__":
     print(Colors.apply("This text is red.").red)
@@ -0,0 +1,205 @@
+import logging
+import re
+import threading
+from functools import lru_cache
+from queue import Queue, Empty
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TOKENS_PER_MESSAGE = 4 # Role markers and separators added by chat templates
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=4096)
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of LLM tokens in a text without a model tokenizer.
+
+    Counts words and punctuation marks and adds a share for long words, which
+    BPE tokenizers split into several pieces. Results are cached, so every
+    message is only measured once over the lifetime of a conversation.
+
+    Args:
+        text: The text to measure.
+
+    Returns:
+        The estimated token count.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        tokens += 1 + len(piece) // 6
+    return tokens
+
+
+def message_tokens(message: Dict[str, str]) -> int:
+    """Estimated tokens of a chat message including template overhead."""
+    return TOKENS_PER_MESSAGE + estimate_tokens(message.get("content") or "")
+
+
+class HistoryWindow:
+    """
+    Keeps the conversation history sent to the LLM within a token budget.
+
+    The full history stays untouched; `messages()` returns the part of it that
+    is sent with each request: an optional rolling summary followed by the most
+    recent turns. Whenever `update()` finds the window over `token_budget`, the
+    oldest complete turns are evicted until it is back below
+    `low_watermark * token_budget`. Evicting in batches keeps the message
+    prefix identical for several turns in a row, so backend prompt caches keep
+    hitting. The evicted turns are folded into the summary by `summarize` on a
+    background thread; until that finished they are simply left out. If
+    summarizing fails, the window is moved back to include those turns again,
+    so the next `update()` evicts and summarizes them anew instead of losing
+    them.
+    """
+    def __init__(
+            self,
+            token_budget: int,
+            summarize: Optional[Callable[[str, List[Dict[str, str]]], str]] = None,
+            low_watermark: float = 0.75,
+        ) -> None:
+        """
+        Initializes the HistoryWindow.
+
+        Args:
+            token_budget: Maximum estimated tokens of the history window (0 disables trimming).
+            summarize: Called as `summarize(previous_summary, evicted_messages)` and
+                       returns the new summary text. It should raise if the summary is
+                       incomplete (e.g. the LLM request was cancelled). If None,
+                       evicted turns are dropped.
+            low_watermark: Fraction of `token_budget` the window is trimmed down to.
+        """
+        self.token_budget = token_budget
+        self.summarize = summarize
+        self.low_watermark = low_watermark
+        self.start = 0 # Index of the first history message inside the window
+        self.summary = ""
+        self.summary_message: Optional[Dict[str, str]] = None
+        self.epoch = 0 # Incremented on reset, outdated summaries are discarded
+        self.lock = threading.Lock()
+        self.summary_jobs: Queue = Queue()
+        self.summary_thread: Optional[threading.Thread] = None
+
+    def messages(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        Returns the history messages to send to the LLM.
+
+        Args:
+            history: The full conversation history.
+
+        Returns:
+            The summary message (if any) followed by the messages inside the window.
+        """
+        with self.lock:
+            if len(history) < self.start: # History was replaced behind our back
+                self._reset_unsafe()
+            window = history[self.start:]
+            if self.summary_message:
+                window.insert(0, self.summary_message)
+            return window
+
+    def update(self, history: List[Dict[str, str]]) -> None:
+        """
+        Trims the window after the history grew, meant to be called between turns.
+
+        Args:
+            history: The full conversation history.
+        """
+        if self.token_budget <= 0:
+            return
+        with self.lock:
+            if len(history) < self.start:
+                self._reset_unsafe()
+            summary_tokens = message_tokens(self.summary_message) if self.summary_message else 0
+            sizes = [message_tokens(message) for message in history[self.start:]]
+            total = summary_tokens + sum(sizes)
+            if total <= self.token_budget:
+                return
+
+            target = self.token_budget * self.low_watermark
+            new_start = self.start
+            for offset, size in enumerate(sizes[:-1]): # Always keep the latest message
+                if total <= target and history[new_start].get("role") == "user":
+                    break # Window starts with a complete turn again
+                total -= size
+                new_start = self.start + offset + 1
+            first = self.start
+            evicted = history[first:new_start]
+            self.start = new_start
+            if self.summarize and evicted:
+                # Queued under the lock, so a failed batch can withdraw the ones behind it
+                self.summary_jobs.put((self.epoch, first, evicted))
+
+        logger.info(f"🗣️📜✂️ History window over budget ({self.token_budget} tokens): evicted {len(evicted)} messages, ~{total} tokens left.")
+        if self.summarize and evicted:
+            self._ensure_summary_thread()
+
+    def reset(self) -> None:
+        """Forgets the window position and summary, e.g. after the history was cleared."""
+        with self.lock:
+            self._reset_unsafe()
+
+    def _reset_unsafe(self) -> None:
+        self.start = 0
+        self.summary = ""
+        self.summary_message = None
+        self.epoch += 1
+
+    def _ensure_summary_thread(self) -> None:
+        if self.summary_thread is None or not self.summary_thread.is_alive():
+            self.summary_thread = threading.Thread(target=self._summary_worker, name="HistorySummaryThread", daemon=True)
+            self.summary_thread.start()
+
+    def _summary_worker(self) -> None:
+        """
+        Folds evicted turns into the rolling summary, one batch at a time.
+
+        Exits once no new batch arrived for a while; `update` restarts it on demand.
+        """
+        while True:
+            try:
+                epoch, first, evicted = self.summary_jobs.get(timeout=30.0)
+            except Empty:
+                return
+            with self.lock:
+                previous = self.summary if epoch == self.epoch else None
+            if previous is None:
+                continue # History was reset meanwhile
+            try:
+                summary = self.summarize(previous, evicted).strip()
+                if not summary:
+                    raise ValueError("empty summary")
+            except Exception as e:
+                logger.warning(f"🗣️📜💥 Summarizing {len(evicted)} evicted messages failed, keeping them in the window: {e}")
+                self._restore_batch(epoch, first)
+                continue
+            with self.lock:
+                if epoch != self.epoch:
+                    continue
+                self.summary = summary
+                self.summary_message = {"role": "system", "content": SUMMARY_PREFIX + summary}
+            logger.info(f"🗣️📜📝 Rolling summary updated (~{estimate_tokens(summary)} tokens): '{summary[:80]}'")
+
+    def _restore_batch(self, epoch: int, first: int) -> None:
+        """
+        Moves the window start back to a batch that could not be summarized.
+
+        Batches queued after it lie behind `first` and are withdrawn, they are
+        part of the window again as well.
+
+        Args:
+            epoch: The epoch the batch was evicted in.
+            first: History index of the batch's first message.
+        """
+        with self.lock:
+            if epoch != self.epoch:
+                return # History was reset meanwhile, nothing to keep
+            self.start = min(self.start, first)
+            while True:
+                try:
+                    self.summary_jobs.get_nowait()
+                except Empty:
+                    break
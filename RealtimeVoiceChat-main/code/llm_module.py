@@ -33,6 +33,9 @@ except ImportError:
     class APIConnectionError(APIError): pass
     logging.warning("🤖⚠️ openai library not installed. OpenAI/LMStudio backends will not function.")
 
+from llm_transport import AsyncLLMTransport, StreamHandle
+from turn_trace import tracer
+
 # Configure logging
 # Use the root logger configured by the main application if available, else basic config
 log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -61,6 +64,11 @@ except ImportError:
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
 LMSTUDIO_BASE_URL = os.getenv("LMSTUDIO_BASE_URL", "http://127.0.0.1:1234/v1")
+OPENAI_DEFAULT_BASE_URL = "https://api.openai.com/v1"
+# "sync": requests/openai SDK streams (default), "async": pooled asyncio transport from llm_transport.py
+LLM_TRANSPORT = os.getenv("LLM_TRANSPORT", "sync").lower()
+# How long Ollama keeps the model (and its KV cache) loaded after a history prefill
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "10m")
 
 # --- Backend Client Creation/Check Functions ---
 def _create_openai_client(api_key: Optional[str], base_url: Optional[str] = None) -> OpenAI:
@@ -181,6 +189,10 @@ def _run_ollama_ps():
         logger.error(f"🤖💥 An unexpected error occurred while running 'ollama ps': {e}")
         return False
 
+class GenerationCancelledError(RuntimeError):
+    """Raised by `LLM.generate(raise_on_cancel=True)` when the stream was cancelled before it finished."""
+
+
 # --- LLM Class ---
 class LLM:
     """
@@ -200,6 +212,8 @@ class LLM:
         api_key: Optional[str] = None,
         base_url: Optional[str] = None,
         no_think: bool = False,
+        transport: Optional[str] = None,
+        session_id: Optional[int] = None,
     ):
         """
         Initializes the LLM interface for a specific backend and model.
@@ -211,9 +225,12 @@ class LLM:
             api_key: API key, primarily for OpenAI backend (can be omitted for others if not needed).
             base_url: Optional base URL for the backend API (overrides defaults/env vars).
             no_think: Experimental flag (currently unused in core logic, intended for future prompt modification).
+            transport: "sync" (requests/openai SDK) or "async" (pooled keep-alive asyncio
+                       transport). Defaults to the LLM_TRANSPORT environment variable.
+            session_id: The voice session using this instance, tags its trace events.
 
         Raises:
-            ValueError: If an unsupported backend is specified.
+            ValueError: If an unsupported backend or transport is specified.
             ImportError: If required libraries for the selected backend are not installed.
         """
         logger.info(f"🤖⚙️ Initializing LLM with backend: {backend}, model: {model}, system_prompt: {system_prompt}")
@@ -226,14 +243,20 @@ class LLM:
         if self.backend in ["openai", "lmstudio"] and not OPENAI_AVAILABLE:
              raise ImportError("openai library is required for the 'openai'/'lmstudio' backends but not installed.")
 
+        self.transport = (transport or LLM_TRANSPORT).lower()
+        if self.transport not in ("sync", "async"):
+            raise ValueError(f"Unsupported transport '{self.transport}'. Supported: ['sync', 'async']")
+
         self.model = model
         self.system_prompt = system_prompt
         self._api_key = api_key
         self._base_url = base_url
         self.no_think = no_think # Not used yet, but kept for future use
+        self.session_id = session_id
 
         self.client: Optional[OpenAI] = None
         self.ollama_session: Optional[Session] = None
+        self.async_transport: Optional[AsyncLLMTransport] = None
         self._client_initialized: bool = False
         self._client_init_lock = Lock()
         self._active_requests: Dict[str, Dict[str, Any]] = {}
@@ -329,6 +352,9 @@ class LLM:
                         logger.error("🤖💥 Ollama session object is None or URL not set during lazy init.")
                         init_ok = False
 
+                if init_ok and self.transport == "async" and self.async_transport is None:
+                    self.async_transport = self._create_async_transport()
+
                 if init_ok:
                     logger.info(f"🤖✅ Client/Connection initialized successfully for backend: {self.backend}.")
                 else:
@@ -346,6 +372,20 @@ class LLM:
             return init_ok
 
 
+    def _create_async_transport(self) -> AsyncLLMTransport:
+        """
+        Creates the pooled asyncio transport for the configured backend.
+
+        Returns:
+            An AsyncLLMTransport bound to the backend's base URL.
+        """
+        if self.backend == "ollama":
+            return AsyncLLMTransport(self.effective_ollama_url)
+        if self.backend == "lmstudio":
+            return AsyncLLMTransport(self.effective_lmstudio_url, headers={"Authorization": "Bearer lmstudio-key"})
+        api_key = self.effective_openai_key or "no-key-needed"
+        return AsyncLLMTransport(self.effective_openai_base_url or OPENAI_DEFAULT_BASE_URL, headers={"Authorization": f"Bearer {api_key}"})
+
     def cancel_generation(self, request_id: Optional[str] = None) -> bool:
         """
         Requests cancellation of active generation streams.
@@ -592,12 +632,93 @@ class LLM:
         logger.error(f"🤖🔥💥 Prewarm failed after exhausting retries. Last error: {last_error}")
         return False
 
+    def prefill_history(
+        self,
+        history: Optional[List[Dict[str, str]]] = None,
+        use_system_prompt: bool = True,
+        timeout: float = 60.0,
+    ) -> bool:
+        """
+        Prefills the backend's KV cache with the conversation so far without generating tokens.
+
+        Sends the same message prefix (system prompt + history) that the next
+        `generate` call will start with, so when the real request arrives the
+        backend reuses the cached prefix and only has to process the new user
+        text. Ollama gets a `/api/chat` request with `num_predict: 0` and a
+        `keep_alive`; LM Studio (and other llama.cpp based OpenAI-compatible
+        servers) a one-token completion with `cache_prompt`. The OpenAI API
+        caches prompt prefixes by itself, so nothing is sent there.
+
+        Args:
+            history: The conversation messages the next request will contain before the new user text.
+            use_system_prompt: If True, prepends the configured system prompt (if any), as `generate` does.
+            timeout: Maximum time in seconds to wait for the backend.
+
+        Returns:
+            True if the backend processed the prefix, False if it was skipped or failed.
+        """
+        if self.backend == "openai":
+            return False
+        if not self._lazy_initialize_clients():
+            logger.warning("🤖🔥⚠️ History prefill skipped: backend client not initialized.")
+            return False
+
+        messages = []
+        if use_system_prompt and self.system_prompt_message:
+            messages.append(self.system_prompt_message)
+        if history:
+            messages.extend(history)
+        if not messages:
+            return False
+
+        start_time = time.time()
+        try:
+            if self.backend == "ollama":
+                path = "/api/chat"
+                payload = {
+                    "model": self.model,
+                    "messages": messages,
+                    "stream": False,
+                    "keep_alive": OLLAMA_KEEP_ALIVE,
+                    "options": {"num_predict": 0},
+                }
+            else:
+                path = "/chat/completions"
+                payload = {
+                    "model": self.model,
+                    "messages": messages,
+                    "stream": False,
+                    "max_tokens": 1,
+                    "cache_prompt": True,
+                }
+
+            if self.async_transport:
+                status, body = self.async_transport.post_json(path, payload, timeout=timeout)
+                if not 200 <= status < 300:
+                    raise ConnectionError(f"HTTP {status}: {body[:200]!r}")
+            elif self.backend == "ollama":
+                response = self.ollama_session.post(f"{self.effective_ollama_url}{path}", json=payload, timeout=(10.0, timeout))
+                response.raise_for_status()
+            else:
+                self.client.chat.completions.create(
+                    model=self.model, messages=messages, max_tokens=1, extra_body={"cache_prompt": True}, timeout=timeout
+                )
+        except Exception as e:
+            logger.warning(f"🤖🔥⚠️ History prefill failed ({len(messages)} messages): {e}")
+            return False
+
+        logger.info(f"🤖🔥✅ Prefilled {len(messages)} messages into the KV cache in {(time.time() - start_time):.3f}s.")
+        tracer.complete("llm_prefill", "llm", start_time, session=self.session_id, messages=len(messages))
+        return True
+
     def generate(
         self,
         text: str,
         history: Optional[List[Dict[str, str]]] = None,
         use_system_prompt: bool = True,
         request_id: Optional[str] = None,
+        raise_on_cancel: bool = False,
+        assistant_prefix: Optional[str] = None,
         **kwargs: Any
     ) -> Generator[str, None, None]:
         """
@@ -611,6 +732,13 @@ class LLM:
             history: An optional list of previous messages (dicts with "role" and "content").
             use_system_prompt: If True, prepends the configured system prompt (if any).
             request_id: An optional unique ID for this generation request. If None, one is generated.
+            raise_on_cancel: If True, a stream ended by `cancel_generation` raises instead of
+                             ending quietly, so callers that need the complete text can tell
+                             it was truncated.
+            assistant_prefix: Start of the answer that was already produced. It is sent
+                              as a trailing assistant message for the model to continue
+                              (Ollama and llama.cpp based servers do); only the
+                              continuation is yielded.
             **kwargs: Additional backend-specific keyword arguments (e.g., temperature, top_p, stop sequences).
 
         Yields:
@@ -623,6 +751,7 @@ class LLM:
             APIError: For backend-specific API errors (OpenAI/LMStudio).
             RateLimitError: For backend-specific rate limit errors (OpenAI/LMStudio).
             requests.exceptions.RequestException: For Ollama HTTP request errors.
+            GenerationCancelledError: If `raise_on_cancel` is set and the request was cancelled.
             Exception: For other unexpected errors during the generation process.
         """
         # Lazy initialization now includes the 'ollama ps' logic if needed
@@ -648,10 +777,13 @@ class LLM:
                 added_text = f"{text}/nothink" # for qwen 3
             logger.info(f"🧠💬 llm_module.py generate adding role user to messages, content: {added_text}")
             messages.append({"role": "user", "content": added_text})
+        if assistant_prefix:
+            messages.append({"role": "assistant", "content": assistant_prefix})
         logger.debug(f"🤖💬 [{req_id}] Prepared messages count: {len(messages)}")
 
         stream_iterator = None
         stream_object_to_register = None # This is the object we need to close on cancel
+        generate_start_time = time.time()
 
         try:
             if self.backend == "openai":
@@ -660,12 +792,15 @@ class LLM:
                 payload = { "model": self.model, "messages": messages, "stream": True, **kwargs }
                 logger.info(f"🤖💬 [{req_id}] Sending OpenAI request with payload:")
                 logger.info(f"{json.dumps(payload, indent=2)}")
-                stream_iterator = self.client.chat.completions.create(
-                    model=self.model, messages=messages, stream=True, **kwargs
-                )
-                stream_object_to_register = stream_iterator # The Stream object itself
-                self._register_request(req_id, "openai", stream_object_to_register)
-                yield from self._yield_openai_chunks(stream_iterator, req_id)
+                if self.async_transport:
+                    yield from self._yield_async_chunks("openai", "/chat/completions", payload, "sse", req_id)
+                else:
+                    stream_iterator = self.client.chat.completions.create(
+                        model=self.model, messages=messages, stream=True, **kwargs
+                    )
+                    stream_object_to_register = stream_iterator # The Stream object itself
+                    self._register_request(req_id, "openai", stream_object_to_register)
+                    yield from self._yield_openai_chunks(stream_iterator, req_id)
 
             elif self.backend == "lmstudio":
                 if self.client is None:
@@ -675,12 +810,15 @@ class LLM:
                 payload = { "model": self.model, "messages": messages, "stream": True, **kwargs }
                 logger.info(f"🤖💬 [{req_id}] Sending LM Studio request with payload:")
                 logger.info(f"{json.dumps(payload, indent=2)}")
-                stream_iterator = self.client.chat.completions.create(
-                    model=self.model, messages=messages, stream=True, **kwargs
-                )
-                stream_object_to_register = stream_iterator # The Stream object itself
-                self._register_request(req_id, "lmstudio", stream_object_to_register)
-                yield from self._yield_openai_chunks(stream_iterator, req_id)
+                if self.async_transport:
+                    yield from self._yield_async_chunks("lmstudio", "/chat/completions", payload, "sse", req_id)
+                else:
+                    stream_iterator = self.client.chat.completions.create(
+                        model=self.model, messages=messages, stream=True, **kwargs
+                    )
+                    stream_object_to_register = stream_iterator # The Stream object itself
+                    self._register_request(req_id, "lmstudio", stream_object_to_register)
+                    yield from self._yield_openai_chunks(stream_iterator, req_id)
 
             elif self.backend == "ollama":
                 if self.ollama_session is None:
@@ -703,23 +841,37 @@ class LLM:
                 }
                 logger.info(f"🤖💬 [{req_id}] Sending Ollama request to {ollama_api_url} with payload:")
                 logger.info(f"{json.dumps(payload, indent=2)}")
-                # Increase read timeout significantly for generation
-                response = self.ollama_session.post(
-                    ollama_api_url, json=payload, stream=True, timeout=(10.0, 600.0) # (connect_timeout, read_timeout)
-                )
-                response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
-                stream_object_to_register = response # The requests.Response object
-                self._register_request(req_id, "ollama", stream_object_to_register)
-                yield from self._yield_ollama_chunks(response, req_id)
+                if self.async_transport:
+                    yield from self._yield_async_chunks("ollama", "/api/chat", payload, "ndjson", req_id)
+                else:
+                    # Increase read timeout significantly for generation
+                    response = self.ollama_session.post(
+                        ollama_api_url, json=payload, stream=True, timeout=(10.0, 600.0) # (connect_timeout, read_timeout)
+                    )
+                    response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
+                    stream_object_to_register = response # The requests.Response object
+                    self._register_request(req_id, "ollama", stream_object_to_register)
+                    yield from self._yield_ollama_chunks(response, req_id)
 
             else:
                 # This case should technically be caught by __init__
                 raise ValueError(f"Backend '{self.backend}' generation logic not implemented.")
 
+            if raise_on_cancel:
+                # Only cancel_generation removes a request before the finally block below
+                with self._requests_lock:
+                    cancelled = req_id not in self._active_requests
+                if cancelled:
+                    raise GenerationCancelledError(f"Generation {req_id} was cancelled before it finished.")
+
             logger.info(f"🤖✅ Finished generating stream successfully (request_id: {req_id})")
 
+        except GenerationCancelledError:
+            logger.info(f"🤖🗑️ [{req_id}] Generation cancelled, raising to caller.")
+            raise
+
         # Catch specific exceptions first
-        except (requests.exceptions.ConnectionError, ConnectionError, APITimeoutError, requests.exceptions.Timeout) as e:
+        except (requests.exceptions.ConnectionError, ConnectionError, TimeoutError, APITimeoutError, requests.exceptions.Timeout) as e:
              logger.error(f"🤖💥 Connection/Timeout Error during generation for {req_id}: {e}", exc_info=False)
              # Reraise as a standard ConnectionError for consistency
              raise ConnectionError(f"Communication error during generation: {e}") from e
@@ -743,6 +895,7 @@ class LLM:
                     # This can happen if cancellation occurred before finally
                     logger.debug(f"🤖🗑️ [{req_id}] Request already removed from tracking before finally block completion.")
             logger.debug(f"🤖ℹ️ [{req_id}] Exiting finally block. Active requests: {len(self._active_requests)}")
+            tracer.complete("llm_generate", "llm", generate_start_time, session=self.session_id, backend=self.backend, request_id=req_id, messages=len(messages))
 
 
     # --- Backend-Specific Chunk Yielding Helpers ---
@@ -960,6 +1113,40 @@ class LLM:
                  except Exception as close_err:
                      logger.warning(f"🤖⚠️ [{request_id}] Error closing Ollama response in finally: {close_err}", exc_info=False)
 
+    def _yield_async_chunks(self, request_type: str, path: str, payload: Dict[str, Any], protocol: str, request_id: str) -> Generator[str, None, None]:
+        """
+        Streams a request through the pooled asyncio transport, yielding content chunks.
+
+        The request is registered with a `StreamHandle` as its stream object, so
+        `cancel_generation` sets the handle's flag and aborts the connection. The
+        transport checks that flag once per received line without taking
+        `_requests_lock`.
+
+        Args:
+            request_type: The backend type used for request tracking (e.g. "ollama").
+            path: API path relative to the backend base URL (e.g. "/api/chat").
+            payload: The JSON request body.
+            protocol: "ndjson" for Ollama, "sse" for OpenAI-compatible backends.
+            request_id: The unique ID associated with this generation stream.
+
+        Yields:
+            str: Content chunks in arrival order.
+
+        Raises:
+            ConnectionError: If the request fails or the backend answers with a non-2xx status.
+            TimeoutError: If the backend stops sending data.
+            RuntimeError: If the backend reports an error inside the stream.
+        """
+        handle = StreamHandle()
+        self._register_request(request_id, request_type, handle)
+        token_count = 0
+        for content in self.async_transport.stream_chat(path, payload, protocol, handle):
+            token_count += 1
+            yield content
+        if handle.cancelled:
+            logger.info(f"🤖🗑️ {request_type} stream {request_id} cancelled during iteration.")
+        logger.debug(f"🤖✅ [{request_id}] Finished yielding {token_count} {request_type} tokens (async transport).")
+
     def measure_inference_time(
         self,
         num_tokens: int = 10,
@@ -0,0 +1,435 @@
+# llm_transport.py
+import asyncio
+import concurrent.futures
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# --- Optional fast JSON decoder ---
+try:
+    import orjson
+    json_loads = orjson.loads # Accepts bytes directly, no intermediate str
+    FAST_JSON_AVAILABLE = True
+except ImportError:
+    json_loads = json.loads
+    FAST_JSON_AVAILABLE = False
+
+# --- Optional HTTP/2 support (httpx needs the h2 package for it) ---
+try:
+    import h2 # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+CONNECT_TIMEOUT = 10.0 # Seconds to establish a TCP/TLS connection
+READ_TIMEOUT = 600.0 # Seconds to wait for the next piece of a streaming body
+MAX_IDLE_CONNECTIONS = 4 # Keep-alive connections kept per pool
+# "1" multiplexes all streams of a transport over one HTTP/2 connection (TLS backends only, needs h2)
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "0") == "1"
+
+_STREAM_END = object() # Sentinel passed from the pump task to the sync adapter
+
+
+class LineSplitter:
+    """
+    Incremental byte-level line splitter for NDJSON and SSE streams.
+
+    Network chunks are appended to a single bytearray and only the bytes that
+    arrived since the last call are searched for a newline, so a line that
+    spans many chunks costs linear time. Lines are kept as bytes until they are
+    complete, which also keeps multi-byte UTF-8 characters split across chunks
+    intact.
+    """
+    def __init__(self) -> None:
+        """Initializes an empty LineSplitter."""
+        self._buffer = bytearray()
+        self._scan_from = 0 # Bytes before this offset are known to contain no newline
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Appends a chunk and returns the lines it completed.
+
+        Args:
+            data: Raw bytes as received from the network.
+
+        Returns:
+            The completed lines without their line terminator (`\\n` or `\\r\\n`).
+        """
+        buffer = self._buffer
+        buffer += data
+        lines = []
+        start = 0
+        newline = buffer.find(b"\n", self._scan_from)
+        while newline != -1:
+            end = newline - 1 if newline > start and buffer[newline - 1] == 0x0D else newline
+            lines.append(bytes(buffer[start:end]))
+            start = newline + 1
+            newline = buffer.find(b"\n", start)
+        if start:
+            del buffer[:start]
+        self._scan_from = len(buffer)
+        return lines
+
+    def flush(self) -> Optional[bytes]:
+        """
+        Returns the unterminated rest of the stream (if any) and empties the buffer.
+
+        Returns:
+            The remaining bytes, or None if the buffer was empty.
+        """
+        if not self._buffer:
+            return None
+        rest = bytes(self._buffer).rstrip(b"\r")
+        self._buffer.clear()
+        self._scan_from = 0
+        return rest
+
+
+def parse_ollama_line(line: bytes) -> Tuple[Optional[str], bool]:
+    """
+    Decodes one line of an Ollama `/api/chat` NDJSON stream.
+
+    Args:
+        line: A complete line from the stream.
+
+    Returns:
+        A tuple (content, done). `content` is None for lines without text.
+
+    Raises:
+        RuntimeError: If Ollama reports an error in the stream.
+        ValueError: If the line is not valid JSON.
+    """
+    if not line.strip():
+        return None, False
+    chunk = json_loads(line)
+    if chunk.get("error"):
+        raise RuntimeError(f"Ollama stream error: {chunk['error']}")
+    message = chunk.get("message")
+    content = message.get("content") if message else None
+    return content or None, bool(chunk.get("done"))
+
+
+def parse_sse_line(line: bytes) -> Tuple[Optional[str], bool]:
+    """
+    Decodes one line of an OpenAI-compatible `/chat/completions` SSE stream.
+
+    Only `data:` fields are relevant; comments, event names and blank event
+    separators are ignored.
+
+    Args:
+        line: A complete line from the stream.
+
+    Returns:
+        A tuple (content, done). `done` is only set by the final `[DONE]` event.
+
+    Raises:
+        RuntimeError: If the server sends an error event.
+        ValueError: If a data field is not valid JSON.
+    """
+    if not line.startswith(b"data:"):
+        return None, False
+    data = line[5:].strip()
+    if data == b"[DONE]":
+        return None, True
+    if not data:
+        return None, False
+    chunk = json_loads(data)
+    if chunk.get("error"):
+        raise RuntimeError(f"Stream error: {chunk['error']}")
+    choices = chunk.get("choices")
+    if not choices:
+        return None, False
+    delta = choices[0].get("delta") or {}
+    return delta.get("content") or None, False
+
+
+LINE_PARSERS = {
+    "ndjson": parse_ollama_line,
+    "sse": parse_sse_line,
+}
+
+
+class StreamHandle:
+    """
+    Cancellation handle of one streaming request.
+
+    The consuming side checks the plain `cancelled` attribute once per line, no
+    lock involved. `close()` (e.g. from `LLM.cancel_generation`) sets the flag
+    and cancels the task that runs the request, so a read that is blocked right
+    now returns too and httpx closes the response.
+    """
+    def __init__(self) -> None:
+        """Initializes a StreamHandle that is not cancelled."""
+        self.cancelled = False
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def attach(self, task: asyncio.Task, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Binds the handle to the task it may have to cancel.
+
+        Args:
+            task: The task running the request.
+            loop: The event loop that runs the task.
+        """
+        self._task = task
+        self._loop = loop
+        if self.cancelled:
+            task.cancel()
+
+    def close(self) -> None:
+        """Cancels the stream. Safe to call from any thread and more than once."""
+        if self.cancelled:
+            return
+        self.cancelled = True
+        task, loop = self._task, self._loop
+        if task is None or loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(task.cancel)
+        except RuntimeError:
+            pass # Loop already closed, so is the request
+
+
+class AsyncLLMTransport:
+    """
+    Streams chat completions through a pooled `httpx.AsyncClient` on a private event loop.
+
+    The client keeps connections alive between requests, so consecutive turns
+    skip the TCP (and TLS) handshake. `astream_chat` is the asyncio interface
+    and runs on `self.loop`; the loop lives in a daemon thread so
+    `stream_chat`, the thin synchronous adapter, can hand tokens to the
+    existing generator based `LLM.generate` consumers (e.g. the LLM worker
+    thread).
+    """
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None, http2: bool = LLM_HTTP2) -> None:
+        """
+        Initializes the transport and starts its event loop thread.
+
+        Args:
+            base_url: Base URL of the backend API (e.g. "http://127.0.0.1:11434").
+            headers: Headers sent with every request (e.g. Authorization).
+            http2: Negotiate HTTP/2 where the server offers it. Falls back to
+                HTTP/1.1 if the h2 package is not installed.
+        """
+        if http2 and not H2_AVAILABLE:
+            logger.warning("🤖⚠️ LLM_HTTP2 requested but the 'h2' package is not installed, using HTTP/1.1.")
+            http2 = False
+        self.base_url = base_url
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"Content-Type": "application/json", **(headers or {})},
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_keepalive_connections=MAX_IDLE_CONNECTIONS),
+            http2=http2,
+        )
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="LLMTransportLoop", daemon=True)
+        self._thread.start()
+        logger.info("🤖🔌 Async LLM transport ready for %s (HTTP/2: %s, fast JSON: %s).", base_url, http2, FAST_JSON_AVAILABLE)
+
+    async def astream_chat(
+            self,
+            path: str,
+            payload: Dict[str, Any],
+            protocol: str,
+            handle: StreamHandle,
+        ) -> AsyncGenerator[str, None]:
+        """
+        Posts a streaming chat request and yields the content pieces.
+
+        Must run inside a task; `handle` cancels that task.
+
+        Args:
+            path: API path relative to the base URL (e.g. "/api/chat").
+            payload: JSON request body, must request streaming.
+            protocol: "ndjson" (Ollama) or "sse" (OpenAI compatible).
+            handle: Cancellation handle, checked once per received line.
+
+        Yields:
+            str: Content pieces in arrival order.
+
+        Raises:
+            ConnectionError: On network failures or non-2xx responses.
+            TimeoutError: If the backend stops sending data.
+            RuntimeError: If the backend reports an error inside the stream.
+        """
+        parse_line = LINE_PARSERS[protocol]
+        handle.attach(asyncio.current_task(), self.loop)
+        body = json.dumps(payload).encode("utf-8")
+        try:
+            async with self.client.stream("POST", path, content=body) as response:
+                if not response.is_success:
+                    detail = (await response.aread())[:300].decode("utf-8", "replace")
+                    raise ConnectionError(f"HTTP {response.status_code} {response.reason_phrase} from {self.base_url}{path}: {detail}")
+                splitter = LineSplitter()
+                done = False
+                chunks = response.aiter_bytes()
+                async for data in chunks:
+                    for line in splitter.feed(data):
+                        if handle.cancelled:
+                            return
+                        try:
+                            content, done = parse_line(line)
+                        except ValueError:
+                            logger.warning("🤖⚠️ Failed to decode stream line: %r", line[:100])
+                            continue
+                        if content:
+                            yield content
+                        if done:
+                            break
+                    if done or handle.cancelled:
+                        break
+                if done:
+                    # Read the end of the body (usually just the chunked terminator) so httpx can reuse the connection
+                    try:
+                        await asyncio.wait_for(self._drain(chunks), 1.0)
+                    except (asyncio.TimeoutError, httpx.HTTPError):
+                        pass
+                elif not handle.cancelled:
+                    rest = splitter.flush()
+                    if rest:
+                        content, done = parse_line(rest)
+                        if content:
+                            yield content
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"No data from {self.base_url}{path} within the timeout: {e!r}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"Request to {self.base_url}{path} failed: {e!r}") from e
+
+    @staticmethod
+    async def _drain(chunks: AsyncGenerator[bytes, None]) -> None:
+        """Reads a body iterator to its end."""
+        async for _ in chunks:
+            pass
+
+    async def _pump(self, path: str, payload: Dict[str, Any], protocol: str, handle: StreamHandle, tokens: queue.Queue) -> None:
+        """Forwards an async token stream into a thread queue, followed by _STREAM_END or an exception."""
+        agen = self.astream_chat(path, payload, protocol, handle)
+        try:
+            async for token in agen:
+                tokens.put(token)
+        except asyncio.CancelledError as e:
+            tokens.put(_STREAM_END if handle.cancelled else e) # A cancelled stream just ends
+            raise
+        except BaseException as e:
+            tokens.put(e)
+        else:
+            tokens.put(_STREAM_END)
+        finally:
+            await agen.aclose()
+
+    def stream_chat(
+            self,
+            path: str,
+            payload: Dict[str, Any],
+            protocol: str,
+            handle: StreamHandle,
+        ) -> Generator[str, None, None]:
+        """
+        Synchronous adapter around `astream_chat` for worker threads.
+
+        Closing the generator early cancels the request through `handle`.
+
+        Args:
+            path: API path relative to the base URL.
+            payload: JSON request body, must request streaming.
+            protocol: "ndjson" (Ollama) or "sse" (OpenAI compatible).
+            handle: Cancellation handle shared with the caller.
+
+        Yields:
+            str: Content pieces in arrival order.
+
+        Raises:
+            ConnectionError, TimeoutError, RuntimeError: As raised by `astream_chat`.
+        """
+        tokens: queue.Queue = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._pump(path, payload, protocol, handle, tokens), self.loop)
+        try:
+            while True:
+                item = tokens.get()
+                if item is _STREAM_END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            if not future.done():
+                handle.close()
+
+    def _run(self, coro, timeout: float, url: str) -> Any:
+        """Runs a coroutine on the transport loop and waits for its result, mapping httpx errors."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError as e:
+            future.cancel()
+            raise TimeoutError(f"No response from {url} within {timeout}s.") from e
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f"No response from {url}: {e!r}") from e
+        except httpx.TransportError as e:
+            raise ConnectionError(f"Request to {url} failed: {e!r}") from e
+
+    def post_json(self, path: str, payload: Dict[str, Any], timeout: float = 60.0) -> Tuple[int, bytes]:
+        """
+        Sends a non-streaming JSON POST through the pooled client and waits for the whole response.
+
+        Args:
+            path: API path relative to the base URL.
+            payload: JSON request body.
+            timeout: Overall timeout in seconds.
+
+        Returns:
+            A tuple (HTTP status, response body).
+
+        Raises:
+            ConnectionError: If the request fails.
+            TimeoutError: If the response does not arrive within `timeout`.
+        """
+        async def post() -> Tuple[int, bytes]:
+            response = await self.client.post(path, content=json.dumps(payload).encode("utf-8"), timeout=timeout)
+            return response.status_code, response.content
+
+        return self._run(post(), timeout, f"{self.base_url}{path}")
+
+    def check_connection(self, path: str = "/", timeout: float = 5.0) -> bool:
+        """
+        Sends a GET request through the pooled client and reports whether it succeeded.
+
+        Args:
+            path: Path to request, relative to the base URL.
+            timeout: Overall timeout in seconds.
+
+        Returns:
+            True for a 2xx response, False otherwise.
+        """
+        async def probe() -> int:
+            response = await self.client.get(path, timeout=timeout)
+            return response.status_code
+
+        try:
+            status = self._run(probe(), timeout, f"{self.base_url}{path}")
+        except Exception as e:
+            logger.warning("🤖🔌❌ Connection check to %s%s failed: %s", self.base_url, path, e)
+            return False
+        return 200 <= status < 300
+
+    def close(self) -> None:
+        """Closes the pooled client and stops the event loop thread."""
+        if self.loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self.client.aclose(), self.loop).result(2.0)
+        except Exception as e:
+            logger.debug("🤖🔌 Closing the LLM transport client failed: %s", e)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2.0)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -1,8 +1,17 @@
+import atexit
 import logging
+import os
 import time
-from colors import Colors # Assuming 'colors' library is installed (pip install ansicolors) or your custom Colors class
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from colors import render_markup
 from typing import Optional # Added for type hint consistency if needed elsewhere, though not strictly used in current args/returns
 
+# Hand log records to a background thread, so real-time threads never block on console output
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() not in ("0", "false", "no")
+# Render colour markup as ANSI codes (off: plain text, e.g. for log files)
+LOG_COLORS = os.getenv("LOG_COLORS", "true").lower() not in ("0", "false", "no")
+
 # --- Define Custom Formatter to handle time locally ---
 class CustomTimeFormatter(logging.Formatter):
     """
@@ -35,55 +44,86 @@ class CustomTimeFormatter(logging.Formatter):
         s = time.strftime("%M:%S", now) + f".{cs:02d}"
         return s
 
-def setup_logging(level: int = logging.INFO) -> None:
+class ConsoleFormatter(CustomTimeFormatter):
+    """
+    Console formatter that renders the colour markup of log messages.
+
+    Message templates name their colours with tags like `{green}` and `{reset}`
+    (see `colors.render_markup`). This formatter is the only place the tags
+    turn into ANSI codes, or are stripped when colours are disabled, so call
+    sites pass plain templates and lazy `%s` arguments and pay nothing for
+    colours when the level is disabled. Timestamp, logger name and level are
+    coloured the same way.
+    """
+    def __init__(self, use_colors: bool = True) -> None:
+        """
+        Initializes the ConsoleFormatter.
+
+        Args:
+            use_colors: Whether to emit ANSI colour codes.
+        """
+        log_format = "{blue}%(asctime)s{reset} {gray}%(name)-10.10s{reset} {green}{bold}%(levelname)-4.4s{reset} %(message)s"
+        super().__init__(render_markup(log_format, use_colors))
+        self.use_colors = use_colors
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Formats the record with its message template's colour tags rendered."""
+        template = record.msg
+        if isinstance(template, str):
+            record.msg = render_markup(template, self.use_colors)
+        try:
+            return super().format(record)
+        finally:
+            record.msg = template # Other handlers see the original template
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    A QueueHandler that passes records on unformatted.
+
+    The stock `QueueHandler.prepare` merges the message and its arguments in
+    the logging thread. Here that work happens in the `QueueListener` thread,
+    so the logging thread only creates the record and enqueues it. Arguments
+    are therefore rendered slightly later; log values, not objects that are
+    mutated right after the call.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging(level: int = logging.INFO, use_queue: bool = LOG_QUEUE, use_colors: bool = LOG_COLORS) -> None:
     """
     Configures the root logger for console output with a custom format and level.
 
-    Sets up a `StreamHandler` for the root logger if no handlers are already present.
-    Applies a `CustomTimeFormatter` to display timestamps as MM:SS.cs and uses
-    ANSI colors for different log message parts (timestamp, logger name, level, message).
+    Sets up a `StreamHandler` with a `ConsoleFormatter` (timestamps as MM:SS.cs,
+    colour markup rendered as ANSI colors) if the root logger has no handlers yet.
+    With `use_queue`, the root logger only gets a `DeferredQueueHandler` and a
+    `QueueListener` thread formats and writes the records, so logging threads
+    never wait for the console; the listener is flushed at interpreter exit.
     This setup avoids modifying global logging state like the record factory or
     the global Formatter converter.
 
     Args:
         level: The minimum logging level for the root logger and the console handler
                (e.g., `logging.DEBUG`, `logging.INFO`). Defaults to `logging.INFO`.
+        use_queue: Whether to log through a background thread (`LOG_QUEUE`, default on).
+        use_colors: Whether to emit ANSI colours (`LOG_COLORS`, default on).
     """
-    # Check if the root logger already has handlers to avoid adding them multiple times
     root_logger = logging.getLogger()
-    if not root_logger.hasHandlers():
-        # Set the level on the logger itself
-        root_logger.setLevel(level)
-
-        # --- Define Format String ---
-        # Note: We will use the standard '%(asctime)s' placeholder now,
-        # because our CustomTimeFormatter will format it correctly.
-        prefix = Colors.apply("🖥️").gray
-        # Use the standard %(asctime)s - our custom formatter will handle its appearance
-        timestamp = Colors.apply("%(asctime)s").blue
-        levelname = Colors.apply("%(levelname)-4.4s").green.bold
-        message = Colors.apply("%(message)s")
-        logger_name = Colors.apply("%(name)-10.10s").gray
-
-        log_format = f"{timestamp} {logger_name} {levelname} {message}"
-        # --- Format String Defined ---
-
-        # --- Configure logging using explicit Handler/Formatter ---
-        # Avoids basicConfig and global state modification
+    if root_logger.hasHandlers():
+        return # Already configured
+    root_logger.setLevel(level)
 
-        # 1. Create the custom formatter instance
-        # We pass the desired log format string. datefmt is not needed as formatTime is overridden.
-        formatter = CustomTimeFormatter(log_format)
+    handler = logging.StreamHandler()
+    handler.setFormatter(ConsoleFormatter(use_colors))
+    handler.setLevel(level)
 
-        # 2. Create a handler (e.g., StreamHandler to log to console)
-        handler = logging.StreamHandler()
-
-        # 3. Set the custom formatter on the handler
-        handler.setFormatter(formatter)
-
-        # 4. Set the level *on the handler* (optional but good practice,
-        #    basicConfig does this implicitly). Controls messages processed by this handler.
-        handler.setLevel(level)
-
-        # 5. Add the configured handler to the root logger
+    if not use_queue:
         root_logger.addHandler(handler)
+        return
+
+    log_queue = SimpleQueue()
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop) # Writes out what is still queued
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
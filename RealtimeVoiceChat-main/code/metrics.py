@@ -0,0 +1,277 @@
+import logging
+import math
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REAL_TIME_FACTOR_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 5.0)
+
+
+class _ThreadCells:
+    """
+    Per-thread value cells of one metric child.
+
+    Every thread writes only to its own cell (created on first use), so
+    recording needs no lock; readers sum all cells. Cells of finished threads
+    are kept, their values still belong to the totals.
+    """
+    __slots__ = ("size", "local", "cells", "lock")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.local = threading.local()
+        self.cells: List[List[float]] = []
+        self.lock = threading.Lock() # Only taken when a thread creates its cell and on collection
+
+    def cell(self) -> List[float]:
+        """Returns the calling thread's cell."""
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = [0.0] * self.size
+            with self.lock:
+                self.cells.append(cell)
+            self.local.cell = cell
+            return cell
+
+    def totals(self) -> List[float]:
+        """Returns the element-wise sum over all threads."""
+        with self.lock:
+            cells = list(self.cells)
+        return [sum(cell[i] for cell in cells) for i in range(self.size)]
+
+
+class CounterChild:
+    """A monotonically increasing value."""
+    __slots__ = ("cells", "function")
+
+    def __init__(self) -> None:
+        self.cells = _ThreadCells(1)
+        self.function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increments the counter by `amount`."""
+        self.cells.cell()[0] += amount
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Reads the value from `function` at collection time, for totals kept elsewhere."""
+        self.function = function
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        value = self.function() if self.function else self.cells.totals()[0]
+        return [f"{name}{labels} {_format_value(value)}"]
+
+
+class GaugeChild:
+    """A value that can go up and down."""
+    __slots__ = ("value", "function")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self.function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        """Sets the gauge (a plain attribute store, atomic under the GIL)."""
+        self.value = value
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        """Samples the value from `function` at collection time, e.g. a queue's `qsize`."""
+        self.function = function
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        value = self.value
+        if self.function:
+            try:
+                value = self.function()
+            except Exception as e:
+                logger.debug(f"📈⚠️ Sampling {name}{labels} failed: {e}")
+                return []
+        return [f"{name}{labels} {_format_value(value)}"]
+
+
+class HistogramChild:
+    """Counts observations into fixed buckets and keeps their sum."""
+    __slots__ = ("buckets", "cells")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.cells = _ThreadCells(len(self.buckets) + 2) # One count per bucket, +Inf, then the sum
+
+    def observe(self, value: float) -> None:
+        """Records one observation."""
+        cell = self.cells.cell()
+        cell[bisect_left(self.buckets, value)] += 1 # Buckets are inclusive upper bounds ("le")
+        cell[-1] += value
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        totals = self.cells.totals()
+        lines = []
+        cumulative = 0.0
+        for bound, count in zip(self.buckets + (math.inf,), totals):
+            cumulative += count
+            lines.append(f"{name}_bucket{_join_labels(labels, 'le', _format_value(bound))} {_format_value(cumulative)}")
+        lines.append(f"{name}_sum{labels} {_format_value(totals[-1])}")
+        lines.append(f"{name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class Metric:
+    """
+    A named metric with optional labels.
+
+    Without label names the metric records directly (`COUNTER.inc()`),
+    otherwise through the child returned by `labels()`
+    (`QUEUE_DEPTH.labels("1", "message_queue").set_function(...)`).
+    """
+    def __init__(self, kind: str, name: str, documentation: str, labelnames: Sequence[str], child_factory: Callable[[], object]) -> None:
+        """
+        Initializes the Metric.
+
+        Args:
+            kind: Exposition type ("counter", "gauge" or "histogram").
+            name: Metric name.
+            documentation: Help text.
+            labelnames: Names of the labels, empty for an unlabeled metric.
+            child_factory: Creates the value holder for one label combination.
+        """
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.child_factory = child_factory
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self.lock = threading.Lock()
+        if not self.labelnames:
+            self.default = self.labels()
+
+    def labels(self, *values: object):
+        """
+        Returns the child for a label combination, creating it on first use.
+
+        Args:
+            *values: One value per label name, in order.
+
+        Returns:
+            The CounterChild, GaugeChild or HistogramChild.
+        """
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self.lock:
+                child = self.children.setdefault(key, self.child_factory())
+        return child
+
+    def remove(self, *values: object) -> None:
+        """Drops a label combination, e.g. when its session disconnected."""
+        with self.lock:
+            self.children.pop(tuple(str(value) for value in values), None)
+
+    # Shortcuts for unlabeled metrics, forwarded to their only child
+    def inc(self, amount: float = 1.0) -> None:
+        self.default.inc(amount)
+
+    def set(self, value: float) -> None:
+        self.default.set(value)
+
+    def observe(self, value: float) -> None:
+        self.default.observe(value)
+
+    def set_function(self, function: Optional[Callable[[], float]]) -> None:
+        self.default.set_function(function)
+
+    def render(self) -> List[str]:
+        """Returns the metric in Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            children = list(self.children.items())
+        for key, child in children:
+            labels = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(self.labelnames, key))
+            lines.extend(child.samples(self.name, f"{{{labels}}}" if labels else ""))
+        return lines
+
+
+class MetricsRegistry:
+    """Holds all metrics of the process and renders them for `/metrics`."""
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+
+    def _register(self, kind: str, name: str, documentation: str, labelnames: Sequence[str], child_factory: Callable[[], object]) -> Metric:
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = Metric(kind, name, documentation, labelnames, child_factory)
+            elif metric.kind != kind:
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Metric:
+        """Returns the counter `name`, registering it on first use."""
+        return self._register("counter", name, documentation, labelnames, CounterChild)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Metric:
+        """Returns the gauge `name`, registering it on first use."""
+        return self._register("gauge", name, documentation, labelnames, GaugeChild)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Metric:
+        """Returns the histogram `name`, registering it on first use."""
+        buckets = tuple(sorted(buckets))
+        return self._register("histogram", name, documentation, labelnames, lambda: HistogramChild(buckets))
+
+    def render(self) -> str:
+        """
+        Renders every metric.
+
+        Returns:
+            The Prometheus text exposition format (version 0.0.4).
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _join_labels(labels: str, name: str, value: str) -> str:
+    extra = f'{name}="{value}"'
+    return f"{labels[:-1]},{extra}}}" if labels else f"{{{extra}}}"
+
+
+REGISTRY = MetricsRegistry()
+
+AUDIO_CHUNKS_RECEIVED = REGISTRY.counter("rtvc_audio_chunks_received_total", "Audio packets received from clients.")
+AUDIO_CHUNKS_DROPPED = REGISTRY.counter("rtvc_audio_chunks_dropped_total", "Audio packets dropped because the incoming audio backlog reached MAX_AUDIO_QUEUE_BYTES.")
+AUDIO_BYTES_COALESCED = REGISTRY.counter("rtvc_audio_bytes_coalesced_total", "Inbound PCM bytes merged into an earlier waiting chunk because processing lagged behind.")
+AUDIO_BYTES_DROPPED = REGISTRY.counter("rtvc_audio_bytes_dropped_total", "Inbound PCM bytes dropped because the incoming audio backlog reached MAX_AUDIO_QUEUE_BYTES.")
+INCOMING_AUDIO_BYTES = REGISTRY.gauge("rtvc_incoming_audio_bytes", "PCM bytes waiting in a session's inbound audio queue.", ("session",))
+QUEUE_DEPTH = REGISTRY.gauge("rtvc_queue_depth", "Items waiting in a per-session queue.", ("session", "queue"))
+LLM_TTFT = REGISTRY.histogram("rtvc_llm_ttft_seconds", "Time from the LLM worker picking up a generation to its first token.")
+TTS_TTFA = REGISTRY.histogram("rtvc_tts_ttfa_seconds", "Time from the start of a synthesis to its first audio chunk.", ("phase",))
+TTS_REAL_TIME_FACTOR = REGISTRY.histogram("rtvc_tts_real_time_factor", "Synthesis time divided by the duration of the synthesized audio (quick answers and pipelined final sentences).", ("phase",), buckets=REAL_TIME_FACTOR_BUCKETS)
+GENERATION_ABORTS = REGISTRY.counter("rtvc_generation_aborts_total", "Running generations that were aborted.")
+ABORT_WAIT = REGISTRY.histogram("rtvc_abort_wait_seconds", "Time callers were blocked until an abort of the running generation completed.")
+TURN_DETECTION_INFERENCE = REGISTRY.histogram("rtvc_turn_detection_inference_seconds", "Duration of one batched turn detection model forward pass.")
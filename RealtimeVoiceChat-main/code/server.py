@@ -7,8 +7,6 @@ logger = logging.getLogger(__name__)
 if __name__ == "__main__":
     logger.info("🖥️👋 Welcome to local real-time voice chat")
 
-from upsample_overlap import UpsampleOverlap
-from datetime import datetime
 from colors import Colors
 import uvicorn
 import asyncio
@@ -19,13 +17,13 @@ import threading # Keep threading for SpeechPipelineManager internals and AbortW
 import sys
 import os # Added for environment variable access
 
-from typing import Any, Dict, Optional, Callable # Added for type hints in docstrings
+from typing import Any, Dict, List, Optional, Callable # Added for type hints in docstrings
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import HTMLResponse, Response, FileResponse
+from starlette.responses import HTMLResponse, Response, FileResponse, JSONResponse
 
 USE_SSL = False
 TTS_START_ENGINE = "orpheus"
@@ -43,18 +41,47 @@ NO_THINK = False
 DIRECT_STREAM = TTS_START_ENGINE=="orpheus"
 
 if __name__ == "__main__":
-    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Starting engine: {Colors.apply(TTS_START_ENGINE).blue}")
-    logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Direct streaming: {Colors.apply('ON' if DIRECT_STREAM else 'OFF').blue}")
+    logger.info("🖥️⚙️ {blue}[PARAM]{reset} Starting engine: {blue}%s{reset}", TTS_START_ENGINE)
+    logger.info("🖥️⚙️ {blue}[PARAM]{reset} Direct streaming: {blue}%s{reset}", 'ON' if DIRECT_STREAM else 'OFF')
 
-# Define the maximum allowed size for the incoming audio queue
+# Inbound audio backlog (bytes of 48 kHz PCM16) from which packets are coalesced, and the hard cap beyond which they are dropped
 try:
-    MAX_AUDIO_QUEUE_SIZE = int(os.getenv("MAX_AUDIO_QUEUE_SIZE", 50))
+    AUDIO_QUEUE_COALESCE_BYTES = int(os.getenv("AUDIO_QUEUE_COALESCE_BYTES", 16384))
     if __name__ == "__main__":
-        logger.info(f"🖥️⚙️ {Colors.apply('[PARAM]').blue} Audio queue size limit set to: {Colors.apply(str(MAX_AUDIO_QUEUE_SIZE)).blue}")
+        logger.info("🖥️⚙️ {blue}[PARAM]{reset} Audio queue coalescing starts at: {blue}%s{reset} bytes", AUDIO_QUEUE_COALESCE_BYTES)
 except ValueError:
     if __name__ == "__main__":
-        logger.warning("🖥️⚠️ Invalid MAX_AUDIO_QUEUE_SIZE env var. Using default: 50")
-    MAX_AUDIO_QUEUE_SIZE = 50
+        logger.warning("🖥️⚠️ Invalid AUDIO_QUEUE_COALESCE_BYTES env var. Using default: 16384")
+    AUDIO_QUEUE_COALESCE_BYTES = 16384
+
+try:
+    MAX_AUDIO_QUEUE_BYTES = int(os.getenv("MAX_AUDIO_QUEUE_BYTES", 960000))
+    if __name__ == "__main__":
+        logger.info("🖥️⚙️ {blue}[PARAM]{reset} Audio queue size limit set to: {blue}%s{reset} bytes", MAX_AUDIO_QUEUE_BYTES)
+except ValueError:
+    if __name__ == "__main__":
+        logger.warning("🖥️⚠️ Invalid MAX_AUDIO_QUEUE_BYTES env var. Using default: 960000")
+    MAX_AUDIO_QUEUE_BYTES = 960000
+
+# Number of concurrent voice sessions (pipeline instances) this server hosts
+try:
+    MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 1))
+    if __name__ == "__main__":
+        logger.info("🖥️⚙️ {blue}[PARAM]{reset} Concurrent session limit set to: {blue}%s{reset}", MAX_SESSIONS)
+except ValueError:
+    if __name__ == "__main__":
+        logger.warning("🖥️⚠️ Invalid MAX_SESSIONS env var. Using default: 1")
+    MAX_SESSIONS = 1
+
+# Seconds a client waits for a free session before the connection is rejected
+try:
+    SESSION_QUEUE_TIMEOUT = float(os.getenv("SESSION_QUEUE_TIMEOUT", 10.0))
+    if __name__ == "__main__":
+        logger.info("🖥️⚙️ {blue}[PARAM]{reset} Session queue timeout set to: {blue}%s{reset}s", SESSION_QUEUE_TIMEOUT)
+except ValueError:
+    if __name__ == "__main__":
+        logger.warning("🖥️⚠️ Invalid SESSION_QUEUE_TIMEOUT env var. Using default: 10.0")
+    SESSION_QUEUE_TIMEOUT = 10.0
 
 
 if sys.platform == "win32":
@@ -64,11 +91,20 @@ if sys.platform == "win32":
 #from audio_out import AudioOutProcessor
 from audio_in import AudioInputProcessor
 from speech_pipeline_manager import SpeechPipelineManager
+from session_pool import SessionPool, VoiceSession
+from async_channel import CoalescingAudioQueue, ThreadSafeAsyncEvent
+from audio_packet import AudioPacket, PACKET_HEADER
+from turn_trace import tracer, unwrap_client_ms
+from metrics import REGISTRY, AUDIO_CHUNKS_RECEIVED, AUDIO_CHUNKS_DROPPED, AUDIO_BYTES_COALESCED, AUDIO_BYTES_DROPPED, INCOMING_AUDIO_BYTES, QUEUE_DEPTH
 from colors import Colors
 
 LANGUAGE = "en"
+# Binary TTS frames (opt-in via `/ws?tts=binary`): header followed by raw little-endian PCM16 samples
+TTS_FRAME_HEADER = struct.Struct("!III") # generation id, sequence number, sample rate (big-endian uint32)
+TTS_OUTPUT_SAMPLE_RATE = 48000
 # TTS_FINAL_TIMEOUT = 0.5 # unsure if 1.0 is needed for stability
 TTS_FINAL_TIMEOUT = 1.0 # unsure if 1.0 is needed for stability
+TTS_SENDER_IDLE_TIMEOUT = 1.0 # Safety net: max seconds the TTS sender sleeps without a wakeup from the pipeline
 
 # --------------------------------------------------------------------
 # Custom no-cache StaticFiles
@@ -108,34 +144,49 @@ async def lifespan(app: FastAPI):
     """
     Manages the application's lifespan, initializing and shutting down resources.
 
-    Initializes global components like SpeechPipelineManager, Upsampler, and
-    AudioInputProcessor and stores them in `app.state`. Handles cleanup on shutdown.
+    Creates the `SessionPool` with `MAX_SESSIONS` pipeline instances and stores it
+    in `app.state`. The first session loads the TTS engine and measures the
+    pipeline latency, all further sessions share that TTS engine. Handles cleanup
+    on shutdown.
 
     Args:
         app: The FastAPI application instance.
     """
     logger.info("🖥️▶️ Server starting up")
-    # Initialize global components, not connection-specific state
-    app.state.SpeechPipelineManager = SpeechPipelineManager(
-        tts_engine=TTS_START_ENGINE,
-        llm_provider=LLM_START_PROVIDER,
-        llm_model=LLM_START_MODEL,
-        no_think=NO_THINK,
-        orpheus_model=TTS_ORPHEUS_MODEL,
-    )
-
-    app.state.Upsampler = UpsampleOverlap()
-    app.state.AudioInputProcessor = AudioInputProcessor(
-        LANGUAGE,
-        is_orpheus=TTS_START_ENGINE=="orpheus",
-        pipeline_latency=app.state.SpeechPipelineManager.full_output_pipeline_latency / 1000, # seconds
-    )
-    app.state.Aborting = False # Keep this? Its usage isn't clear in the provided snippet. Minimizing changes.
+    shared_audio = None
+    shared_llm_inference_time = None
+
+    def create_session(session_id: int) -> VoiceSession:
+        nonlocal shared_audio, shared_llm_inference_time
+        pipeline_manager = SpeechPipelineManager(
+            tts_engine=TTS_START_ENGINE,
+            llm_provider=LLM_START_PROVIDER,
+            llm_model=LLM_START_MODEL,
+            no_think=NO_THINK,
+            orpheus_model=TTS_ORPHEUS_MODEL,
+            audio_processor=shared_audio,
+            llm_inference_time=shared_llm_inference_time,
+            session_id=session_id,
+        )
+        shared_audio = pipeline_manager.audio
+        shared_llm_inference_time = pipeline_manager.llm_inference_time
+
+        audio_input_processor = AudioInputProcessor(
+            LANGUAGE,
+            is_orpheus=TTS_START_ENGINE=="orpheus",
+            pipeline_latency=pipeline_manager.full_output_pipeline_latency / 1000, # seconds
+            session_id=session_id,
+        )
+        return VoiceSession(session_id, pipeline_manager, audio_input_processor)
+
+    app.state.SessionPool = SessionPool(MAX_SESSIONS, create_session)
+    app.state.SessionPool.start()
+    register_pool_metrics(app.state.SessionPool)
 
     yield
 
     logger.info("🖥️⏹️ Server shutting down")
-    app.state.AudioInputProcessor.shutdown()
+    app.state.SessionPool.shutdown()
 
 # --------------------------------------------------------------------
 # FastAPI app instance
@@ -178,9 +229,73 @@ async def get_index() -> HTMLResponse:
         html_content = f.read()
     return HTMLResponse(content=html_content)
 
+@app.get("/trace")
+async def get_trace(turn: Optional[int] = None, list_turns: bool = False) -> JSONResponse:
+    """
+    Exports the timeline of a voice turn as Chrome trace-event JSON.
+
+    The result can be opened in https://ui.perfetto.dev or chrome://tracing.
+    Requires `TURN_TRACE=1`.
+
+    Args:
+        turn: The turn id to export, defaults to the latest turn.
+        list_turns: If True, returns the recorded turns instead of a timeline.
+
+    Returns:
+        A JSONResponse with the trace document, the turn list, or a 404 error.
+    """
+    if not tracer.enabled:
+        return JSONResponse({"error": "Turn tracing is disabled, start the server with TURN_TRACE=1."}, status_code=404)
+    if list_turns:
+        return JSONResponse({"turns": tracer.list_turns()})
+    trace = tracer.export(turn)
+    if trace is None:
+        return JSONResponse({"error": f"No recorded turn {turn if turn is not None else 'yet'}."}, status_code=404)
+    return JSONResponse(trace, headers={"Content-Disposition": f"inline; filename=turn_{trace['otherData']['turn']}.json"})
+
+@app.get("/metrics")
+async def get_metrics() -> Response:
+    """
+    Serves all metrics in the Prometheus text exposition format.
+
+    Returns:
+        A plain text Response for Prometheus scrapers.
+    """
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # --------------------------------------------------------------------
 # Utility functions
 # --------------------------------------------------------------------
+def register_pool_metrics(pool: SessionPool) -> None:
+    """
+    Registers metrics that are sampled from the session pool and shared caches at scrape time.
+
+    Args:
+        pool: The started SessionPool.
+    """
+    REGISTRY.gauge("rtvc_sessions_idle", "Sessions available for new clients.").set_function(lambda: pool.idle_count)
+    REGISTRY.gauge("rtvc_sessions_waiting", "Clients queued for a free session.").set_function(lambda: pool.waiting_count)
+
+    silence_wakeups = REGISTRY.counter("rtvc_silence_monitor_wakeups_total", "Wakeups of the transcriber's silence monitor.", ("session",))
+    for session in pool.sessions:
+        transcriber = session.audio_input_processor.transcriber
+        silence_wakeups.labels(session.session_id).set_function(lambda transcriber=transcriber: transcriber.silence_monitor_wakeups)
+
+    if not pool.sessions:
+        return
+    first_session = pool.sessions[0]
+    turn_detection = first_session.audio_input_processor.transcriber.turn_detection
+    if turn_detection: # The probability cache is shared by all sessions
+        cache_events = REGISTRY.counter("rtvc_turn_detection_cache_total", "Turn detection probability cache lookups.", ("result",))
+        cache_events.labels("hit").set_function(lambda: turn_detection.get_cache_stats()["hits"])
+        cache_events.labels("miss").set_function(lambda: turn_detection.get_cache_stats()["misses"])
+    tts_cache = first_session.pipeline_manager.audio.tts_cache
+    if tts_cache: # The TTS engine (and its cache) is shared by all sessions
+        tts_cache_events = REGISTRY.counter("rtvc_tts_cache_total", "TTS phrase cache lookups.", ("result",))
+        tts_cache_events.labels("memory_hit").set_function(lambda: tts_cache.stats()["memory_hits"])
+        tts_cache_events.labels("disk_hit").set_function(lambda: tts_cache.stats()["disk_hits"])
+        tts_cache_events.labels("miss").set_function(lambda: tts_cache.stats()["misses"])
+
 def parse_json_message(text: str) -> dict:
     """
     Safely parses a JSON string into a dictionary.
@@ -199,50 +314,25 @@ def parse_json_message(text: str) -> dict:
         logger.warning("🖥️⚠️ Ignoring client message with invalid JSON")
         return {}
 
-def format_timestamp_ns(timestamp_ns: int) -> str:
-    """
-    Formats a nanosecond timestamp into a human-readable HH:MM:SS.fff string.
-
-    Args:
-        timestamp_ns: The timestamp in nanoseconds since the epoch.
-
-    Returns:
-        A string formatted as hours:minutes:seconds.milliseconds.
-    """
-    # Split into whole seconds and the nanosecond remainder
-    seconds = timestamp_ns // 1_000_000_000
-    remainder_ns = timestamp_ns % 1_000_000_000
-
-    # Convert seconds part into a datetime object (local time)
-    dt = datetime.fromtimestamp(seconds)
-
-    # Format the main time as HH:MM:SS
-    time_str = dt.strftime("%H:%M:%S")
-
-    # For instance, if you want milliseconds, divide the remainder by 1e6 and format as 3-digit
-    milliseconds = remainder_ns // 1_000_000
-    formatted_timestamp = f"{time_str}.{milliseconds:03d}"
-
-    return formatted_timestamp
 
 # --------------------------------------------------------------------
 # WebSocket data processing
 # --------------------------------------------------------------------
 
-async def process_incoming_data(ws: WebSocket, app: FastAPI, incoming_chunks: asyncio.Queue, callbacks: 'TranscriptionCallbacks') -> None:
+async def process_incoming_data(ws: WebSocket, session: VoiceSession, incoming_chunks: CoalescingAudioQueue, callbacks: 'TranscriptionCallbacks') -> None:
     """
     Receives messages via WebSocket, processes audio and text messages.
 
-    Handles binary audio chunks, extracting metadata (timestamp, flags) and
-    putting the audio PCM data with metadata into the `incoming_chunks` queue.
-    Applies back-pressure if the queue is full.
+    Handles binary audio chunks, parsing them into `AudioPacket` records
+    (timestamp, flags, PCM view) and putting those into the `incoming_chunks` queue.
+    When the consumer lags, the queue coalesces chunks; beyond its byte cap they are dropped.
     Parses text messages (assumed JSON) and triggers actions based on message type
     (e.g., updates client TTS state via `callbacks`, clears history, sets speed).
 
     Args:
         ws: The WebSocket connection instance.
-        app: The FastAPI application instance (for accessing global state if needed).
-        incoming_chunks: An asyncio queue to put processed audio metadata dictionaries into.
+        session: The VoiceSession leased to this connection.
+        incoming_chunks: The session's inbound audio queue to put the AudioPackets into.
         callbacks: The TranscriptionCallbacks instance for this connection to manage state.
     """
     try:
@@ -252,46 +342,41 @@ async def process_incoming_data(ws: WebSocket, app: FastAPI, incoming_chunks: as
                 raw = msg["bytes"]
 
                 # Ensure we have at least an 8‑byte header: 4 bytes timestamp_ms + 4 bytes flags
-                if len(raw) < 8:
+                if len(raw) < PACKET_HEADER.size:
                     logger.warning("🖥️⚠️ Received packet too short for 8‑byte header.")
                     continue
 
-                # Unpack big‑endian uint32 timestamp (ms) and uint32 flags
-                timestamp_ms, flags = struct.unpack("!II", raw[:8])
-                client_sent_ns = timestamp_ms * 1_000_000
-
-                # Build metadata using fixed fields
-                metadata = {
-                    "client_sent_ms":           timestamp_ms,
-                    "client_sent":              client_sent_ns,
-                    "client_sent_formatted":    format_timestamp_ns(client_sent_ns),
-                    "isTTSPlaying":             bool(flags & 1),
-                }
-
-                # Record server receive time
+                # Header fields and a view of the PCM payload; readable timestamps are only formatted if logged
                 server_ns = time.time_ns()
-                metadata["server_received"] = server_ns
-                metadata["server_received_formatted"] = format_timestamp_ns(server_ns)
-
-                # The rest of the payload is raw PCM bytes
-                metadata["pcm"] = raw[8:]
-
-                # Check queue size before putting data
-                current_qsize = incoming_chunks.qsize()
-                if current_qsize < MAX_AUDIO_QUEUE_SIZE:
-                    # Now put only the metadata dict (containing PCM audio) into the processing queue.
-                    await incoming_chunks.put(metadata)
-                else:
-                    # Queue is full, drop the chunk and log a warning
+                packet = AudioPacket.from_message(raw, server_ns)
+                logger.debug("🖥️📦 %s", packet)
+
+                if tracer.enabled:
+                    client_sent = unwrap_client_ms(packet.client_sent_ms, server_ns) / 1000
+                    server_received = server_ns / 1_000_000_000
+                    if client_sent <= server_received:
+                        tracer.complete("audio_packet", "net", client_sent, server_received, session=session.session_id, bytes=len(packet.pcm))
+                    else: # Client clock ahead of ours, keep the raw values
+                        tracer.instant("audio_packet", "net", server_received, session=session.session_id, client_sent=client_sent, bytes=len(packet.pcm))
+
+                # Queue the packet; a lagging consumer gets it merged into the previous one
+                AUDIO_CHUNKS_RECEIVED.inc()
+                result = incoming_chunks.put_nowait(packet)
+                if result == CoalescingAudioQueue.COALESCED:
+                    AUDIO_BYTES_COALESCED.inc(len(packet.pcm))
+                elif result == CoalescingAudioQueue.DROPPED:
+                    # Backlog reached the hard cap, drop the chunk and log a warning
+                    AUDIO_CHUNKS_DROPPED.inc()
+                    AUDIO_BYTES_DROPPED.inc(len(packet.pcm))
                     logger.warning(
-                        f"🖥️⚠️ Audio queue full ({current_qsize}/{MAX_AUDIO_QUEUE_SIZE}); dropping chunk. Possible lag."
+                        "🖥️⚠️ Audio queue full (%s/%s bytes); dropping chunk. Possible lag.", incoming_chunks.bytes, MAX_AUDIO_QUEUE_BYTES
                     )
 
             elif "text" in msg and msg["text"]:
                 # Text-based message: parse JSON
                 data = parse_json_message(msg["text"])
                 msg_type = data.get("type")
-                logger.info(Colors.apply(f"🖥️📥 ←←Client: {data}").orange)
+                logger.info("{orange}🖥️📥 ←←Client: %s", data)
 
 
                 if msg_type == "tts_start":
@@ -305,54 +390,73 @@ async def process_incoming_data(ws: WebSocket, app: FastAPI, incoming_chunks: as
                 # Add to the handleJSONMessage function in server.py
                 elif msg_type == "clear_history":
                     logger.info("🖥️ℹ️ Received clear_history from client.")
-                    app.state.SpeechPipelineManager.reset()
+                    session.pipeline_manager.reset()
                 elif msg_type == "set_speed":
                     speed_value = data.get("speed", 0)
                     speed_factor = speed_value / 100.0  # Convert 0-100 to 0.0-1.0
-                    turn_detection = app.state.AudioInputProcessor.transcriber.turn_detection
+                    turn_detection = session.audio_input_processor.transcriber.turn_detection
                     if turn_detection:
                         turn_detection.update_settings(speed_factor)
-                        logger.info(f"🖥️⚙️ Updated turn detection settings to factor: {speed_factor:.2f}")
+                        logger.info("🖥️⚙️ Updated turn detection settings to factor: %.2f", speed_factor)
 
 
     except asyncio.CancelledError:
         pass # Task cancellation is expected on disconnect
     except WebSocketDisconnect as e:
-        logger.warning(f"🖥️⚠️ {Colors.apply('WARNING').red} disconnect in process_incoming_data: {repr(e)}")
+        logger.warning("🖥️⚠️ {red}WARNING{reset} disconnect in process_incoming_data: %r", e)
     except RuntimeError as e:  # Often raised on closed transports
-        logger.error(f"🖥️💥 {Colors.apply('RUNTIME_ERROR').red} in process_incoming_data: {repr(e)}")
+        logger.error("🖥️💥 {red}RUNTIME_ERROR{reset} in process_incoming_data: %r", e)
     except Exception as e:
-        logger.exception(f"🖥️💥 {Colors.apply('EXCEPTION').red} in process_incoming_data: {repr(e)}")
+        logger.exception("🖥️💥 {red}EXCEPTION{reset} in process_incoming_data: %r", e)
+
+def build_tts_frame(generation_id: int, sequence: int, pcm: bytes) -> bytes:
+    """
+    Builds a binary TTS audio frame for clients that opted into binary TTS.
+
+    Args:
+        generation_id: The id of the generation the audio belongs to.
+        sequence: The frame's sequence number within the generation (starting at 0).
+        pcm: The 48kHz PCM16 audio payload.
+
+    Returns:
+        The `TTS_FRAME_HEADER` followed by the PCM payload.
+    """
+    return TTS_FRAME_HEADER.pack(generation_id, sequence, TTS_OUTPUT_SAMPLE_RATE) + pcm
 
 async def send_text_messages(ws: WebSocket, message_queue: asyncio.Queue) -> None:
     """
-    Continuously sends text messages from a queue to the client via WebSocket.
+    Continuously sends messages from a queue to the client via WebSocket.
 
-    Waits for messages on the `message_queue`, formats them as JSON, and sends
-    them to the connected WebSocket client. Logs non-TTS messages.
+    Waits for messages on the `message_queue`. Dictionaries are sent as JSON
+    (non-TTS messages are logged), bytes are sent as binary frames. Using a
+    single queue keeps binary TTS frames ordered relative to control messages.
 
     Args:
         ws: The WebSocket connection instance.
-        message_queue: An asyncio queue yielding dictionaries to be sent as JSON.
+        message_queue: An asyncio queue yielding dictionaries to be sent as JSON
+                       or bytes to be sent as binary frames.
     """
     try:
         while True:
             await asyncio.sleep(0.001) # Yield control
             data = await message_queue.get()
+            if isinstance(data, bytes):
+                await ws.send_bytes(data)
+                continue
             msg_type = data.get("type")
             if msg_type != "tts_chunk":
-                logger.info(Colors.apply(f"🖥️📤 →→Client: {data}").orange)
+                logger.info("{orange}🖥️📤 →→Client: %s", data)
             await ws.send_json(data)
     except asyncio.CancelledError:
         pass # Task cancellation is expected on disconnect
     except WebSocketDisconnect as e:
-        logger.warning(f"🖥️⚠️ {Colors.apply('WARNING').red} disconnect in send_text_messages: {repr(e)}")
+        logger.warning("🖥️⚠️ {red}WARNING{reset} disconnect in send_text_messages: %r", e)
     except RuntimeError as e:  # Often raised on closed transports
-        logger.error(f"🖥️💥 {Colors.apply('RUNTIME_ERROR').red} in send_text_messages: {repr(e)}")
+        logger.error("🖥️💥 {red}RUNTIME_ERROR{reset} in send_text_messages: %r", e)
     except Exception as e:
-        logger.exception(f"🖥️💥 {Colors.apply('EXCEPTION').red} in send_text_messages: {repr(e)}")
+        logger.exception("🖥️💥 {red}EXCEPTION{reset} in send_text_messages: %r", e)
 
-async def _reset_interrupt_flag_async(app: FastAPI, callbacks: 'TranscriptionCallbacks'):
+async def _reset_interrupt_flag_async(session: VoiceSession, callbacks: 'TranscriptionCallbacks'):
     """
     Resets the microphone interruption flag after a delay (async version).
 
@@ -361,19 +465,19 @@ async def _reset_interrupt_flag_async(app: FastAPI, callbacks: 'TranscriptionCal
     connection-specific callbacks instance.
 
     Args:
-        app: The FastAPI application instance (to access AudioInputProcessor).
+        session: The VoiceSession leased to this connection (to access its AudioInputProcessor).
         callbacks: The TranscriptionCallbacks instance for the connection.
     """
     await asyncio.sleep(1)
     # Check the AudioInputProcessor's own interrupted state
-    if app.state.AudioInputProcessor.interrupted:
-        logger.info(f"{Colors.apply('🖥️🎙️ ▶️ Microphone continued (async reset)').cyan}")
-        app.state.AudioInputProcessor.interrupted = False
+    if session.audio_input_processor.interrupted:
+        logger.info("{cyan}🖥️🎙️ ▶️ Microphone continued (async reset)")
+        session.audio_input_processor.interrupted = False
         # Reset connection-specific interruption time via callbacks
         callbacks.interruption_time = 0
-        logger.info(Colors.apply("🖥️🎙️ interruption flag reset after TTS chunk (async)").cyan)
+        logger.info("{cyan}🖥️🎙️ interruption flag reset after TTS chunk (async)")
 
-async def send_tts_chunks(app: FastAPI, message_queue: asyncio.Queue, callbacks: 'TranscriptionCallbacks') -> None:
+async def send_tts_chunks(session: VoiceSession, message_queue: asyncio.Queue, callbacks: 'TranscriptionCallbacks') -> None:
     """
     Continuously sends TTS audio chunks from the SpeechPipelineManager to the client.
 
@@ -382,8 +486,12 @@ async def send_tts_chunks(app: FastAPI, message_queue: asyncio.Queue, callbacks:
     queue, upsamples/encodes them, and puts them onto the outgoing `message_queue`
     for the client. Handles the end-of-generation logic and state resets.
 
+    Instead of polling, the sender sleeps on `callbacks.tts_wakeup`, which the
+    pipeline's worker threads set whenever a chunk is queued or the generation's
+    audio state changes. While chunks are pending it drains them back to back.
+
     Args:
-        app: The FastAPI application instance (to access global components).
+        session: The VoiceSession leased to this connection.
         message_queue: An asyncio queue to put outgoing TTS chunk messages onto.
         callbacks: The TranscriptionCallbacks instance managing this connection's state.
     """
@@ -392,123 +500,156 @@ async def send_tts_chunks(app: FastAPI, message_queue: asyncio.Queue, callbacks:
         last_quick_answer_chunk = 0
         last_chunk_sent = 0
         prev_status = None
+        upsampled_gen_id = None # Generation whose audio the upsampler state belongs to
+        tts_sequence = 0 # Frame sequence number within the current generation
+        wakeup = callbacks.tts_wakeup
+        session.pipeline_manager.on_audio_activity = wakeup.set
+
+        def log_status():
+            nonlocal prev_status
+            pipeline_manager = session.pipeline_manager
+            is_tts_finished = pipeline_manager.is_valid_gen() and pipeline_manager.running_generation.audio_quick_finished
+            curr_status = (
+                # Access connection-specific state via callbacks
+                int(callbacks.tts_to_client),
+                int(callbacks.tts_client_playing),
+                int(callbacks.tts_chunk_sent),
+                1, # Placeholder?
+                int(callbacks.is_hot), # from callbacks
+                int(callbacks.synthesis_started), # from callbacks
+                int(pipeline_manager.running_generation is not None), # Global manager state
+                int(pipeline_manager.is_valid_gen()), # Global manager state
+                int(is_tts_finished), # Calculated local variable
+                int(session.audio_input_processor.interrupted) # Input processor state
+            )
+
+            if curr_status != prev_status:
+                logger.info(
+                    "{red}🖥️🚦 State {reset} ToClient %s, "
+                    "ttsClientON %s, " # Renamed slightly for clarity
+                    "ChunkSent %s, "
+                    "hot %s, synth %s"
+                    " gen %s"
+                    " valid %s"
+                    " tts_q_fin %s"
+                    " mic_inter %s",
+                    curr_status[0], curr_status[1], curr_status[2], curr_status[4], curr_status[5],
+                    curr_status[6], curr_status[7], curr_status[8], curr_status[9],
+                )
+                prev_status = curr_status
+
+        async def wait_for_activity():
+            # The only time-based transition is the 2 second microphone interruption reset, wake up for it
+            timeout = TTS_SENDER_IDLE_TIMEOUT
+            if session.audio_input_processor.interrupted and callbacks.interruption_time:
+                timeout = min(timeout, max(0.0, callbacks.interruption_time + 2.0 - time.time()))
+            await wakeup.wait(timeout=timeout)
+            log_status()
 
         while True:
-            await asyncio.sleep(0.001) # Yield control
+            await asyncio.sleep(0) # Yield control between chunks
 
             # Use connection-specific interruption_time via callbacks
-            if app.state.AudioInputProcessor.interrupted and callbacks.interruption_time and time.time() - callbacks.interruption_time > 2.0:
-                app.state.AudioInputProcessor.interrupted = False
+            if session.audio_input_processor.interrupted and callbacks.interruption_time and time.time() - callbacks.interruption_time > 2.0:
+                session.audio_input_processor.interrupted = False
                 callbacks.interruption_time = 0 # Reset via callbacks
-                logger.info(Colors.apply("🖥️🎙️ interruption flag reset after 2 seconds").cyan)
-
-            is_tts_finished = app.state.SpeechPipelineManager.is_valid_gen() and app.state.SpeechPipelineManager.running_generation.audio_quick_finished
-
-            def log_status():
-                nonlocal prev_status
-                last_quick_answer_chunk_decayed = (
-                    last_quick_answer_chunk
-                    and time.time() - last_quick_answer_chunk > TTS_FINAL_TIMEOUT
-                    and time.time() - last_chunk_sent > TTS_FINAL_TIMEOUT
-                )
-
-                curr_status = (
-                    # Access connection-specific state via callbacks
-                    int(callbacks.tts_to_client),
-                    int(callbacks.tts_client_playing),
-                    int(callbacks.tts_chunk_sent),
-                    1, # Placeholder?
-                    int(callbacks.is_hot), # from callbacks
-                    int(callbacks.synthesis_started), # from callbacks
-                    int(app.state.SpeechPipelineManager.running_generation is not None), # Global manager state
-                    int(app.state.SpeechPipelineManager.is_valid_gen()), # Global manager state
-                    int(is_tts_finished), # Calculated local variable
-                    int(app.state.AudioInputProcessor.interrupted) # Input processor state
-                )
-
-                if curr_status != prev_status:
-                    status = Colors.apply("🖥️🚦 State ").red
-                    logger.info(
-                        f"{status} ToClient {curr_status[0]}, "
-                        f"ttsClientON {curr_status[1]}, " # Renamed slightly for clarity
-                        f"ChunkSent {curr_status[2]}, "
-                        f"hot {curr_status[4]}, synth {curr_status[5]}"
-                        f" gen {curr_status[6]}"
-                        f" valid {curr_status[7]}"
-                        f" tts_q_fin {curr_status[8]}"
-                        f" mic_inter {curr_status[9]}"
-                    )
-                    prev_status = curr_status
+                logger.info("{cyan}🖥️🎙️ interruption flag reset after 2 seconds")
 
             # Use connection-specific state via callbacks
             if not callbacks.tts_to_client:
-                await asyncio.sleep(0.001)
-                log_status()
+                await wait_for_activity()
                 continue
 
-            if not app.state.SpeechPipelineManager.running_generation:
-                await asyncio.sleep(0.001)
-                log_status()
+            if not session.pipeline_manager.running_generation:
+                await wait_for_activity()
                 continue
 
-            if app.state.SpeechPipelineManager.running_generation.abortion_started:
-                await asyncio.sleep(0.001)
-                log_status()
+            if session.pipeline_manager.running_generation.abortion_started:
+                await wait_for_activity()
                 continue
 
-            if not app.state.SpeechPipelineManager.running_generation.audio_quick_finished:
-                app.state.SpeechPipelineManager.running_generation.tts_quick_allowed_event.set()
+            if not session.pipeline_manager.running_generation.audio_quick_finished:
+                session.pipeline_manager.running_generation.tts_quick_allowed_event.set()
 
-            if not app.state.SpeechPipelineManager.running_generation.quick_answer_first_chunk_ready:
-                await asyncio.sleep(0.001)
-                log_status()
+            if not session.pipeline_manager.running_generation.quick_answer_first_chunk_ready:
+                await wait_for_activity()
                 continue
 
             chunk = None
             try:
-                chunk = app.state.SpeechPipelineManager.running_generation.audio_chunks.get_nowait()
+                chunk = session.pipeline_manager.running_generation.audio_chunks.get_nowait()
                 if chunk:
                     last_quick_answer_chunk = time.time()
             except Empty:
-                final_expected = app.state.SpeechPipelineManager.running_generation.quick_answer_provided
-                audio_final_finished = app.state.SpeechPipelineManager.running_generation.audio_final_finished
+                final_expected = session.pipeline_manager.running_generation.quick_answer_provided
+                audio_final_finished = session.pipeline_manager.running_generation.audio_final_finished
 
                 if not final_expected or audio_final_finished:
                     logger.info("🖥️🏁 Sending of TTS chunks and 'user request/assistant answer' cycle finished.")
+                    # Release the samples still held back by the upsampler's filter delay
+                    if callbacks.tts_binary:
+                        tail_pcm = session.upsampler.flush_pcm_chunk()
+                        if tail_pcm and callbacks.tts_to_client:
+                            message_queue.put_nowait(build_tts_frame(upsampled_gen_id or 0, tts_sequence, tail_pcm))
+                    else:
+                        tail_chunk = session.upsampler.flush_base64_chunk()
+                        if tail_chunk and callbacks.tts_to_client:
+                            message_queue.put_nowait({
+                                "type": "tts_chunk",
+                                "content": tail_chunk
+                            })
+                    upsampled_gen_id = None
                     callbacks.send_final_assistant_answer() # Callbacks method
+                    tracer.end_turn(session.session_id)
 
-                    assistant_answer = app.state.SpeechPipelineManager.running_generation.quick_answer + app.state.SpeechPipelineManager.running_generation.final_answer                    
-                    app.state.SpeechPipelineManager.running_generation = None
+                    assistant_answer = session.pipeline_manager.running_generation.quick_answer + session.pipeline_manager.running_generation.final_answer                    
+                    session.pipeline_manager.running_generation = None
 
                     callbacks.tts_chunk_sent = False # Reset via callbacks
                     callbacks.reset_state() # Reset connection state via callbacks
 
-                await asyncio.sleep(0.001)
-                log_status()
+                await wait_for_activity()
                 continue
 
-            base64_chunk = app.state.Upsampler.get_base64_chunk(chunk)
-            message_queue.put_nowait({
-                "type": "tts_chunk",
-                "content": base64_chunk
-            })
+            current_gen = session.pipeline_manager.running_generation # May be cleared concurrently by an abort
+            current_gen_id = current_gen.id if current_gen else None
+            if current_gen_id != upsampled_gen_id:
+                # New generation: don't let the previous (possibly interrupted) audio bleed into it
+                session.upsampler.reset()
+                upsampled_gen_id = current_gen_id
+                tts_sequence = 0
+
+            if callbacks.tts_binary:
+                pcm = session.upsampler.get_pcm_chunk(chunk)
+                message_queue.put_nowait(build_tts_frame(upsampled_gen_id or 0, tts_sequence, pcm))
+            else:
+                base64_chunk = session.upsampler.get_base64_chunk(chunk)
+                message_queue.put_nowait({
+                    "type": "tts_chunk",
+                    "content": base64_chunk
+                })
+            if tts_sequence == 0:
+                tracer.instant("first_tts_chunk_sent", "server", session=session.session_id, generation=upsampled_gen_id)
+            tts_sequence += 1
             last_chunk_sent = time.time()
 
             # Use connection-specific state via callbacks
             if not callbacks.tts_chunk_sent:
                 # Use the async helper function instead of a thread
-                asyncio.create_task(_reset_interrupt_flag_async(app, callbacks))
+                asyncio.create_task(_reset_interrupt_flag_async(session, callbacks))
 
             callbacks.tts_chunk_sent = True # Set via callbacks
 
     except asyncio.CancelledError:
         pass # Task cancellation is expected on disconnect
     except WebSocketDisconnect as e:
-        logger.warning(f"🖥️⚠️ {Colors.apply('WARNING').red} disconnect in send_tts_chunks: {repr(e)}")
+        logger.warning("🖥️⚠️ {red}WARNING{reset} disconnect in send_tts_chunks: %r", e)
     except RuntimeError as e:
-        logger.error(f"🖥️💥 {Colors.apply('RUNTIME_ERROR').red} in send_tts_chunks: {repr(e)}")
+        logger.error("🖥️💥 {red}RUNTIME_ERROR{reset} in send_tts_chunks: %r", e)
     except Exception as e:
-        logger.exception(f"🖥️💥 {Colors.apply('EXCEPTION').red} in send_tts_chunks: {repr(e)}")
+        logger.exception("🖥️💥 {red}EXCEPTION{reset} in send_tts_chunks: %r", e)
+    finally:
+        session.pipeline_manager.on_audio_activity = None
 
 
 # --------------------------------------------------------------------
@@ -524,16 +665,19 @@ class TranscriptionCallbacks:
     `message_queue` and manages interaction logic like interruptions and final answer delivery.
     It also includes a threaded worker to handle abort checks based on partial transcription.
     """
-    def __init__(self, app: FastAPI, message_queue: asyncio.Queue):
+    def __init__(self, session: VoiceSession, message_queue: asyncio.Queue, tts_binary: bool = False):
         """
         Initializes the TranscriptionCallbacks instance for a WebSocket connection.
 
         Args:
-            app: The FastAPI application instance (to access global components).
+            session: The VoiceSession leased to this connection (pipeline components).
             message_queue: An asyncio queue for sending messages back to the client.
+            tts_binary: If True, TTS audio is sent as binary frames instead of
+                        Base64 `tts_chunk` JSON messages.
         """
-        self.app = app
+        self.session = session
         self.message_queue = message_queue
+        self.tts_binary = tts_binary
         self.final_transcription = ""
         self.abort_text = ""
         self.last_abort_text = ""
@@ -560,7 +704,11 @@ class TranscriptionCallbacks:
 
         self.reset_state() # Call reset to ensure consistency
 
+        # Set from pipeline threads to wake the (otherwise idle) TTS chunk sender
+        self.tts_wakeup = ThreadSafeAsyncEvent()
+
         self.abort_request_event = threading.Event()
+        self.shutdown_event = threading.Event()
         self.abort_worker_thread = threading.Thread(target=self._abort_worker, name="AbortWorker", daemon=True)
         self.abort_worker_thread.start()
 
@@ -588,27 +736,35 @@ class TranscriptionCallbacks:
         self.partial_transcription = ""
 
         # Keep the abort call related to the audio processor/pipeline manager
-        self.app.state.AudioInputProcessor.abort_generation()
+        self.session.audio_input_processor.abort_generation()
 
 
     def _abort_worker(self):
         """Background thread worker to check for abort conditions based on partial text."""
-        while True:
+        while not self.shutdown_event.is_set():
             was_set = self.abort_request_event.wait(timeout=0.1) # Check every 100ms
-            if was_set:
+            if was_set and not self.shutdown_event.is_set():
                 self.abort_request_event.clear()
                 # Only trigger abort check if the text actually changed
                 if self.last_abort_text != self.abort_text:
                     self.last_abort_text = self.abort_text
-                    logger.debug(f"🖥️🧠 Abort check triggered by partial: '{self.abort_text}'")
-                    self.app.state.SpeechPipelineManager.check_abort(self.abort_text, False, "on_partial")
+                    logger.debug("🖥️🧠 Abort check triggered by partial: '%s'", self.abort_text)
+                    self.session.pipeline_manager.check_abort(self.abort_text, False, "on_partial")
+
+    def shutdown(self):
+        """Stops the abort worker thread once the connection has ended."""
+        self.shutdown_event.set()
+        self.abort_request_event.set() # Wake the worker so it notices the shutdown
+        if self.abort_worker_thread.is_alive():
+            self.abort_worker_thread.join(timeout=1.0)
 
     def on_partial(self, txt: str):
         """
         Callback invoked when a partial transcription result is available.
 
         Updates internal state, sends the partial result to the client,
-        and signals the abort worker thread to check for potential interruptions.
+        signals the abort worker thread to check for potential interruptions
+        and requests a KV cache prefill of the conversation history.
 
         Args:
             txt: The partial transcription text.
@@ -616,9 +772,11 @@ class TranscriptionCallbacks:
         self.final_assistant_answer_sent = False # New user speech invalidates previous final answer sending state
         self.final_transcription = "" # Clear final transcription as this is partial
         self.partial_transcription = txt
+        tracer.instant("realtime_stt", "stt", session=self.session.session_id, text=txt)
         self.message_queue.put_nowait({"type": "partial_user_request", "content": txt})
         self.abort_text = txt # Update text used for abort check
         self.abort_request_event.set() # Signal the abort worker
+        self.session.pipeline_manager.prefill_history() # No-op once this turn's history is cached
 
     def safe_abort_running_syntheses(self, reason: str):
         """Placeholder for safely aborting syntheses (currently does nothing)."""
@@ -628,9 +786,9 @@ class TranscriptionCallbacks:
     def on_tts_allowed_to_synthesize(self):
         """Callback invoked when the system determines TTS synthesis can proceed."""
         # Access global manager state
-        if self.app.state.SpeechPipelineManager.running_generation and not self.app.state.SpeechPipelineManager.running_generation.abortion_started:
-            logger.info(f"{Colors.apply('🖥️🔊 TTS ALLOWED').blue}")
-            self.app.state.SpeechPipelineManager.running_generation.tts_quick_allowed_event.set()
+        if self.session.pipeline_manager.running_generation and not self.session.pipeline_manager.running_generation.abortion_started:
+            logger.info("{blue}🖥️🔊 TTS ALLOWED")
+            self.session.pipeline_manager.running_generation.tts_quick_allowed_event.set()
 
     def on_potential_sentence(self, txt: str):
         """
@@ -641,9 +799,9 @@ class TranscriptionCallbacks:
         Args:
             txt: The potential sentence text.
         """
-        logger.debug(f"🖥️🧠 Potential sentence: '{txt}'")
+        logger.debug("🖥️🧠 Potential sentence: '%s'", txt)
         # Access global manager state
-        self.app.state.SpeechPipelineManager.prepare_generation(txt)
+        self.session.pipeline_manager.prepare_generation(txt)
 
     def on_potential_final(self, txt: str):
         """
@@ -654,7 +812,7 @@ class TranscriptionCallbacks:
         Args:
             txt: The potential final transcription text.
         """
-        logger.info(f"{Colors.apply('🖥️🧠 HOT: ').magenta}{txt}")
+        logger.info("{magenta}🖥️🧠 HOT: {reset}%s", txt)
 
     def on_potential_abort(self):
         """Callback invoked if the STT detects a potential need to abort based on user speech."""
@@ -665,7 +823,8 @@ class TranscriptionCallbacks:
         """
         Callback invoked just before the final STT result for a user turn is confirmed.
 
-        Sets flags indicating user finished, allows TTS if pending, interrupts microphone input,
+        Sets flags indicating user finished, promotes a matching speculative branch if one is
+        cached (and logs the turn's speculation statistics), allows TTS if pending, interrupts microphone input,
         releases TTS stream to client, sends final user request and any pending partial
         assistant answer to the client, and adds user request to history.
 
@@ -673,44 +832,53 @@ class TranscriptionCallbacks:
             audio: The raw audio bytes corresponding to the final transcription. (Currently unused)
             txt: The transcription text (might be slightly refined in on_final).
         """
-        logger.info(Colors.apply('🖥️🏁 =================== USER TURN END ===================').light_gray)
+        logger.info("{light_gray}🖥️🏁 =================== USER TURN END ===================")
         self.user_finished_turn = True
         self.user_interrupted = False # Reset connection-specific flag (user finished, not interrupted)
+
+        # Use the reliable final_transcription OR current partial if final isn't set yet
+        user_request_content = self.final_transcription if self.final_transcription else self.partial_transcription
+        tracer.instant("on_before_final", "server", session=self.session.session_id, text=user_request_content)
+
+        # Switch to an already synthesized speculative answer if one matches the final text
+        self.session.pipeline_manager.promote_speculation(user_request_content)
+        self.session.pipeline_manager.report_speculation_turn()
+
         # Access global manager state
-        if self.app.state.SpeechPipelineManager.is_valid_gen():
-            logger.info(f"{Colors.apply('🖥️🔊 TTS ALLOWED (before final)').blue}")
-            self.app.state.SpeechPipelineManager.running_generation.tts_quick_allowed_event.set()
+        if self.session.pipeline_manager.is_valid_gen():
+            logger.info("{blue}🖥️🔊 TTS ALLOWED (before final)")
+            self.session.pipeline_manager.running_generation.tts_quick_allowed_event.set()
 
         # first block further incoming audio (Audio processor's state)
-        if not self.app.state.AudioInputProcessor.interrupted:
-            logger.info(f"{Colors.apply('🖥️🎙️ ⏸️ Microphone interrupted (end of turn)').cyan}")
-            self.app.state.AudioInputProcessor.interrupted = True
+        if not self.session.audio_input_processor.interrupted:
+            logger.info("{cyan}🖥️🎙️ ⏸️ Microphone interrupted (end of turn)")
+            self.session.audio_input_processor.interrupted = True
             self.interruption_time = time.time() # Set connection-specific flag
 
-        logger.info(f"{Colors.apply('🖥️🔊 TTS STREAM RELEASED').blue}")
+        logger.info("{blue}🖥️🔊 TTS STREAM RELEASED")
         self.tts_to_client = True # Set connection-specific flag
+        self.tts_wakeup.set() # Chunks synthesized ahead of the turn end may already be waiting
 
-        # Send final user request (using the reliable final_transcription OR current partial if final isn't set yet)
-        user_request_content = self.final_transcription if self.final_transcription else self.partial_transcription
+        # Send final user request
         self.message_queue.put_nowait({
             "type": "final_user_request",
             "content": user_request_content
         })
 
         # Access global manager state
-        if self.app.state.SpeechPipelineManager.is_valid_gen():
+        if self.session.pipeline_manager.is_valid_gen():
             # Send partial assistant answer (if available) to the client
             # Use connection-specific user_interrupted flag
-            if self.app.state.SpeechPipelineManager.running_generation.quick_answer and not self.user_interrupted:
-                self.assistant_answer = self.app.state.SpeechPipelineManager.running_generation.quick_answer
+            if self.session.pipeline_manager.running_generation.quick_answer and not self.user_interrupted:
+                self.assistant_answer = self.session.pipeline_manager.running_generation.quick_answer
                 self.message_queue.put_nowait({
                     "type": "partial_assistant_answer",
                     "content": self.assistant_answer
                 })
 
-        logger.info(f"🖥️🧠 Adding user request to history: '{user_request_content}'")
+        logger.info("🖥️🧠 Adding user request to history: '%s'", user_request_content)
         # Access global manager state
-        self.app.state.SpeechPipelineManager.history.append({"role": "user", "content": user_request_content})
+        self.session.pipeline_manager.history.append({"role": "user", "content": user_request_content})
 
     def on_final(self, txt: str):
         """
@@ -721,7 +889,7 @@ class TranscriptionCallbacks:
         Args:
             txt: The final transcription text.
         """
-        logger.info(f"\n{Colors.apply('🖥️✅ FINAL USER REQUEST (STT Callback): ').green}{txt}")
+        logger.info("\n{green}🖥️✅ FINAL USER REQUEST (STT Callback): {reset}%s", txt)
         if not self.final_transcription: # Store it if not already set by on_before_final logic
              self.final_transcription = txt
 
@@ -734,9 +902,9 @@ class TranscriptionCallbacks:
         Args:
             reason: A string describing why the abortion is triggered.
         """
-        logger.info(f"{Colors.apply('🖥️🛑 Aborting generation:').blue} {reason}")
+        logger.info("{blue}🖥️🛑 Aborting generation:{reset} %s", reason)
         # Access global manager state
-        self.app.state.SpeechPipelineManager.abort_generation(reason=f"server.py abort_generations: {reason}")
+        self.session.pipeline_manager.abort_generation(reason=f"server.py abort_generations: {reason}")
 
     def on_silence_active(self, silence_active: bool):
         """
@@ -760,7 +928,7 @@ class TranscriptionCallbacks:
         Args:
             txt: The partial assistant text.
         """
-        logger.info(f"{Colors.apply('🖥️💬 PARTIAL ASSISTANT ANSWER: ').green}{txt}")
+        logger.info("{green}🖥️💬 PARTIAL ASSISTANT ANSWER: {reset}%s", txt)
         # Use connection-specific user_interrupted flag
         if not self.user_interrupted:
             self.assistant_answer = txt
@@ -778,16 +946,18 @@ class TranscriptionCallbacks:
         If client-side TTS is playing, it triggers an interruption: stops server-side
         TTS streaming, sends stop/interruption messages to the client, aborts ongoing
         generation, sends any final assistant answer generated so far, and resets relevant state.
+        Finally requests a KV cache prefill of the conversation history.
         """
-        logger.info(f"{Colors.ORANGE}🖥️🎙️ Recording started.{Colors.RESET} TTS Client Playing: {self.tts_client_playing}")
+        logger.info("{orange}🖥️🎙️ Recording started.{reset} TTS Client Playing: %s", self.tts_client_playing)
+        tracer.start_turn(self.session.session_id)
         # Use connection-specific tts_client_playing flag
         if self.tts_client_playing:
             self.tts_to_client = False # Stop server sending TTS
             self.user_interrupted = True # Mark connection as user interrupted
-            logger.info(f"{Colors.apply('🖥️❗ INTERRUPTING TTS due to recording start').blue}")
+            logger.info("{blue}🖥️❗ INTERRUPTING TTS due to recording start")
 
             # Send final assistant answer *if* one was generated and not sent
-            logger.info(Colors.apply("🖥️✅ Sending final assistant answer (forced on interruption)").pink)
+            logger.info("{pink}🖥️✅ Sending final assistant answer (forced on interruption)")
             self.send_final_assistant_answer(forced=True)
 
             # Minimal reset for interruption:
@@ -800,7 +970,7 @@ class TranscriptionCallbacks:
                 "content": ""
             })
 
-            logger.info(f"{Colors.apply('🖥️🛑 RECORDING START ABORTING GENERATION').red}")
+            logger.info("{red}🖥️🛑 RECORDING START ABORTING GENERATION")
             self.abort_generations("on_recording_start, user interrupts, TTS Playing")
 
             logger.info("🖥️❗ Sending tts_interruption to client.")
@@ -813,6 +983,9 @@ class TranscriptionCallbacks:
             # Be careful what exactly needs reset vs persists (like tts_client_playing)
             # self.reset_state() # Might clear too much, like user_interrupted prematurely
 
+        # Let the LLM backend process the history (incl. a forced final answer) while the user is still speaking
+        self.session.pipeline_manager.prefill_history()
+
     def send_final_assistant_answer(self, forced=False):
         """
         Sends the final (or best available) assistant answer to the client.
@@ -827,19 +1000,19 @@ class TranscriptionCallbacks:
         """
         final_answer = ""
         # Access global manager state
-        if self.app.state.SpeechPipelineManager.is_valid_gen():
-            final_answer = self.app.state.SpeechPipelineManager.running_generation.quick_answer + self.app.state.SpeechPipelineManager.running_generation.final_answer
+        if self.session.pipeline_manager.is_valid_gen():
+            final_answer = self.session.pipeline_manager.running_generation.quick_answer + self.session.pipeline_manager.running_generation.final_answer
 
         if not final_answer: # Check if constructed answer is empty
             # If forced, try using the last known partial answer from this connection
             if forced and self.assistant_answer:
                  final_answer = self.assistant_answer
-                 logger.warning(f"🖥️⚠️ Using partial answer as final (forced): '{final_answer}'")
+                 logger.warning("🖥️⚠️ Using partial answer as final (forced): '%s'", final_answer)
             else:
-                logger.warning(f"🖥️⚠️ Final assistant answer was empty, not sending.")
+                logger.warning("🖥️⚠️ Final assistant answer was empty, not sending.")
                 return# Nothing to send
 
-        logger.debug(f"🖥️✅ Attempting to send final answer: '{final_answer}' (Sent previously: {self.final_assistant_answer_sent})")
+        logger.debug("🖥️✅ Attempting to send final answer: '%s' (Sent previously: %s)", final_answer, self.final_assistant_answer_sent)
 
         if not self.final_assistant_answer_sent and final_answer:
             import re
@@ -850,26 +1023,85 @@ class TranscriptionCallbacks:
             cleaned_answer = re.sub(r'\s+', ' ', cleaned_answer).strip()
 
             if cleaned_answer: # Ensure it's not empty after cleaning
-                logger.info(f"\n{Colors.apply('🖥️✅ FINAL ASSISTANT ANSWER (Sending): ').green}{cleaned_answer}")
+                logger.info("\n{green}🖥️✅ FINAL ASSISTANT ANSWER (Sending): {reset}%s", cleaned_answer)
+                tracer.instant("final_answer_sent", "server", session=self.session.session_id, forced=forced, text=cleaned_answer)
                 self.message_queue.put_nowait({
                     "type": "final_assistant_answer",
                     "content": cleaned_answer
                 })
-                app.state.SpeechPipelineManager.history.append({"role": "assistant", "content": cleaned_answer})
+                self.session.pipeline_manager.history.append({"role": "assistant", "content": cleaned_answer})
+                self.session.pipeline_manager.update_history_window() # Trim between turns, off the request path
                 self.final_assistant_answer_sent = True
                 self.final_assistant_answer = cleaned_answer # Store the sent answer
             else:
-                logger.warning(f"🖥️⚠️ {Colors.YELLOW}Final assistant answer was empty after cleaning.{Colors.RESET}")
+                logger.warning("🖥️⚠️ {yellow}Final assistant answer was empty after cleaning.")
                 self.final_assistant_answer_sent = False # Don't mark as sent
                 self.final_assistant_answer = "" # Clear the stored answer
         elif forced and not final_answer: # Should not happen due to earlier check, but safety
-             logger.warning(f"🖥️⚠️ {Colors.YELLOW}Forced send of final assistant answer, but it was empty.{Colors.RESET}")
+             logger.warning("🖥️⚠️ {yellow}Forced send of final assistant answer, but it was empty.")
              self.final_assistant_answer = "" # Clear the stored answer
 
 
 # --------------------------------------------------------------------
 # Main WebSocket endpoint
 # --------------------------------------------------------------------
+async def _wait_for_disconnect(ws: WebSocket) -> None:
+    """Discards client messages until the client disconnects (used while it is queued)."""
+    try:
+        while True:
+            message = await ws.receive()
+            if message.get("type") == "websocket.disconnect":
+                return
+    except (WebSocketDisconnect, RuntimeError):
+        return
+
+async def acquire_session(ws: WebSocket, pool: SessionPool) -> Optional[VoiceSession]:
+    """
+    Leases a session for a client, queueing it while all sessions are busy.
+
+    A queued client is told its position and stops waiting as soon as it
+    disconnects, so it never takes a session it can no longer use. Rejected
+    clients are notified and the socket is closed.
+
+    Args:
+        ws: The accepted WebSocket connection.
+        pool: The session pool.
+
+    Returns:
+        The leased session, or None if the client was rejected or disconnected.
+    """
+    session = await pool.acquire(timeout=0)
+    if session is not None:
+        return session
+
+    position = pool.waiting_count + 1
+    acquire_task = asyncio.create_task(pool.acquire(timeout=SESSION_QUEUE_TIMEOUT))
+    disconnect_task = asyncio.create_task(_wait_for_disconnect(ws))
+    try:
+        await ws.send_json({"type": "session_queued", "content": position})
+        await asyncio.wait((acquire_task, disconnect_task), return_when=asyncio.FIRST_COMPLETED)
+    except (WebSocketDisconnect, RuntimeError):
+        pass # Client gone while being told it is queued
+    finally:
+        for task in (acquire_task, disconnect_task):
+            task.cancel()
+        await asyncio.gather(acquire_task, disconnect_task, return_exceptions=True)
+
+    session = acquire_task.result() if acquire_task.done() and not acquire_task.cancelled() else None
+    if disconnect_task.done() and not disconnect_task.cancelled():
+        logger.info("🖥️👋 Client disconnected while queued for a session.")
+        if session is not None:
+            await pool.release(session) # Won the race against the disconnect, hand it on
+        return None
+    if session is None:
+        logger.warning("🖥️⛔ No free session within %ss, rejecting client.", SESSION_QUEUE_TIMEOUT)
+        try:
+            await ws.send_json({"type": "session_rejected", "content": "Server is at capacity, please try again later."})
+            await ws.close(code=1013) # 1013 = Try Again Later
+        except (WebSocketDisconnect, RuntimeError):
+            pass # Client already gone
+    return session
+
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
     """
@@ -886,37 +1118,60 @@ async def websocket_endpoint(ws: WebSocket):
     await ws.accept()
     logger.info("🖥️✅ Client connected via WebSocket.")
 
+    pool: SessionPool = app.state.SessionPool
+    session = await acquire_session(ws, pool)
+    if session is None:
+        return
+    logger.info("🖥️🔗 Client assigned to session %s.", session.session_id)
+
     message_queue = asyncio.Queue()
-    audio_chunks = asyncio.Queue()
-
-    # Set up callback manager - THIS NOW HOLDS THE CONNECTION-SPECIFIC STATE
-    callbacks = TranscriptionCallbacks(app, message_queue)
-
-    # Assign callbacks to the AudioInputProcessor (global component)
-    # These methods within callbacks will now operate on its *instance* state
-    app.state.AudioInputProcessor.realtime_callback = callbacks.on_partial
-    app.state.AudioInputProcessor.transcriber.potential_sentence_end = callbacks.on_potential_sentence
-    app.state.AudioInputProcessor.transcriber.on_tts_allowed_to_synthesize = callbacks.on_tts_allowed_to_synthesize
-    app.state.AudioInputProcessor.transcriber.potential_full_transcription_callback = callbacks.on_potential_final
-    app.state.AudioInputProcessor.transcriber.potential_full_transcription_abort_callback = callbacks.on_potential_abort
-    app.state.AudioInputProcessor.transcriber.full_transcription_callback = callbacks.on_final
-    app.state.AudioInputProcessor.transcriber.before_final_sentence = callbacks.on_before_final
-    app.state.AudioInputProcessor.recording_start_callback = callbacks.on_recording_start
-    app.state.AudioInputProcessor.silence_active_callback = callbacks.on_silence_active
-
-    # Assign callback to the SpeechPipelineManager (global component)
-    app.state.SpeechPipelineManager.on_partial_assistant_text = callbacks.on_partial_assistant_text
-
-    # Create tasks for handling different responsibilities
-    # Pass the 'callbacks' instance to tasks that need connection-specific state
-    tasks = [
-        asyncio.create_task(process_incoming_data(ws, app, audio_chunks, callbacks)), # Pass callbacks
-        asyncio.create_task(app.state.AudioInputProcessor.process_chunk_queue(audio_chunks)),
-        asyncio.create_task(send_text_messages(ws, message_queue)),
-        asyncio.create_task(send_tts_chunks(app, message_queue, callbacks)), # Pass callbacks
-    ]
+    audio_chunks = CoalescingAudioQueue(AUDIO_QUEUE_COALESCE_BYTES, MAX_AUDIO_QUEUE_BYTES)
+    callbacks: Optional[TranscriptionCallbacks] = None
+    tasks: List[asyncio.Task] = []
 
+    # Everything from here on runs inside the try, so the session always goes back to the pool
     try:
+        # Clients opt into binary TTS frames with /ws?tts=binary, everyone else gets Base64 JSON
+        tts_binary = ws.query_params.get("tts") == "binary"
+        logger.info("🖥️🔊 TTS transport: %s", 'binary frames' if tts_binary else 'base64 JSON')
+
+        # Set up callback manager - THIS NOW HOLDS THE CONNECTION-SPECIFIC STATE
+        callbacks = TranscriptionCallbacks(session, message_queue, tts_binary=tts_binary)
+
+        # Assign callbacks to the session's AudioInputProcessor
+        # These methods within callbacks will now operate on its *instance* state
+        audio_input_processor = session.audio_input_processor
+        audio_input_processor.realtime_callback = callbacks.on_partial
+        audio_input_processor.transcriber.potential_sentence_end = callbacks.on_potential_sentence
+        audio_input_processor.transcriber.on_tts_allowed_to_synthesize = callbacks.on_tts_allowed_to_synthesize
+        audio_input_processor.transcriber.potential_full_transcription_callback = callbacks.on_potential_final
+        audio_input_processor.transcriber.potential_full_transcription_abort_callback = callbacks.on_potential_abort
+        audio_input_processor.transcriber.full_transcription_callback = callbacks.on_final
+        audio_input_processor.transcriber.before_final_sentence = callbacks.on_before_final
+        audio_input_processor.recording_start_callback = callbacks.on_recording_start
+        audio_input_processor.silence_active_callback = callbacks.on_silence_active
+
+        # Assign callback to the session's SpeechPipelineManager
+        session.pipeline_manager.on_partial_assistant_text = callbacks.on_partial_assistant_text
+
+        # Queue depths are sampled when /metrics is scraped
+        def tts_queue_depth() -> int:
+            generation = session.pipeline_manager.running_generation
+            return generation.audio_chunks.qsize() if generation else 0
+        QUEUE_DEPTH.labels(session.session_id, "incoming_chunks").set_function(audio_chunks.qsize)
+        INCOMING_AUDIO_BYTES.labels(session.session_id).set_function(lambda: audio_chunks.bytes)
+        QUEUE_DEPTH.labels(session.session_id, "message_queue").set_function(message_queue.qsize)
+        QUEUE_DEPTH.labels(session.session_id, "audio_chunks").set_function(tts_queue_depth)
+
+        # Create tasks for handling different responsibilities
+        # Pass the 'callbacks' instance to tasks that need connection-specific state
+        tasks = [
+            asyncio.create_task(process_incoming_data(ws, session, audio_chunks, callbacks)), # Pass callbacks
+            asyncio.create_task(audio_input_processor.process_chunk_queue(audio_chunks)),
+            asyncio.create_task(send_text_messages(ws, message_queue)),
+            asyncio.create_task(send_tts_chunks(session, message_queue, callbacks)), # Pass callbacks
+        ]
+
         # Wait for any task to complete (e.g., client disconnect)
         done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
         for task in pending:
@@ -925,7 +1180,7 @@ async def websocket_endpoint(ws: WebSocket):
         # Await cancelled tasks to let them clean up if needed
         await asyncio.gather(*pending, return_exceptions=True)
     except Exception as e:
-        logger.error(f"🖥️💥 {Colors.apply('ERROR').red} in WebSocket session: {repr(e)}")
+        logger.error("🖥️💥 {red}ERROR{reset} in WebSocket session: %r", e)
     finally:
         logger.info("🖥️🧹 Cleaning up WebSocket tasks...")
         for task in tasks:
@@ -934,6 +1189,14 @@ async def websocket_endpoint(ws: WebSocket):
         # Ensure all tasks are awaited after cancellation
         # Use return_exceptions=True to prevent gather from stopping on first error during cleanup
         await asyncio.gather(*tasks, return_exceptions=True)
+        if callbacks:
+            callbacks.shutdown()
+        for queue_name in ("incoming_chunks", "message_queue", "audio_chunks"):
+            QUEUE_DEPTH.remove(session.session_id, queue_name)
+        INCOMING_AUDIO_BYTES.remove(session.session_id)
+        if audio_chunks.coalesced_bytes or audio_chunks.dropped_bytes:
+            logger.info("🖥️📊 [Session %s] Inbound audio coalesced: %s bytes, dropped: %s bytes.", session.session_id, audio_chunks.coalesced_bytes, audio_chunks.dropped_bytes)
+        await pool.release(session)
         logger.info("🖥️❌ WebSocket session ended.")
 
 # --------------------------------------------------------------------
@@ -952,7 +1215,7 @@ if __name__ == "__main__":
         cert_file = "127.0.0.1+1.pem"
         key_file = "127.0.0.1+1-key.pem"
         if not os.path.exists(cert_file) or not os.path.exists(key_file):
-             logger.error(f"🖥️💥 SSL cert file ({cert_file}) or key file ({key_file}) not found.")
+             logger.error("🖥️💥 SSL cert file (%s) or key file (%s) not found.", cert_file, key_file)
              logger.error("🖥️💥 Please generate them using mkcert:")
              logger.error("🖥️💥   choco install mkcert") # Assuming Windows based on earlier check, adjust if needed
              logger.error("🖥️💥   mkcert -install")
@@ -961,7 +1224,7 @@ if __name__ == "__main__":
              sys.exit(1)
 
         # Run the server with SSL
-        logger.info(f"🖥️▶️ Starting server with SSL (cert: {cert_file}, key: {key_file}).")
+        logger.info("🖥️▶️ Starting server with SSL (cert: %s, key: %s).", cert_file, key_file)
         uvicorn.run(
             "server:app",
             host="0.0.0.0",
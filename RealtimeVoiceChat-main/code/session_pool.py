@@ -0,0 +1,162 @@
+import asyncio
+import logging
+from typing import Callable, List, Optional
+
+from audio_in import AudioInputProcessor
+from speech_pipeline_manager import SpeechPipelineManager
+from upsample_overlap import UpsampleOverlap
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceSession:
+    """
+    Bundles the per-connection pipeline state leased to a single WebSocket client.
+
+    Each session owns its own transcription state (`AudioInputProcessor`), its own
+    generation state and conversation history (`SpeechPipelineManager`) and its own
+    upsampler. Heavy model weights (TTS engine, turn detection classifier) are
+    shared between sessions by the objects themselves.
+    """
+    def __init__(
+            self,
+            session_id: int,
+            pipeline_manager: SpeechPipelineManager,
+            audio_input_processor: AudioInputProcessor,
+        ) -> None:
+        """
+        Initializes a VoiceSession.
+
+        Args:
+            session_id: A process-unique identifier for this session (used for logging).
+            pipeline_manager: The SpeechPipelineManager dedicated to this session.
+            audio_input_processor: The AudioInputProcessor dedicated to this session.
+        """
+        self.session_id = session_id
+        self.pipeline_manager = pipeline_manager
+        self.audio_input_processor = audio_input_processor
+        self.upsampler = UpsampleOverlap()
+
+    def reset(self) -> None:
+        """
+        Returns the session to a clean state so it can be leased to the next client.
+
+        Aborts any running generation, clears conversation history, detaches all
+        connection callbacks and drops any buffered audio. Blocking; call from a thread.
+        """
+        logger.info(f"🏊🧹 [Session {self.session_id}] Resetting session state.")
+        self.pipeline_manager.on_partial_assistant_text = None
+        self.pipeline_manager.on_audio_activity = None
+        self.pipeline_manager.reset()
+        self.audio_input_processor.reset()
+        self.upsampler = UpsampleOverlap()
+
+    def shutdown(self) -> None:
+        """Shuts down the pipeline workers and the transcription backend of this session."""
+        logger.info(f"🏊🔌 [Session {self.session_id}] Shutting down session.")
+        self.pipeline_manager.shutdown()
+        self.audio_input_processor.shutdown()
+
+
+class SessionPool:
+    """
+    Fixed-size pool of `VoiceSession` instances shared by all WebSocket connections.
+
+    All sessions are created up front so that connecting clients never pay for
+    model loading. A client that connects while every session is leased waits
+    (up to a timeout) for one to be released and is rejected afterwards.
+    """
+    def __init__(
+            self,
+            max_sessions: int,
+            session_factory: Callable[[int], VoiceSession],
+        ) -> None:
+        """
+        Initializes the SessionPool.
+
+        Args:
+            max_sessions: The number of concurrent sessions this node serves.
+            session_factory: A callable receiving a session id and returning a new
+                             `VoiceSession`. Called `max_sessions` times by `start`.
+
+        Raises:
+            ValueError: If `max_sessions` is smaller than 1.
+        """
+        if max_sessions < 1:
+            raise ValueError("max_sessions must be at least 1")
+        self.max_sessions = max_sessions
+        self.session_factory = session_factory
+        self.sessions: List[VoiceSession] = []
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._waiting: int = 0
+
+    def start(self) -> None:
+        """Creates all sessions and marks them as idle. Must run inside the event loop."""
+        for session_id in range(1, self.max_sessions + 1):
+            logger.info(f"🏊🚀 Creating session {session_id}/{self.max_sessions}...")
+            session = self.session_factory(session_id)
+            self.sessions.append(session)
+            self._idle.put_nowait(session)
+        logger.info(f"🏊✅ Session pool ready with {self.max_sessions} session(s).")
+
+    @property
+    def idle_count(self) -> int:
+        """The number of sessions currently available for lease."""
+        return self._idle.qsize()
+
+    @property
+    def waiting_count(self) -> int:
+        """The number of clients currently queued for a session."""
+        return self._waiting
+
+    async def acquire(self, timeout: Optional[float] = None) -> Optional[VoiceSession]:
+        """
+        Leases an idle session, waiting for one to be released if necessary.
+
+        Args:
+            timeout: Maximum time in seconds to wait for a session. None waits forever,
+                     0 rejects immediately if no session is idle.
+
+        Returns:
+            The leased VoiceSession, or None if no session became available in time.
+        """
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if timeout is not None and timeout <= 0:
+                return None
+
+        self._waiting += 1
+        logger.info(f"🏊⏳ All {self.max_sessions} session(s) busy, client queued ({self._waiting} waiting).")
+        try:
+            return await asyncio.wait_for(self._idle.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"🏊⏱️ No session became available within {timeout}s.")
+            return None
+        finally:
+            self._waiting -= 1
+
+    async def release(self, session: VoiceSession) -> None:
+        """
+        Resets a leased session and returns it to the idle pool.
+
+        The reset may block while a running generation aborts, so it is executed
+        in a worker thread to keep the event loop responsive.
+
+        Args:
+            session: The session previously returned by `acquire`.
+        """
+        try:
+            await asyncio.to_thread(session.reset)
+        except Exception as e:
+            logger.exception(f"🏊💥 [Session {session.session_id}] Error while resetting session: {e}")
+        self._idle.put_nowait(session)
+        logger.info(f"🏊↩️ [Session {session.session_id}] Returned to pool ({self.idle_count}/{self.max_sessions} idle).")
+
+    def shutdown(self) -> None:
+        """Shuts down every session in the pool."""
+        for session in self.sessions:
+            try:
+                session.shutdown()
+            except Exception as e:
+                logger.exception(f"🏊💥 [Session {session.session_id}] Error during shutdown: {e}")
@@ -0,0 +1,160 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+from text_similarity import TextSimilarity
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeBranch:
+    """
+    A speculative generation whose quick answer audio is ready.
+
+    Captured from a `RunningGeneration` that was aborted because the user's
+    text changed, so it can be replayed if the user ends up saying the same
+    thing after all. A `complete` branch carries the whole answer and its audio;
+    otherwise only the quick answer was synthesized and the rest of the answer
+    is generated again when the branch is promoted.
+    """
+    def __init__(
+            self,
+            text: str,
+            context_key: Hashable,
+            quick_answer: str,
+            final_answer: str,
+            audio_chunks: List[Any],
+            first_audio_ms: float,
+            total_ms: float,
+            complete: bool = True,
+        ) -> None:
+        """
+        Initializes a SpeculativeBranch.
+
+        Args:
+            text: The user text the branch was generated for.
+            context_key: Identifies the conversation history the answer depends on.
+            quick_answer: The quick answer text.
+            final_answer: The text synthesized after the quick answer (empty if not complete).
+            audio_chunks: The synthesized audio chunks in playback order (quick
+                          answer only if not complete).
+            first_audio_ms: Time from generation start to the first audio chunk.
+            total_ms: Time from generation start until the kept audio was synthesized.
+            complete: Whether the final answer was synthesized as well.
+        """
+        self.text = text
+        self.context_key = context_key
+        self.quick_answer = quick_answer
+        self.final_answer = final_answer
+        self.audio_chunks = audio_chunks
+        self.first_audio_ms = first_audio_ms
+        self.total_ms = total_ms
+        self.complete = complete
+        self.created = time.time()
+
+
+class SpeculationCache:
+    """
+    Keeps up to `max_branches` speculative generations per session.
+
+    Branches are keyed by the user text they answer and the conversation
+    history they were generated on. A lookup returns the most similar branch
+    for the same history (using `TextSimilarity`, as `check_abort` does) and
+    removes it from the cache. Least recently added branches are evicted first.
+    """
+    def __init__(self, text_similarity: TextSimilarity, max_branches: int = 3, similarity_threshold: float = 0.95) -> None:
+        """
+        Initializes the SpeculationCache.
+
+        Args:
+            text_similarity: Comparator used to match user texts.
+            max_branches: Maximum number of branches kept.
+            similarity_threshold: Minimum similarity for a branch to be reused.
+        """
+        self.text_similarity = text_similarity
+        self.max_branches = max_branches
+        self.similarity_threshold = similarity_threshold
+        self.branches: "OrderedDict[int, SpeculativeBranch]" = OrderedDict()
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+        self.partial_hits = 0 # Hits on branches that only had the quick answer
+        self.saved_ms = 0.0
+
+    def add(self, branch: SpeculativeBranch) -> None:
+        """
+        Stores a branch, replacing one for the same text and history.
+
+        Args:
+            branch: The branch to keep.
+        """
+        for branch_id, existing in list(self.branches.items()):
+            if existing.context_key == branch.context_key and existing.text == branch.text:
+                del self.branches[branch_id]
+        self.branches[self._next_id] = branch
+        self._next_id += 1
+        while len(self.branches) > self.max_branches:
+            self.branches.popitem(last=False)
+        logger.info("🗣️🌿 Parked %s speculative branch for '%.40s' (%s audio chunks, %s cached).",
+                    "complete" if branch.complete else "quick answer", branch.text, len(branch.audio_chunks), len(self.branches))
+
+    def take(self, text: str, context_key: Hashable) -> Optional[SpeculativeBranch]:
+        """
+        Removes and returns the best matching branch for `text`, if any.
+
+        Args:
+            text: The user text that is about to be answered.
+            context_key: Identifies the current conversation history.
+
+        Returns:
+            The most similar branch generated on the same history, or None.
+        """
+        self.lookups += 1
+        best_id, best_similarity = None, self.similarity_threshold
+        for branch_id, branch in self.branches.items():
+            if branch.context_key != context_key:
+                continue
+            similarity = 1.0 if branch.text == text else self.text_similarity.calculate_similarity(branch.text, text)
+            if similarity >= best_similarity:
+                best_id, best_similarity = branch_id, similarity
+        if best_id is None:
+            return None
+        branch = self.branches.pop(best_id)
+        self.hits += 1
+        if not branch.complete:
+            self.partial_hits += 1
+        self.saved_ms += branch.first_audio_ms
+        return branch
+
+    def drop_other_contexts(self, context_key: Hashable) -> None:
+        """
+        Discards branches generated on a different conversation history.
+
+        Args:
+            context_key: Identifies the current conversation history.
+        """
+        for branch_id in [b_id for b_id, b in self.branches.items() if b.context_key != context_key]:
+            del self.branches[branch_id]
+
+    def clear(self) -> None:
+        """Discards all branches (statistics are kept)."""
+        self.branches.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns cache statistics.
+
+        Returns:
+            A dict with cached branches, lookups, hits (and how many of them
+            were quick answer only), hit rate and the first-audio latency saved
+            by hits in milliseconds.
+        """
+        return {
+            "branches": len(self.branches),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            "saved_ms": self.saved_ms,
+        }
@@ -3,15 +3,23 @@ from typing import Optional, Callable
 import threading
 import logging
 import time
+import os
+import re
+import uuid
 from queue import Queue, Empty
 import sys
 
+from async_channel import LinkedEvent, NotifyingQueue
+
 # (Make sure real/mock imports are correct)
 from audio_module import AudioProcessor
 from text_similarity import TextSimilarity
-from text_context import TextContext
+from text_context import TextContext, is_leading_settled
+from speculation_cache import SpeculationCache, SpeculativeBranch
+from history_window import HistoryWindow
 from llm_module import LLM
-from colors import Colors
+from turn_trace import tracer
+from metrics import LLM_TTFT, GENERATION_ABORTS, ABORT_WAIT
 
 # (Logging setup)
 logger = logging.getLogger(__name__)
@@ -28,6 +36,33 @@ except FileNotFoundError:
 
 USE_ORPHEUS_UNCENSORED = False
 
+# Stripped from the start of the LLM answer when `no_think` is enabled
+QUICK_ANSWER_LEADING_PATTERNS = ["<think>", "</think>", "\n", " "]
+
+# Prefill the LLM's KV cache with the conversation history while the user is still speaking
+LLM_HISTORY_PREFILL = os.getenv("LLM_HISTORY_PREFILL", "1").lower() not in ("0", "false", "no")
+try:
+    # Finished speculative generations kept for reuse when the user's text changes back (0 disables)
+    SPECULATION_CACHE_BRANCHES = int(os.getenv("SPECULATION_CACHE_BRANCHES", 3))
+except ValueError:
+    logger.warning("🗣️⚠️ Invalid SPECULATION_CACHE_BRANCHES env var. Using default: 3")
+    SPECULATION_CACHE_BRANCHES = 3
+try:
+    # Estimated tokens of conversation history sent with each LLM request (0 sends the full history)
+    LLM_HISTORY_TOKEN_BUDGET = int(os.getenv("LLM_HISTORY_TOKEN_BUDGET", 2000))
+except ValueError:
+    logger.warning("🗣️⚠️ Invalid LLM_HISTORY_TOKEN_BUDGET env var. Using default: 2000")
+    LLM_HISTORY_TOKEN_BUDGET = 2000
+# Fold turns that drop out of the history window into a rolling summary instead of discarding them
+LLM_HISTORY_SUMMARY = os.getenv("LLM_HISTORY_SUMMARY", "1").lower() not in ("0", "false", "no")
+
+HISTORY_SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a spoken conversation between a user and an assistant. "
+    "Merge the previous summary and the new conversation excerpt into one updated summary. "
+    "Keep names, facts, preferences and open questions, drop small talk. "
+    "Answer with the summary only, in at most 120 words."
+)
+
 orpheus_prompt_addon_normal = """
 When expressing emotions, you are ONLY allowed to use the following exact tags (including the spaces):
 " <laugh> ", " <chuckle> ", " <sigh> ", " <cough> ", " <sniffle> ", " <groan> ", " <yawn> ", and " <gasp> ".
@@ -71,18 +106,24 @@ class RunningGeneration:
     the status of LLM and TTS stages (quick and final), threading events for synchronization,
     queues for audio chunks, and text buffers for partial/complete answers.
     """
-    def __init__(self, id: int):
+    def __init__(self, id: int, on_audio_chunk: Optional[Callable[[], None]] = None):
         """
         Initializes a RunningGeneration state object.
 
         Args:
             id: A unique identifier for this generation attempt.
+            on_audio_chunk: Optional callback fired (from the TTS worker thread)
+                            whenever an audio chunk is put into `audio_chunks`.
         """
         self.id: int = id # Store the generation ID
         self.text: Optional[str] = None
         self.timestamp = time.time()
+        self.context_key = None # Identifies the conversation history the answer is based on
+        self.first_audio_time: Optional[float] = None
+        self.audio_finished_time: Optional[float] = None
 
         self.llm_generator = None
+        self.llm_request_id: Optional[str] = None # Lets an abort cancel only this generation's LLM stream
         self.llm_finished: bool = False
         self.llm_finished_event = threading.Event()
         self.llm_aborted: bool = False
@@ -94,10 +135,12 @@ class RunningGeneration:
         self.tts_quick_started: bool = False
 
         self.tts_quick_allowed_event = threading.Event()
-        self.audio_chunks = Queue()
+        self.audio_chunks = NotifyingQueue(on_put=on_audio_chunk, record=True) # Recorded for speculative reuse
         self.audio_quick_finished: bool = False
         self.audio_quick_aborted: bool = False
         self.tts_quick_finished_event = threading.Event()
+        self.quick_audio_chunk_count: int = 0 # Recorded chunks belonging to the quick answer
+        self.quick_audio_finished_time: Optional[float] = None
 
         self.abortion_started: bool = False
 
@@ -126,6 +169,9 @@ class SpeechPipelineManager:
             llm_model: str = "hf.co/bartowski/huihui-ai_Mistral-Small-24B-Instruct-2501-abliterated-GGUF:Q4_K_M",
             no_think: bool = False,
             orpheus_model: str = "orpheus-3b-0.1-ft-Q8_0-GGUF/orpheus-3b-0.1-ft-q8_0.gguf",
+            audio_processor: Optional[AudioProcessor] = None,
+            llm_inference_time: Optional[float] = None,
+            session_id: Optional[int] = None,
         ):
         """
         Initializes the SpeechPipelineManager.
@@ -140,25 +186,35 @@ class SpeechPipelineManager:
             llm_model: The specific LLM model identifier.
             no_think: If True, removes specific thinking tags from LLM output.
             orpheus_model: Path or identifier for the Orpheus TTS model, if used.
+            audio_processor: An existing AudioProcessor to share with other pipeline
+                             instances. If None, a new one (and TTS engine) is created.
+            llm_inference_time: A previously measured LLM inference time in ms. If
+                                provided, the LLM prewarm and measurement are skipped.
+            session_id: The voice session this pipeline belongs to. Tags the trace
+                        events of the pipeline, its LLM and its TTS requests.
         """
         self.tts_engine = tts_engine
         self.llm_provider = llm_provider
         self.llm_model = llm_model
         self.no_think = no_think
         self.orpheus_model = orpheus_model
+        self.session_id = session_id
 
         self.system_prompt = system_prompt
         if tts_engine == "orpheus":
             self.system_prompt += f"\n{orpheus_prompt_addon}"
 
         # --- Instance Dependencies ---
-        self.audio = AudioProcessor(
-            engine=self.tts_engine,
-            orpheus_model=self.orpheus_model
-        )
-        self.audio.on_first_audio_chunk_synthesize = self.on_first_audio_chunk_synthesize
+        if audio_processor is None:
+            audio_processor = AudioProcessor(
+                engine=self.tts_engine,
+                orpheus_model=self.orpheus_model
+            )
+        self.audio = audio_processor
         self.text_similarity = TextSimilarity(focus='end', n_words=5)
         self.text_context = TextContext()
+        self.speculation_cache = SpeculationCache(self.text_similarity, max_branches=SPECULATION_CACHE_BRANCHES)
+        self.speculation_stats_reported = self.speculation_cache.stats()
         self.generation_counter: int = 0
         self.abort_lock = threading.Lock()
         self.llm = LLM(
@@ -166,13 +222,20 @@ class SpeechPipelineManager:
             model=self.llm_model,
             system_prompt=self.system_prompt,
             no_think=no_think,
+            session_id=session_id,
         )
-        self.llm.prewarm()
-        self.llm_inference_time = self.llm.measure_inference_time()
-        logger.debug(f"🗣️🧠🕒 LLM inference time: {self.llm_inference_time:.2f}ms")
+        if llm_inference_time is None:
+            self.llm.prewarm()
+            llm_inference_time = self.llm.measure_inference_time()
+        self.llm_inference_time = llm_inference_time
+        logger.debug("🗣️🧠🕒 LLM inference time: %.2fms", self.llm_inference_time)
 
         # --- State ---
         self.history = []
+        self.history_window = HistoryWindow(
+            LLM_HISTORY_TOKEN_BUDGET,
+            summarize=self._summarize_history if LLM_HISTORY_SUMMARY else None,
+        )
         self.requests_queue = Queue()
         self.running_generation: Optional[RunningGeneration] = None
 
@@ -183,14 +246,17 @@ class SpeechPipelineManager:
         self.stop_everything_event = threading.Event()
         self.stop_llm_request_event = threading.Event()
         self.stop_llm_finished_event = threading.Event()
-        self.stop_tts_quick_request_event = threading.Event()
+        self.stop_tts_quick_request_event = LinkedEvent() # Wakes a waiting synthesis immediately on abort
         self.stop_tts_quick_finished_event = threading.Event()
-        self.stop_tts_final_request_event = threading.Event()
+        self.stop_tts_final_request_event = LinkedEvent()
         self.stop_tts_final_finished_event = threading.Event()
         self.abort_completed_event = threading.Event()
         self.abort_block_event = threading.Event()
         self.abort_block_event.set()
         self.check_abort_lock = threading.Lock()
+        self.generation_switch_lock = threading.RLock() # Serializes starting/promoting generations
+        self.history_prefill_requested_event = threading.Event()
+        self.prefilled_history_key = None # Identifies the history the backend has cached
 
         # --- State Flags ---
         self.llm_generation_active = False
@@ -203,16 +269,21 @@ class SpeechPipelineManager:
         self.llm_inference_thread = threading.Thread(target=self._llm_inference_worker, name="LLMProcessingThread", daemon=True)
         self.tts_quick_inference_thread = threading.Thread(target=self._tts_quick_inference_worker, name="TTSQuickProcessingThread", daemon=True)
         self.tts_final_inference_thread = threading.Thread(target=self._tts_final_inference_worker, name="TTSFinalProcessingThread", daemon=True)
+        self.history_prefill_thread = threading.Thread(target=self._history_prefill_worker, name="LLMPrefillThread", daemon=True)
 
         self.request_processing_thread.start()
         self.llm_inference_thread.start()
         self.tts_quick_inference_thread.start()
         self.tts_final_inference_thread.start()
+        if LLM_HISTORY_PREFILL:
+            self.history_prefill_thread.start()
 
         self.on_partial_assistant_text: Optional[Callable[[str], None]] = None
+        # Called from worker threads whenever audio output state changes (chunk queued, first chunk ready, TTS finished)
+        self.on_audio_activity: Optional[Callable[[], None]] = None
 
         self.full_output_pipeline_latency = self.llm_inference_time + self.audio.tts_inference_time
-        logger.info(f"🗣️⏱️ Full output pipeline latency: {self.full_output_pipeline_latency:.2f}ms (LLM: {self.llm_inference_time:.2f}ms, TTS: {self.audio.tts_inference_time:.2f}ms)")
+        logger.info("🗣️⏱️ Full output pipeline latency: %.2fms (LLM: %.2fms, TTS: %.2fms)", self.full_output_pipeline_latency, self.llm_inference_time, self.audio.tts_inference_time)
 
         logger.info("🗣️🚀 SpeechPipelineManager initialized and workers started.")
 
@@ -226,6 +297,12 @@ class SpeechPipelineManager:
         """
         return self.running_generation is not None and not self.running_generation.abortion_started
 
+    def _notify_audio_activity(self):
+        """Wakes up the consumer of the audio output (if one registered `on_audio_activity`)."""
+        callback = self.on_audio_activity
+        if callback:
+            callback()
+
     def _request_processing_worker(self):
         """
         Worker thread target that processes requests from the `requests_queue`.
@@ -246,32 +323,32 @@ class SpeechPipelineManager:
                     # Simple timestamp-based deduplication for identical consecutive requests
                     if self.previous_request.data == request.data and isinstance(request.data, str):
                         if request.timestamp - self.previous_request.timestamp < 2:
-                            logger.info(f"🗣️🗑️ Request Processor: Skipping duplicate request - {request.action}")
+                            logger.info("🗣️🗑️ Request Processor: Skipping duplicate request - %s", request.action)
                             continue
 
                 # Drain the queue to get the most recent request
                 while not self.requests_queue.empty():
                     skipped_request = self.requests_queue.get(False)  # Non-blocking get
-                    logger.debug(f"🗣️🗑️ Request Processor: Skipping older request - {skipped_request.action}")
+                    logger.debug("🗣️🗑️ Request Processor: Skipping older request - %s", skipped_request.action)
                     request = skipped_request # Keep the last one we retrieved
                 
                 self.abort_block_event.wait() # Wait if an abort is in progress
-                logger.debug(f"🗣️🔄 Request Processor: Processing most recent request - {request.action}")
+                logger.debug("🗣️🔄 Request Processor: Processing most recent request - %s", request.action)
                 
                 if request.action == "prepare":
                     self.process_prepare_generation(request.data)
                     self.previous_request = request
                 elif request.action == "finish":
                      # Note: 'finish' action currently has no specific handling logic here.
-                     logger.info(f"🗣️🤷 Request Processor: Received 'finish' action (currently no-op).")
+                     logger.info("🗣️🤷 Request Processor: Received 'finish' action (currently no-op).")
                      self.previous_request = request # Still update previous_request
                 else:
-                    logger.warning(f"🗣️❓ Request Processor: Unknown action '{request.action}'")
+                    logger.warning("🗣️❓ Request Processor: Unknown action '%s'", request.action)
 
             except Empty:
                 continue
             except Exception as e:
-                logger.exception(f"🗣️💥 Request Processor: Error: {e}")
+                logger.exception("🗣️💥 Request Processor: Error: %s", e)
         logger.info("🗣️🏁 Request Processor: Shutting down.")
 
     def on_first_audio_chunk_synthesize(self):
@@ -284,6 +361,9 @@ class SpeechPipelineManager:
         logger.info("🗣️🎶 First audio chunk synthesized. Setting TTS quick allowed event.")
         if self.running_generation:
             self.running_generation.quick_answer_first_chunk_ready = True
+            if self.running_generation.first_audio_time is None:
+                self.running_generation.first_audio_time = time.time()
+        self._notify_audio_activity()
 
     def preprocess_chunk(self, chunk: str) -> str:
         """
@@ -313,7 +393,7 @@ class SpeechPipelineManager:
         Returns:
             The text with specified leading patterns removed.
         """
-        patterns_to_remove = ["<think>", "</think>", "\n", " "]
+        patterns_to_remove = QUICK_ANSWER_LEADING_PATTERNS
         previous_text = None
         current_text = text
         
@@ -327,14 +407,93 @@ class SpeechPipelineManager:
         
         return current_text
 
+    def _history_prefill_worker(self):
+        """
+        Worker thread target that prefills the LLM's KV cache with the conversation history.
+
+        Waits for `history_prefill_requested_event` (set by `prefill_history` while
+        the user speaks) and sends the current history to the backend as a
+        zero-token request via `LLM.prefill_history`, so the real request only has
+        to process the new user text. A history that was already prefilled is
+        skipped, as is the request if a generation is already running.
+        Runs until `shutdown_event` is set.
+        """
+        logger.info("🗣️🔥 History Prefill Worker: Starting...")
+        while not self.shutdown_event.is_set():
+            if not self.history_prefill_requested_event.wait(timeout=1.0):
+                continue
+            self.history_prefill_requested_event.clear()
+
+            history = self._llm_history()
+            key = self._history_key(history)
+            if not history or key == self.prefilled_history_key:
+                continue
+            if self.llm_generation_active or self.running_generation is not None:
+                logger.debug("🗣️🔥 History Prefill Worker: Generation already running, skipping prefill.")
+                continue
+
+            if self.llm.prefill_history(history):
+                self.prefilled_history_key = key
+        logger.info("🗣️🔥 History Prefill Worker: Shutting down.")
+
+    @staticmethod
+    def _history_key(history: list) -> tuple:
+        """
+        Identifies a history by its length, first and last message.
+
+        The last message changes with every turn, the first one when the history
+        window evicts turns or its rolling summary changes.
+        """
+        if not history:
+            return (0, None)
+        return (len(history), history[0].get("content"), history[-1].get("role"), history[-1].get("content"))
+
+    def _llm_history(self) -> list:
+        """Returns the part of the conversation history sent to the LLM (see `HistoryWindow`)."""
+        return self.history_window.messages(self.history)
+
+    def _summarize_history(self, previous_summary: str, messages: list) -> str:
+        """
+        Folds conversation messages into the rolling history summary.
+
+        Runs on the history window's summary thread, never on the request path.
+
+        Args:
+            previous_summary: The current summary (empty for the first fold).
+            messages: The messages that were evicted from the history window.
+
+        Returns:
+            The updated summary text.
+
+        Raises:
+            GenerationCancelledError: If the request was cancelled, so a truncated
+                summary is never stored.
+        """
+        excerpt = "\n".join(f"{m.get('role')}: {m.get('content')}" for m in messages)
+        prompt = f"Previous summary:\n{previous_summary or '(none)'}\n\nConversation excerpt:\n{excerpt}"
+        summary_history = [
+            {"role": "system", "content": HISTORY_SUMMARY_INSTRUCTIONS},
+            {"role": "user", "content": prompt},
+        ]
+        summary = "".join(self.llm.generate(
+            text="",
+            history=summary_history,
+            use_system_prompt=False,
+            request_id=f"summary-{uuid.uuid4()}", # Never matches a generation's id, aborts leave it running
+            raise_on_cancel=True,
+            temperature=0.2,
+        ))
+        return re.sub(r"<think>.*?</think>", "", summary, flags=re.DOTALL)
+
     def _llm_inference_worker(self):
         """
         Worker thread target that handles LLM inference for a generation.
 
         Waits for `generator_ready_event`. Once signaled, it iterates through the
         LLM generator provided in `running_generation`. It accumulates the generated
-        text, optionally cleans it (`no_think`), checks for a natural sentence boundary
-        to define the `quick_answer` using `TextContext`. If a quick answer is found,
+        text, optionally cleans its start (`no_think`), checks for a natural sentence boundary
+        to define the `quick_answer` using an incremental `StreamingTextContext` (each
+        token is scanned once). If a quick answer is found,
         it signals `llm_answer_ready_event`. Handles stop requests (`stop_llm_request_event`)
         and signals completion/abortion via `stop_llm_finished_event` and internal flags.
         Runs until `shutdown_event` is set.
@@ -364,19 +523,22 @@ class SpeechPipelineManager:
                 continue # Go back to waiting
 
             gen_id = current_gen.id
-            logger.info(f"🗣️🧠🔄 [Gen {gen_id}] LLM Worker: Processing generation...")
+            logger.info("🗣️🧠🔄 [Gen %s] LLM Worker: Processing generation...", gen_id)
 
             # Set state for active generation
             self.llm_generation_active = True
             self.stop_llm_finished_event.clear()
             start_time = time.time()
             token_count = 0
+            # Carries the boundary scan across tokens instead of rescanning the whole answer
+            context_detector = self.text_context.stream()
+            leading_settled = not self.no_think
 
             try:
                 for chunk in current_gen.llm_generator:
                     # Check for stop *before* processing the chunk
                     if self.stop_llm_request_event.is_set():
-                        logger.info(f"🗣️🧠❌ [Gen {gen_id}] LLM Worker: Stop request detected during iteration.")
+                        logger.info("🗣️🧠❌ [Gen %s] LLM Worker: Stop request detected during iteration.", gen_id)
                         self.stop_llm_request_event.clear()
                         current_gen.llm_aborted = True
                         break # Exit the generator loop
@@ -384,17 +546,25 @@ class SpeechPipelineManager:
                     chunk = self.preprocess_chunk(chunk)
                     token_count += 1
                     current_gen.quick_answer += chunk
-                    if self.no_think:
+                    new_text = chunk
+                    if not leading_settled:
+                        # Only the start of the answer is cleaned, stop once it can no longer change
                         current_gen.quick_answer = self.clean_quick_answer(current_gen.quick_answer)
+                        leading_settled = is_leading_settled(current_gen.quick_answer, QUICK_ANSWER_LEADING_PATTERNS)
+                        context_detector.reset()
+                        new_text = current_gen.quick_answer
 
                     if token_count == 1:
-                        logger.info(f"🗣️🧠⏱️ [Gen {gen_id}] LLM Worker: TTFT: {(time.time() - start_time):.4f}s")
+                        logger.info("🗣️🧠⏱️ [Gen %s] LLM Worker: TTFT: %.4fs", gen_id, time.time() - start_time)
+                        tracer.complete("llm_ttft", "llm", start_time, session=self.session_id, gen=gen_id)
+                        LLM_TTFT.observe(time.time() - start_time)
 
                     # Check for quick answer boundary only if not already provided
                     if not current_gen.quick_answer_provided:
-                        context, overhang = self.text_context.get_context(current_gen.quick_answer)
+                        context, overhang = context_detector.feed(new_text)
                         if context:
-                            logger.info(f"🗣️🧠✔️ [Gen {gen_id}] LLM Worker:  {Colors.apply('QUICK ANSWER FOUND:').magenta} {context}, overhang: {overhang}")
+                            logger.info("🗣️🧠✔️ [Gen %s] LLM Worker:  {magenta}QUICK ANSWER FOUND:{reset} %s, overhang: %s", gen_id, context, overhang)
+                            tracer.complete("llm_quick_answer", "llm", start_time, session=self.session_id, gen=gen_id, tokens=token_count, text=context)
                             current_gen.quick_answer = context
                             if self.on_partial_assistant_text:
                                 self.on_partial_assistant_text(current_gen.quick_answer)
@@ -406,12 +576,12 @@ class SpeechPipelineManager:
 
 
                 # Loop finished naturally or broke due to stop request
-                logger.info(f"🗣️🧠🏁 [Gen {gen_id}] LLM Worker: Generator loop finished%s" % (" (Aborted)" if current_gen.llm_aborted else ""))
+                logger.info("🗣️🧠🏁 [Gen %s] LLM Worker: Generator loop finished%s", gen_id, " (Aborted)" if current_gen.llm_aborted else "")
 
                 # If loop finished naturally and no quick answer was ever found (e.g., short response)
                 # Set the whole thing as the quick answer.
                 if not current_gen.llm_aborted and not current_gen.quick_answer_provided:
-                    logger.info(f"🗣️🧠✔️ [Gen {gen_id}] LLM Worker: No context boundary found, using full response as quick answer.")
+                    logger.info("🗣️🧠✔️ [Gen %s] LLM Worker: No context boundary found, using full response as quick answer.", gen_id)
                     # quick_answer already contains the full text
                     current_gen.quick_answer_provided = True # Mark as provided
                     if self.on_partial_assistant_text:
@@ -419,7 +589,7 @@ class SpeechPipelineManager:
                     self.llm_answer_ready_event.set() # Signal TTS quick worker
 
             except Exception as e:
-                logger.exception(f"🗣️🧠💥 [Gen {gen_id}] LLM Worker: Error during generation: {e}")
+                logger.exception("🗣️🧠💥 [Gen %s] LLM Worker: Error during generation: %s", gen_id, e)
                 current_gen.llm_aborted = True # Mark as aborted on error
             finally:
                 # Clean up state regardless of how the loop/try block exited
@@ -428,13 +598,13 @@ class SpeechPipelineManager:
 
                 if current_gen.llm_aborted:
                     # If LLM was aborted, ensure TTS (both quick and final) is also stopped
-                    logger.info(f"🗣️🧠❌ [Gen {gen_id}] LLM Aborted, requesting TTS quick/final stop.")
+                    logger.info("🗣️🧠❌ [Gen %s] LLM Aborted, requesting TTS quick/final stop.", gen_id)
                     self.stop_tts_quick_request_event.set()
                     self.stop_tts_final_request_event.set()
                     # Wake up TTS quick worker if it's waiting
                     self.llm_answer_ready_event.set()
 
-                logger.info(f"🗣️🧠🏁 [Gen {gen_id}] LLM Worker: Finished processing cycle.")
+                logger.info("🗣️🧠🏁 [Gen %s] LLM Worker: Finished processing cycle.", gen_id)
 
                 current_gen.llm_finished = True
                 current_gen.llm_finished_event.set()
@@ -468,51 +638,52 @@ class SpeechPipelineManager:
         with self.check_abort_lock:
             if self.running_generation:
                 current_gen_id_str = f"Gen {self.running_generation.id}"
-                logger.info(f"🗣️🛑❓ {current_gen_id_str} Abort check requested (reason: {abort_reason})")
+                logger.info("🗣️🛑❓ %s Abort check requested (reason: %s)", current_gen_id_str, abort_reason)
 
                 if self.running_generation.abortion_started:
-                    logger.info(f"🗣️🛑⏳ {current_gen_id_str} Active generation is already aborting, waiting to finish (if requested).")
+                    logger.info("🗣️🛑⏳ %s Active generation is already aborting, waiting to finish (if requested).", current_gen_id_str)
 
                     # Only wait if wait_for_finish is True
                     if wait_for_finish:
                         start_time = time.time()
                         # Wait using the abort_completed_event for better synchronization
                         completed = self.abort_completed_event.wait(timeout=5.0) # Use the event from abort_generation
+                        ABORT_WAIT.observe(time.time() - start_time)
 
                         if not completed:
-                             logger.error(f"🗣️🛑💥💥 {current_gen_id_str} Timeout waiting for ongoing abortion to complete. State inconsistency possible!")
+                             logger.error("🗣️🛑💥💥 %s Timeout waiting for ongoing abortion to complete. State inconsistency possible!", current_gen_id_str)
                              # Force clear it just in case, though this indicates a deeper issue.
                              self.running_generation = None
                         elif self.running_generation is not None:
-                            logger.error(f"🗣️🛑💥💥 {current_gen_id_str} Abortion completed event set, but running_generation still exists. State inconsistency likely!")
+                            logger.error("🗣️🛑💥💥 %s Abortion completed event set, but running_generation still exists. State inconsistency likely!", current_gen_id_str)
                             # Force clear it.
                             self.running_generation = None
                         else:
-                            logger.info(f"🗣️🛑✅ {current_gen_id_str} Ongoing abortion finished.")
+                            logger.info("🗣️🛑✅ %s Ongoing abortion finished.", current_gen_id_str)
                     else:
-                        logger.info(f"🗣️🛑🏃 {current_gen_id_str} Not waiting for ongoing abortion as wait_for_finish=False")
+                        logger.info("🗣️🛑🏃 %s Not waiting for ongoing abortion as wait_for_finish=False", current_gen_id_str)
 
                     return True # An abort was processed (waited for)
                 else:
                     # No abortion in progress, check similarity
-                    logger.info(f"🗣️🛑🤔 {current_gen_id_str} Found active generation, checking text similarity.")
+                    logger.info("🗣️🛑🤔 %s Found active generation, checking text similarity.", current_gen_id_str)
                     try:
                          # Ensure running_generation.text is not None before comparison
                         if self.running_generation.text is None:
-                            logger.warning(f"🗣️🛑❓ {current_gen_id_str} Running generation text is None, cannot compare similarity. Assuming different.")
+                            logger.warning("🗣️🛑❓ %s Running generation text is None, cannot compare similarity. Assuming different.", current_gen_id_str)
                             similarity = 0.0
                         else:
                             similarity = self.text_similarity.calculate_similarity(self.running_generation.text, txt)
                     except Exception as e:
-                        logger.warning(f"🗣️🛑💥 {current_gen_id_str} Error calculating similarity: {e}. Assuming different.")
+                        logger.warning("🗣️🛑💥 %s Error calculating similarity: %s. Assuming different.", current_gen_id_str, e)
                         similarity = 0.0 # Assume different on error
 
                     if similarity >= 0.95:
-                        logger.info(f"🗣️🛑🙅 {current_gen_id_str} Text ('{txt[:30]}...') too similar ({similarity:.2f}) to current '{self.running_generation.text[:30] if self.running_generation.text else 'None'}...'. Ignoring.")
+                        logger.info("🗣️🛑🙅 %s Text ('%.30s...') too similar (%.2f) to current '%.30s...'. Ignoring.", current_gen_id_str, txt, similarity, self.running_generation.text)
                         return False # No abort needed
 
                     # Texts are different enough, initiate abort
-                    logger.info(f"🗣️🛑🚀 {current_gen_id_str} Text ('{txt[:30]}...') different enough ({similarity:.2f}) from '{self.running_generation.text[:30] if self.running_generation.text else 'None'}...'. Requesting synchronous abort.")
+                    logger.info("🗣️🛑🚀 %s Text ('%.30s...') different enough (%.2f) from '%.30s...'. Requesting synchronous abort.", current_gen_id_str, txt, similarity, self.running_generation.text)
                     start_time = time.time()
                     # Call the synchronous public abort method - THIS IS KEY
                     self.abort_generation(wait_for_completion=wait_for_finish, timeout=7.0, reason=f"check_abort found different text ({abort_reason})")
@@ -520,11 +691,11 @@ class SpeechPipelineManager:
                     if wait_for_finish:
                          # Check state *after* waiting for the abort call
                         if self.running_generation is not None:
-                            logger.error(f"🗣️🛑💥💥 {current_gen_id_str} !!! Abort call completed but running_generation is still not None. State inconsistency likely!")
+                            logger.error("🗣️🛑💥💥 %s !!! Abort call completed but running_generation is still not None. State inconsistency likely!", current_gen_id_str)
                             # Force clear it.
                             self.running_generation = None
                         else:
-                            logger.info(f"🗣️🛑✅ {current_gen_id_str} Synchronous abort completed in {time.time() - start_time:.2f}s.")
+                            logger.info("🗣️🛑✅ %s Synchronous abort completed in %.2fs.", current_gen_id_str, time.time() - start_time)
 
                     return True # An abort was processed (initiated)
             else:
@@ -567,11 +738,11 @@ class SpeechPipelineManager:
 
             # Double-check if this generation was aborted *just* before we got here
             if current_gen.audio_quick_aborted or current_gen.abortion_started:
-                logger.info(f"🗣️👄❌ [Gen {current_gen.id}] Quick TTS Worker: Generation already marked as aborted. Skipping.")
+                logger.info("🗣️👄❌ [Gen %s] Quick TTS Worker: Generation already marked as aborted. Skipping.", current_gen.id)
                 continue
 
             gen_id = current_gen.id
-            logger.info(f"🗣️👄🔄 [Gen {gen_id}] Quick TTS Worker: Processing TTS for quick answer...")
+            logger.info("🗣️👄🔄 [Gen %s] Quick TTS Worker: Processing TTS for quick answer...", gen_id)
 
             # Set state for active generation
             self.tts_quick_generation_active = True
@@ -586,7 +757,7 @@ class SpeechPipelineManager:
             allowed_to_speak = False
             start_wait_time = time.time()
             wait_timeout = 5.0 # Example timeout
-            logger.debug(f"🗣️👄⏳ [Gen {gen_id}] Quick TTS Worker: Waiting for tts_quick_allowed_event (timeout: {wait_timeout}s)...")
+            logger.debug("🗣️👄⏳ [Gen %s] Quick TTS Worker: Waiting for tts_quick_allowed_event (timeout: %ss)...", gen_id, wait_timeout)
             # TODO: Determine if this event is actually used/needed. If not, remove the wait.
             # If it IS needed, ensure something sets it. Currently, it might always timeout.
             # For now, we'll proceed even if it times out, assuming it's optional or not yet implemented.
@@ -602,43 +773,54 @@ class SpeechPipelineManager:
             try:
                 # Check again for aborts right before synthesis call
                 if self.stop_tts_quick_request_event.is_set() or current_gen.abortion_started:
-                     logger.info(f"🗣️👄❌ [Gen {gen_id}] Quick TTS Worker: Aborting TTS synthesis due to stop request or abortion flag.")
+                     logger.info("🗣️👄❌ [Gen %s] Quick TTS Worker: Aborting TTS synthesis due to stop request or abortion flag.", gen_id)
                      current_gen.audio_quick_aborted = True
                 else:
-                    logger.info(f"🗣️👄🎶 [Gen {gen_id}] Quick TTS Worker: Synthesizing: '{current_gen.quick_answer[:50]}...'")
-                    completed = self.audio.synthesize(
-                        current_gen.quick_answer,
-                        current_gen.audio_chunks,
-                        self.stop_tts_quick_request_event # Pass the event for the synthesizer to check
-                    )
+                    logger.info("🗣️👄🎶 [Gen %s] Quick TTS Worker: Synthesizing: '%.50s...'", gen_id, current_gen.quick_answer)
+                    synthesis_start_time = time.time()
+                    def on_first_quick_audio_chunk():
+                        tracer.complete("tts_quick_ttfa", "tts", synthesis_start_time, session=self.session_id, gen=gen_id)
+                        self.on_first_audio_chunk_synthesize()
+                    with tracer.span("tts_quick", "tts", session=self.session_id, gen=gen_id, chars=len(current_gen.quick_answer)) as span:
+                        completed = self.audio.synthesize(
+                            current_gen.quick_answer,
+                            current_gen.audio_chunks,
+                            self.stop_tts_quick_request_event, # Pass the event for the synthesizer to check
+                            on_first_audio_chunk=on_first_quick_audio_chunk,
+                            session_id=self.session_id,
+                        )
+                        span.set(completed=completed)
 
                     if not completed:
                         # Synthesis was stopped by the stop_tts_quick_request_event
-                        logger.info(f"🗣️👄❌ [Gen {gen_id}] Quick TTS Worker: Synthesis stopped via event.")
+                        logger.info("🗣️👄❌ [Gen %s] Quick TTS Worker: Synthesis stopped via event.", gen_id)
                         current_gen.audio_quick_aborted = True
                     else:
-                        logger.info(f"🗣️👄✅ [Gen {gen_id}] Quick TTS Worker: Synthesis completed successfully.")
+                        logger.info("🗣️👄✅ [Gen %s] Quick TTS Worker: Synthesis completed successfully.", gen_id)
 
 
             except Exception as e:
-                logger.exception(f"🗣️👄💥 [Gen {gen_id}] Quick TTS Worker: Error during synthesis: {e}")
+                logger.exception("🗣️👄💥 [Gen %s] Quick TTS Worker: Error during synthesis: %s", gen_id, e)
                 current_gen.audio_quick_aborted = True # Mark as aborted on error
             finally:
                 # Clean up state regardless of how the try block exited
                 self.tts_quick_generation_active = False
                 self.stop_tts_quick_finished_event.set() # Signal that this worker's processing attempt is done
-                logger.info(f"🗣️👄🏁 [Gen {gen_id}] Quick TTS Worker: Finished processing cycle.")
+                logger.info("🗣️👄🏁 [Gen %s] Quick TTS Worker: Finished processing cycle.", gen_id)
 
                 # Check if synthesis completed naturally or was stopped/aborted
                 if current_gen.audio_quick_aborted or self.stop_tts_quick_request_event.is_set():
-                    logger.info(f"🗣️👄❌ [Gen {gen_id}] Quick TTS Marked as Aborted/Incomplete.")
+                    logger.info("🗣️👄❌ [Gen %s] Quick TTS Marked as Aborted/Incomplete.", gen_id)
                     self.stop_tts_quick_request_event.clear() # Clear the request if it was set
                     current_gen.audio_quick_aborted = True # Ensure flag is set
                 else:
-                    logger.info(f"🗣️👄✅ [Gen {gen_id}] Quick TTS Finished Successfully.")
+                    logger.info("🗣️👄✅ [Gen %s] Quick TTS Finished Successfully.", gen_id)
+                    current_gen.quick_audio_chunk_count = len(current_gen.audio_chunks.recorded)
+                    current_gen.quick_audio_finished_time = time.time()
                     current_gen.tts_quick_finished_event.set() # Signal natural completion
 
                 current_gen.audio_quick_finished = True # Mark quick audio phase as done (even if aborted)
+                self._notify_audio_activity()
 
     def _tts_final_inference_worker(self):
         """
@@ -675,37 +857,37 @@ class SpeechPipelineManager:
                 #logger.debug(f"🗣️👄🙅 [Gen {gen_id}] Final TTS Worker: Quick TTS was aborted, skipping final TTS.")
                 continue
             if not current_gen.quick_answer_provided:
-                 logger.debug(f"🗣️👄🙅 [Gen {gen_id}] Final TTS Worker: Quick answer boundary was not found, skipping final TTS (quick TTS handled everything).")
+                 logger.debug("🗣️👄🙅 [Gen %s] Final TTS Worker: Quick answer boundary was not found, skipping final TTS (quick TTS handled everything).", gen_id)
                  continue
             if current_gen.abortion_started:
-                 logger.debug(f"🗣️👄🙅 [Gen {gen_id}] Final TTS Worker: Generation is aborting, skipping final TTS.")
+                 logger.debug("🗣️👄🙅 [Gen %s] Final TTS Worker: Generation is aborting, skipping final TTS.", gen_id)
                  continue
 
             # --- Conditions met, start final TTS ---
-            logger.info(f"🗣️👄🔄 [Gen {gen_id}] Final TTS Worker: Processing final TTS...")
+            logger.info("🗣️👄🔄 [Gen %s] Final TTS Worker: Processing final TTS...", gen_id)
 
             def get_generator():
                 """Yields remaining text chunks for final TTS synthesis."""
                 # Yield overhang first
                 if current_gen.quick_answer_overhang:
                     preprocessed_overhang = self.preprocess_chunk(current_gen.quick_answer_overhang)
-                    logger.debug(f"🗣️👄< [Gen {gen_id}] Final TTS Gen: Yielding overhang: '{preprocessed_overhang[:50]}...'")
+                    logger.debug("🗣️👄< [Gen %s] Final TTS Gen: Yielding overhang: '%.50s...'", gen_id, preprocessed_overhang)
                     current_gen.final_answer += preprocessed_overhang # Add preprocessed version
                     if self.on_partial_assistant_text:
-                         logger.debug(f"🗣️👄< [Gen {gen_id}] Final TTS Worker on_partial_assistant_text: Sending overhang.")
+                         logger.debug("🗣️👄< [Gen %s] Final TTS Worker on_partial_assistant_text: Sending overhang.", gen_id)
                          try:
                             self.on_partial_assistant_text(current_gen.quick_answer + current_gen.final_answer)
                          except Exception as cb_e:
-                             logger.warning(f"🗣️💥 Callback error in on_partial_assistant_text (overhang): {cb_e}")
+                             logger.warning("🗣️💥 Callback error in on_partial_assistant_text (overhang): %s", cb_e)
                     yield preprocessed_overhang
 
                 # Yield remaining chunks from LLM generator
-                logger.debug(f"🗣️👄< [Gen {gen_id}] Final TTS Gen: Yielding remaining LLM chunks...")
+                logger.debug("🗣️👄< [Gen %s] Final TTS Gen: Yielding remaining LLM chunks...", gen_id)
                 try:
                     for chunk in current_gen.llm_generator:
                          # Check for stop *before* processing chunk
                          if self.stop_tts_final_request_event.is_set():
-                             logger.info(f"🗣️👄❌ [Gen {gen_id}] Final TTS Gen: Stop request detected during LLM iteration.")
+                             logger.info("🗣️👄❌ [Gen %s] Final TTS Gen: Stop request detected during LLM iteration.", gen_id)
                              current_gen.audio_final_aborted = True
                              break # Stop yielding
 
@@ -716,12 +898,12 @@ class SpeechPipelineManager:
                             try:
                                  self.on_partial_assistant_text(current_gen.quick_answer + current_gen.final_answer)
                             except Exception as cb_e:
-                                 logger.warning(f"🗣️💥 Callback error in on_partial_assistant_text (final chunk): {cb_e}")
+                                 logger.warning("🗣️💥 Callback error in on_partial_assistant_text (final chunk): %s", cb_e)
 
                          yield preprocessed_chunk
-                    logger.debug(f"🗣️👄< [Gen {gen_id}] Final TTS Gen: Finished iterating LLM chunks.")
+                    logger.debug("🗣️👄< [Gen %s] Final TTS Gen: Finished iterating LLM chunks.", gen_id)
                 except Exception as gen_e:
-                     logger.exception(f"🗣️👄💥 [Gen {gen_id}] Final TTS Gen: Error iterating LLM generator: {gen_e}")
+                     logger.exception("🗣️👄💥 [Gen %s] Final TTS Gen: Error iterating LLM generator: %s", gen_id, gen_e)
                      current_gen.audio_final_aborted = True # Mark as aborted on error
 
             # Set state for active generation
@@ -731,41 +913,47 @@ class SpeechPipelineManager:
             current_gen.tts_final_finished_event.clear() # Reset TTS finish marker
 
             try:
-                logger.info(f"🗣️👄🎶 [Gen {gen_id}] Final TTS Worker: Synthesizing remaining text...")
-                completed = self.audio.synthesize_generator(
-                    get_generator(),
-                    current_gen.audio_chunks,
-                    self.stop_tts_final_request_event # Pass the event for the synthesizer to check
-                )
+                logger.info("🗣️👄🎶 [Gen %s] Final TTS Worker: Synthesizing remaining text...", gen_id)
+                with tracer.span("tts_final", "tts", session=self.session_id, gen=gen_id) as span:
+                    completed = self.audio.synthesize_generator(
+                        get_generator(),
+                        current_gen.audio_chunks,
+                        self.stop_tts_final_request_event, # Pass the event for the synthesizer to check
+                        on_first_audio_chunk=self.on_first_audio_chunk_synthesize,
+                        session_id=self.session_id,
+                    )
+                    span.set(completed=completed, chars=len(current_gen.final_answer))
 
                 if not completed:
-                     logger.info(f"🗣️👄❌ [Gen {gen_id}] Final TTS Worker: Synthesis stopped via event.")
+                     logger.info("🗣️👄❌ [Gen %s] Final TTS Worker: Synthesis stopped via event.", gen_id)
                      current_gen.audio_final_aborted = True
                 else:
-                    logger.info(f"🗣️👄✅ [Gen {gen_id}] Final TTS Worker: Synthesis completed successfully.")
+                    logger.info("🗣️👄✅ [Gen %s] Final TTS Worker: Synthesis completed successfully.", gen_id)
 
 
             except Exception as e:
-                logger.exception(f"🗣️👄💥 [Gen {gen_id}] Final TTS Worker: Error during synthesis: {e}")
+                logger.exception("🗣️👄💥 [Gen %s] Final TTS Worker: Error during synthesis: %s", gen_id, e)
                 current_gen.audio_final_aborted = True # Mark as aborted on error
             finally:
                 # Clean up state regardless of how the try block exited
                 self.tts_final_generation_active = False
                 self.stop_tts_final_finished_event.set() # Signal that this worker's processing attempt is done
                 # logger.info(f"🗣️👄🏁 [Gen {gen_id}] Final TTS Worker: Finished processing cycle. Final answer accumulated: '{current_gen.final_answer[:50]}...'")
-                logger.info(f"🗣️👄🏁 [Gen {gen_id}] Final TTS Worker: Finished processing cycle.")
+                logger.info("🗣️👄🏁 [Gen %s] Final TTS Worker: Finished processing cycle.", gen_id)
 
 
                 # Check if synthesis completed naturally or was stopped
                 if current_gen.audio_final_aborted or self.stop_tts_final_request_event.is_set():
-                    logger.info(f"🗣️👄❌ [Gen {gen_id}] Final TTS Marked as Aborted/Incomplete.")
+                    logger.info("🗣️👄❌ [Gen %s] Final TTS Marked as Aborted/Incomplete.", gen_id)
                     self.stop_tts_final_request_event.clear() # Clear the request if it was set
                     current_gen.audio_final_aborted = True # Ensure flag is set
                 else:
-                    logger.info(f"🗣️👄✅ [Gen {gen_id}] Final TTS Finished Successfully.")
+                    logger.info("🗣️👄✅ [Gen %s] Final TTS Finished Successfully.", gen_id)
+                    current_gen.audio_finished_time = time.time()
                     current_gen.tts_final_finished_event.set() # Signal natural completion
 
                 current_gen.audio_final_finished = True # Mark final audio phase as done (even if aborted)
+                self._notify_audio_activity()
 
 
     # --- Processing Methods ---
@@ -776,7 +964,8 @@ class SpeechPipelineManager:
 
         1. Calls `check_abort` to potentially stop and clean up any existing generation
            if the new input `txt` is significantly different. Waits for the abort to finish.
-        2. Increments the `generation_counter`.
+        2. Increments the `generation_counter`. If a finished speculative branch for
+           a matching text on the same history is cached, promotes it and returns.
         3. Resets state flags and events relevant to starting a new generation.
         4. Creates a new `RunningGeneration` instance with the new ID and input text.
         5. Calls `llm.generate` to get the LLM response generator.
@@ -787,49 +976,165 @@ class SpeechPipelineManager:
         Args:
             txt: The user input text for the new generation.
         """
-        # --- Abort existing generation if necessary ---
-        id_in_spec = self.generation_counter + 1 # Prospective ID for logging
-        aborted = self.check_abort(txt, wait_for_finish=True, abort_reason=f"process_prepare_generation for new id {id_in_spec}")
+        with self.generation_switch_lock:
+            # --- Abort existing generation if necessary ---
+            id_in_spec = self.generation_counter + 1 # Prospective ID for logging
+            aborted = self.check_abort(txt, wait_for_finish=True, abort_reason=f"process_prepare_generation for new id {id_in_spec}")
+
+            # --- State is now guaranteed to be clean (running_generation is None) ---
+            self.generation_counter += 1
+            new_gen_id = self.generation_counter
+            logger.info("🗣️✨🔄 [Gen %s] Preparing new generation for: '%.50s...'", new_gen_id, txt)
+            tracer.instant("prepare_generation", "pipeline", session=self.session_id, gen=new_gen_id, text=txt, aborted_previous=aborted)
+
+            # Reset flags and events (mostly redundant after sync abort, but safe)
+            self.llm_generation_active = False
+            self.tts_quick_generation_active = False
+            self.tts_final_generation_active = False
+            self.llm_answer_ready_event.clear()
+            self.generator_ready_event.clear()
+            self.stop_llm_request_event.clear()
+            self.stop_llm_finished_event.clear()
+            self.stop_tts_quick_request_event.clear()
+            self.stop_tts_quick_finished_event.clear()
+            self.stop_tts_final_request_event.clear()
+            self.stop_tts_final_finished_event.clear()
+            self.abort_completed_event.clear()
+            self.abort_block_event.set() # Ensure block is released if check_abort didn't run/clear it
+
+            # --- Reuse a finished speculative branch for this text if there is one ---
+            context_key = self._speculation_context_key()
+            self.speculation_cache.drop_other_contexts(context_key)
+            branch = self.speculation_cache.take(txt, context_key) if self.running_generation is None else None
+            if branch:
+                self._promote_branch(branch, new_gen_id, txt)
+                return
 
-        # --- State is now guaranteed to be clean (running_generation is None) ---
-        self.generation_counter += 1
-        new_gen_id = self.generation_counter
-        logger.info(f"🗣️✨🔄 [Gen {new_gen_id}] Preparing new generation for: '{txt[:50]}...'")
+            # --- Create new generation object ---
+            self.running_generation = RunningGeneration(id=new_gen_id, on_audio_chunk=self._notify_audio_activity)
+            self.running_generation.text = txt
+            self.running_generation.context_key = context_key
 
-        # Reset flags and events (mostly redundant after sync abort, but safe)
-        self.llm_generation_active = False
-        self.tts_quick_generation_active = False
-        self.tts_final_generation_active = False
-        self.llm_answer_ready_event.clear()
-        self.generator_ready_event.clear()
-        self.stop_llm_request_event.clear()
-        self.stop_llm_finished_event.clear()
-        self.stop_tts_quick_request_event.clear()
-        self.stop_tts_quick_finished_event.clear()
-        self.stop_tts_final_request_event.clear()
-        self.stop_tts_final_finished_event.clear()
-        self.abort_completed_event.clear()
-        self.abort_block_event.set() # Ensure block is released if check_abort didn't run/clear it
-
-        # --- Create new generation object ---
-        self.running_generation = RunningGeneration(id=new_gen_id)
-        self.running_generation.text = txt
-
-        try:
-            logger.info(f"🗣️🧠🚀 [Gen {new_gen_id}] Calling LLM generate...")
-            # TODO: Update history management if needed
-            # self.history.append({"role": "user", "content": txt}) # Example history update
-            self.running_generation.llm_generator = self.llm.generate(
+            try:
+                logger.info("🗣️🧠🚀 [Gen %s] Calling LLM generate...", new_gen_id)
+                # TODO: Update history management if needed
+                # self.history.append({"role": "user", "content": txt}) # Example history update
+                self.running_generation.llm_request_id = f"gen-{new_gen_id}-{uuid.uuid4()}"
+                self.running_generation.llm_generator = self.llm.generate(
+                    text=txt,
+                    history=self._llm_history(), # Token-budgeted window of the current history
+                    use_system_prompt=True,
+                    request_id=self.running_generation.llm_request_id,
+                )
+                logger.info("🗣️🧠✔️ [Gen %s] LLM generator created. Setting generator ready event.", new_gen_id)
+                self.generator_ready_event.set() # Signal LLM worker
+            except Exception as e:
+                logger.exception("🗣️🧠💥 [Gen %s] Failed to create LLM generator: %s", new_gen_id, e)
+                self.running_generation = None # Clean up if generator creation failed
+
+
+    def _speculation_context_key(self) -> tuple:
+        """
+        Identifies the conversation history a generation for the next user text is based on.
+
+        A trailing user message is ignored: speculative generations run before the
+        user's text is added to the history, the final one may run after.
+        """
+        history = self.history
+        if history and history[-1].get("role") == "user":
+            history = history[:-1]
+        return self._history_key(history)
+
+    def _park_speculative_branch(self, gen: RunningGeneration):
+        """
+        Keeps a generation that is being aborted in the speculation cache.
+
+        A generation is kept as soon as its quick answer audio is complete, which
+        is usually long before the final answer is. If the final TTS completed as
+        well, the whole answer is kept and a promoted branch plays without running
+        the LLM or TTS again; otherwise only the quick answer and its audio are
+        kept and the promoted branch continues the answer from there.
+
+        Args:
+            gen: The generation that is being aborted.
+        """
+        if not self.speculation_cache.max_branches or gen.context_key is None or not gen.text:
+            return
+        if not (gen.quick_answer_provided and gen.tts_quick_finished_event.is_set()):
+            return
+        complete = gen.tts_final_finished_event.is_set() and gen.audio_finished_time is not None
+        audio_chunks = gen.audio_chunks.recorded if complete else gen.audio_chunks.recorded[:gen.quick_audio_chunk_count]
+        if not audio_chunks or gen.first_audio_time is None:
+            return
+        finished_time = gen.audio_finished_time if complete else gen.quick_audio_finished_time
+        self.speculation_cache.add(SpeculativeBranch(
+            text=gen.text,
+            context_key=gen.context_key,
+            quick_answer=gen.quick_answer,
+            final_answer=gen.final_answer if complete else "",
+            audio_chunks=list(audio_chunks),
+            first_audio_ms=(gen.first_audio_time - gen.timestamp) * 1000,
+            total_ms=(finished_time - gen.timestamp) * 1000,
+            complete=complete,
+        ))
+
+    def _promote_branch(self, branch: SpeculativeBranch, gen_id: int, txt: str):
+        """
+        Makes a cached speculative branch the running generation.
+
+        The branch's audio is queued right away. A complete branch leaves the LLM
+        and TTS workers nothing to do. For a quick answer only branch, the LLM is
+        asked to continue the quick answer (sent as the start of the assistant
+        message) and the final TTS worker synthesizes that continuation, exactly
+        as it would the rest of a normal answer.
+
+        Args:
+            branch: The branch taken from the speculation cache.
+            gen_id: ID for the promoted generation.
+            txt: The user text the generation now answers.
+        """
+        gen = RunningGeneration(id=gen_id, on_audio_chunk=self._notify_audio_activity)
+        gen.text = txt
+        gen.context_key = branch.context_key
+        gen.quick_answer = branch.quick_answer
+        gen.final_answer = branch.final_answer
+        gen.quick_answer_provided = True
+        gen.llm_finished = True
+        gen.llm_finished_event.set()
+        gen.tts_quick_started = True
+        for chunk in branch.audio_chunks:
+            gen.audio_chunks.put_nowait(chunk)
+        gen.first_audio_time = gen.quick_audio_finished_time = gen.timestamp
+        gen.quick_audio_chunk_count = len(branch.audio_chunks)
+        gen.audio_quick_finished = True
+        gen.tts_quick_finished_event.set()
+        gen.quick_answer_first_chunk_ready = True
+        if branch.complete:
+            gen.tts_final_started = True
+            gen.audio_final_finished = True
+            gen.audio_finished_time = gen.timestamp
+            gen.tts_final_finished_event.set()
+        else:
+            # The final TTS worker picks this up like the rest of a normal answer
+            gen.llm_request_id = f"gen-{gen_id}-{uuid.uuid4()}"
+            gen.llm_generator = self.llm.generate(
                 text=txt,
-                history=self.history, # Pass current history
+                history=self._llm_history(),
                 use_system_prompt=True,
+                request_id=gen.llm_request_id,
+                assistant_prefix=branch.quick_answer,
             )
-            logger.info(f"🗣️🧠✔️ [Gen {new_gen_id}] LLM generator created. Setting generator ready event.")
-            self.generator_ready_event.set() # Signal LLM worker
-        except Exception as e:
-            logger.exception(f"🗣️🧠💥 [Gen {new_gen_id}] Failed to create LLM generator: {e}")
-            self.running_generation = None # Clean up if generator creation failed
+        self.running_generation = gen
 
+        tracer.instant("speculation_promoted", "pipeline", session=self.session_id, gen=gen_id, text=txt, complete=branch.complete, saved_first_audio_ms=branch.first_audio_ms)
+        logger.info("🗣️🌿✅ [Gen %s] Promoted %s speculative branch for '%.50s' (saved %.0fms to first audio, %.0fms of LLM/TTS work).",
+                    gen_id, "complete" if branch.complete else "quick answer", txt, branch.first_audio_ms, branch.total_ms)
+        if self.on_partial_assistant_text:
+            try:
+                self.on_partial_assistant_text(gen.quick_answer + gen.final_answer)
+            except Exception as cb_e:
+                logger.warning("🗣️💥 Callback error in on_partial_assistant_text (promoted branch): %s", cb_e)
+        self._notify_audio_activity()
 
     def process_abort_generation(self):
         """
@@ -844,7 +1149,7 @@ class SpeechPipelineManager:
            `llm_answer_ready_event`) so they can see the stop request.
         5. Waits (with timeouts) for each worker to acknowledge the stop by setting their
            respective `stop_..._finished_event`.
-        6. Calls external cancellation methods if available (e.g., `llm.cancel_generation`).
+        6. Cancels the generation's LLM request by its id (`llm.cancel_generation`).
         7. Attempts to close the LLM generator stream.
         8. Clears the `running_generation` reference.
         9. Clears stale start events (`generator_ready_event`, `llm_answer_ready_event`).
@@ -858,16 +1163,17 @@ class SpeechPipelineManager:
 
             if current_gen_obj is None or current_gen_obj.abortion_started:
                 if current_gen_obj is None:
-                    logger.info(f"🗣️🛑🤷 {current_gen_id_str} No active generation found to abort.")
+                    logger.info("🗣️🛑🤷 %s No active generation found to abort.", current_gen_id_str)
                 else:
-                    logger.info(f"🗣️🛑⏳ {current_gen_id_str} Abortion already in progress.")
+                    logger.info("🗣️🛑⏳ %s Abortion already in progress.", current_gen_id_str)
                 # Ensure events are managed correctly even if called redundantly
                 self.abort_completed_event.set() # Signal completion if nothing to do/already done
                 self.abort_block_event.set() # Ensure block is released
                 return
 
             # --- Start Abort Process ---
-            logger.info(f"🗣️🛑🚀 {current_gen_id_str} Abortion process starting...")
+            logger.info("🗣️🛑🚀 %s Abortion process starting...", current_gen_id_str)
+            GENERATION_ABORTS.inc()
             current_gen_obj.abortion_started = True # Mark immediately
             self.abort_block_event.clear() # Block new requests *before* waiting
             self.abort_completed_event.clear() # Clear completion flag at start
@@ -880,95 +1186,96 @@ class SpeechPipelineManager:
             # Need to check generator_ready_event too, as it might be waiting there.
             is_llm_potentially_active = self.llm_generation_active or self.generator_ready_event.is_set()
             if is_llm_potentially_active:
-                logger.info(f"🗣️🛑🧠❌ {current_gen_id_str} - Stopping LLM...")
+                logger.info("🗣️🛑🧠❌ %s - Stopping LLM...", current_gen_id_str)
                 self.stop_llm_request_event.set()
                 self.generator_ready_event.set() # Wake up LLM worker if it's waiting
                 stopped = self.stop_llm_finished_event.wait(timeout=5.0) # Wait for LLM worker
                 if stopped:
-                    logger.info(f"🗣️🛑🧠👍 {current_gen_id_str} LLM stopped confirmation received.")
+                    logger.info("🗣️🛑🧠👍 %s LLM stopped confirmation received.", current_gen_id_str)
                     self.stop_llm_finished_event.clear() # Reset for next time
                 else:
-                    logger.warning(f"🗣️🛑🧠⏱️ {current_gen_id_str} Timeout waiting for LLM stop confirmation.")
-                # Attempt external cancellation if available
-                if hasattr(self.llm, 'cancel_generation'):
-                    logger.info(f"🗣️🛑🧠🔌 {current_gen_id_str} Calling external LLM cancel_generation.")
+                    logger.warning("🗣️🛑🧠⏱️ %s Timeout waiting for LLM stop confirmation.", current_gen_id_str)
+                # Attempt external cancellation of this generation's stream only (a history summary may be running too)
+                if hasattr(self.llm, 'cancel_generation') and current_gen_obj.llm_request_id:
+                    logger.info("🗣️🛑🧠🔌 %s Calling external LLM cancel_generation.", current_gen_id_str)
                     try:
-                        self.llm.cancel_generation()
+                        self.llm.cancel_generation(current_gen_obj.llm_request_id)
                     except Exception as cancel_e:
-                         logger.warning(f"🗣️🛑🧠💥 {current_gen_id_str} Error during external LLM cancel: {cancel_e}")
+                         logger.warning("🗣️🛑🧠💥 %s Error during external LLM cancel: %s", current_gen_id_str, cancel_e)
                 self.llm_generation_active = False # Ensure flag is off
                 aborted_something = True
             else:
-                logger.info(f"🗣️🛑🧠📴 {current_gen_id_str} LLM appears inactive, no stop needed.")
+                logger.info("🗣️🛑🧠📴 %s LLM appears inactive, no stop needed.", current_gen_id_str)
             self.stop_llm_request_event.clear() # Ensure stop request is clear
 
             # --- Abort Quick TTS ---
             # Check if TTS Quick is potentially active (running OR waiting to start)
             is_tts_quick_potentially_active = self.tts_quick_generation_active or self.llm_answer_ready_event.is_set()
             if is_tts_quick_potentially_active:
-                logger.info(f"🗣️🛑👄❌ {current_gen_id_str} Stopping Quick TTS...")
+                logger.info("🗣️🛑👄❌ %s Stopping Quick TTS...", current_gen_id_str)
                 self.stop_tts_quick_request_event.set()
                 self.llm_answer_ready_event.set() # Wake up TTS worker if it's waiting
                 stopped = self.stop_tts_quick_finished_event.wait(timeout=5.0) # Wait for TTS worker
                 if stopped:
-                    logger.info(f"🗣️🛑👄👍 {current_gen_id_str} Quick TTS stopped confirmation received.")
+                    logger.info("🗣️🛑👄👍 %s Quick TTS stopped confirmation received.", current_gen_id_str)
                     self.stop_tts_quick_finished_event.clear() # Reset
                 else:
-                    logger.warning(f"🗣️🛑👄⏱️ {current_gen_id_str} Timeout waiting for Quick TTS stop confirmation.")
+                    logger.warning("🗣️🛑👄⏱️ %s Timeout waiting for Quick TTS stop confirmation.", current_gen_id_str)
                 self.tts_quick_generation_active = False # Ensure flag is off
                 aborted_something = True
             else:
-                logger.info(f"🗣️🛑👄📴 {current_gen_id_str} Quick TTS appears inactive, no stop needed.")
+                logger.info("🗣️🛑👄📴 %s Quick TTS appears inactive, no stop needed.", current_gen_id_str)
             self.stop_tts_quick_request_event.clear() # Ensure stop request is clear
 
             # --- Abort Final TTS ---
             # Check if TTS Final is potentially active (just running, doesn't wait on an event like others)
             is_tts_final_potentially_active = self.tts_final_generation_active
             if is_tts_final_potentially_active:
-                logger.info(f"🗣️🛑👄❌ {current_gen_id_str} Stopping Final TTS...")
+                logger.info("🗣️🛑👄❌ %s Stopping Final TTS...", current_gen_id_str)
                 self.stop_tts_final_request_event.set()
                 # No event to .set() here to wake it up, it polls state
                 stopped = self.stop_tts_final_finished_event.wait(timeout=5.0) # Wait for TTS worker
                 if stopped:
-                    logger.info(f"🗣️🛑👄👍 {current_gen_id_str} Final TTS stopped confirmation received.")
+                    logger.info("🗣️🛑👄👍 %s Final TTS stopped confirmation received.", current_gen_id_str)
                     self.stop_tts_final_finished_event.clear() # Reset
                 else:
-                    logger.warning(f"🗣️🛑👄⏱️ {current_gen_id_str} Timeout waiting for Final TTS stop confirmation.")
+                    logger.warning("🗣️🛑👄⏱️ %s Timeout waiting for Final TTS stop confirmation.", current_gen_id_str)
                 self.tts_final_generation_active = False # Ensure flag is off
                 aborted_something = True
             else:
-                logger.info(f"🗣️🛑👄📴 {current_gen_id_str} Final TTS appears inactive, no stop needed.")
+                logger.info("🗣️🛑👄📴 %s Final TTS appears inactive, no stop needed.", current_gen_id_str)
             self.stop_tts_final_request_event.clear() # Ensure stop request is clear
 
             # --- Stop Audio Playback (if AudioProcessor handles it) ---
             # Assuming AudioProcessor might have playback control that needs stopping
             if hasattr(self.audio, 'stop_playback'):
-                logger.info(f"🗣️🛑🔊 {current_gen_id_str} Requesting audio playback stop.")
+                logger.info("🗣️🛑🔊 %s Requesting audio playback stop.", current_gen_id_str)
                 try:
                     self.audio.stop_playback() # Or similar method
                 except Exception as audio_e:
-                    logger.warning(f"🗣️🛑🔊💥 {current_gen_id_str} Error stopping audio playback: {audio_e}")
+                    logger.warning("🗣️🛑🔊💥 %s Error stopping audio playback: %s", current_gen_id_str, audio_e)
 
 
             # --- Clear the running generation object and close generator ---
             # Re-check self.running_generation in case it changed *during* the waits above
             # Use the initially captured current_gen_obj for closing the generator if needed
             if self.running_generation is not None and self.running_generation.id == current_gen_obj.id:
-                logger.info(f"🗣️🛑🧹 {current_gen_id_str} Clearing running generation object.")
+                self._park_speculative_branch(current_gen_obj)
+                logger.info("🗣️🛑🧹 %s Clearing running generation object.", current_gen_id_str)
                 if current_gen_obj.llm_generator and hasattr(current_gen_obj.llm_generator, 'close'):
                     try:
-                        logger.info(f"🗣️🛑🧠🔌 {current_gen_id_str} Closing LLM generator stream.")
+                        logger.info("🗣️🛑🧠🔌 %s Closing LLM generator stream.", current_gen_id_str)
                         current_gen_obj.llm_generator.close()
                     except Exception as e:
-                        logger.warning(f"🗣️🛑🧠💥 {current_gen_id_str} Error closing LLM generator: {e}")
+                        logger.warning("🗣️🛑🧠💥 %s Error closing LLM generator: %s", current_gen_id_str, e)
                 self.running_generation = None # Clear the reference
             elif self.running_generation is not None and self.running_generation.id != current_gen_obj.id:
-                 logger.warning(f"🗣️🛑❓ {current_gen_id_str} Mismatch: self.running_generation changed during abort (now Gen {self.running_generation.id}). Clearing current ref.")
+                 logger.warning("🗣️🛑❓ %s Mismatch: self.running_generation changed during abort (now Gen %s). Clearing current ref.", current_gen_id_str, self.running_generation.id)
                  self.running_generation = None # Clear the unexpected new one too? Or just log? Clearing seems safer.
             elif aborted_something:
-                logger.info(f"🗣️🛑🤷 {current_gen_id_str} Worker(s) aborted but running_generation was already None.")
+                logger.info("🗣️🛑🤷 %s Worker(s) aborted but running_generation was already None.", current_gen_id_str)
             else:
-                logger.info(f"🗣️🛑🤷 {current_gen_id_str} Nothing seemed active to abort, running_generation is None.")
+                logger.info("🗣️🛑🤷 %s Nothing seemed active to abort, running_generation is None.", current_gen_id_str)
 
 
             # --- Final Cleanup of Trigger Events ---
@@ -977,7 +1284,7 @@ class SpeechPipelineManager:
             self.llm_answer_ready_event.clear()
 
             # --- Signal Completion ---
-            logger.info(f"🗣️🛑✅ {current_gen_id_str} Abort processing complete. Setting completion event and releasing block.")
+            logger.info("🗣️🛑✅ %s Abort processing complete. Setting completion event and releasing block.", current_gen_id_str)
             self.abort_completed_event.set() # Signal that the abort process is fully done
             self.abort_block_event.set() # Release the block for the request processor
 
@@ -993,9 +1300,86 @@ class SpeechPipelineManager:
         Args:
             txt: The user input text to be synthesized.
         """
-        logger.info(f"🗣️📥 Queueing 'prepare' request for: '{txt[:50]}...'")
+        logger.info("🗣️📥 Queueing 'prepare' request for: '%.50s...'", txt)
         self.requests_queue.put(PipelineRequest("prepare", txt))
 
+    def prefill_history(self):
+        """
+        Public method to request a KV cache prefill of the current conversation history.
+
+        Cheap and non-blocking, meant to be called whenever the user starts
+        speaking (recording start, partial transcriptions). The prefill itself
+        runs on the history prefill worker thread and is sent once per history.
+        """
+        if not LLM_HISTORY_PREFILL or self._history_key(self._llm_history()) == self.prefilled_history_key:
+            return
+        self.history_prefill_requested_event.set()
+
+    def promote_speculation(self, txt: str) -> bool:
+        """
+        Public method to switch to a cached speculative branch at the end of the user's turn.
+
+        Does nothing if the running generation already answers a text similar to
+        `txt` or if no cached branch matches. Otherwise aborts the running
+        generation (parking it if its quick answer audio is complete) and
+        promotes the best matching branch.
+
+        Args:
+            txt: The user's final text for this turn.
+
+        Returns:
+            True if a branch was promoted, False otherwise.
+        """
+        if not self.speculation_cache.branches:
+            return False
+        with self.generation_switch_lock:
+            gen = self.running_generation
+            if gen is not None and gen.text and self.text_similarity.calculate_similarity(gen.text, txt) >= 0.95:
+                return False
+            context_key = self._speculation_context_key()
+            self.speculation_cache.drop_other_contexts(context_key)
+            branch = self.speculation_cache.take(txt, context_key)
+            if branch is None:
+                return False
+            if gen is not None:
+                self.check_abort(txt, wait_for_finish=True, abort_reason="promote_speculation")
+            self.generation_counter += 1
+            self.abort_completed_event.clear()
+            self.abort_block_event.set()
+            self._promote_branch(branch, self.generation_counter, txt)
+            return True
+
+    def report_speculation_turn(self):
+        """
+        Logs speculation cache statistics for the turn that just ended.
+
+        Reports lookups, hits (of which quick answer only), hit rate and saved
+        first-audio milliseconds since the previous report, followed by the
+        session totals.
+        """
+        stats = self.speculation_cache.stats()
+        previous = self.speculation_stats_reported
+        lookups = stats["lookups"] - previous["lookups"]
+        hits = stats["hits"] - previous["hits"]
+        saved_ms = stats["saved_ms"] - previous["saved_ms"]
+        turn_hit_rate = hits / lookups if lookups else 0.0
+        logger.info(
+            "🗣️🌿📊 Speculation this turn: %s/%s hits (%.0f%%), saved %.0fms | "
+            "session: %s/%s hits (%.0f%%, %s quick answer only), saved %.0fms, %s cached",
+            hits, lookups, turn_hit_rate * 100, saved_ms,
+            stats["hits"], stats["lookups"], stats["hit_rate"] * 100, stats["partial_hits"], stats["saved_ms"], stats["branches"],
+        )
+        self.speculation_stats_reported = stats
+
+    def update_history_window(self):
+        """
+        Public method to trim the LLM history window after a turn was added to the history.
+
+        Evicts the oldest turns once the history exceeds `LLM_HISTORY_TOKEN_BUDGET`
+        and folds them into the rolling summary in the background.
+        """
+        self.history_window.update(self.history)
+
     def finish_generation(self):
         """
         Public method to signal the end of user input or interaction.
@@ -1005,7 +1389,7 @@ class SpeechPipelineManager:
         trigger specific pipeline behavior based on it. It might be used for
         future features like finalizing history or state.
         """
-        logger.info(f"🗣️📥 Queueing 'finish' request")
+        logger.info("🗣️📥 Queueing 'finish' request")
         self.requests_queue.put(PipelineRequest("finish"))
 
     def abort_generation(self, wait_for_completion: bool = False, timeout: float = 7.0, reason: str = ""):
@@ -1027,21 +1411,25 @@ class SpeechPipelineManager:
             return
 
         gen_id_str = f"Gen {self.running_generation.id}" if self.running_generation else "Gen None"
-        logger.info(f"🗣️🛑🚀 Requesting 'abort' (wait={wait_for_completion}, reason='{reason}') for {gen_id_str}")
+        logger.info("🗣️🛑🚀 Requesting 'abort' (wait=%s, reason='%s') for %s", wait_for_completion, reason, gen_id_str)
+        had_generation = self.running_generation is not None
+        start_time = time.time()
 
         # Call the internal synchronous processor
         self.process_abort_generation()
 
         # Optionally wait for completion
         if wait_for_completion:
-            logger.info(f"🗣️🛑⏳ Waiting for abort completion (timeout={timeout}s)...")
+            logger.info("🗣️🛑⏳ Waiting for abort completion (timeout=%ss)...", timeout)
             completed = self.abort_completed_event.wait(timeout=timeout)
             if completed:
-                logger.info(f"🗣️🛑✅ Abort completion confirmed.")
+                logger.info("🗣️🛑✅ Abort completion confirmed.")
             else:
-                logger.warning(f"🗣️🛑⏱️ Timeout waiting for abort completion event.")
+                logger.warning("🗣️🛑⏱️ Timeout waiting for abort completion event.")
             # Ensure block is released after waiting, even on timeout
             self.abort_block_event.set()
+        if had_generation:
+            ABORT_WAIT.observe(time.time() - start_time)
 
 
     def reset(self):
@@ -1054,6 +1442,9 @@ class SpeechPipelineManager:
         logger.info("🗣️🔄 Resetting pipeline state...")
         self.abort_generation(wait_for_completion=True, timeout=7.0, reason="reset") # Ensure clean slate
         self.history = []
+        self.history_window.reset()
+        self.prefilled_history_key = None
+        self.speculation_cache.clear()
         logger.info("🗣️🧹 History cleared. Reset complete.")
 
     def shutdown(self):
@@ -1076,6 +1467,7 @@ class SpeechPipelineManager:
         logger.info("🗣️🔌🔔 Signaling events to wake up any waiting threads...")
         self.generator_ready_event.set()
         self.llm_answer_ready_event.set()
+        self.history_prefill_requested_event.set()
         # Also signal 'finished' and 'completion' events
         self.stop_llm_finished_event.set()
         self.stop_tts_quick_finished_event.set()
@@ -1089,16 +1481,17 @@ class SpeechPipelineManager:
             (self.llm_inference_thread, "LLM Worker"),
             (self.tts_quick_inference_thread, "Quick TTS Worker"),
             (self.tts_final_inference_thread, "Final TTS Worker"),
+            (self.history_prefill_thread, "History Prefill Worker"),
         ]
 
         for thread, name in threads_to_join:
              if thread.is_alive():
-                 logger.info(f"🗣️🔌⏳ Joining {name}...")
+                 logger.info("🗣️🔌⏳ Joining %s...", name)
                  thread.join(timeout=5.0)
                  if thread.is_alive():
-                     logger.warning(f"🗣️🔌⏱️ {name} thread did not join cleanly.")
+                     logger.warning("🗣️🔌⏱️ %s thread did not join cleanly.", name)
              else:
-                  logger.info(f"🗣️🔌👍 {name} thread already finished.")
+                  logger.info("🗣️🔌👍 %s thread already finished.", name)
 
 
         logger.info("🗣️🔌✅ Shutdown complete.")
\ No newline at end of file
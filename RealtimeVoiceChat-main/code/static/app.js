@@ -37,6 +37,10 @@ const HEADER_BYTES  = 8;
 const FRAME_BYTES   = BATCH_SAMPLES * 2;
 const MESSAGE_BYTES = HEADER_BYTES + FRAME_BYTES;
 
+// --- binary TTS frames: 12-byte header (gen id, seq, sample rate; big-endian uint32) + PCM16 ---
+const USE_BINARY_TTS   = true;
+const TTS_HEADER_BYTES = 12;
+
 const bufferPool = [];
 let batchBuffer = null;
 let batchView = null;
@@ -260,6 +264,22 @@ function handleJSONMessage({ type, content }) {
     socket.send(JSON.stringify({ type: 'tts_stop' }));
     return;
   }
+  if (type === "session_queued") {
+    statusDiv.textContent = `Server busy, waiting for a free session (position ${content})…`;
+    return;
+  }
+  if (type === "session_rejected") {
+    statusDiv.textContent = content || "Server is at capacity, please try again later.";
+    return;
+  }
+}
+
+function handleBinaryTTSFrame(frame) {
+  if (ignoreIncomingTTS || frame.byteLength <= TTS_HEADER_BYTES) return;
+  if (ttsWorkletNode) {
+    // Hand the whole frame to the worklet without copying; it skips the header itself
+    ttsWorkletNode.port.postMessage(frame, [frame]);
+  }
 }
 
 function escapeHtml(str) {
@@ -300,7 +320,9 @@ document.getElementById("startBtn").onclick = async () => {
   statusDiv.textContent = "Initializing connection...";
 
   const wsProto = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-  socket = new WebSocket(`${wsProto}//${location.host}/ws`);
+  const wsQuery = USE_BINARY_TTS ? "?tts=binary" : "";
+  socket = new WebSocket(`${wsProto}//${location.host}/ws${wsQuery}`);
+  socket.binaryType = "arraybuffer";
 
   socket.onopen = async () => {
     statusDiv.textContent = "Connected. Activating mic and TTS…";
@@ -310,6 +332,10 @@ document.getElementById("startBtn").onclick = async () => {
   };
 
   socket.onmessage = (evt) => {
+    if (evt.data instanceof ArrayBuffer) {
+      handleBinaryTTSFrame(evt.data);
+      return;
+    }
     if (typeof evt.data === "string") {
       try {
         const msg = JSON.parse(evt.data);
@@ -320,8 +346,10 @@ document.getElementById("startBtn").onclick = async () => {
     }
   };
 
-  socket.onclose = () => {
-    statusDiv.textContent = "Connection closed.";
+  socket.onclose = (evt) => {
+    if (evt.code !== 1013) { // 1013: rejected by server, keep the rejection notice
+      statusDiv.textContent = "Connection closed.";
+    }
     flushRemainder();
     cleanupAudio();
     speedSlider.disabled = true;
@@ -1,3 +1,6 @@
+// Binary TTS frames start with a 12-byte header (generation id, sequence, sample rate)
+const TTS_HEADER_BYTES = 12;
+
 class TTSPlaybackProcessor extends AudioWorkletProcessor {
   constructor() {
     super();
@@ -18,10 +21,15 @@ class TTSPlaybackProcessor extends AudioWorkletProcessor {
         return;
       }
       
+      // Binary frame straight from the WebSocket: view the PCM16 payload after the header
+      let chunk = event.data;
+      if (chunk instanceof ArrayBuffer) {
+        chunk = new Int16Array(chunk, TTS_HEADER_BYTES);
+      }
+
       // Otherwise assume it's a PCM chunk (e.g., an Int16Array)
-      // (You may also check here if event.data instanceof Int16Array if needed)
-      this.bufferQueue.push(event.data);
-      this.samplesRemaining += event.data.length;
+      this.bufferQueue.push(chunk);
+      this.samplesRemaining += chunk.length;
     };
   }
 
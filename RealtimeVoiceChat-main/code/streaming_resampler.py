@@ -0,0 +1,211 @@
+import numpy as np
+from scipy.signal import firwin
+
+
+def design_resample_filter(up: int, down: int) -> np.ndarray:
+    """
+    Designs the same anti-aliasing FIR filter `scipy.signal.resample_poly` uses.
+
+    A Kaiser windowed sinc (beta 5.0) with 10 zero crossings per side at the
+    lower of the two rates, scaled by `up` to preserve signal amplitude.
+
+    Args:
+        up: The upsampling factor.
+        down: The downsampling factor.
+
+    Returns:
+        The float32 filter taps (length `2 * 10 * max(up, down) + 1`).
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+    return taps.astype(np.float32)
+
+
+class StreamingDecimator:
+    """
+    Stateful integer-factor decimator for a continuous stream of PCM16 chunks.
+
+    Unlike calling `resample_poly` on every chunk in isolation, the FIR history
+    is carried across calls, so chunk boundaries see the real preceding audio
+    instead of zero padding. All work happens in buffers that are allocated once
+    and only grown when a larger chunk arrives.
+
+    Output samples are taken on the same per-chunk grid `resample_poly` uses
+    (input indices 0, factor, 2*factor, ... of each chunk), so every call returns
+    exactly `ceil(len(chunk) / factor)` samples. The filter is causal, which
+    delays the signal by half the filter length (10 output samples).
+    """
+    def __init__(self, factor: int = 3) -> None:
+        """
+        Initializes the StreamingDecimator.
+
+        Args:
+            factor: The integer decimation factor (e.g. 3 for 48kHz -> 16kHz).
+        """
+        self.factor = factor
+        # Reversed so that a sliding window dot product computes the convolution
+        self.taps = design_resample_filter(1, factor)[::-1].copy()
+        self.history_len = len(self.taps) - 1
+
+        self._capacity = 0
+        self._input = np.zeros(self.history_len, dtype=np.float32)
+        self._output = np.zeros(0, dtype=np.float32)
+        self._output_int16 = np.zeros(0, dtype=np.int16)
+        self._history_silent = True
+
+    def _ensure_capacity(self, num_samples: int) -> None:
+        """Grows the working buffers so a chunk of `num_samples` fits."""
+        if num_samples <= self._capacity:
+            return
+        history = self._input[:self.history_len].copy()
+        self._capacity = num_samples
+        self._input = np.empty(self.history_len + num_samples, dtype=np.float32)
+        self._input[:self.history_len] = history
+        max_out = -(-num_samples // self.factor)
+        self._output = np.empty(max_out, dtype=np.float32)
+        self._output_int16 = np.empty(max_out, dtype=np.int16)
+
+    def reset(self) -> None:
+        """Clears the filter history, e.g. when a new audio stream starts."""
+        self._input[:self.history_len] = 0.0
+        self._history_silent = True
+
+    def process(self, raw_audio: np.ndarray) -> np.ndarray:
+        """
+        Decimates one int16 chunk, continuing from the previous chunk's state.
+
+        Silent input is detected while converting the chunk: if the chunk and the
+        filter history are both digital silence, the filtering step is skipped
+        and zeros are returned.
+
+        Args:
+            raw_audio: A 1D int16 numpy array at the input sample rate.
+
+        Returns:
+            An int16 array with `ceil(len(raw_audio) / factor)` samples. The array
+            is a view into an internal buffer and is only valid until the next call.
+        """
+        n = len(raw_audio)
+        num_out = -(-n // self.factor)
+        if n == 0:
+            return self._output_int16[:0]
+        self._ensure_capacity(n)
+
+        hist = self.history_len
+        chunk_silent = not raw_audio.any()
+        out_int16 = self._output_int16[:num_out]
+
+        if chunk_silent and self._history_silent:
+            out_int16.fill(0)
+            return out_int16
+
+        buf = self._input
+        end = hist + n
+        np.copyto(buf[hist:end], raw_audio, casting="unsafe")
+
+        # Window j spans buf[j*factor : j*factor + taps], ending on input sample j*factor of this chunk
+        windows = np.lib.stride_tricks.sliding_window_view(buf[:end], len(self.taps))[::self.factor]
+        out = self._output[:num_out]
+        np.dot(windows[:num_out], self.taps, out=out)
+        np.clip(out, -32768, 32767, out=out)
+        np.copyto(out_int16, out, casting="unsafe")
+
+        # Keep the most recent samples as history for the next chunk
+        buf[:hist] = buf[end - hist:end]
+        self._history_silent = chunk_silent and (n >= hist or self._history_silent)
+        return out_int16
+
+
+class StreamingUpsampler:
+    """
+    Stateful integer-factor upsampler for a continuous stream of PCM16 chunks.
+
+    Implements polyphase interpolation: every input sample produces `factor`
+    output samples, each phase being a short dot product over the most recent
+    input samples. Only the filter tail (the last `taps / factor` input samples)
+    is kept between calls, so each sample is filtered exactly once and chunk
+    boundaries are seamless. The causal filter delays the output by half the
+    filter length (`10 * factor` output samples).
+    """
+    def __init__(self, factor: int = 2) -> None:
+        """
+        Initializes the StreamingUpsampler.
+
+        Args:
+            factor: The integer upsampling factor (e.g. 2 for 24kHz -> 48kHz).
+        """
+        self.factor = factor
+        taps = design_resample_filter(factor, 1)
+        self.window_len = -(-len(taps) // factor)
+        self.history_len = self.window_len - 1
+        self.delay = (len(taps) - 1) // 2 # Group delay in output samples
+
+        # Column p holds the reversed taps of phase p: y[factor*i + p] = sum_k taps[factor*k + p] * x[i - k]
+        padded = np.zeros(self.window_len * factor, dtype=np.float32)
+        padded[:len(taps)] = taps
+        self.phase_matrix = np.ascontiguousarray(padded.reshape(self.window_len, factor)[::-1])
+
+        self._capacity = 0
+        self._input = np.zeros(self.history_len, dtype=np.float32)
+        self._output = np.zeros((0, factor), dtype=np.float32)
+        self._output_int16 = np.zeros(0, dtype=np.int16)
+
+    def _ensure_capacity(self, num_samples: int) -> None:
+        """Grows the working buffers so a chunk of `num_samples` fits."""
+        if num_samples <= self._capacity:
+            return
+        history = self._input[:self.history_len].copy()
+        self._capacity = num_samples
+        self._input = np.empty(self.history_len + num_samples, dtype=np.float32)
+        self._input[:self.history_len] = history
+        self._output = np.empty((num_samples, self.factor), dtype=np.float32)
+        self._output_int16 = np.empty(num_samples * self.factor, dtype=np.int16)
+
+    def reset(self) -> None:
+        """Clears the filter tail, e.g. when a new audio stream starts."""
+        self._input[:self.history_len] = 0.0
+
+    def process(self, raw_audio: np.ndarray) -> np.ndarray:
+        """
+        Upsamples one int16 chunk, continuing from the previous chunk's state.
+
+        Args:
+            raw_audio: A 1D int16 numpy array at the input sample rate.
+
+        Returns:
+            An int16 array with `len(raw_audio) * factor` samples. The array is a
+            view into an internal buffer and is only valid until the next call.
+        """
+        n = len(raw_audio)
+        if n == 0:
+            return self._output_int16[:0]
+        self._ensure_capacity(n)
+
+        hist = self.history_len
+        buf = self._input
+        end = hist + n
+        np.copyto(buf[hist:end], raw_audio, casting="unsafe")
+
+        # Window i ends on input sample i of this chunk; one matrix product yields all phases interleaved
+        windows = np.lib.stride_tricks.sliding_window_view(buf[:end], self.window_len)
+        out = self._output[:n]
+        np.dot(windows, self.phase_matrix, out=out)
+        flat = out.reshape(-1)
+        np.clip(flat, -32768, 32767, out=flat)
+        out_int16 = self._output_int16[:n * self.factor]
+        np.copyto(out_int16, flat, casting="unsafe")
+
+        buf[:hist] = buf[end - hist:end]
+        return out_int16
+
+    def flush(self) -> np.ndarray:
+        """
+        Returns the samples still held back by the filter delay and resets the state.
+
+        Returns:
+            An int16 array with the remaining `delay` output samples.
+        """
+        tail = self.process(np.zeros(-(-self.delay // self.factor), dtype=np.int16))[:self.delay]
+        self.reset()
+        return tail
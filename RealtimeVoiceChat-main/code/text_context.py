@@ -66,8 +66,107 @@ class TextContext:
                 if i >= min_len and alnum_count >= min_alnum_count:
                     context_str = txt[:i]
                     remaining_str = txt[i:]
-                    logger.info(f"🧠 {Colors.MAGENTA}Context found after char no: {i}, context: {context_str}")
+                    logger.info("🧠 {magenta}Context found after char no: %s, context: %s", i, context_str)
                     return context_str, remaining_str
 
         # No suitable context found within the max_len limit
-        return None, None
\ No newline at end of file
+        return None, None
+
+    def stream(self, min_len: int = 6, max_len: int = 120, min_alnum_count: int = 10) -> "StreamingTextContext":
+        """
+        Creates an incremental detector that finds the same context as `get_context`.
+
+        Args:
+            min_len: The minimum allowable overall length for the extracted context substring.
+            max_len: The maximum allowable overall length for the extracted context substring.
+            min_alnum_count: The minimum number of alphanumeric characters required within
+                             the extracted context substring.
+
+        Returns:
+            A new StreamingTextContext using this instance's split tokens.
+        """
+        return StreamingTextContext(self.split_tokens, min_len=min_len, max_len=max_len, min_alnum_count=min_alnum_count)
+
+
+class StreamingTextContext:
+    """
+    Incremental version of `TextContext.get_context` for text arriving in pieces.
+
+    Calling `get_context` after every LLM token rescans the accumulated answer
+    from the start, which is quadratic in the answer length. This detector carries
+    the scan position and the alphanumeric count forward, so feeding a token only
+    costs O(len(token)). For any sequence of appended pieces it reports the same
+    context/overhang split `get_context` would report on the concatenated text.
+    """
+    def __init__(self, split_tokens: Set[str], min_len: int = 6, max_len: int = 120, min_alnum_count: int = 10) -> None:
+        """
+        Initializes the StreamingTextContext.
+
+        Args:
+            split_tokens: Characters treated as potential end-of-context markers.
+            min_len: The minimum allowable overall length for the extracted context substring.
+            max_len: The maximum allowable overall length for the extracted context substring.
+            min_alnum_count: The minimum number of alphanumeric characters required within
+                             the extracted context substring.
+        """
+        self.split_tokens = split_tokens
+        self.min_len = min_len
+        self.max_len = max_len
+        self.min_alnum_count = min_alnum_count
+        self.reset()
+
+    def reset(self) -> None:
+        """Forgets all text fed so far (e.g. after the text was modified at its start)."""
+        self._parts: list[str] = []
+        self._scanned = 0 # Number of characters examined so far
+        self._alnum_count = 0
+
+    def feed(self, piece: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Appends `piece` to the text and scans only the new characters.
+
+        Args:
+            piece: The newly arrived text (e.g. one LLM token).
+
+        Returns:
+            A tuple (context, remaining) for the whole text fed so far once a context
+            boundary is found, otherwise (None, None), exactly like `get_context`.
+        """
+        self._parts.append(piece)
+        if self._scanned >= self.max_len:
+            return None, None # get_context never looks beyond max_len
+
+        for char in piece[:self.max_len - self._scanned]:
+            self._scanned += 1
+            if char.isalnum():
+                self._alnum_count += 1
+
+            # Check if the current character is a potential context end meeting the criteria
+            if char in self.split_tokens and self._scanned >= self.min_len and self._alnum_count >= self.min_alnum_count:
+                text = "".join(self._parts)
+                context_str = text[:self._scanned]
+                remaining_str = text[self._scanned:]
+                logger.info("🧠 {magenta}Context found after char no: %s, context: %s", self._scanned, context_str)
+                return context_str, remaining_str
+
+        return None, None
+
+
+def is_leading_settled(text: str, patterns: list[str]) -> bool:
+    """
+    Checks whether appending text can no longer make `text` start with one of `patterns`.
+
+    For a `text` that has already been stripped of leading `patterns`, this is the
+    case once it is non-empty and not a proper prefix of any pattern (e.g. "<th"
+    could still become "<think>"). From then on stripping can be skipped.
+
+    Args:
+        text: Text already stripped of leading `patterns`.
+        patterns: The leading patterns that are being stripped.
+
+    Returns:
+        True if further stripping would never change the text's start.
+    """
+    if not text:
+        return False
+    return not any(len(text) < len(pattern) and pattern.startswith(text) for pattern in patterns)
@@ -1,5 +1,7 @@
 import re
+from collections import OrderedDict
 from difflib import SequenceMatcher
+from typing import Any, Callable, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -198,6 +200,146 @@ class TextSimilarity:
         similarity = self.calculate_similarity(text1, text2)
         return similarity >= self.similarity_threshold
 
+class SentenceTailCache:
+    """
+    Indexed store of already-normalized texts, matched by their last `n_words` words.
+
+    Equivalent to comparing a query against every stored text with
+    `TextSimilarity(focus='end', n_words=n_words).calculate_similarity(...) > similarity_threshold`,
+    but each entry is stored under its pre-computed tail, an exact tail match is a
+    dict lookup, and the fuzzy fallback reuses one `SequenceMatcher` (the query is
+    its cached second sequence) and skips entries whose length alone rules out a
+    match. Entries keep insertion/update order so stale ones can be evicted from the front.
+    """
+    def __init__(self, n_words: int = 5, similarity_threshold: float = 0.96, max_entries: Optional[int] = None) -> None:
+        """
+        Initializes the SentenceTailCache.
+
+        Args:
+            n_words: Number of trailing words that identify an entry.
+            similarity_threshold: Ratio a fuzzy match has to exceed.
+            max_entries: Optional size bound; the least recently updated entry is dropped.
+        """
+        self.n_words = n_words
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, Any] = OrderedDict() # tail -> caller data
+        self._matcher = SequenceMatcher(isjunk=None, a="", b="", autojunk=False)
+
+    def tail_of(self, normalized_text: str) -> str:
+        """
+        Returns the last `n_words` words of a text already normalized for comparison.
+
+        Args:
+            normalized_text: Lowercase text containing only word characters and single spaces.
+
+        Returns:
+            The tail used as the cache key.
+        """
+        return ' '.join(normalized_text.split()[-self.n_words:])
+
+    def tail_from_text(self, text: str, normalize: Callable[[str], str]) -> str:
+        """
+        Returns `tail_of(normalize(text))` while only normalizing the trailing words.
+
+        Normalization that works word by word (lowercasing, dropping punctuation)
+        is applied to as few trailing whitespace separated tokens as needed, so the
+        cost depends on the tail and not on the length of the whole transcript.
+
+        Args:
+            text: The raw text.
+            normalize: Word-wise normalization function (maps a token to a single
+                       word or to an empty string).
+
+        Returns:
+            The normalized tail, empty if the text has no words after normalization.
+        """
+        max_split = self.n_words * 2
+        while True:
+            tokens = text.rsplit(None, max_split)
+            exhausted = len(tokens) <= max_split # No unsplit prefix left
+            candidates = tokens if exhausted else tokens[1:]
+            words = []
+            for token in reversed(candidates):
+                word = normalize(token)
+                if word:
+                    words.append(word)
+                    if len(words) == self.n_words:
+                        return ' '.join(reversed(words))
+            if exhausted:
+                return ' '.join(reversed(words))
+            max_split *= 2
+
+    def find(self, tail: str) -> Optional[str]:
+        """
+        Returns the key of the entry matching `tail`, or None.
+
+        An exact tail match wins; otherwise the first entry (in update order) whose
+        tail similarity exceeds the threshold is returned.
+
+        Args:
+            tail: The query tail (see `tail_of`).
+
+        Returns:
+            The matching entry's tail key, or None if nothing matches.
+        """
+        if tail in self.entries:
+            return tail
+
+        threshold = self.similarity_threshold
+        tail_len = len(tail)
+        matcher = self._matcher
+        matcher.set_seq2(tail) # SequenceMatcher caches its analysis of the second sequence
+        for key in self.entries:
+            key_len = len(key)
+            total = key_len + tail_len
+            # The ratio can never exceed 2 * min(len) / (len_a + len_b)
+            if total == 0 or 2.0 * min(key_len, tail_len) / total <= threshold:
+                continue
+            matcher.set_seq1(key)
+            if matcher.quick_ratio() > threshold and matcher.ratio() > threshold:
+                return key
+        return None
+
+    def add(self, tail: str, value: Any) -> None:
+        """
+        Stores `value` under `tail` as the most recently updated entry.
+
+        Args:
+            tail: The entry's tail key (see `tail_of`).
+            value: Caller data, e.g. timestamps.
+        """
+        self.entries[tail] = value
+        self.entries.move_to_end(tail)
+        if self.max_entries is not None:
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def touch(self, tail: str) -> None:
+        """Marks an existing entry as most recently updated."""
+        self.entries.move_to_end(tail)
+
+    def evict_older_than(self, cutoff: float, timestamp_of: Callable[[Any], float]) -> None:
+        """
+        Drops entries from the front (least recently updated) whose timestamp is before `cutoff`.
+
+        Args:
+            cutoff: Entries last updated before this time are removed.
+            timestamp_of: Extracts the last update time from an entry's value.
+        """
+        while self.entries:
+            tail, value = next(iter(self.entries.items()))
+            if timestamp_of(value) >= cutoff:
+                break
+            del self.entries[tail]
+
+    def clear(self) -> None:
+        """Removes all entries."""
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
 if __name__ == "__main__":
     # Configure basic logging for example output
     logging.basicConfig(level=logging.INFO)
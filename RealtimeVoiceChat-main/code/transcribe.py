@@ -4,7 +4,8 @@ logger = logging.getLogger(__name__)
 from turndetect import strip_ending_punctuation
 from difflib import SequenceMatcher
 from colors import Colors
-from text_similarity import TextSimilarity
+from text_similarity import TextSimilarity, SentenceTailCache
+from turn_trace import tracer
 from scipy import signal
 import numpy as np
 import threading
@@ -86,10 +87,20 @@ class TranscriptionProcessor:
     _TTS_ALLOWANCE_OFFSET_S: float = 0.25
     # Minimum time for potential sentence end detection relative to silence start
     _MIN_POTENTIAL_END_DETECTION_TIME_MS: float = 0.02 # 20 ms
+    # Added to the silence monitor's sleep so a deadline is strictly passed when it wakes up
+    _SILENCE_MONITOR_DEADLINE_SLACK_S: float = 0.0005
     # Maximum age for cached sentence end timestamps (ms)
     _SENTENCE_CACHE_MAX_AGE_MS: float = 0.2
     # Number of detections within the cache age required to trigger potential end
     _SENTENCE_CACHE_TRIGGER_COUNT: int = 3
+    # Number of trailing words that identify a sentence end, and the similarity above which two are the same
+    _SENTENCE_TAIL_WORDS: int = 5
+    _SENTENCE_SIMILARITY_THRESHOLD: float = 0.96
+    # Most recent yielded sentences remembered to avoid yielding them twice
+    _YIELDED_SENTENCES_MAX_ENTRIES: int = 64
+    # Precompiled patterns for _normalize_text
+    _NON_ALNUM_REGEX = re.compile(r'[^a-z0-9\s]')
+    _WHITESPACE_REGEX = re.compile(r'\s+')
 
 
     def __init__(
@@ -108,6 +119,7 @@ class TranscriptionProcessor:
             tts_allowed_event: Optional[threading.Event] = None, # Note: This seems unused in the original code provided
             pipeline_latency: float = 0.5,
             recorder_config: Optional[Dict[str, Any]] = None, # Allow passing custom config
+            session_id: Optional[int] = None,
     ) -> None:
         """
         Initializes the TranscriptionProcessor.
@@ -127,6 +139,7 @@ class TranscriptionProcessor:
             tts_allowed_event: An event that might be set when TTS synthesis is allowed (currently unused in provided logic).
             pipeline_latency: Estimated latency of the downstream processing pipeline in seconds. Used for timing calculations.
             recorder_config: Optional dictionary to override default RealtimeSTT recorder configuration.
+            session_id: The voice session this transcriber belongs to, tags its trace events.
         """
         self.source_language = source_language
         self.realtime_transcription_callback = realtime_transcription_callback
@@ -139,31 +152,44 @@ class TranscriptionProcessor:
         self.on_recording_start_callback = on_recording_start_callback
         self.is_orpheus = is_orpheus
         self.pipeline_latency = pipeline_latency
+        self.session_id = session_id
         self.recorder: Optional[AudioToTextRecorder | AudioToTextRecorderClient] = None
         self.is_silero_speech_active: bool = False # Note: Seems unused
         self.silero_working: bool = False         # Note: Seems unused
         self.on_wakeword_detection_start: Optional[Callable] = None # Note: Seems unused
         self.on_wakeword_detection_end: Optional[Callable] = None   # Note: Seems unused
         self.realtime_text: Optional[str] = None
-        self.sentence_end_cache: List[Dict[str, Any]] = []
-        self.potential_sentences_yielded: List[Dict[str, Any]] = []
+        # Keyed by the normalized last words of a sentence: tail -> detection timestamps
+        self.sentence_end_cache = SentenceTailCache(
+            n_words=self._SENTENCE_TAIL_WORDS,
+            similarity_threshold=self._SENTENCE_SIMILARITY_THRESHOLD,
+        )
+        # tail -> yield timestamp
+        self.potential_sentences_yielded = SentenceTailCache(
+            n_words=self._SENTENCE_TAIL_WORDS,
+            similarity_threshold=self._SENTENCE_SIMILARITY_THRESHOLD,
+            max_entries=self._YIELDED_SENTENCES_MAX_ENTRIES,
+        )
         self.stripped_partial_user_text: str = ""
         self.final_transcription: Optional[str] = None
         self.shutdown_performed: bool = False
+        # Wakes the silence monitor on state changes (see `_start_silence_monitor`)
+        self.silence_monitor_wakeup = threading.Event()
+        self.silence_monitor_wakeups: int = 0
         self.silence_time: float = 0.0
         self.silence_active: bool = False
         self.last_audio_copy: Optional[np.ndarray] = None
 
         self.on_tts_allowed_to_synthesize: Optional[Callable] = None # Note: Seems unused
 
-        self.text_similarity = TextSimilarity(focus='end', n_words=5)
+        self.text_similarity = TextSimilarity(focus='end', n_words=self._SENTENCE_TAIL_WORDS)
 
         # Use provided config or default
         self.recorder_config = copy.deepcopy(recorder_config if recorder_config else DEFAULT_RECORDER_CONFIG)
         self.recorder_config['language'] = self.source_language # Ensure language is set
 
         if USE_TURN_DETECTION:
-            logger.info(f"👂🔄 {Colors.YELLOW}Turn detection enabled{Colors.RESET}")
+            logger.info("👂🔄 {yellow}Turn detection enabled{reset}")
             self.turn_detection = TurnDetection(
                 on_new_waiting_time=self.on_new_waiting_time,
                 local=local,
@@ -232,89 +258,140 @@ class TranscriptionProcessor:
             return getattr(self.recorder, "is_recording", False)
 
     # --- Silence Monitor ---
+    @property
+    def silence_time(self) -> float:
+        """Start time of the current silence period (speech end), 0.0 while the user speaks."""
+        return self._silence_time
+
+    @silence_time.setter
+    def silence_time(self, value: float) -> None:
+        self._silence_time = value
+        self.silence_monitor_wakeup.set() # Deadlines depend on the silence start
+
+    def _silence_thresholds(self, silence_waiting_time: float) -> tuple:
+        """
+        Computes when the silence monitor acts, relative to the start of silence.
+
+        Args:
+            silence_waiting_time: The recorder's current `post_speech_silence_duration`.
+
+        Returns:
+            A tuple (potential_sentence_end_time, tts_allowance_time, start_hot_condition_time)
+            in seconds after the silence started.
+        """
+        # Calculate latest time pipeline can start without exceeding silence duration
+        latest_pipe_start_time = silence_waiting_time - self.pipeline_latency - self._PIPELINE_RESERVE_TIME_MS
+
+        # Calculate the target time to trigger potential sentence end detection
+        potential_sentence_end_time = latest_pipe_start_time
+        # Ensure it doesn't trigger too early
+        if potential_sentence_end_time < self._MIN_POTENTIAL_END_DETECTION_TIME_MS:
+            potential_sentence_end_time = self._MIN_POTENTIAL_END_DETECTION_TIME_MS
+
+        # Determine the threshold time to enter the "hot" state
+        start_hot_condition_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
+        # Ensure the hot condition has a minimum meaningful duration
+        if start_hot_condition_time < self._MIN_HOT_CONDITION_DURATION_S:
+            start_hot_condition_time = self._MIN_HOT_CONDITION_DURATION_S
+
+        # Adjust potential_sentence_end_time based on Orpheus mode
+        if self.is_orpheus:
+             # For Orpheus, ensure potential end detection doesn't happen too early relative to hot state
+            orpheus_potential_end_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
+            if potential_sentence_end_time < orpheus_potential_end_time:
+                 potential_sentence_end_time = orpheus_potential_end_time
+
+        # Allow TTS synthesis shortly before the final silence duration elapses
+        tts_allowance_time = silence_waiting_time - self._TTS_ALLOWANCE_OFFSET_S
+        return potential_sentence_end_time, tts_allowance_time, start_hot_condition_time
+
     def _start_silence_monitor(self) -> None:
         """
         Starts a background thread to monitor silence duration and trigger
         events like potential sentence end detection, TTS synthesis allowance,
         and potential full transcription ("hot") state changes.
+
+        The thread works as a deadline scheduler: on every wakeup it computes
+        the trigger times of the current silence period, acts on those that
+        passed and sleeps until the earliest pending one. State changes (silence
+        start/end, a new waiting time, new partial text during silence, shutdown)
+        set `silence_monitor_wakeup`. While the user speaks and nothing is
+        pending, the thread sleeps without a timeout.
         """
         def monitor():
             hot = False
+            forced_end = None # (silence start, text) last forced as potential sentence end
+            tts_allowed_for = None # Silence start the TTS allowance was signalled for
             # Initialize silence_time using the abstracted getter
-            self.silence_time = self._get_recorder_param("speech_end_silence_start", 0.0)
+            self.silence_time = self._get_recorder_param("speech_end_silence_start", 0.0) or 0.0
 
             while not self.shutdown_performed:
+                self.silence_monitor_wakeup.clear()
+                self.silence_monitor_wakeups += 1
                 speech_end_silence_start = self.silence_time # Use cached value updated by callback
+                next_deadline = None # Seconds after silence start of the earliest pending trigger
 
                 if self.recorder and speech_end_silence_start is not None and speech_end_silence_start != 0:
                     silence_waiting_time = self._get_recorder_param("post_speech_silence_duration", 0.0)
+                    potential_sentence_end_time, tts_allowance_time, start_hot_condition_time = self._silence_thresholds(silence_waiting_time)
                     time_since_silence = time.time() - speech_end_silence_start
 
-                    # Calculate latest time pipeline can start without exceeding silence duration
-                    latest_pipe_start_time = silence_waiting_time - self.pipeline_latency - self._PIPELINE_RESERVE_TIME_MS
-
-                    # Calculate the target time to trigger potential sentence end detection
-                    potential_sentence_end_time = latest_pipe_start_time
-                    # Ensure it doesn't trigger too early
-                    if potential_sentence_end_time < self._MIN_POTENTIAL_END_DETECTION_TIME_MS:
-                        potential_sentence_end_time = self._MIN_POTENTIAL_END_DETECTION_TIME_MS
-
-                    # Determine the threshold time to enter the "hot" state
-                    start_hot_condition_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
-                    # Ensure the hot condition has a minimum meaningful duration
-                    if start_hot_condition_time < self._MIN_HOT_CONDITION_DURATION_S:
-                        start_hot_condition_time = self._MIN_HOT_CONDITION_DURATION_S
-
-                    # Adjust potential_sentence_end_time based on Orpheus mode
-                    if self.is_orpheus:
-                         # For Orpheus, ensure potential end detection doesn't happen too early relative to hot state
-                        orpheus_potential_end_time = silence_waiting_time - self._HOT_THRESHOLD_OFFSET_S
-                        if potential_sentence_end_time < orpheus_potential_end_time:
-                             potential_sentence_end_time = orpheus_potential_end_time
-
-
                     # --- Trigger Actions Based on Timing ---
 
-                    # 1. Force potential sentence end detection if time has passed
+                    # 1. Force potential sentence end detection if time has passed (again if the text changes)
                     if time_since_silence > potential_sentence_end_time:
                         # Check if realtime_text exists before logging/detecting
                         current_text = self.realtime_text if self.realtime_text else ""
-                        logger.info(f"👂🔚 {Colors.YELLOW}Potential sentence end detected (timed out){Colors.RESET}: {current_text}")
-                        # Use force_yield=True because this is triggered by timeout, not punctuation detection
-                        self.detect_potential_sentence_end(current_text, force_yield=True, force_ellipses=True) # Force ellipses if timeout occurs
+                        if forced_end != (speech_end_silence_start, current_text):
+                            forced_end = (speech_end_silence_start, current_text)
+                            logger.info("👂🔚 {yellow}Potential sentence end detected (timed out){reset}: %s", current_text)
+                            # Use force_yield=True because this is triggered by timeout, not punctuation detection
+                            self.detect_potential_sentence_end(current_text, force_yield=True, force_ellipses=True) # Force ellipses if timeout occurs
+                    else:
+                        next_deadline = potential_sentence_end_time
 
                     # 2. Allow TTS synthesis shortly before the final silence duration elapses
-                    tts_allowance_time = silence_waiting_time - self._TTS_ALLOWANCE_OFFSET_S
                     if time_since_silence > tts_allowance_time:
-                        if self.on_tts_allowed_to_synthesize: # Check if callback exists
-                            self.on_tts_allowed_to_synthesize()
+                        if tts_allowed_for != speech_end_silence_start:
+                            tts_allowed_for = speech_end_silence_start
+                            if self.on_tts_allowed_to_synthesize: # Check if callback exists
+                                self.on_tts_allowed_to_synthesize()
+                    elif next_deadline is None or tts_allowance_time < next_deadline:
+                        next_deadline = tts_allowance_time
 
                     # 3. Handle "Hot" state (potential full transcription)
                     hot_condition_met = time_since_silence > start_hot_condition_time
                     if hot_condition_met and not hot:
                         hot = True
-                        print(f"{Colors.MAGENTA}HOT{Colors.RESET}")
+                        logger.info("👂🔥 {magenta}HOT")
                         if self.potential_full_transcription_callback:
                             self.potential_full_transcription_callback(self.realtime_text)
                     elif not hot_condition_met and hot:
                         # Transitioning from Hot to Cold while still in silence period (e.g., silence_waiting_time changed)
                         if self._is_recorder_recording(): # Check if still recording before aborting
-                            print(f"{Colors.CYAN}COLD (during silence){Colors.RESET}")
+                            logger.info("👂🧊 {cyan}COLD (during silence)")
                             if self.potential_full_transcription_abort_callback:
                                 self.potential_full_transcription_abort_callback()
                         hot = False
+                    if not hot_condition_met and (next_deadline is None or start_hot_condition_time < next_deadline):
+                        next_deadline = start_hot_condition_time
+
+                    if next_deadline is not None:
+                        # Triggers fire once the time is strictly past the threshold
+                        next_deadline = max(0.0, next_deadline - time_since_silence) + self._SILENCE_MONITOR_DEADLINE_SLACK_S
 
                 elif hot: # Exited silence period (speech_end_silence_start is 0 or None)
                     # If we were hot, but silence ended (e.g., new speech started), transition to cold
                     if self._is_recorder_recording(): # Check if recording actually restarted
-                         print(f"{Colors.CYAN}COLD (silence ended){Colors.RESET}")
+                         logger.info("👂🧊 {cyan}COLD (silence ended)")
                          if self.potential_full_transcription_abort_callback:
                              self.potential_full_transcription_abort_callback()
                     hot = False
 
-                time.sleep(0.001) # Short sleep to prevent busy-waiting dominating CPU
+                # Sleep until the earliest pending trigger or the next state change
+                self.silence_monitor_wakeup.wait(next_deadline)
 
-        monitor_thread = threading.Thread(target=monitor, daemon=True)
+        monitor_thread = threading.Thread(target=monitor, name="SilenceMonitorThread", daemon=True)
         monitor_thread.start()
 
     def on_new_waiting_time(
@@ -334,8 +411,9 @@ class TranscriptionProcessor:
             current_duration = self._get_recorder_param("post_speech_silence_duration")
             if current_duration != waiting_time:
                 log_text = text if text else "(No text provided)"
-                logger.info(f"👂⏳ {Colors.GRAY}New waiting time: {Colors.RESET}{Colors.YELLOW}{waiting_time:.2f}{Colors.RESET}{Colors.GRAY} for text: {log_text}{Colors.RESET}")
+                logger.info("👂⏳ {gray}New waiting time: {reset}{yellow}%.2f{reset}{gray} for text: %s", waiting_time, log_text)
                 self._set_recorder_param("post_speech_silence_duration", waiting_time)
+                self.silence_monitor_wakeup.set() # Deadlines of the current silence period moved
         else:
             logger.warning("👂⚠️ Recorder not initialized, cannot set new waiting time.")
 
@@ -353,7 +431,8 @@ class TranscriptionProcessor:
                 return
 
             self.final_transcription = text
-            logger.info(f"👂✅ {Colors.apply('Final user text: ').green} {Colors.apply(text).yellow}")
+            logger.info("👂✅ {green}Final user text: {reset} {yellow}%s", text)
+            tracer.instant("final_transcription", "stt", session=self.session_id, text=text)
             self.sentence_end_cache.clear()
             self.potential_sentences_yielded.clear()
 
@@ -373,7 +452,7 @@ class TranscriptionProcessor:
                  try:
                      self._set_recorder_param('on_final_transcription', on_final)
                  except Exception as e:
-                     logger.error(f"👂💥 Failed to set final transcription callback parameter for client: {e}")
+                     logger.error("👂💥 Failed to set final transcription callback parameter for client: %s", e)
             else:
                 logger.warning("👂⚠️ Local recorder object does not have a 'text' method for final callback.")
         else:
@@ -406,13 +485,14 @@ class TranscriptionProcessor:
         """
         if self.recorder: # Check if recorder exists, primarily as a gatekeeper
             if self.realtime_text is None:
-                logger.warning(f"👂❓ {Colors.RED}Forcing final transcription, but realtime_text is None. Using empty string.{Colors.RESET}")
+                logger.warning("👂❓ {red}Forcing final transcription, but realtime_text is None. Using empty string.")
                 current_text = ""
             else:
                 current_text = self.realtime_text
 
             self.final_transcription = current_text # Update internal state
-            logger.info(f"👂❗ {Colors.apply('Forced Final user text: ').green} {Colors.apply(current_text).yellow}")
+            logger.info("👂❗ {green}Forced Final user text: {reset} {yellow}%s", current_text)
+            tracer.instant("final_transcription", "stt", session=self.session_id, text=current_text, forced=True)
             self.sentence_end_cache.clear()
             self.potential_sentences_yielded.clear()
 
@@ -438,9 +518,9 @@ class TranscriptionProcessor:
         """
         text = text.lower()
         # Remove all non-alphanumeric characters (keeping spaces)
-        text = re.sub(r'[^a-z0-9\s]', '', text) # Keep spaces for SequenceMatcher
+        text = self._NON_ALNUM_REGEX.sub('', text) # Keep spaces for SequenceMatcher
         # Remove extra whitespace and trim
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = self._WHITESPACE_REGEX.sub(' ', text).strip()
         return text
 
     def is_basically_the_same(
@@ -476,6 +556,11 @@ class TranscriptionProcessor:
         is True (e.g., due to silence timeout), it triggers the `potential_sentence_end`
         callback, avoiding redundant triggers for the same sentence.
 
+        Both caches are `SentenceTailCache`s keyed by the normalized last words, so a
+        repeated ending is an exact lookup and only new endings fall back to fuzzy
+        matching. Endings not seen within the cache age are evicted, keeping the
+        per-update cost flat no matter how long the user talks.
+
         Args:
             text: The real-time transcription text to check.
             force_yield: If True, bypasses punctuation and timing checks and forces
@@ -502,62 +587,50 @@ class TranscriptionProcessor:
         if not ends_with_punctuation and not force_yield:
             return
 
-        normalized_text = self._normalize_text(stripped_text_raw)
-        if not normalized_text: # Handle cases where normalization leaves empty string
+        # Normalized last words; only the end of the (ever growing) transcript is normalized
+        tail = self.sentence_end_cache.tail_from_text(stripped_text_raw, self._normalize_text)
+        if not tail: # Handle cases where normalization leaves empty string
             return
 
         # --- Cache Management ---
-        entry_found = None
-        for entry in self.sentence_end_cache:
-            # Check if normalized text matches cached entry
-            if self.is_basically_the_same(entry['text'], normalized_text):
-                entry_found = entry
-                break
-
-        if entry_found:
-            entry_found['timestamps'].append(now)
+        # Endings whose newest timestamp is too old can't reach the trigger count anymore
+        self.sentence_end_cache.evict_older_than(now - self._SENTENCE_CACHE_MAX_AGE_MS, lambda stamps: stamps[-1])
+
+        cached_tail = self.sentence_end_cache.find(tail)
+        if cached_tail is not None:
+            timestamps = self.sentence_end_cache.entries[cached_tail]
+            timestamps.append(now)
             # Keep only recent timestamps
-            entry_found['timestamps'] = [t for t in entry_found['timestamps'] if now - t <= self._SENTENCE_CACHE_MAX_AGE_MS]
+            timestamps = [t for t in timestamps if now - t <= self._SENTENCE_CACHE_MAX_AGE_MS]
+            self.sentence_end_cache.add(cached_tail, timestamps)
         else:
             # Add new entry
-            entry_found = {'text': normalized_text, 'timestamps': [now]}
-            self.sentence_end_cache.append(entry_found)
-            # Optional: Limit cache size if it grows too large over time
-            # MAX_CACHE_SIZE = 50
-            # if len(self.sentence_end_cache) > MAX_CACHE_SIZE:
-            #     self.sentence_end_cache.pop(0) # Remove oldest
+            timestamps = [now]
+            self.sentence_end_cache.add(tail, timestamps)
 
         # --- Yielding Logic ---
         should_yield = False
         if force_yield:
             should_yield = True
         # Yield if the same sentence ending appeared multiple times recently
-        elif ends_with_punctuation and len(entry_found['timestamps']) >= self._SENTENCE_CACHE_TRIGGER_COUNT:
+        elif ends_with_punctuation and len(timestamps) >= self._SENTENCE_CACHE_TRIGGER_COUNT:
              should_yield = True
 
 
         if should_yield:
-            # Check if this *exact* normalized text was already yielded recently
-            already_yielded = False
-            for yielded_entry in self.potential_sentences_yielded:
-                # Using the same similarity check for yielded text
-                if self.is_basically_the_same(yielded_entry['text'], normalized_text):
-                    already_yielded = True
-                    break
+            # Check if this sentence ending was already yielded (same similarity check as the cache)
+            already_yielded = self.potential_sentences_yielded.find(tail) is not None
 
             if not already_yielded:
-                # Add to yielded list (use normalized text for comparison, keep timestamp)
-                self.potential_sentences_yielded.append({'text': normalized_text, 'timestamp': now})
-                # Optional: Limit yielded list size
-                # MAX_YIELDED_SIZE = 20
-                # if len(self.potential_sentences_yielded) > MAX_YIELDED_SIZE:
-                #    self.potential_sentences_yielded.pop(0)
-
-                logger.info(f"👂➡️ Yielding potential sentence end: {stripped_text_raw}")
+                # Remember the yielded ending (bounded, oldest yields are dropped first)
+                self.potential_sentences_yielded.add(tail, now)
+
+                logger.info("👂➡️ Yielding potential sentence end: %s", stripped_text_raw)
+                tracer.instant("potential_sentence_end", "stt", session=self.session_id, text=stripped_text_raw, forced=force_yield)
                 if self.potential_sentence_end:
                     self.potential_sentence_end(stripped_text_raw) # Callback with original punctuation
             # else: # No need to log this every time, can be noisy
-                 # logger.debug(f"👂➡️ Sentence '{normalized_text}' matched yielded '{yielded_entry.get('text', '')}', not yielding again.")
+                 # logger.debug(f"👂➡️ Sentence '{normalized_text}' was already yielded, not yielding again.")
 
 
     def set_silence(self, silence_active: bool) -> None:
@@ -569,7 +642,7 @@ class TranscriptionProcessor:
         """
         if self.silence_active != silence_active:
             self.silence_active = silence_active
-            logger.info(f"👂🤫 Silence state changed: {'ACTIVE' if silence_active else 'INACTIVE'}")
+            logger.info("👂🤫 Silence state changed: %s", "ACTIVE" if silence_active else "INACTIVE")
             if self.silence_active_callback:
                 self.silence_active_callback(silence_active)
 
@@ -642,12 +715,12 @@ class TranscriptionProcessor:
              # Update last_audio_copy only if the new copy is valid and has data
              if audio_copy is not None and len(audio_copy) > 0:
                  self.last_audio_copy = audio_copy
-                 logger.debug(f"👂💾 Successfully got audio copy (length: {len(audio_copy)} samples).")
+                 logger.debug("👂💾 Successfully got audio copy (length: %d samples).", len(audio_copy))
 
 
              return audio_copy
         except Exception as e:
-             logger.error(f"👂💥 Error getting audio copy: {e}", exc_info=True)
+             logger.error("👂💥 Error getting audio copy: %s", e, exc_info=True)
              return self.last_audio_copy # Return last known on error
 
     def _create_recorder(self) -> None:
@@ -663,7 +736,7 @@ class TranscriptionProcessor:
             # Capture silence start time immediately. Use recorder's time if available.
             recorder_silence_start = self._get_recorder_param("speech_end_silence_start", None)
             self.silence_time = recorder_silence_start if recorder_silence_start else time.time()
-            logger.debug(f"👂🤫 Silence detected (start_silence_detection called). Silence time set to: {self.silence_time}")
+            logger.debug("👂🤫 Silence detected (start_silence_detection called). Silence time set to: %s", self.silence_time)
 
 
         def stop_silence_detection():
@@ -698,7 +771,7 @@ class TranscriptionProcessor:
                     result = self.before_final_sentence(audio_copy, self.realtime_text)
                     return result if isinstance(result, bool) else False
                 except Exception as e:
-                    logger.error(f"👂💥 Error in before_final_sentence callback: {e}", exc_info=True)
+                    logger.error("👂💥 Error in before_final_sentence callback: %s", e, exc_info=True)
                     return False # Ensure False is returned on error
             return False # Indicate no action taken if callback doesn't exist or doesn't return True
 
@@ -708,6 +781,8 @@ class TranscriptionProcessor:
                 # logger.warning(f"👂❓ {Colors.RED}Partial text received None{Colors.RESET}") # Can be noisy
                 return
             self.realtime_text = text # Update the latest realtime text
+            if self.silence_time:
+                self.silence_monitor_wakeup.set() # A timed-out sentence end is re-checked with the new text
 
             # Detect potential sentence ends based on punctuation stability
             self.detect_potential_sentence_end(text)
@@ -717,13 +792,13 @@ class TranscriptionProcessor:
             # Log only significant changes or all partials based on debug level maybe
             if stripped_partial_user_text_new != self.stripped_partial_user_text:
                 self.stripped_partial_user_text = stripped_partial_user_text_new
-                logger.info(f"👂📝 Partial transcription: {Colors.CYAN}{text}{Colors.RESET}")
+                logger.info("👂📝 Partial transcription: {cyan}%s", text)
                 if self.realtime_transcription_callback:
                     self.realtime_transcription_callback(text)
                 if USE_TURN_DETECTION and hasattr(self, 'turn_detection'):
                     self.turn_detection.calculate_waiting_time(text=text)
             else: # Log less critical updates differently (optional, uncomment if needed)
-                 logger.debug(f"👂📝 Partial transcription (no change after strip): {Colors.GRAY}{text}{Colors.RESET}")
+                 logger.debug("👂📝 Partial transcription (no change after strip): {gray}%s", text)
 
 
         # --- Prepare Recorder Configuration ---
@@ -753,7 +828,7 @@ class TranscriptionProcessor:
         padded_cfg = textwrap.indent(json.dumps(pretty_cfg, indent=2), "    ")
 
         recorder_type = "AudioToTextRecorderClient" if START_STT_SERVER else "AudioToTextRecorder"
-        logger.info(f"👂⚙️ Creating {recorder_type} with params:")
+        logger.info("👂⚙️ Creating %s with params:", recorder_type)
         print(Colors.apply(padded_cfg).blue) # Use print for formatted JSON as logger might mangle it
 
 
@@ -771,21 +846,21 @@ class TranscriptionProcessor:
                 # Ensure wake words are disabled if needed (double check via param setting)
                 self._set_recorder_param("use_wake_words", False) # Uses the helper method
 
-            logger.info(f"👂✅ {recorder_type} instance created successfully.")
+            logger.info("👂✅ %s instance created successfully.", recorder_type)
 
         except Exception as e:
             # Log the exception with traceback for detailed debugging
-            logger.exception(f"👂🔥 Failed to create recorder: {e}")
+            logger.exception("👂🔥 Failed to create recorder: %s", e)
             self.recorder = None # Ensure recorder is None if creation failed
 
-    def feed_audio(self, chunk: bytes, audio_meta_data: Optional[Dict[str, Any]] = None) -> None:
+    def feed_audio(self, chunk: bytes, audio_meta_data: Optional[Any] = None) -> None:
         """
         Feeds an audio chunk to the underlying recorder instance for processing.
 
         Args:
             chunk: A bytes object containing the raw audio data chunk.
-            audio_meta_data: Optional dictionary containing metadata about the audio
-                             (e.g., sample rate, channels), if required by the recorder.
+            audio_meta_data: Optional metadata about the audio (the `AudioPacket` it
+                             came from), if required by the recorder.
         """
         if self.recorder and not self.shutdown_performed:
             try:
@@ -797,15 +872,41 @@ class TranscriptionProcessor:
                      # Local recorder might use metadata if provided
                      self.recorder.feed_audio(chunk) # Assuming local handles it similarly for now
 
-                logger.debug(f"👂🔊 Fed audio chunk of size {len(chunk)} bytes to recorder.")
+                logger.debug("👂🔊 Fed audio chunk of size %d bytes to recorder.", len(chunk))
             except Exception as e:
-                logger.error(f"👂💥 Error feeding audio to recorder: {e}")
+                logger.error("👂💥 Error feeding audio to recorder: %s", e)
         elif not self.recorder:
             logger.warning("👂⚠️ Cannot feed audio: Recorder not initialized.")
         elif self.shutdown_performed:
             logger.debug("👂🚫 Cannot feed audio: Shutdown already performed.")
         # No warning if shutdown_performed is True, as expected
 
+    def reset(self) -> None:
+        """
+        Clears all per-conversation transcription state so the processor can be reused.
+
+        Drops cached partial texts and potential sentence ends, resets the turn
+        detection history and discards any audio still queued in the recorder.
+        The recorder itself (and its loaded models) is kept alive.
+        """
+        logger.info("👂🔄 Resetting TranscriptionProcessor state.")
+        self.realtime_text = None
+        self.final_transcription = None
+        self.stripped_partial_user_text = ""
+        self.sentence_end_cache.clear()
+        self.potential_sentences_yielded.clear()
+        self.last_audio_copy = None
+        self.silence_time = 0.0
+
+        if USE_TURN_DETECTION and hasattr(self, 'turn_detection'):
+            self.turn_detection.reset()
+
+        if self.recorder and hasattr(self.recorder, 'clear_audio_queue'):
+            try:
+                self.recorder.clear_audio_queue()
+            except Exception as e:
+                logger.warning("👂⚠️ Error clearing recorder audio queue: %s", e)
+
     def shutdown(self) -> None:
         """
         Shuts down the recorder instance, cleans up resources, and prevents
@@ -814,6 +915,7 @@ class TranscriptionProcessor:
         if not self.shutdown_performed:
             logger.info("👂🔌 Shutting down TranscriptionProcessor...")
             self.shutdown_performed = True # Set flag early to stop loops/threads
+            self.silence_monitor_wakeup.set()
 
             if self.recorder:
                 logger.info("👂🔌 Calling recorder shutdown()...")
@@ -821,7 +923,7 @@ class TranscriptionProcessor:
                     self.recorder.shutdown()
                     logger.info("👂🔌 Recorder shutdown() method completed.")
                 except Exception as e:
-                    logger.error(f"👂💥 Error during recorder shutdown: {e}", exc_info=True)
+                    logger.error("👂💥 Error during recorder shutdown: %s", e, exc_info=True)
                 finally:
                     self.recorder = None
             else:
@@ -833,7 +935,7 @@ class TranscriptionProcessor:
                 try:
                     self.turn_detection.shutdown() # Example: Assuming TurnDetection has a shutdown method
                 except Exception as e:
-                     logger.error(f"👂💥 Error during TurnDetection shutdown: {e}", exc_info=True)
+                     logger.error("👂💥 Error during TurnDetection shutdown: %s", e, exc_info=True)
 
             logger.info("👂🔌 TranscriptionProcessor shutdown process finished.")
         else:
@@ -0,0 +1,319 @@
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE_SUFFIX = ".pcm"
+CHUNK_COUNT = struct.Struct("<I")
+FINGERPRINT_CONTENT_BYTES = 16 * 1024 * 1024 # Larger files are fingerprinted by size and mtime only
+
+
+def normalize_tts_text(text: str) -> str:
+    """
+    Normalizes a text for cache lookups.
+
+    Case and whitespace do not change how a phrase is spoken, punctuation does
+    ("Sure!" vs. "Sure."), so only the former are folded.
+
+    Args:
+        text: The text that is about to be synthesized.
+
+    Returns:
+        The normalized text.
+    """
+    return " ".join(text.split()).casefold()
+
+
+def fingerprint_files(paths: List[str]) -> str:
+    """
+    Builds a short fingerprint of model or voice files for cache keys.
+
+    Small files (a reference voice clip, configs, vocabularies) are hashed by
+    content; files above `FINGERPRINT_CONTENT_BYTES` (model weights) by size and
+    modification time, which is cheap and still changes when they are replaced.
+
+    Args:
+        paths: The files that determine the synthesized audio.
+
+    Returns:
+        A hex digest; missing files contribute "missing".
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(os.path.basename(path).encode("utf-8") + b"\0")
+        try:
+            stat = os.stat(path)
+            if stat.st_size <= FINGERPRINT_CONTENT_BYTES:
+                with open(path, "rb") as f:
+                    digest.update(hashlib.sha1(f.read()).digest())
+            else:
+                digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("ascii"))
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()[:16]
+
+
+class ChunkRecorder:
+    """
+    Queue proxy that remembers every chunk put into the wrapped queue.
+
+    Lets a synthesis run write to the real output queue while collecting the
+    exact chunks that were emitted, for storing them in the `TTSCache`.
+    """
+    def __init__(self, queue: Any) -> None:
+        """
+        Initializes the ChunkRecorder.
+
+        Args:
+            queue: The queue the chunks are forwarded to (needs `put_nowait`).
+        """
+        self.queue = queue
+        self.chunks: List[bytes] = []
+
+    def put_nowait(self, chunk: bytes) -> None:
+        """Forwards a chunk to the wrapped queue and records it."""
+        self.queue.put_nowait(chunk)
+        self.chunks.append(chunk)
+
+
+class TTSCache:
+    """
+    Content-addressed cache of synthesized PCM chunks for short phrases.
+
+    Entries are keyed by engine, model, voice, speed and normalized text, where
+    model and voice carry fingerprints of their files, so replacing a reference
+    clip or model never replays audio of the old one. Recently used
+    entries are kept in an in-memory LRU bounded by `max_memory_bytes`. If a
+    directory is given, every entry is also written to a file there (chunk
+    count, chunk lengths, then the raw PCM) and read back through `mmap` on a
+    memory miss, so phrases survive restarts. The disk store is bounded by
+    `max_disk_bytes`; the least recently used files are deleted first.
+    """
+    def __init__(
+            self,
+            directory: Optional[str] = None,
+            max_memory_bytes: int = 64 * 1024 * 1024,
+            max_disk_bytes: int = 512 * 1024 * 1024,
+            max_text_chars: int = 80,
+        ) -> None:
+        """
+        Initializes the TTSCache and indexes the files already on disk.
+
+        Args:
+            directory: Directory of the on-disk store, None keeps the cache in memory only.
+            max_memory_bytes: Maximum PCM bytes held in the in-memory LRU.
+            max_disk_bytes: Maximum size of the on-disk store in bytes.
+            max_text_chars: Longer texts are not cached (they rarely repeat).
+        """
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_text_chars = max_text_chars
+        self.lock = threading.Lock()
+        self.memory: "OrderedDict[str, List[bytes]]" = OrderedDict()
+        self.memory_bytes = 0
+        self.disk: "OrderedDict[str, int]" = OrderedDict() # key -> file size, least recently used first
+        self.disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.directory:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                entries = []
+                for name in os.listdir(self.directory):
+                    if name.endswith(CACHE_FILE_SUFFIX):
+                        stat = os.stat(os.path.join(self.directory, name))
+                        entries.append((stat.st_mtime, name[:-len(CACHE_FILE_SUFFIX)], stat.st_size))
+                for _mtime, key, size in sorted(entries):
+                    self.disk[key] = size
+                    self.disk_bytes += size
+                self._evict_disk_unsafe()
+                logger.info(f"👄💾 TTS cache: {len(self.disk)} phrases on disk ({self.disk_bytes / 1024 / 1024:.1f} MB) in '{self.directory}'.")
+            except OSError as e:
+                logger.warning(f"👄⚠️ TTS cache directory '{self.directory}' unusable, keeping the cache in memory only: {e}")
+                self.directory = None
+
+    def make_key(self, engine: str, model: str, voice: str, speed: float, text: str) -> Optional[str]:
+        """
+        Builds the cache key for a synthesis request.
+
+        Args:
+            engine: TTS engine name.
+            model: Model identifier of the engine, including a file fingerprint where available.
+            voice: Voice identifier of the engine, including a file fingerprint where available.
+            speed: Speaking speed of the engine.
+            text: The text to synthesize.
+
+        Returns:
+            A hex digest, or None if the text should not be cached.
+        """
+        normalized = normalize_tts_text(text)
+        if not normalized or len(normalized) > self.max_text_chars:
+            return None
+        return hashlib.sha1(f"{engine}\0{model}\0{voice}\0{speed}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[bytes]]:
+        """
+        Looks up the chunks for a key, from memory first, then from disk.
+
+        Args:
+            key: A key built by `make_key`.
+
+        Returns:
+            The cached PCM chunks, or None on a miss.
+        """
+        with self.lock:
+            chunks = self.memory.get(key)
+            if chunks is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return chunks
+            on_disk = key in self.disk
+
+        chunks = self._read_file(key) if on_disk else None
+        with self.lock:
+            if chunks is None:
+                self.misses += 1
+                if on_disk:
+                    self._forget_disk_unsafe(key)
+                return None
+            self.disk_hits += 1
+            if key in self.disk:
+                self.disk.move_to_end(key)
+            self._remember_unsafe(key, chunks)
+        return chunks
+
+    def put(self, key: str, chunks: List[bytes]) -> None:
+        """
+        Stores the chunks of a completed synthesis.
+
+        Args:
+            key: A key built by `make_key`.
+            chunks: The PCM chunks in playback order.
+        """
+        if not chunks:
+            return
+        with self.lock:
+            self._remember_unsafe(key, chunks)
+            self.stores += 1
+        if self.directory:
+            size = self._write_file(key, chunks)
+            if size:
+                with self.lock:
+                    self.disk_bytes += size - self.disk.pop(key, 0)
+                    self.disk[key] = size
+                    self._evict_disk_unsafe()
+
+    def stats(self) -> dict:
+        """
+        Returns cache statistics.
+
+        Returns:
+            A dict with entry counts, sizes, hits (memory/disk), misses, hit rate,
+            stores and evictions (memory/disk).
+        """
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+                "disk_entries": len(self.disk),
+                "disk_bytes": self.disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "stores": self.stores,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+    def _remember_unsafe(self, key: str, chunks: List[bytes]) -> None:
+        size = sum(len(c) for c in chunks)
+        if size > self.max_memory_bytes:
+            return
+        previous = self.memory.pop(key, None)
+        if previous is not None:
+            self.memory_bytes -= sum(len(c) for c in previous)
+        self.memory[key] = chunks
+        self.memory_bytes += size
+        while self.memory_bytes > self.max_memory_bytes:
+            _old_key, old_chunks = self.memory.popitem(last=False)
+            self.memory_bytes -= sum(len(c) for c in old_chunks)
+            self.memory_evictions += 1
+
+    def _evict_disk_unsafe(self) -> None:
+        while self.disk and self.disk_bytes > self.max_disk_bytes:
+            key = next(iter(self.disk))
+            self._forget_disk_unsafe(key)
+            self.disk_evictions += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _forget_disk_unsafe(self, key: str) -> None:
+        self.disk_bytes -= self.disk.pop(key, 0)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_FILE_SUFFIX)
+
+    def _write_file(self, key: str, chunks: List[bytes]) -> int:
+        """Writes an entry atomically, returns its size in bytes (0 on failure)."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        header = CHUNK_COUNT.pack(len(chunks)) + struct.pack(f"<{len(chunks)}I", *(len(c) for c in chunks))
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+            return len(header) + sum(len(c) for c in chunks)
+        except OSError as e:
+            logger.warning(f"👄⚠️ Could not write TTS cache file '{path}': {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return 0
+
+    def _read_file(self, key: str) -> Optional[List[bytes]]:
+        """Reads an entry through mmap, returns None if it is missing or corrupt."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                count, = CHUNK_COUNT.unpack_from(mm, 0)
+                offset = CHUNK_COUNT.size
+                lengths = struct.unpack_from(f"<{count}I", mm, offset)
+                offset += 4 * count
+                if offset + sum(lengths) != len(mm):
+                    raise ValueError("size mismatch")
+                chunks = []
+                for length in lengths:
+                    chunks.append(mm[offset:offset + length])
+                    offset += length
+            os.utime(path) # Keeps the on-disk LRU order across restarts
+            return chunks
+        except FileNotFoundError:
+            logger.debug(f"👄💾 TTS cache file '{path}' was removed, treating it as a miss.")
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            logger.warning(f"👄⚠️ Dropping unreadable TTS cache file '{path}': {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
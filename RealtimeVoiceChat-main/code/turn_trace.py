@@ -0,0 +1,282 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-turn timeline recording, exported as Chrome trace-event JSON (opt-in)
+TURN_TRACE = os.getenv("TURN_TRACE", "false").lower() not in ("0", "false", "no")
+try:
+    TURN_TRACE_BUFFER_SIZE = int(os.getenv("TURN_TRACE_BUFFER_SIZE", 50000))
+except ValueError:
+    logger.warning("🧭⚠️ Invalid TURN_TRACE_BUFFER_SIZE env var. Using default: 50000")
+    TURN_TRACE_BUFFER_SIZE = 50000
+try:
+    TURN_TRACE_TURNS = int(os.getenv("TURN_TRACE_TURNS", 100))
+except ValueError:
+    logger.warning("🧭⚠️ Invalid TURN_TRACE_TURNS env var. Using default: 100")
+    TURN_TRACE_TURNS = 100
+
+TURN_LEAD_IN_US = 1_000_000 # Events this long before a turn started still belong to its timeline
+CLIENT_TIMESTAMP_RANGE_MS = 1 << 32 # Clients send `Date.now() & 0xFFFFFFFF`
+
+
+def unwrap_client_ms(timestamp_ms: int, server_ns: int) -> int:
+    """
+    Restores a client's epoch milliseconds from its truncated 32-bit timestamp.
+
+    Picks the epoch time closest before `server_ns` whose lower 32 bits match,
+    which is correct as long as client and server clocks differ by less than
+    ~49 days.
+
+    Args:
+        timestamp_ms: The uint32 timestamp from the audio packet header.
+        server_ns: The server receive time in nanoseconds since the epoch.
+
+    Returns:
+        The client send time in milliseconds since the epoch.
+    """
+    server_ms = server_ns // 1_000_000
+    return server_ms - ((server_ms - timestamp_ms) % CLIENT_TIMESTAMP_RANGE_MS)
+
+
+class _Span:
+    """Context manager recording one complete ("X") event when it exits."""
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: "TurnTracer", name: str, category: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def set(self, **args: Any) -> None:
+        """Adds arguments to the event, e.g. results only known at the end."""
+        self.args.update(args)
+
+    def __enter__(self) -> "_Span":
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.category, self.start, **self.args)
+
+
+class _NullSpan:
+    """Span handed out while tracing is disabled, does nothing."""
+    __slots__ = ()
+
+    def set(self, **args: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class TurnTracer:
+    """
+    Ring buffer of timeline events, grouped into voice turns on export.
+
+    Components record instants ("i") and complete spans ("X") with wall clock
+    timestamps; `start_turn()` marks where a user turn begins. `export()` cuts
+    the events of one turn out of the buffer and returns them as Chrome
+    trace-event JSON, which chrome://tracing and https://ui.perfetto.dev open
+    directly. While disabled every recording call returns right away, so the
+    instrumentation can stay in the hot paths.
+    """
+    def __init__(self, enabled: bool = False, capacity: int = 50000, max_turns: int = 100) -> None:
+        """
+        Initializes the TurnTracer.
+
+        Args:
+            enabled: Whether events are recorded.
+            capacity: Maximum number of events kept, the oldest are overwritten.
+            max_turns: Maximum number of turns kept for export.
+        """
+        self.enabled = enabled
+        self.events: deque = deque(maxlen=capacity) # (ts_us, dur_us, name, category, tid, args)
+        self.turns: deque = deque(maxlen=max_turns)
+        self.thread_names: Dict[int, str] = {}
+        self.lock = threading.Lock()
+        self.next_turn_id = 1
+
+    def _record(self, ts_us: int, dur_us: Optional[int], name: str, category: str, args: Dict[str, Any]) -> None:
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        self.events.append((ts_us, dur_us, name, category, tid, args)) # deque.append is atomic
+
+    def instant(self, name: str, category: str, ts: Optional[float] = None, **args: Any) -> None:
+        """
+        Records a point in time.
+
+        Args:
+            name: Event name shown in the timeline.
+            category: Event category (component), e.g. "stt" or "tts".
+            ts: Time in seconds since the epoch, defaults to now.
+            **args: Details shown when the event is selected.
+        """
+        if not self.enabled:
+            return
+        self._record(int((ts if ts is not None else time.time()) * 1_000_000), None, name, category, args)
+
+    def complete(self, name: str, category: str, start: float, end: Optional[float] = None, **args: Any) -> None:
+        """
+        Records a span that already ended.
+
+        Args:
+            name: Event name shown in the timeline.
+            category: Event category (component), e.g. "llm".
+            start: Start time in seconds since the epoch.
+            end: End time in seconds since the epoch, defaults to now.
+            **args: Details shown when the event is selected.
+        """
+        if not self.enabled:
+            return
+        start_us = int(start * 1_000_000)
+        end_us = int((end if end is not None else time.time()) * 1_000_000)
+        self._record(start_us, max(0, end_us - start_us), name, category, args)
+
+    def span(self, name: str, category: str, **args: Any):
+        """
+        Returns a context manager that records its body as a complete span.
+
+        Args:
+            name: Event name shown in the timeline.
+            category: Event category (component).
+            **args: Details shown when the event is selected.
+
+        Returns:
+            A span with a `set(**args)` method, or a shared no-op span if disabled.
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def start_turn(self, session_id: Optional[int] = None) -> Optional[int]:
+        """
+        Marks the beginning of a user turn and ends the session's previous one.
+
+        Args:
+            session_id: The session the turn belongs to.
+
+        Returns:
+            The new turn id, or None if disabled.
+        """
+        if not self.enabled:
+            return None
+        now_us = int(time.time() * 1_000_000)
+        with self.lock:
+            for turn in self.turns:
+                if turn["session"] == session_id and turn["end_us"] is None:
+                    turn["end_us"] = now_us
+            turn_id = self.next_turn_id
+            self.next_turn_id += 1
+            self.turns.append({"id": turn_id, "session": session_id, "start_us": now_us, "end_us": None})
+        self.instant("turn_start", "turn", turn=turn_id, session=session_id)
+        return turn_id
+
+    def end_turn(self, session_id: Optional[int] = None) -> None:
+        """
+        Marks the end of the session's current turn (assistant answer delivered or interrupted).
+
+        Args:
+            session_id: The session the turn belongs to.
+        """
+        if not self.enabled:
+            return
+        now_us = int(time.time() * 1_000_000)
+        with self.lock:
+            for turn in self.turns:
+                if turn["session"] == session_id and turn["end_us"] is None:
+                    turn["end_us"] = now_us
+                    self.instant("turn_end", "turn", turn=turn["id"], session=session_id)
+
+    def list_turns(self) -> List[Dict[str, Any]]:
+        """
+        Returns the recorded turns, oldest first.
+
+        Returns:
+            Dicts with id, session, start time and duration in milliseconds
+            (None while the turn is still running).
+        """
+        with self.lock:
+            return [
+                {
+                    "id": turn["id"],
+                    "session": turn["session"],
+                    "start": turn["start_us"] / 1_000_000,
+                    "duration_ms": (turn["end_us"] - turn["start_us"]) / 1000 if turn["end_us"] is not None else None,
+                }
+                for turn in self.turns
+            ]
+
+    def export(self, turn_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Builds the Chrome trace-event document of a turn.
+
+        Contains every event from shortly before the turn started until it ended
+        (or until now). Events recorded with a `session` argument are limited to
+        the turn's session. Events without one (or with `session=None`) come from
+        components that do not act for a single session, such as the batched turn
+        detection model, and are always included.
+
+        Args:
+            turn_id: The turn to export, defaults to the latest one.
+
+        Returns:
+            A dict ready for `json.dumps`, or None if the turn is unknown.
+        """
+        with self.lock:
+            turn = None
+            for candidate in self.turns:
+                if turn_id is None or candidate["id"] == turn_id:
+                    turn = dict(candidate)
+        if turn is None:
+            return None
+        start_us = turn["start_us"] - TURN_LEAD_IN_US
+        end_us = turn["end_us"] if turn["end_us"] is not None else int(time.time() * 1_000_000)
+
+        pid = os.getpid()
+        trace_events = []
+        tids = set()
+        for ts_us, dur_us, name, category, tid, args in list(self.events):
+            if ts_us + (dur_us or 0) < start_us or ts_us > end_us:
+                continue
+            session = args.get("session")
+            if session is not None and session != turn["session"]:
+                continue
+            event = {"name": name, "cat": category, "ph": "X" if dur_us is not None else "i", "ts": ts_us, "pid": pid, "tid": tid, "args": args}
+            if dur_us is not None:
+                event["dur"] = dur_us
+            else:
+                event["s"] = "t" # Instant scoped to its thread
+            trace_events.append(event)
+            tids.add(tid)
+        trace_events.sort(key=lambda event: event["ts"])
+
+        metadata = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"Voice turn {turn['id']}"}}]
+        for tid in sorted(tids):
+            metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": self.thread_names.get(tid, str(tid))}})
+        return {
+            "traceEvents": metadata + trace_events,
+            "displayTimeUnit": "ms",
+            "otherData": {"turn": turn["id"], "session": turn["session"]},
+        }
+
+
+tracer = TurnTracer(TURN_TRACE, TURN_TRACE_BUFFER_SIZE, TURN_TRACE_TURNS)
+if TURN_TRACE:
+    logger.info(f"🧭⚙️ Turn tracing enabled (buffer: {TURN_TRACE_BUFFER_SIZE} events, {TURN_TRACE_TURNS} turns).")
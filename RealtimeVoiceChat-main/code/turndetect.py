@@ -1,19 +1,56 @@
 import logging
 logger = logging.getLogger(__name__)
 
-import transformers
+import importlib.util
 import collections
+import atexit
+import json
 import threading
 import queue
-import torch
 import time
+import os
 import re
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+from metrics import TURN_DETECTION_INFERENCE
 
 # Configuration constants
 model_dir_local = "KoljaB/SentenceFinishedClassification"
 model_dir_cloud = "/root/models/sentenceclassification/"
 sentence_end_marks = ['.', '!', '?', '。'] # Characters considered sentence endings
 
+# Classifier backend: "torch" (transformers, default) or "onnx" (onnxruntime, exported on first use)
+TURN_DETECTION_BACKEND = os.getenv("TURN_DETECTION_BACKEND", "torch").lower()
+TURN_DETECTION_ONNX_DIR = os.getenv("TURN_DETECTION_ONNX_DIR", "turndetection_onnx")
+TURN_DETECTION_ONNX_QUANTIZE = os.getenv("TURN_DETECTION_ONNX_QUANTIZE", "1").lower() not in ("0", "false", "no")
+try:
+    TURN_DETECTION_ONNX_THREADS = int(os.getenv("TURN_DETECTION_ONNX_THREADS", 2))
+except ValueError:
+    logger.warning("🎤⚠️ Invalid TURN_DETECTION_ONNX_THREADS env var. Using default: 2")
+    TURN_DETECTION_ONNX_THREADS = 2
+
+# Completion probability cache shared by all sessions (survives resets, optionally persisted to disk)
+try:
+    TURN_DETECTION_CACHE_SIZE = int(os.getenv("TURN_DETECTION_CACHE_SIZE", 4096))
+    TURN_DETECTION_CACHE_TTL = float(os.getenv("TURN_DETECTION_CACHE_TTL", 86400))
+except ValueError:
+    logger.warning("🎤⚠️ Invalid TURN_DETECTION_CACHE_SIZE/TTL env var. Using defaults: 4096 entries, 86400s")
+    TURN_DETECTION_CACHE_SIZE = 4096
+    TURN_DETECTION_CACHE_TTL = 86400.0
+TURN_DETECTION_CACHE_FILE = os.getenv("TURN_DETECTION_CACHE_FILE", "") # Empty disables persistence
+try:
+    TURN_DETECTION_CACHE_SAVE_INTERVAL = float(os.getenv("TURN_DETECTION_CACHE_SAVE_INTERVAL", 60))
+except ValueError:
+    logger.warning("🎤⚠️ Invalid TURN_DETECTION_CACHE_SAVE_INTERVAL env var. Using default: 60s")
+    TURN_DETECTION_CACHE_SAVE_INTERVAL = 60.0
+
+# Classifier instances shared by all TurnDetection objects, keyed by backend and model directory
+_shared_classifiers: dict[str, 'CompletionClassifier'] = {}
+_shared_classifiers_lock = threading.Lock()
+
 # Anchor points for probability-to-pause interpolation
 anchor_points = [
     (0.0, 1.0), # Probability 0.0 maps to pause 1.0
@@ -166,6 +203,551 @@ def interpolate_detection(prob: float) -> float:
     logger.warning(f"🎤⚠️ Probability {p} fell outside defined anchor points {anchor_points}. Returning fallback value.")
     return 4.0
 
+class CompletionProbabilityCache:
+    """
+    Thread-safe LRU cache of sentence completion probabilities with a TTL.
+
+    Keyed by the exact cleaned text `TurnDetection._text_worker` feeds the model.
+    One cache belongs to each shared CompletionClassifier, so it is used by all
+    sessions and survives `TurnDetection.reset()`: common openers like "I think" or
+    "Can you" are inferred once instead of every turn. If `path` is set, entries
+    are loaded from and saved to a JSON file so they also survive restarts. Saving
+    happens on a background thread every `save_interval` seconds when entries
+    changed (and once more at exit), never on the turn detection path.
+
+    Hit and miss counters plus the measured model time per miss are kept so
+    `stats()` can report how much inference time the cache saves.
+    """
+    def __init__(self, max_size: int = 4096, ttl: float = 86400.0, path: str = "", model_key: str = "", save_interval: float = 60.0) -> None:
+        """
+        Initializes the cache and loads persisted entries if a file path is given.
+
+        Args:
+            max_size: Maximum number of entries, least recently used ones are evicted.
+            ttl: Seconds after which an entry expires.
+            path: JSON file for persistence between restarts. Empty disables persistence.
+            model_key: Identifies the model the probabilities came from; a persisted
+                       file written for a different model is ignored.
+            save_interval: Seconds between background saves if `path` is set.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.model_key = model_key
+        self._entries: collections.OrderedDict[str, tuple[float, float]] = collections.OrderedDict() # text -> (probability, timestamp)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock() # One writer at a time, also against the exit save
+        self._dirty = False
+        self.save_interval = save_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.computed = 0 # Entries produced by the model
+        self.model_time = 0.0 # Seconds of model inference spent on those entries
+
+        if self.path:
+            self.load()
+            self._save_thread = threading.Thread(target=self._save_worker, name="CompletionCacheSaver", daemon=True)
+            self._save_thread.start()
+
+    def get(self, text: str) -> Optional[float]:
+        """
+        Returns the cached probability for `text`, or None if it is missing or expired.
+
+        Args:
+            text: The cleaned model input text.
+
+        Returns:
+            The cached probability or None.
+        """
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is not None and time.time() - entry[1] > self.ttl:
+                del self._entries[text]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text) # Mark as recently used
+            self.hits += 1
+            return entry[0]
+
+    def put(self, text: str, probability: float, inference_time: float = 0.0) -> None:
+        """
+        Stores a probability computed by the model.
+
+        Args:
+            text: The cleaned model input text.
+            probability: The completion probability.
+            inference_time: Model seconds spent on this text (used for the savings estimate).
+        """
+        with self._lock:
+            self._entries[text] = (probability, time.time())
+            self._entries.move_to_end(text)
+            self.computed += 1
+            self.model_time += inference_time
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False) # Remove the least recently used item
+                self.evictions += 1
+            self._dirty = True
+
+    def stats(self) -> dict:
+        """
+        Returns the cache counters.
+
+        Returns:
+            A dict with `size`, `hits`, `misses`, `evictions`, `hit_rate` and
+            `saved_model_ms` (hits times the mean model time per computed entry).
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_model_ms": self.hits * self.model_time / max(self.computed, 1) * 1000,
+            }
+
+    def load(self) -> None:
+        """Loads non-expired entries from `path`, ignoring missing or incompatible files."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"🎤⚠️ Could not load completion probability cache from {self.path}: {e}")
+            return
+        if data.get("model") != self.model_key:
+            logger.info(f"🎤🗑️ Ignoring completion probability cache {self.path} written for another model.")
+            return
+
+        now = time.time()
+        entries = sorted(data.get("entries", {}).items(), key=lambda item: item[1][1]) # Oldest first for LRU order
+        with self._lock:
+            for text, (probability, timestamp) in entries[-self.max_size:]:
+                if now - timestamp <= self.ttl:
+                    self._entries[text] = (probability, timestamp)
+        logger.info(f"🎤💾 Loaded {len(self._entries)} completion probabilities from {self.path}.")
+
+    def save(self) -> None:
+        """
+        Writes the cache to `path` if persistence is enabled and entries changed.
+
+        Serialized by a save lock and written through a unique temporary file in
+        the target directory, which then atomically replaces `path`.
+        """
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = {"model": self.model_key, "entries": dict(self._entries)}
+                self._dirty = False
+            tmp_path = None
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f"{os.path.basename(self.path)}.", suffix=".tmp")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path) # Atomic, a crash never leaves a half written cache
+                logger.debug(f"🎤💾 Saved {len(data['entries'])} completion probabilities to {self.path}.")
+            except OSError as e:
+                logger.warning(f"🎤⚠️ Could not save completion probability cache to {self.path}: {e}")
+                with self._lock:
+                    self._dirty = True # Try again with the next save
+                if tmp_path and os.path.exists(tmp_path):
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+
+    def _save_worker(self) -> None:
+        """Saves the cache every `save_interval` seconds; the exit save covers the rest."""
+        while True:
+            time.sleep(self.save_interval)
+            self.save()
+
+class ClassificationRequest:
+    """A single sentence waiting for the batching worker of a CompletionClassifier."""
+    def __init__(self, sentence: str) -> None:
+        self.sentence = sentence
+        self.done = threading.Event()
+        self.result: float = 0.0
+        self.error: Exception = None
+
+class CompletionClassifier:
+    """
+    Batched front end for the sentence completion classifier.
+
+    One instance (and one worker thread) exists per model directory and is shared by
+    all TurnDetection objects, i.e. by all voice sessions. Callers submit single
+    sentences via `predict`; the worker drains every request that is pending at that
+    moment and answers them with one forward pass. Sequences are padded only to the
+    longest sentence in the batch instead of `max_length`, so short partial
+    transcripts do not pay for 128 tokens of compute. A sentence that is already
+    waiting for the worker is not queued again; later callers wait on the pending
+    request instead.
+    """
+    def __init__(self, model_dir: str, max_length: int = 128, max_batch_size: int = 32) -> None:
+        """
+        Loads the tokenizer and model, warms them up and starts the batching worker.
+
+        Args:
+            model_dir: The local path or Hugging Face identifier of the classifier.
+            max_length: Max sequence length; longer inputs are truncated.
+            max_batch_size: Maximum number of sentences per forward pass.
+        """
+        self.max_length = max_length
+        self.max_batch_size = max_batch_size
+        self._load_model(model_dir)
+        self.cache = CompletionProbabilityCache(
+            max_size=TURN_DETECTION_CACHE_SIZE,
+            ttl=TURN_DETECTION_CACHE_TTL,
+            path=TURN_DETECTION_CACHE_FILE,
+            model_key=self._model_key(model_dir),
+            save_interval=TURN_DETECTION_CACHE_SAVE_INTERVAL,
+        )
+        atexit.register(self.cache.save)
+
+        # Warmup the classification model for faster initial predictions
+        logger.info("🎤🔥 Warming up the classification model...")
+        self.predict_batch(["This is a warmup sentence."])
+        logger.info("🎤✅ Classification model warmed up.")
+
+        self.request_queue: queue.Queue[ClassificationRequest] = queue.Queue()
+        self._pending: dict[str, ClassificationRequest] = {} # Sentence -> request not answered yet
+        self._pending_lock = threading.Lock()
+        self.batch_worker = threading.Thread(target=self._batch_worker, name="TurnDetectionBatcher", daemon=True)
+        self.batch_worker.start()
+
+    def _load_model(self, model_dir: str) -> None:
+        """
+        Loads the tokenizer and the PyTorch model.
+
+        Args:
+            model_dir: The local path or Hugging Face identifier of the classifier.
+        """
+        import torch
+        import transformers
+
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        logger.info(f"🎤🔌 Using device: {self.device}")
+        self.tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
+        self.classification_model = transformers.DistilBertForSequenceClassification.from_pretrained(model_dir)
+        self.classification_model.to(self.device)
+        self.classification_model.eval() # Set model to evaluation mode
+
+    def _model_key(self, model_dir: str) -> str:
+        """
+        Identifies the served model for the persisted probability cache.
+
+        Args:
+            model_dir: The local path or Hugging Face identifier of the classifier.
+
+        Returns:
+            A key that changes whenever the probabilities could differ.
+        """
+        return f"{type(self).__name__}:{model_dir}:{self.max_length}"
+
+    def predict_batch(self, sentences: list[str]) -> list[float]:
+        """
+        Runs one dynamically padded forward pass over `sentences`.
+
+        Args:
+            sentences: The sentences to classify.
+
+        Returns:
+            The probability that each sentence is complete, in input order.
+        """
+        import torch
+
+        inputs = self.tokenizer(
+            sentences,
+            return_tensors="pt",
+            truncation=True,
+            padding="longest", # Pad to the longest sentence in the batch only
+            max_length=self.max_length
+        )
+        # Move input tensors to the correct device (CPU or GPU)
+        inputs = {key: value.to(self.device) for key, value in inputs.items()}
+
+        with torch.no_grad(): # Disable gradient calculation for inference
+            logits = self.classification_model(**inputs).logits
+        # Softmax yields [prob_incomplete, prob_complete], index 1 is the 'complete' label
+        return torch.softmax(logits, dim=1)[:, 1].tolist()
+
+    def predict(self, sentence: str) -> float:
+        """
+        Returns the completion probability of one sentence, batched with concurrent callers.
+
+        Answers from the shared probability cache when possible; otherwise the
+        sentence is classified by the batching worker, which caches the result.
+        Concurrent misses on the same sentence share one pending request.
+
+        Args:
+            sentence: The sentence to classify.
+
+        Returns:
+            The probability (between 0.0 and 1.0) that the sentence is complete.
+        """
+        cached = self.cache.get(sentence)
+        if cached is not None:
+            return cached
+
+        with self._pending_lock:
+            request = self._pending.get(sentence)
+            if request is None:
+                request = ClassificationRequest(sentence)
+                self._pending[sentence] = request
+                self.request_queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _batch_worker(self) -> None:
+        """Collects all pending requests and answers them with a single forward pass."""
+        while True:
+            batch = [self.request_queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self.request_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # Identical sentences (e.g. from sessions hearing the same phrase) are computed once
+            unique_sentences = list(dict.fromkeys(request.sentence for request in batch))
+            try:
+                start = time.perf_counter()
+                probabilities = dict(zip(unique_sentences, self.predict_batch(unique_sentences)))
+                batch_time = time.perf_counter() - start
+                TURN_DETECTION_INFERENCE.observe(batch_time)
+                logger.debug(f"🎤⚡ Classified batch of {len(unique_sentences)} sentence(s) in {batch_time * 1000:.1f}ms")
+                for sentence, probability in probabilities.items():
+                    self.cache.put(sentence, probability, inference_time=batch_time / len(unique_sentences))
+                for request in batch:
+                    request.result = probabilities[request.sentence]
+            except Exception as e:
+                logger.exception(f"🎤💥 Error in batched classification: {e}")
+                for request in batch:
+                    request.error = e
+            with self._pending_lock:
+                # Results are cached by now, so new callers hit the cache instead
+                for request in batch:
+                    if self._pending.get(request.sentence) is request:
+                        del self._pending[request.sentence]
+            for request in batch:
+                request.done.set()
+
+def export_onnx_classifier(model_dir: str, output_dir: str, quantize: bool = True) -> str:
+    """
+    Exports the sentence completion classifier to ONNX, optionally with int8 weights.
+
+    Writes `model.onnx` (and `model.int8.onnx` if `quantize`) plus the fast
+    tokenizer's `tokenizer.json` to `output_dir`; each file is only created if it
+    is missing, so a partial directory (e.g. an interrupted export, or a
+    user-supplied model without tokenizer) is completed. Batch size and sequence length
+    are dynamic axes, so the exported graph supports the batched, dynamically
+    padded inference of `CompletionClassifier`. Requires torch and transformers;
+    quantization additionally requires onnxruntime.
+
+    Args:
+        model_dir: The local path or Hugging Face identifier of the classifier.
+        output_dir: Directory the exported files are written to.
+        quantize: If True, also writes a dynamically int8-quantized model.
+
+    Returns:
+        The path of the model to serve (the int8 model if `quantize`, else fp32).
+    """
+    import torch
+    import transformers
+
+    os.makedirs(output_dir, exist_ok=True)
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+    tokenizer_path = os.path.join(output_dir, "tokenizer.json")
+    tokenizer = None
+
+    if not os.path.exists(tokenizer_path):
+        logger.info(f"🎤📦 Writing tokenizer of {model_dir} to {output_dir}...")
+        tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
+        tokenizer.save_pretrained(output_dir) # Writes tokenizer.json for the runtime
+
+    if not os.path.exists(fp32_path):
+        logger.info(f"🎤📦 Exporting classification model {model_dir} to ONNX ({fp32_path})...")
+        if tokenizer is None:
+            tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
+        model = transformers.DistilBertForSequenceClassification.from_pretrained(model_dir)
+        model.eval()
+        model.config.return_dict = False # Export plain (logits,) tuples
+
+        dummy = tokenizer(["This is a warmup sentence."], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (dummy["input_ids"], dummy["attention_mask"]),
+                fp32_path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=14,
+            )
+        logger.info("🎤✅ ONNX export finished.")
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        logger.info(f"🎤📦 Quantizing ONNX classification model to int8 ({int8_path})...")
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        logger.info("🎤✅ ONNX int8 quantization finished.")
+    return int8_path
+
+class OnnxCompletionClassifier(CompletionClassifier):
+    """
+    CompletionClassifier served from onnxruntime instead of eager PyTorch.
+
+    The model is exported (and optionally int8-quantized) on first use via
+    `export_onnx_classifier`; afterwards startup only needs onnxruntime and the
+    `tokenizers` package, neither torch nor transformers are imported. Batching
+    and dynamic padding work exactly as in the PyTorch classifier.
+    """
+    def __init__(
+        self,
+        model_dir: str,
+        max_length: int = 128,
+        max_batch_size: int = 32,
+        onnx_dir: str = TURN_DETECTION_ONNX_DIR,
+        quantize: bool = TURN_DETECTION_ONNX_QUANTIZE,
+        num_threads: int = TURN_DETECTION_ONNX_THREADS,
+    ) -> None:
+        """
+        Exports the model if needed, creates the onnxruntime session and starts the batching worker.
+
+        Args:
+            model_dir: The local path or Hugging Face identifier of the classifier.
+            max_length: Max sequence length; longer inputs are truncated.
+            max_batch_size: Maximum number of sentences per forward pass.
+            onnx_dir: Directory holding (or receiving) the exported ONNX files.
+            quantize: If True, serves the int8 dynamically quantized model.
+            num_threads: Intra-op thread count of the onnxruntime session.
+        """
+        self.onnx_dir = onnx_dir
+        self.quantize = quantize
+        self.num_threads = num_threads
+        super().__init__(model_dir, max_length=max_length, max_batch_size=max_batch_size)
+
+    def _load_model(self, model_dir: str) -> None:
+        """
+        Loads the tokenizer and the onnxruntime inference session.
+
+        Args:
+            model_dir: The local path or Hugging Face identifier of the classifier
+                       (only needed when the ONNX files do not exist yet).
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        model_name = "model.int8.onnx" if self.quantize else "model.onnx"
+        model_path = os.path.join(self.onnx_dir, model_name)
+        if not os.path.exists(model_path) or not os.path.exists(os.path.join(self.onnx_dir, "tokenizer.json")):
+            model_path = export_onnx_classifier(model_dir, self.onnx_dir, quantize=self.quantize)
+
+        self.device = "cpu"
+        logger.info(f"🎤🔌 Using onnxruntime ({model_name}, {self.num_threads} thread(s))")
+        self.tokenizer = Tokenizer.from_file(os.path.join(self.onnx_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        pad_token = "[PAD]"
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token) # Pads to the longest in the batch
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.model_path = model_path
+
+    def _model_key(self, model_dir: str) -> str:
+        """
+        Identifies the served ONNX file for the persisted probability cache.
+
+        fp32 and int8 models yield slightly different probabilities, so the file
+        name is part of the key, together with its size and modification time to
+        invalidate the cache when the model is re-exported.
+
+        Args:
+            model_dir: The local path or Hugging Face identifier of the classifier.
+
+        Returns:
+            A key that changes whenever the probabilities could differ.
+        """
+        stat = os.stat(self.model_path)
+        return f"{super()._model_key(model_dir)}:{os.path.basename(self.model_path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+    def predict_batch(self, sentences: list[str]) -> list[float]:
+        """
+        Runs one dynamically padded onnxruntime pass over `sentences`.
+
+        Args:
+            sentences: The sentences to classify.
+
+        Returns:
+            The probability that each sentence is complete, in input order.
+        """
+        encodings = self.tokenizer.encode_batch(sentences)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        logits = self.session.run(["logits"], {"input_ids": input_ids, "attention_mask": attention_mask})[0]
+        # Numerically stable softmax, index 1 is the 'complete' label
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return (exp[:, 1] / exp.sum(axis=1)).tolist()
+
+def load_shared_classifier(model_dir: str, max_length: int = 128, backend: str = TURN_DETECTION_BACKEND) -> CompletionClassifier:
+    """
+    Returns the CompletionClassifier for a model directory and backend, loading it on first use.
+
+    The sentence classification model is loaded and warmed up only once per process
+    and then shared by every TurnDetection instance (one per voice session), so
+    additional sessions neither duplicate the model weights in memory nor run
+    separate forward passes.
+
+    Args:
+        model_dir: The local path or Hugging Face identifier of the classifier.
+        max_length: Max sequence length of the classifier inputs.
+        backend: "torch" or "onnx". Falls back to "torch" if onnxruntime is not installed.
+
+    Returns:
+        The shared CompletionClassifier.
+    """
+    if backend == "onnx" and importlib.util.find_spec("onnxruntime") is None:
+        logger.warning("🎤⚠️ onnxruntime is not installed, falling back to the torch classifier backend.")
+        backend = "torch"
+
+    key = f"{backend}:{model_dir}"
+    with _shared_classifiers_lock:
+        if key in _shared_classifiers:
+            logger.info(f"🎤♻️ Reusing loaded classification model from {model_dir} ({backend}).")
+            return _shared_classifiers[key]
+
+        if backend == "onnx":
+            classifier = OnnxCompletionClassifier(model_dir, max_length=max_length)
+        else:
+            classifier = CompletionClassifier(model_dir, max_length=max_length)
+        _shared_classifiers[key] = classifier
+        return classifier
+
 class TurnDetection:
     """
     Manages turn detection logic based on text input and sentence completion model.
@@ -187,8 +769,8 @@ class TurnDetection:
         """
         Initializes the TurnDetection instance.
 
-        Loads the sentence classification model and tokenizer, sets up internal state
-        (deques, cache), starts the background processing thread, and performs model warmup.
+        Obtains the (process-wide shared) sentence classification model and tokenizer,
+        sets up internal state (deques, cache) and starts the background processing thread.
 
         Args:
             on_new_waiting_time: Callback function invoked when a new waiting time is calculated.
@@ -213,34 +795,13 @@ class TurnDetection:
         )
         self.text_worker.start()
 
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        logger.info(f"🎤🔌 Using device: {self.device}")
-        self.tokenizer = transformers.DistilBertTokenizerFast.from_pretrained(model_dir)
-        self.classification_model = transformers.DistilBertForSequenceClassification.from_pretrained(model_dir)
-        self.classification_model.to(self.device)
-        self.classification_model.eval() # Set model to evaluation mode
         self.max_length: int = 128 # Max sequence length for the model
+        self.classifier = load_shared_classifier(model_dir, max_length=self.max_length)
         self.pipeline_latency: float = pipeline_latency
         self.pipeline_latency_overhead: float = pipeline_latency_overhead
 
-        # Initialize completion probability cache with OrderedDict for LRU behavior
-        self._completion_probability_cache: collections.OrderedDict[str, float] = collections.OrderedDict()
-        self._completion_probability_cache_max_size: int = 256 # Max size for the LRU cache
-
-        # Warmup the classification model for faster initial predictions
-        logger.info("🎤🔥 Warming up the classification model...")
-        with torch.no_grad():
-            warmup_text = "This is a warmup sentence."
-            inputs = self.tokenizer(
-                warmup_text,
-                return_tensors="pt",
-                truncation=True,
-                padding="max_length",
-                max_length=self.max_length
-            )
-            inputs = {key: value.to(self.device) for key, value in inputs.items()}
-            _ = self.classification_model(**inputs) # Run one prediction
-        logger.info("🎤✅ Classification model warmed up.")
+        # Completion probabilities are cached by the shared classifier (see CompletionProbabilityCache)
+        self.completion_probability_cache = self.classifier.cache
 
         # Default dynamic pause settings (initialized for speed_factor=0.0)
         self.detection_speed: float = 0.5
@@ -326,8 +887,8 @@ class TurnDetection:
         """
         Calculates the probability that the given sentence is complete using the ML model.
 
-        Uses an internal LRU cache (`_completion_probability_cache`) to store and
-        retrieve results for previously seen sentences, improving performance.
+        Results for previously seen sentences come from the classifier's shared
+        `CompletionProbabilityCache`, which outlives resets and sessions.
 
         Args:
             sentence: The input sentence string to analyze.
@@ -336,42 +897,17 @@ class TurnDetection:
             A float representing the probability (between 0.0 and 1.0) that the
             sentence is considered complete by the model.
         """
-        # Check cache first
-        if sentence in self._completion_probability_cache:
-            self._completion_probability_cache.move_to_end(sentence) # Mark as recently used
-            return self._completion_probability_cache[sentence]
-
-        # If not in cache, run model prediction
-        import torch
-        import torch.nn.functional as F
+        # Cache lookup, then model prediction (batched with other pending requests) on a miss
+        return self.classifier.predict(sentence)
 
-        inputs = self.tokenizer(
-            sentence,
-            return_tensors="pt",
-            truncation=True,
-            padding="max_length",
-            max_length=self.max_length
-        )
-        # Move input tensors to the correct device (CPU or GPU)
-        inputs = {key: value.to(self.device) for key, value in inputs.items()}
-
-        with torch.no_grad(): # Disable gradient calculation for inference
-            outputs = self.classification_model(**inputs)
-
-        logits = outputs.logits
-        # Apply softmax to get probabilities [prob_incomplete, prob_complete]
-        probabilities = F.softmax(logits, dim=1).squeeze().tolist()
-        prob_complete = probabilities[1] # Index 1 corresponds to 'complete' label
-
-        # Store the result in the cache
-        self._completion_probability_cache[sentence] = prob_complete
-        self._completion_probability_cache.move_to_end(sentence) # Mark as recently used
-
-        # Maintain cache size (LRU eviction)
-        if len(self._completion_probability_cache) > self._completion_probability_cache_max_size:
-            self._completion_probability_cache.popitem(last=False) # Remove the least recently used item
+    def get_cache_stats(self) -> dict:
+        """
+        Returns the hit/miss counters of the shared completion probability cache.
 
-        return prob_complete
+        Returns:
+            The dict produced by `CompletionProbabilityCache.stats()`.
+        """
+        return self.completion_probability_cache.stats()
 
     def get_suggested_whisper_pause(self, text: str) -> float:
         """
@@ -406,7 +942,9 @@ class TurnDetection:
         """
         Background worker thread that processes text from the queue for turn detection.
 
-        Continuously retrieves text items from `self.text_queue`. For each item, it:
+        Continuously retrieves text items from `self.text_queue`. All texts queued in
+        the meantime are drained at once: older partials of the utterance only update
+        the text history, the pause is calculated for the newest one. For it, it:
         1. Preprocesses the text.
         2. Updates text history deques.
         3. Finds recent matching text segments to analyze punctuation consistency.
@@ -429,16 +967,24 @@ class TurnDetection:
                 time.sleep(0.01) # Small sleep to yield CPU when idle
                 continue
 
+            # Drain partials that arrived meanwhile, only the newest one needs a pause calculation
+            texts = [text]
+            while True:
+                try:
+                    texts.append(self.text_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if len(texts) > 1:
+                logger.info(f"🎤🗑️ Skipping pause calculation for {len(texts) - 1} stale partial(s)")
+            for stale_text in texts[:-1]:
+                self._add_to_history(preprocess_text(stale_text))
+            text = texts[-1]
+
             # --- Processing starts when text is received ---
             logger.info(f"🎤⚙️ Starting pause calculation for: \"{text}\"")
             
             processed_text = preprocess_text(text) # Apply initial cleaning
-
-            # Update history deques
-            current_time = time.time()
-            self.text_time_deque.append((current_time, processed_text))
-            text_without_punctuation = strip_ending_punctuation(processed_text)
-            self.texts_without_punctuation.append((processed_text, text_without_punctuation))
+            self._add_to_history(processed_text)
 
             # Analyze recent matching texts for consistent punctuation pauses
             matches = find_matching_texts(self.texts_without_punctuation)
@@ -498,8 +1044,20 @@ class TurnDetection:
             # Suggest the calculated time via callback
             self.suggest_time(final_pause, processed_text) # Use processed_text for context
 
-            # Mark task as done for the queue (important if using queue.join())
-            self.text_queue.task_done()
+            # Mark tasks as done for the queue (important if using queue.join())
+            for _ in texts:
+                self.text_queue.task_done()
+
+    def _add_to_history(self, processed_text: str) -> None:
+        """
+        Appends a preprocessed text to the history deques used for punctuation analysis.
+
+        Args:
+            processed_text: The text after `preprocess_text`.
+        """
+        self.text_time_deque.append((time.time(), processed_text))
+        text_without_punctuation = strip_ending_punctuation(processed_text)
+        self.texts_without_punctuation.append((processed_text, text_without_punctuation))
 
     def calculate_waiting_time(
             self,
@@ -520,9 +1078,10 @@ class TurnDetection:
         """
         Resets the internal state of the TurnDetection instance.
 
-        Clears the text history deques, the model prediction cache, and resets the
-        current waiting time tracker. Useful for starting a new conversation or
-        interaction context.
+        Clears the text history deques and resets the current waiting time tracker.
+        Useful for starting a new conversation or interaction context. The shared
+        completion probability cache is kept (it is bounded by size and TTL) and
+        its counters are logged; it is saved to disk in the background.
         """
         logger.info("🎤🔄 Resetting TurnDetection state.")
         # Clear the history deques
@@ -530,9 +1089,13 @@ class TurnDetection:
         self.texts_without_punctuation.clear()
         # Reset the last suggested time
         self.current_waiting_time = -1
-        # Clear the prediction cache
-        if hasattr(self, "_completion_probability_cache"):
-            self._completion_probability_cache.clear()
+        # Keep the prediction cache, it is shared and still valid for the next turn
+        if hasattr(self, "completion_probability_cache"):
+            stats = self.completion_probability_cache.stats()
+            logger.info(
+                f"🎤📊 Completion cache: {stats['size']} entries, {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.0%} hit rate), ~{stats['saved_model_ms']:.0f}ms model time saved"
+            )
         # Clear the processing queue (optional, might discard unprocessed items)
         # while not self.text_queue.empty():
         #     try: